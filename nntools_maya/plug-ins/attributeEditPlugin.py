@@ -0,0 +1,125 @@
+"""複数アトリビュートの値の変更を一回の Undo として記録するプラグイン
+
+スクリプト側では編集中の値を MDGModifier で Undo に記録せずに適用し､
+確定時にこのコマンドへ変更前と変更後の値を渡して Undo/Redo を一回分にする｡
+"""
+
+import sys
+
+import maya.api.OpenMaya as om
+
+
+# コマンド名
+kPluginCmdName = "attributeEdit"
+
+
+def maya_useNewAPI():
+    """プラグインが API2.0 ベースであることの明示"""
+    pass
+
+
+class AttributeEdit(om.MPxCommand):
+    """コマンドクラス"""
+    def __init__(self):
+        om.MPxCommand.__init__(self)
+
+        self.plug_names = []
+        self.plugs = []
+        self.before = []
+        self.after = []
+
+    def doIt(self, args):
+        """実行時の処理"""
+        # 引数の解析
+        self.parseArguments(args)
+
+        # プラグの解決
+        slist = om.MSelectionList()
+
+        for name in self.plug_names:
+            slist.add(name)
+
+        self.plugs = [slist.getPlug(i) for i in range(slist.length())]
+
+        self.redoIt()
+
+    def parseArguments(self, args):
+        """引数の解析"""
+
+        # 引数オブジェクト
+        argData = om.MArgParser(self.syntax(), args)
+
+        # 対象のプラグ名と変更前後の値
+        self.plug_names = [argData.getFlagArgumentList('-p', i).asString(0) for i in range(argData.numberOfFlagUses('-p'))]
+        self.before = [argData.getFlagArgumentList('-b', i).asDouble(0) for i in range(argData.numberOfFlagUses('-b'))]
+        self.after = [argData.getFlagArgumentList('-a', i).asDouble(0) for i in range(argData.numberOfFlagUses('-a'))]
+
+    def _apply(self, values):
+        """全プラグの値を一つのモディファイアで設定する"""
+        modifier = om.MDGModifier()
+
+        for plug, value in zip(self.plugs, values):
+            modifier.newPlugValueDouble(plug, value)
+
+        modifier.doIt()
+
+    def redoIt(self):
+        """Redo時の処理"""
+        self._apply(self.after)
+
+    def undoIt(self):
+        """Undo時の処理"""
+        self._apply(self.before)
+
+    def isUndoable(self):
+        """Undo可能ならTrueを返す"""
+        return True
+
+
+def cmdCreator():
+    """コマンドのクラスを返す"""
+    return AttributeEdit()
+
+
+def syntaxCreator():
+    """引数の構成を設定したシンタックスオブジェクトを返す"""
+    # シンタックスオブジェクト
+    syntax = om.MSyntax()
+
+    # 対象のプラグ
+    syntax.addFlag('-p', '-plug', om.MSyntax.kString)
+    syntax.makeFlagMultiUse('-p')
+
+    # 変更前と変更後の値
+    syntax.addFlag('-b', '-before', om.MSyntax.kDouble)
+    syntax.makeFlagMultiUse('-b')
+    syntax.addFlag('-a', '-after', om.MSyntax.kDouble)
+    syntax.makeFlagMultiUse('-a')
+
+    return syntax
+
+
+def initializePlugin(mobject):
+    """プラグインを有効にした際の処理"""
+    # プラグインオブジェクト
+    mplugin = om.MFnPlugin(mobject)
+
+    # 登録
+    try:
+        mplugin.registerCommand(kPluginCmdName, cmdCreator, syntaxCreator)
+
+    except Exception:
+        sys.stderr.write('Failed to register command: ' + kPluginCmdName)
+
+
+def uninitializePlugin(mobject):
+    """プラグインを無効にした際の処理"""
+    # プラグインオブジェクト
+    mplugin = om.MFnPlugin(mobject)
+
+    # 削除
+    try:
+        mplugin.deregisterCommand(kPluginCmdName)
+
+    except Exception:
+        sys.stderr.write('Failed to unregister command: ' + kPluginCmdName)
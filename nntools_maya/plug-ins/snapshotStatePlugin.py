@@ -28,6 +28,15 @@ class SnapshotState(om.MPxCommand):
         self.to_store_colors = False
         self.to_store_smooths = False
         self.to_store_weights = False
+        self.to_store_uvs = False
+
+        # 対象オブジェクト毎の保存データ
+        self.smooths = dict()
+        self.normals = dict()
+        self.positions = dict()
+        self.colors = dict()
+        self.weights = dict()
+        self.uvs = dict()
 
     def doIt(self, args):
         """実行時の処理"""
@@ -35,6 +44,10 @@ class SnapshotState(om.MPxCommand):
         self.parseArguments(args)
 
         # オブジェクトの状態を保存
+        self.store()
+
+    def store(self):
+        """全対象オブジェクトの状態を保存する"""
         for target in self.targets:
             slist = om.MSelectionList()
             slist.add(target)
@@ -43,16 +56,16 @@ class SnapshotState(om.MPxCommand):
 
             if self.to_store_smooths or self.to_store_normals:
                 all_edge_ids = range(fn_mesh.numEdges)
-                self.smooths = [fn_mesh.isEdgeSmooth(ei) for ei in all_edge_ids]
+                self.smooths[target] = [fn_mesh.isEdgeSmooth(ei) for ei in all_edge_ids]
 
             if self.to_store_normals:
-                self.normals = fn_mesh.getNormals()
+                self.normals[target] = fn_mesh.getNormals()
 
             if self.to_store_positions:
-                self.positions = fn_mesh.getPoints()
+                self.positions[target] = fn_mesh.getPoints()
 
             if self.to_store_colors:
-                self.colors = fn_mesh.getFaceVertexColors()
+                self.colors[target] = fn_mesh.getFaceVertexColors()
 
             if self.to_store_weights:
                 slist = om.MGlobal.getSelectionListByName(target)
@@ -63,7 +76,11 @@ class SnapshotState(om.MPxCommand):
                 dg_skincluster = om.MGlobal.getSelectionListByName(skin_cluster).getDependNode(0)
                 fn_skin = oma.MFnSkinCluster(dg_skincluster)
 
-                self.weights = fn_skin.getWeights(dp_obj, om.MObject.kNullObj)[0]
+                self.weights[target] = fn_skin.getWeights(dp_obj, om.MObject.kNullObj)[0]
+
+            if self.to_store_uvs:
+                uv_set = fn_mesh.currentUVSetName()
+                self.uvs[target] = (uv_set,) + tuple(fn_mesh.getUVs(uv_set)) + tuple(fn_mesh.getAssignedUVs(uv_set))
 
     def parseArguments(self, args):
         """引数の解析"""
@@ -95,6 +112,9 @@ class SnapshotState(om.MPxCommand):
         if argData.isFlagSet('-w'):
             self.to_store_weights = argData.flagArgumentBool('-w', 0)
 
+        if argData.isFlagSet('-uv'):
+            self.to_store_uvs = argData.flagArgumentBool('-uv', 0)
+
     def _undo_redo(self):
         """Undo/Redo時の処理"""
         # オブジェクトの状態を復帰
@@ -106,13 +126,13 @@ class SnapshotState(om.MPxCommand):
 
             if self.to_store_smooths or self.to_store_normals:
                 all_edge_ids = range(fn_mesh.numEdges)
-                fn_mesh.setEdgeSmoothings(all_edge_ids, self.smooths)
+                fn_mesh.setEdgeSmoothings(all_edge_ids, self.smooths[target])
 
             if self.to_store_normals:
-                fn_mesh.setNormals(self.normals)
+                fn_mesh.setNormals(self.normals[target])
 
             if self.to_store_positions:
-                fn_mesh.setPoints(self.positions)
+                fn_mesh.setPoints(self.positions[target])
 
             if self.to_store_colors:
                 face_indices = om.MIntArray()
@@ -124,7 +144,7 @@ class SnapshotState(om.MPxCommand):
                         face_indices.append(i)
                         vertex_indices.append(j)
 
-                fn_mesh.setFaceVertexColors(self.colors, face_indices, vertex_indices)
+                fn_mesh.setFaceVertexColors(self.colors[target], face_indices, vertex_indices)
 
             if self.to_store_weights:
                 skin_cluster = mel.eval(f"findRelatedSkinCluster {target}")
@@ -136,7 +156,18 @@ class SnapshotState(om.MPxCommand):
                 all_vtx_comp = fn_comp.create(om.MFn.kMeshVertComponent)
                 fn_comp.addElements(list(range(fn_mesh.numVertices)))
 
-                fn_skin.setWeights(dag, all_vtx_comp, all_influences, self.weights)
+                fn_skin.setWeights(dag, all_vtx_comp, all_influences, self.weights[target])
+
+            if self.to_store_uvs and target in self.uvs:
+                uv_set, us, vs, uv_counts, uv_ids = self.uvs[target]
+
+                # UV の追加や割り当ての変更があった場合は割り当てごと復元する
+                if len(us) != fn_mesh.numUVs(uv_set) or list(fn_mesh.getAssignedUVs(uv_set)[1]) != list(uv_ids):
+                    fn_mesh.clearUVs(uv_set)
+                    fn_mesh.setUVs(us, vs, uv_set)
+                    fn_mesh.assignUVs(uv_counts, uv_ids, uv_set)
+                else:
+                    fn_mesh.setUVs(us, vs, uv_set)
 
             fn_mesh.updateSurface()
 
@@ -175,6 +206,7 @@ def syntaxCreator():
     syntax.addFlag('-c', '-color', om.MSyntax.kBoolean)
     syntax.addFlag('-sm', '-smooth', om.MSyntax.kBoolean)
     syntax.addFlag('-w', '-weight', om.MSyntax.kBoolean)
+    syntax.addFlag('-uv', '-uvs', om.MSyntax.kBoolean)
 
     return syntax
 
@@ -0,0 +1,236 @@
+"""
+メッシュの疎行列演算子のキャッシュ
+
+隣接行列 (CSR) とその二乗による 2 ホップ近傍､境界頂点､隣接頂点の平均を取る演算子はトポロジーから作り､
+トポロジーが変わるまで保持する｡
+主曲率･エッジ長で重み付けした平均演算子･コタンジェントラプラシアンと質量行列は頂点座標から作り､
+直近の頂点座標の分を保持する｡ ラプラシアンスムーズの係数行列の分解は強度毎に保持する｡
+
+    import _experimental.mesh_operators as mo
+    ops = mo.get_operators(mesh)
+    new_coords = ops.uniform_average @ ops.vertices
+"""
+import collections
+import hashlib
+
+import igl
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+import maya.api.OpenMaya as om
+
+
+def array_hash(array):
+    """ndarray の内容のハッシュ"""
+    return hashlib.md5(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def get_mesh_arrays(mesh):
+    """メッシュの頂点座標と三角形の頂点インデックスを一括で取得する
+
+    Args:
+        mesh (str): メッシュのノード名
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 頂点座標 (N x 3) と三角形の頂点インデックス (T x 3)
+    """
+    dag_path = om.MGlobal.getSelectionListByName(mesh).getDagPath(0)
+    fn_mesh = om.MFnMesh(dag_path)
+
+    # MPointArray は (x, y, z, w) の並びとして変換できる
+    vertices = np.array(fn_mesh.getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+
+    _, tri_vertex_ids = fn_mesh.getTriangles()
+    faces = np.array(tri_vertex_ids, dtype=np.int64).reshape(-1, 3)
+
+    return vertices, faces
+
+
+def row_normalize(matrix):
+    """各行の和が 1 になるようにした CSR 行列｡ 和が 0 の行はそのまま"""
+    sums = np.asarray(matrix.sum(axis=1)).ravel()
+    inv = np.zeros_like(sums)
+    inv[sums != 0] = 1.0 / sums[sums != 0]
+
+    return (scipy.sparse.diags(inv) @ matrix).tocsr()
+
+
+class MeshOperators(object):
+    """メッシュ 1 つ分の演算子
+
+    Args:
+        faces (np.ndarray): 三角形の頂点インデックス (T x 3)
+        num_vertices (int): 頂点数
+    """
+    # 座標に依存する演算子を保持する座標の数
+    max_geometries = 2
+
+    def __init__(self, faces, num_vertices):
+        self.faces = faces
+        self.num_vertices = num_vertices
+
+        # 隣接行列｡ 両方向のエッジを足してから値を 1 にする
+        rows = np.concatenate([faces[:, 0], faces[:, 1], faces[:, 2]])
+        cols = np.concatenate([faces[:, 1], faces[:, 2], faces[:, 0]])
+        edge_counts = scipy.sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_vertices, num_vertices))
+        self.adjacency = (edge_counts + edge_counts.T).tocsr()
+        self.adjacency.data[:] = 1.0
+        self.degree = np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+        # 一つのフェースにしか使われていないエッジの頂点が境界頂点
+        undirected_counts = scipy.sparse.triu(edge_counts + edge_counts.T, k=1).tocoo()
+        boundary = undirected_counts.data == 1
+        self.boundary_mask = np.zeros(num_vertices, dtype=bool)
+        self.boundary_mask[undirected_counts.row[boundary]] = True
+        self.boundary_mask[undirected_counts.col[boundary]] = True
+
+        # 隣接頂点の単純平均
+        self.uniform_average = row_normalize(self.adjacency)
+
+        self._two_hop = None
+        self.points_hash = None
+        self._geometry = None
+        self._geometries = collections.OrderedDict()
+
+    @property
+    def boundary_vertex_ids(self):
+        return np.where(self.boundary_mask)[0]
+
+    @property
+    def two_hop(self):
+        """2 ホップ以内の隣接行列 (自身を除く)｡ 初回参照時に A + A^2 から作る"""
+        if self._two_hop is None:
+            two_hop = (self.adjacency + self.adjacency @ self.adjacency).tocsr()
+            two_hop.setdiag(0)
+            two_hop.eliminate_zeros()
+            two_hop.data[:] = 1.0
+            self._two_hop = two_hop
+
+        return self._two_hop
+
+    def set_points(self, vertices, points_hash=None):
+        """頂点座標を設定する
+
+        座標に依存する演算子は直近 max_geometries 個の座標の分を保持するので､
+        適用後に Undo して強度だけ変えて再実行する場合は分解済みの行列を再利用できる｡
+        """
+        points_hash = points_hash or array_hash(vertices)
+
+        if points_hash not in self._geometries:
+            self._geometries[points_hash] = {
+                "vertices": vertices,
+                "curvature": None,
+                "weighted_average": None,
+                "laplacian": None,
+                "laplacian_factors": dict(),
+            }
+
+            while len(self._geometries) > self.max_geometries:
+                self._geometries.popitem(last=False)
+
+        self._geometries.move_to_end(points_hash)
+        self.points_hash = points_hash
+        self._geometry = self._geometries[points_hash]
+
+    @property
+    def vertices(self):
+        """設定した頂点座標"""
+        return self._geometry["vertices"] if self._geometry else None
+
+    def curvature(self):
+        """設定した頂点座標での主曲率 (k1, k2)"""
+        if self._geometry["curvature"] is None:
+            _, _, k1, k2 = igl.principal_curvature(self.vertices, self.faces)
+            self._geometry["curvature"] = (k1, k2)
+
+        return self._geometry["curvature"]
+
+    def mean_curvature(self):
+        """設定した頂点座標での (k1 + k2) / 2"""
+        k1, k2 = self.curvature()
+
+        return (k1 + k2) / 2
+
+    @property
+    def weighted_average(self):
+        """設定した頂点座標でのエッジ長で重み付けした隣接頂点の平均を取る演算子"""
+        if self._geometry["weighted_average"] is None:
+            coo = self.adjacency.tocoo()
+            lengths = np.linalg.norm(self.vertices[coo.row] - self.vertices[coo.col], axis=1)
+            weights = scipy.sparse.csr_matrix((lengths, (coo.row, coo.col)), shape=self.adjacency.shape)
+            self._geometry["weighted_average"] = row_normalize(weights)
+
+        return self._geometry["weighted_average"]
+
+    def laplacian(self):
+        """設定した頂点座標でのコタンジェントラプラシアンとボロノイ質量行列"""
+        if self._geometry["laplacian"] is None:
+            L = igl.cotmatrix(self.vertices, self.faces)
+            M = igl.massmatrix(self.vertices, self.faces, igl.MASSMATRIX_TYPE_VORONOI)
+            self._geometry["laplacian"] = (L, M)
+
+        return self._geometry["laplacian"]
+
+    def laplacian_solver(self, lambda_):
+        """(M - lambda L) x = M b を解く関数を返す｡ 分解結果は強度毎に保持する"""
+        factors = self._geometry["laplacian_factors"]
+
+        if lambda_ not in factors:
+            L, M = self.laplacian()
+            solve = scipy.sparse.linalg.factorized((M - lambda_ * L).tocsc())
+            factors[lambda_] = lambda b: np.column_stack([solve(M @ b[:, i]) for i in range(b.shape[1])])
+
+        return factors[lambda_]
+
+    def laplacian_solver_at(self, vertices, lambda_):
+        """vertices の頂点座標で分解した laplacian_solver を返す
+
+        設定中の頂点座標と異なる場合は vertices の分を作って保持し､設定済みの頂点座標があれば元に戻す｡
+        """
+        points_hash = array_hash(vertices)
+
+        if points_hash == self.points_hash:
+            return self.laplacian_solver(lambda_)
+
+        current = (self.vertices, self.points_hash)
+        self.set_points(vertices, points_hash)
+        solve = self.laplacian_solver(lambda_)
+
+        if current[1] is not None:
+            self.set_points(*current)
+
+        return solve
+
+
+class OperatorCache(object):
+    """メッシュ毎の MeshOperators のキャッシュ"""
+    def __init__(self):
+        self.entries = dict()
+
+    def get(self, mesh):
+        """メッシュの最新の状態に対応する MeshOperators を返す"""
+        vertices, faces = get_mesh_arrays(mesh)
+        topology_hash = array_hash(faces)
+        entry = self.entries.get(mesh)
+
+        if entry is None or entry[0] != topology_hash or entry[1].num_vertices != len(vertices):
+            entry = (topology_hash, MeshOperators(faces, len(vertices)))
+            self.entries[mesh] = entry
+
+        operators = entry[1]
+        operators.set_points(vertices)
+
+        return operators
+
+    def clear(self):
+        self.entries.clear()
+
+
+# セッション共通のキャッシュ
+_cache = OperatorCache()
+
+
+def get_operators(mesh):
+    """メッシュの演算子を返す｡ トポロジーと頂点座標が前回と同じならキャッシュを返す"""
+    return _cache.get(mesh)
@@ -1,95 +1,297 @@
 """
 ジオデシック距離で頂点を選択する
+
+Heat Method でジオデシック距離を求める｡
+メッシュ毎に三角形･頂点座標と､熱拡散とポアソン方程式の係数行列の分解結果をキャッシュし､
+トポロジーと頂点座標のハッシュが変わらない限り再利用するので､二回目以降の問い合わせは前進後退代入だけになる｡
+複数のソース頂点は一度の求解で最も近いソースまでの距離になる｡
+
+scikit-sparse (cholmod) があれば疎行列のコレスキー分解を､無ければ scipy の LU 分解を使う｡
+キャッシュはモジュールに保持するので､繰り返し使う場合はスクリプトを再実行せずにインポートして main() を呼ぶ｡
+
+    import select_from_geodesic_dist
+    select_from_geodesic_dist.main()
 """
-import igl
+import hashlib
+
 import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
 
 from datetime import datetime
 
+try:
+    from sksparse.cholmod import cholesky
+except ImportError:
+    cholesky = None
+
+
+def factorize(matrix):
+    """対称正定値の疎行列を分解し､右辺を受け取って解を返す関数を返す"""
+    matrix = matrix.tocsc()
+
+    if cholesky is not None:
+        return cholesky(matrix)
+
+    return scipy.sparse.linalg.factorized(matrix)
 
-def triangulate(faces):
-    """フェースを三角形に分割する
+
+def array_hash(array):
+    """ndarray の内容のハッシュ"""
+    return hashlib.md5(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def get_mesh_arrays(dag_path):
+    """メッシュの頂点座標と三角形の頂点インデックスを一括で取得する
 
     Args:
-        faces (list[list[int]]): ポリゴン毎の頂点インデックスリストのリスト
+        dag_path (MDagPath): メッシュの DAG パス
 
     Returns:
-        list[list[int]]: 引数を三角形に分割したもの
+        tuple[np.ndarray, np.ndarray]: 頂点座標 (N x 3) と三角形の頂点インデックス (T x 3)
     """
-    tris = []
-    for face in faces:
-        for i in range(len(face)-2):
-            tris.append([face[0], face[i+1], face[i+2]])
+    fn_mesh = om.MFnMesh(dag_path)
 
-    return tris
+    # MPointArray は (x, y, z, w) の並びとして変換できる
+    vertices = np.array(fn_mesh.getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
 
+    _, tri_vertex_ids = fn_mesh.getTriangles()
+    faces = np.array(tri_vertex_ids, dtype=np.int64).reshape(-1, 3)
 
-# Maya からメッシュデータを取得
-def get_mesh_data_from_selection():
-    # 選択オブジェクトの名前を取得
-    selection_list = om.MGlobal.getActiveSelectionList()
-    dag_path = selection_list.getDagPath(0)
-    mfn_mesh = om.MFnMesh(dag_path)
+    return vertices, faces
 
-    # 頂点座標を取得
-    points = mfn_mesh.getPoints(om.MSpace.kWorld)
-    vertices = np.array([[p.x, p.y, p.z] for p in points])
 
-    # ポリゴンのインデックスリストを取得
-    vertex_indices = []
-    for i in range(mfn_mesh.numPolygons):
-        vertex_indices.append(mfn_mesh.getPolygonVertices(i))
+class MeshTopology(object):
+    """頂点座標に依存しない三角形と連結成分
 
-    # 四角形メッシュを三角形メッシュに変換
-    faces = np.array(triangulate(vertex_indices))
+    Args:
+        faces (np.ndarray): 三角形の頂点インデックス (T x 3)
+        num_vertices (int): 頂点数
+    """
+    def __init__(self, faces, num_vertices):
+        self.faces = faces
+        self.num_vertices = num_vertices
 
-    return vertices, faces
+        rows = np.concatenate([faces[:, 0], faces[:, 1], faces[:, 2]])
+        cols = np.concatenate([faces[:, 1], faces[:, 2], faces[:, 0]])
+        adjacency = scipy.sparse.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_vertices, num_vertices))
+        self.num_components, self.component_ids = scipy.sparse.csgraph.connected_components(adjacency, directed=False)
+
+
+class HeatGeodesics(object):
+    """Heat Method によるジオデシック距離の事前計算
+
+    Args:
+        vertices (np.ndarray): 頂点座標 (N x 3)
+        topology (MeshTopology): 三角形と連結成分
+    """
+    def __init__(self, vertices, topology):
+        self.topology = topology
+        faces = topology.faces
+        n = topology.num_vertices
+
+        x0 = vertices[faces[:, 0]]
+        x1 = vertices[faces[:, 1]]
+        x2 = vertices[faces[:, 2]]
+
+        # フェース法線と面積｡ 縮退した三角形は面積を下限値にして 0 除算を避ける
+        normals = np.cross(x1 - x0, x2 - x0)
+        double_areas = np.linalg.norm(normals, axis=1)
+        double_areas = np.maximum(double_areas, 1e-12 * max(double_areas.max(), 1e-12))
+        normals /= double_areas[:, np.newaxis]
+        areas = double_areas * 0.5
+
+        # 勾配演算子 (3T x N)｡ 頂点 i の寄与は N x (対辺ベクトル) / 2A
+        rows = []
+        cols = []
+        values = []
+        num_faces = len(faces)
+        face_rows = np.arange(num_faces) * 3
+
+        for k, opposite in enumerate(((x2 - x1), (x0 - x2), (x1 - x0))):
+            g = np.cross(normals, opposite) / double_areas[:, np.newaxis]
+
+            for axis in range(3):
+                rows.append(face_rows + axis)
+                cols.append(faces[:, k])
+                values.append(g[:, axis])
+
+        self.gradient = scipy.sparse.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(3 * num_faces, n))
+
+        # 勾配ベクトルの成分毎に面積で重み付けする対角行列
+        self.area_weights = scipy.sparse.diags(np.repeat(areas, 3))
+
+        # 発散演算子 (G^T A) と剛性行列 (G^T A G = -L, L はコタンジェントラプラシアン)
+        self.divergence = (self.gradient.T @ self.area_weights).tocsr()
+        stiffness = (self.divergence @ self.gradient).tocsc()
+
+        # 重心領域による集中質量行列
+        mass = np.zeros(n)
+        for k in range(3):
+            np.add.at(mass, faces[:, k], areas / 3.0)
+
+        # 孤立頂点の対角成分が 0 にならないようにする
+        mass = np.maximum(mass, 1e-12 * max(mass.max(), 1e-12))
+        mass_matrix = scipy.sparse.diags(mass)
+
+        # 時間ステップは平均エッジ長の二乗
+        edge_lengths = np.linalg.norm(np.concatenate([x1 - x0, x2 - x1, x0 - x2]), axis=1)
+        self.time_step = float(np.mean(edge_lengths)) ** 2 if len(edge_lengths) else 1.0
+
+        # 熱拡散 (M + tK) u = δ とポアソン方程式 K φ = div X の係数行列を分解しておく
+        # K は定数ベクトルを核に持つので質量行列をわずかに足して正定値にする
+        regularization = 1e-8 * stiffness.diagonal().mean() / mass.mean() if n else 0.0
+        self.solve_heat = factorize(mass_matrix + self.time_step * stiffness)
+        self.solve_poisson = factorize(stiffness + regularization * mass_matrix)
+
+    def distances(self, source_ids):
+        """ソース頂点のいずれかまでのジオデシック距離
 
+        Args:
+            source_ids (list[int]): ソース頂点のインデックス
 
-# libigl を使ってジオデシック距離を計算し、指定距離以内の頂点を取得
-def get_nearby_vertices(vertices, faces, source_vertex_idx, max_distance):
-    # メッシュを初期化 (V: 頂点, F: 面)
-    V = np.array(vertices)
-    F = np.array(faces)
+        Returns:
+            np.ndarray: 頂点毎の距離｡ ソースと連結していない頂点は inf
+        """
+        topology = self.topology
+        source_ids = np.unique(np.asarray(source_ids, dtype=np.int64))
 
-    # ジオデシック距離を計算 (ソース頂点を指定)
-    vs = np.array([source_vertex_idx], dtype=np.int32)  # ソース頂点インデックス
-    vt = np.arange(len(V))  # 全ての頂点に対して距離を計算
+        delta = np.zeros(topology.num_vertices)
+        delta[source_ids] = 1.0
+        u = self.solve_heat(delta)
 
-    distances = igl.exact_geodesic(V, F, vs, vt)  # 戻り値は1つの配列
+        # 熱の勾配の逆方向の単位ベクトル場
+        grad_u = (self.gradient @ u).reshape(-1, 3)
+        norms = np.linalg.norm(grad_u, axis=1)
+        field = np.zeros_like(grad_u)
+        nonzero = norms > 0
+        field[nonzero] = -grad_u[nonzero] / norms[nonzero, np.newaxis]
 
-    # 指定距離以内の頂点を選別
-    nearby_vertices = np.where(distances <= max_distance)[0]
+        phi = self.solve_poisson(self.divergence @ field.reshape(-1))
 
-    return nearby_vertices
+        # 連結成分毎にソースでの値が 0 になるようにずらす
+        result = np.full(topology.num_vertices, np.inf)
+        source_components = topology.component_ids[source_ids]
 
+        for component in np.unique(source_components):
+            mask = topology.component_ids == component
+            offset = phi[source_ids[source_components == component]].min()
+            result[mask] = np.maximum(phi[mask] - offset, 0.0)
 
-# Maya で指定の頂点を選択する
-def select_vertices_in_maya(dag_path, vertex_indices):
-    cmds.select(clear=True)
-    for idx in vertex_indices:
-        cmds.select(f"{dag_path.fullPathName()}.vtx[{idx}]", add=True)
+        return result
+
+
+class GeodesicCache(object):
+    """メッシュ毎の HeatGeodesics のキャッシュ
+
+    トポロジーが変わればすべて､頂点座標だけが変われば係数行列の分解だけを作り直す｡
+    """
+    def __init__(self):
+        self.entries = dict()
+
+    def get(self, dag_path):
+        """メッシュの最新の状態に対応する HeatGeodesics を返す"""
+        key = dag_path.fullPathName()
+        vertices, faces = get_mesh_arrays(dag_path)
+        topology_hash = array_hash(faces)
+        points_hash = array_hash(vertices)
+
+        entry = self.entries.get(key)
+
+        if entry is None or entry["topology_hash"] != topology_hash:
+            entry = {"topology_hash": topology_hash, "points_hash": None, "topology": MeshTopology(faces, len(vertices)), "solver": None}
+            self.entries[key] = entry
+
+        if entry["points_hash"] != points_hash:
+            entry["solver"] = HeatGeodesics(vertices, entry["topology"])
+            entry["points_hash"] = points_hash
+
+        return entry["solver"]
+
+    def clear(self):
+        self.entries.clear()
+
+
+# セッション共通のキャッシュ
+_cache = GeodesicCache()
+
+
+def get_nearby_vertices(dag_path, source_ids, max_distance):
+    """ソース頂点から指定距離以内の頂点インデックスを返す
+
+    Args:
+        dag_path (MDagPath): メッシュの DAG パス
+        source_ids (list[int]): ソース頂点のインデックス
+        max_distance (float): 距離 (Maya の単位)
+
+    Returns:
+        np.ndarray: 頂点インデックス
+    """
+    distances = _cache.get(dag_path).distances(source_ids)
+
+    return np.where(distances <= max_distance)[0]
+
+
+def make_vertex_selection(dag_path, vertex_ids):
+    """頂点インデックスから一つのコンポーネントを持つ MSelectionList を作成する"""
+    fn_comp = om.MFnSingleIndexedComponent()
+    comp = fn_comp.create(om.MFn.kMeshVertComponent)
+    fn_comp.addElements([int(i) for i in vertex_ids])
+
+    selection_list = om.MSelectionList()
+    selection_list.add((dag_path, comp))
+
+    return selection_list
+
+
+def select_vertices_in_maya(dag_path, vertex_ids):
+    """頂点をまとめて選択する｡ Undo できるように範囲表記の文字列にして cmds.select を一度だけ呼ぶ"""
+    selection_list = make_vertex_selection(dag_path, vertex_ids)
+    cmds.select(selection_list.getSelectionStrings(), replace=True)
+
+
+def get_source_from_selection():
+    """選択からメッシュの DAG パスとソース頂点を取得する｡ オブジェクト選択なら頂点 0 をソースにする"""
+    selection_list = om.MGlobal.getActiveSelectionList()
+    dag_path, comp = selection_list.getComponent(0)
+    dag_path.extendToShape()
+
+    if comp.isNull():
+        return dag_path, [0]
+
+    vertex_comp = om.MSelectionList()
+    for name in cmds.polyListComponentConversion(selection_list.getSelectionStrings(0), toVertex=True):
+        vertex_comp.add(name)
+
+    source_ids = []
+    for i in range(vertex_comp.length()):
+        _, comp = vertex_comp.getComponent(i)
+        source_ids.extend(om.MFnSingleIndexedComponent(comp).getElements())
+
+    return dag_path, source_ids
 
 
 # メイン処理
 def main():
     max_distance = 5  # 10 cm (Maya の単位に依存)
 
-    # Maya からメッシュデータを取得
-    vertices, faces = get_mesh_data_from_selection()
+    # 選択メッシュと選択頂点を取得
+    dag_path, source_ids = get_source_from_selection()
 
     print(datetime.now())
-    # 頂点インデックス 0 から 10cm 以内の頂点を取得
-    nearby_vertices = get_nearby_vertices(vertices, faces, 0, max_distance)
+    # 選択頂点から指定距離以内の頂点を取得
+    nearby_vertices = get_nearby_vertices(dag_path, source_ids, max_distance)
     print(datetime.now())
 
     # Maya で近くの頂点を選択
-    selection_list = om.MGlobal.getActiveSelectionList()
-    dag_path = selection_list.getDagPath(0)
     select_vertices_in_maya(dag_path, nearby_vertices)
 
 
-# 実行
-main()
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,17 @@
 TODO: curvature_smooth で interior_division オプション
 TODO: 独立したリラックス機能
 """
-import math
 
 import igl
-import scipy.sparse
-import scipy.sparse.linalg
 import numpy as np
 from numpy.typing import NDArray
 
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
 
+import plugin_util.snapshotState as ss
+import _experimental.mesh_operators as mo
+
 
 def get_boundary_vertex_ids(vertex_ids_per_face):
     """フェース情報から境界頂点の頂点IDを返す
@@ -90,144 +90,114 @@ def get_mesh_data(mesh):
     return vertex_coords, vertex_ids_per_tri
 
 
-def adjacency_list_2_hop(faces):
-    # 隣接リストを取得
-    adj_list = igl.adjacency_list(faces)
+def adjacency_list_2_hop(faces, num_vertices=None):
+    """2 ホップ以内の隣接頂点のリストを返す｡ 隣接行列の二乗から作る"""
+    num_vertices = num_vertices or int(faces.max()) + 1
+    two_hop = mo.MeshOperators(faces, num_vertices).two_hop
 
-    # 2ホップ以内の隣接リストを生成
-    adj_list_2_hop = []
-    for i, neighbors in enumerate(adj_list):
-        two_hop_neighbors = set(neighbors)
-        for neighbor in neighbors:
-            two_hop_neighbors.update(adj_list[neighbor])
-        two_hop_neighbors.discard(i)  # 自分自身を除外
-        adj_list_2_hop.append(list(two_hop_neighbors))
+    return [two_hop.indices[two_hop.indptr[i]:two_hop.indptr[i + 1]].tolist() for i in range(num_vertices)]
 
-    return adj_list_2_hop
 
+def curvature_smooth_step(operators, current_coords, mod_factor=0.2, interior_division=True, movable_mask=None, curvature=None):
+    """曲率に基づくスムーズを 1 回分行った頂点座標を返す
 
-def curvature_smooth(mesh, iterations=1, mod_factor=0.2, interior_division=True, exclusive_ids=None, laplacian_lambda=0):
-    """曲率に基づいてメッシュをスムージングする
+    全頂点分を疎行列とベクトルの積でまとめて計算する｡
 
     Args:
-        mesh (str): 対象メッシュのノード名
-        iterations (int, optional): 反復数. Defaults to 1.
+        operators (MeshOperators): メッシュの演算子
+        current_coords (ndarray): 現在の頂点座標
         mod_factor (float, optional): スムーズ強度. Defaults to 0.2.
-        exclusive_ids (list[int], optional): スムースしない頂点IDのリスト. Defaults to None.
-    """
-
-    exclusive_ids = exclusive_ids or []
+        interior_division (bool, optional): True で隣接頂点の平均をエッジ長で重み付けする. Defaults to True.
+        movable_mask (ndarray, optional): 動かす頂点を True にした bool 配列｡ 省略時は境界以外. Defaults to None.
+        curvature (ndarray, optional): 頂点毎の (k1 + k2) / 2｡ 省略時は current_coords から計算する. Defaults to None.
 
+    Returns:
+        ndarray: スムーズ後の頂点座標
+    """
     threshold_k = 0.0001
     max_k_ratio = 1
     min_k_ratio = 0.01
 
-    vertex_coords, vertex_ids_per_face = get_mesh_data(mesh)
-    vertex_normals = igl.per_vertex_normals(vertex_coords, vertex_ids_per_face)
-
-    # 境界頂点の頂点ID
-    boundary_vertex_ids = get_boundary_vertex_ids(vertex_ids_per_face)
-
-    current_coords = np.copy(vertex_coords)
-    new_coords = np.copy(vertex_coords)
-
-    neighbor_vis_per_vertex = igl.adjacency_list(vertex_ids_per_face)
+    if movable_mask is None:
+        movable_mask = ~operators.boundary_mask
 
-    vertex_ids_each_edge = igl.edges(vertex_ids_per_face)
-    vertex_size = len(vertex_coords)
-    edge_length_matrix = np.full((vertex_size, vertex_size), -1.0, dtype=float)
+    if curvature is None:
+        _, _, k1, k2 = igl.principal_curvature(current_coords, operators.faces)
+        curvature = (k1 + k2) / 2
 
-    row_indices = vertex_ids_each_edge[:, 0]
-    col_indices = vertex_ids_each_edge[:, 1]
-    edge_ids = np.arange(vertex_ids_each_edge.shape[0])
+    # 隣接頂点の平均点｡ interior_division が True の場合はエッジ長で重み付け
+    average = operators.weighted_average if interior_division else operators.uniform_average
+    avg_coords = average @ current_coords
+    diff_vectors = avg_coords - current_coords
 
-    for _ in range(iterations):
-        # 主曲率を計算
-        c1, c2, k1, k2 = igl.principal_curvature(current_coords, vertex_ids_per_face)
-
-        start_coords = vertex_coords[vertex_ids_each_edge[:, 0]]
-        end_coords = vertex_coords[vertex_ids_each_edge[:, 1]]
-        differences = end_coords - start_coords
-        edge_length_each_eid = np.linalg.norm(differences, axis=1)
+    avg_neighbor_k = operators.uniform_average @ curvature
+    diff_k = avg_neighbor_k - curvature
 
-        for vi in range(len(vertex_coords)):
-            # 境界はスキップ
-            if vi in boundary_vertex_ids:
-                continue
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k_ratio = np.clip(np.nan_to_num(np.abs(diff_k / curvature), nan=max_k_ratio, posinf=max_k_ratio), min_k_ratio, max_k_ratio)
 
-            # 現在の頂点座標
-            current_coord = current_coords[vi]
+    ideal_coords = avg_coords + diff_vectors * (np.sign(avg_neighbor_k) * diff_k)[:, np.newaxis]
+    tweak_vectors = ideal_coords - current_coords
 
-            neighbor_vis = neighbor_vis_per_vertex[vi]
+    mask = movable_mask & np.any(diff_vectors != 0, axis=1) & (np.abs(diff_k) >= threshold_k)
 
-            # 隣接頂点の平均点計算
-            # interior_division が True の場合はエッジ長で重み付け
-            if interior_division:
-                # 頂点IDからエッジ長を得るndarray
-                edge_length_matrix[row_indices, col_indices] = np.linalg.norm((vertex_coords[row_indices] - vertex_coords[col_indices]), axis=1)
-                edge_length_matrix[col_indices, row_indices] = edge_length_matrix[row_indices, col_indices]
+    new_coords = np.copy(current_coords)
+    new_coords[mask] += tweak_vectors[mask] * (mod_factor * k_ratio[mask])[:, np.newaxis]
 
-                # 内分点を求める
-                # 隣接頂点のエッジ長抽出
-                edge_lengths = edge_length_matrix[vi, neighbor_vis]
+    return new_coords
 
-                # 隣接頂点の頂点座標抽出
-                neighbor_coords = current_coords[neighbor_vis]
 
-                # 各座標にエッジ長で重み付けして合計､エッジ長の和で割る
-                inner_products = np.sum(neighbor_coords * edge_lengths[:, np.newaxis], axis=0)
-                avg_coord = inner_products / np.sum(edge_lengths)
-            else:
-                avg_coord = np.mean(current_coords[neighbor_vis], axis=0)
+def curvature_smooth(mesh, iterations=1, mod_factor=0.2, interior_division=True, exclusive_ids=None, laplacian_lambda=0):
+    """曲率に基づいてメッシュをスムージングする
 
-            diff_vector = avg_coord - current_coord
+    隣接行列･境界頂点･平均演算子･初期形状の曲率とラプラシアンの分解はキャッシュされるので､
+    同じ形状に対して強度を変えて再実行する場合は反復計算だけが行われる｡
 
-            if math.isclose(np.linalg.norm(diff_vector), 0.0):
-                continue
+    Args:
+        mesh (str): 対象メッシュのノード名
+        iterations (int, optional): 反復数. Defaults to 1.
+        mod_factor (float, optional): スムーズ強度. Defaults to 0.2.
+        exclusive_ids (list[int], optional): スムースしない頂点IDのリスト. Defaults to None.
+    """
+    operators = mo.get_operators(mesh)
+    vertex_coords = operators.vertices
 
-            avg_neighbor_k1 = np.mean(k1[neighbor_vis], axis=0)
-            avg_neighbor_k2 = np.mean(k2[neighbor_vis], axis=0)
-            avg_neighbor_k = (avg_neighbor_k1 + avg_neighbor_k2) / 2
-            current_avg_k = (k1[vi] + k2[vi]) / 2
-            diff_k = avg_neighbor_k - current_avg_k
+    # 境界頂点とスムースしない頂点は動かさない
+    movable_mask = ~operators.boundary_mask
+    if exclusive_ids:
+        movable_mask[np.asarray(exclusive_ids, dtype=np.int64)] = False
 
-            k_ratio = max(min(abs(diff_k / current_avg_k), max_k_ratio), min_k_ratio)
+    current_coords = np.copy(vertex_coords)
 
-            ideal_coord = avg_coord + diff_vector * np.sign(avg_neighbor_k) * diff_k
-            tweak_vector = ideal_coord - current_coord
+    for i in range(iterations):
+        # 初回は初期形状の曲率のキャッシュを使う
+        curvature = operators.mean_curvature() if i == 0 else None
+        new_coords = curvature_smooth_step(operators, current_coords, mod_factor, interior_division, movable_mask, curvature)
 
-            if abs(diff_k) < threshold_k:
-                continue
+        if laplacian_lambda != 0:
+            new_coords = laplacian_smoothing(new_coords, operators.faces, iterations=1, lambda_=laplacian_lambda, exclusive_ids=operators.boundary_vertex_ids, projection=True, operators=operators)
 
-            else:
-                new_coords[vi] = current_coord + tweak_vector * mod_factor * k_ratio
+        current_coords = new_coords
 
-            if vi == -1:
-                print("current_coord: ", current_coord)
-                print("diff_vector: ", diff_vector)
-                print("new_coord: ", new_coords[vi])
-                print("current_avg_k: ", round(current_avg_k, 5))
-                print("avg_neighbor_k: ", round(avg_neighbor_k, 5))
-                print("diff_k: ", round(diff_k, 5))
-                print("k ratio: ", round(diff_k / current_avg_k, 5))
-                print("tweak_vector: ", tweak_vector)
-                print("tweak amount: ", tweak_vector * mod_factor * k_ratio)
+    # スムースしない頂点は元の座標に戻して一括で適用する
+    if exclusive_ids:
+        current_coords[exclusive_ids] = vertex_coords[exclusive_ids]
 
-        if laplacian_lambda != 0:
-            new_coords = laplacian_smoothing(new_coords, vertex_ids_per_face, iterations=1, lambda_=laplacian_lambda, exclusive_ids=boundary_vertex_ids, projection=True)
+    set_mesh_points(mesh, current_coords)
 
-        current_coords = np.copy(new_coords)
 
-    # 作成した頂点座標を適用
-    for vi in range(len(new_coords)):
-        if vi in exclusive_ids:
-            continue
+def set_mesh_points(mesh, coords):
+    """頂点座標をワールド空間で一括設定する"""
+    dag_path = om.MGlobal.getSelectionListByName(mesh).getDagPath(0)
+    fn_mesh = om.MFnMesh(dag_path)
+    points = om.MPointArray([om.MPoint(*p) for p in coords.tolist()])
 
-        new_coord = new_coords[vi]
-        cmds.xform("{}.vtx[{}]".format(cmds.ls(selection=True)[0], vi), t=new_coord, worldSpace=True)
+    with ss.snapshot_state(targets=[mesh], position=True):
+        fn_mesh.setPoints(points, om.MSpace.kWorld)
+        fn_mesh.updateSurface()
 
 
-def laplacian_smoothing(vertex_coords, vertex_ids_per_face, iterations, lambda_, projection, exclusive_ids=None):
+def laplacian_smoothing(vertex_coords, vertex_ids_per_face, iterations, lambda_, projection, exclusive_ids=None, operators=None):
     """ラプラシアンスムーズを適用して新しい頂点座標を返す
 
     Args:
@@ -237,22 +207,24 @@ def laplacian_smoothing(vertex_coords, vertex_ids_per_face, iterations, lambda_,
         lambda_ (float, optional): スムース強度. Defaults to 0.5.
         exclusive_ids (ndarray, optional): スムースしない頂点のIDリスト. Defaults to 0.
         projection (bool, optional): True で直接スムーズせずスムーズしたメッシュへのプロジェクションを行う. Defaults to False.
+        operators (MeshOperators, optional): 指定した場合はトポロジーの演算子と分解結果のキャッシュを使う｡ 係数行列は常に vertex_coords から作る. Defaults to None.
 
     Returns:
         ndarray: スムーズ後の頂点座標
     """
     if exclusive_ids is None:
-        exclusive_ids = np.array([])
+        exclusive_ids = np.array([], dtype=np.int64)
+
+    if operators is None:
+        operators = mo.MeshOperators(vertex_ids_per_face, len(vertex_coords))
 
-    L = igl.cotmatrix(vertex_coords, vertex_ids_per_face)
-    M = igl.massmatrix(vertex_coords, vertex_ids_per_face, igl.MASSMATRIX_TYPE_VORONOI)
-    S = M - lambda_ * L
+    solve = operators.laplacian_solver_at(vertex_coords, lambda_)
 
+    smooth_vertex_coords = vertex_coords
     for _ in range(iterations):
-        smooth_vertex_coords = scipy.sparse.linalg.spsolve(S, M @ vertex_coords)
+        smooth_vertex_coords = solve(smooth_vertex_coords)
 
-    for vi in exclusive_ids:
-        smooth_vertex_coords[vi] = vertex_coords[vi]
+    smooth_vertex_coords[exclusive_ids] = vertex_coords[exclusive_ids]
 
     if projection:
         new_vertex_coords = project_vertices_to_other_surface(vertex_coords, smooth_vertex_coords, vertex_ids_per_face)
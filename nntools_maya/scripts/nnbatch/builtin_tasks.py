@@ -0,0 +1,104 @@
+"""
+nntools のチェック･修正処理をシーン全体に対して行うタスク
+
+対話的な機能の選択に依存しない部分を呼び出し､結果を JSON に変換できる辞書で返す｡
+"""
+import nnbatch.tasks as tasks
+
+
+def _mesh_transforms():
+    """シーン内の中間オブジェクトでないメッシュのトランスフォーム (フルパス)"""
+    import maya.cmds as cmds
+
+    shapes = cmds.ls(type="mesh", noIntermediate=True, long=True)
+
+    if not shapes:
+        return []
+
+    return sorted(set(cmds.listRelatives(shapes, parent=True, fullPath=True) or []))
+
+
+def _skinned_meshes():
+    """スキンクラスターの出力先メッシュのトランスフォーム"""
+    import nnutil.skin_index as nsi
+
+    index = nsi.get_index()
+    meshes = []
+
+    for skincluster in sorted(index.skincluster_to_meshes):
+        for mesh in index.skincluster_to_meshes[skincluster]:
+            if mesh not in meshes:
+                meshes.append(mesh)
+
+    return meshes
+
+
+@tasks.register("check_weight_fractions", kind=tasks.KIND_CHECK)
+def check_weight_fractions(min_unit=0.01, fast_mode=True):
+    """ウェイトに min_unit の倍数以外の値を持つスキンメッシュ"""
+    import nnskin.check_weights_fractions as cwf
+
+    objects, components = cwf.find_weight_fractions(_skinned_meshes(), min_unit=min_unit, fast_mode=fast_mode)
+
+    return {"issues": objects, "num_components": len(components)}
+
+
+@tasks.register("check_weight_islands", kind=tasks.KIND_CHECK)
+def check_weight_islands(target_influences=None):
+    """ウェイトが非ゼロの領域が複数に分かれているインフルエンス"""
+    import nnskin.check_weight_island as cwi
+
+    issues = []
+    islands = dict()
+
+    for mesh in _skinned_meshes():
+        results = cwi.check_weight_islands_for_mesh(mesh, target_influences)
+        split = dict((influence, count) for influence, count in results.items() if count > 1)
+
+        if split:
+            islands[mesh] = split
+            issues.extend("%s:%s" % (mesh, influence) for influence in sorted(split))
+
+    return {"issues": issues, "islands": islands}
+
+
+@tasks.register("check_digon_holes", kind=tasks.KIND_CHECK)
+def check_digon_holes():
+    """二角形ホールを持つメッシュ"""
+    import nnutil.misc as nmisc
+
+    holes = dict()
+
+    for obj in _mesh_transforms():
+        pairs = nmisc.get_digon_edge_pairs(obj)
+
+        if pairs:
+            holes[obj] = len(pairs)
+
+    return {"issues": sorted(holes), "holes": holes}
+
+
+@tasks.register("remove_digon_holes", kind=tasks.KIND_FIX)
+def remove_digon_holes():
+    """全メッシュの二角形ホールを削除する"""
+    import nnutil.misc as nmisc
+
+    removed = dict()
+
+    for obj in _mesh_transforms():
+        count = nmisc.remove_digon_holes(obj)
+
+        if count:
+            removed[obj] = count
+
+    return {"fixed": sum(removed.values()), "removed": removed}
+
+
+@tasks.register("delete_unconnected_orig_meshes", kind=tasks.KIND_FIX)
+def delete_unconnected_orig_meshes():
+    """どこにも接続されていない Orig シェイプを削除する"""
+    import nnskin.core
+
+    deleted = nnskin.core.delete_unconnected_orig_meshes()
+
+    return {"fixed": len(deleted), "deleted": deleted}
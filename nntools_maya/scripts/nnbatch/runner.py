@@ -0,0 +1,372 @@
+"""
+複数シーンに対してタスクを並列実行するバッチランナー
+
+シーン毎のジョブを multiprocessing のプールに分配し､各ジョブはバックエンドで実行する｡
+MayapyBackend はジョブ毎に mayapy のスタンドアロンプロセスを起動するので､ Maya が落ちてもそのシーンだけが crashed になる｡
+InProcessBackend はプールのプロセス内で直接実行するもので､テスト用のモックや mayapy 上での実行に使う｡
+
+結果は 1 シーン 1 行の JSON Lines としてシーンが終わる度に追記するので､
+ランナーが途中で止まっても同じ結果ファイルを指定して再実行すれば残りのシーンから再開できる｡
+
+    python -m nnbatch.runner --tasks check_weight_fractions,check_digon_holes --results results.jsonl --mayapy "C:/Program Files/Autodesk/Maya2024/bin/mayapy.exe" D:/assets
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import nnbatch.tasks as tasks
+import nnbatch.worker as worker
+
+
+# nntools のモジュールが置かれているディレクトリ
+scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# シーンとして扱う拡張子
+scene_extensions = (".ma", ".mb")
+
+# 再開時に実行済みとして扱う状態
+done_statuses = (tasks.STATUS_OK, tasks.STATUS_FAILED, tasks.STATUS_ERROR)
+
+
+def crashed_record(scene, message, seconds=0.0, **kwargs):
+    """ワーカーが結果を返さなかったシーンの結果"""
+    record = {"scene": scene, "status": tasks.STATUS_CRASHED, "error": message, "seconds": seconds, "tasks": []}
+    record.update(kwargs)
+
+    return record
+
+
+class InProcessBackend(object):
+    """プールのプロセス内でジョブを実行するバックエンド
+
+    Args:
+        opener (function, optional): シーンを開く関数. Defaults to worker.open_scene.
+        saver (function, optional): シーンを保存する関数. Defaults to worker.save_scene.
+    """
+    def __init__(self, opener=None, saver=None):
+        self.opener = opener or worker.open_scene
+        self.saver = saver or worker.save_scene
+
+    def run(self, job):
+        return worker.run_job(job, self.opener, self.saver)
+
+
+class MayapyBackend(object):
+    """ジョブ毎に mayapy のスタンドアロンプロセスを起動するバックエンド
+
+    Args:
+        executable (str, optional): mayapy のパス. Defaults to 環境変数 MAYAPY か "mayapy".
+        worker_module (str, optional): mayapy で実行するモジュール. Defaults to "nnbatch.worker".
+        python_path (list[str], optional): PYTHONPATH の先頭に追加するディレクトリ. Defaults to [scripts_dir].
+        timeout (float, optional): 1 シーンの制限時間 (秒)｡ 超えた場合は crashed. Defaults to None.
+    """
+    def __init__(self, executable=None, worker_module="nnbatch.worker", python_path=None, timeout=None):
+        self.executable = executable or os.environ.get("MAYAPY", "mayapy")
+        self.worker_module = worker_module
+        self.python_path = python_path or [scripts_dir]
+        self.timeout = timeout
+
+    def run(self, job):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(self.python_path + [x for x in [env.get("PYTHONPATH")] if x])
+        start = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix="nnbatch_") as tmp_dir:
+            job_path = os.path.join(tmp_dir, "job.json")
+            result_path = os.path.join(tmp_dir, "result.json")
+
+            with open(job_path, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+
+            try:
+                process = subprocess.run(
+                    [self.executable, "-m", self.worker_module, job_path, result_path],
+                    env=env,
+                    capture_output=True,
+                    timeout=self.timeout)
+
+            except subprocess.TimeoutExpired:
+                return crashed_record(job["scene"], "timeout", time.perf_counter() - start)
+
+            # 終了処理で落ちた場合も結果が書き出されていればそれを使う
+            if os.path.exists(result_path):
+                with open(result_path, encoding="utf-8") as f:
+                    record = json.load(f)
+
+                record["returncode"] = process.returncode
+
+                return record
+
+        stderr = process.stderr.decode("utf-8", errors="replace")
+
+        return crashed_record(job["scene"], stderr[-4000:], time.perf_counter() - start, returncode=process.returncode)
+
+
+def _run_job(args):
+    # プールのワーカーから呼ばれる｡ バックエンド自体の例外も crashed として返す
+    backend, job = args
+    start = time.perf_counter()
+
+    try:
+        return backend.run(job)
+
+    except Exception as e:
+        return crashed_record(job["scene"], repr(e), time.perf_counter() - start)
+
+
+def normalize_pipeline(pipeline):
+    """タスク名､ (名前, オプション) もしくは {"name", "options"} のリストを {"name", "options"} のリストにする"""
+    specs = []
+
+    for item in pipeline:
+        if isinstance(item, str):
+            specs.append({"name": item, "options": dict()})
+        elif isinstance(item, dict):
+            specs.append({"name": item["name"], "options": dict(item.get("options") or dict())})
+        else:
+            name, options = item
+            specs.append({"name": name, "options": dict(options or dict())})
+
+    return specs
+
+
+def expand_scenes(paths):
+    """ファイル､ディレクトリ (再帰的に探索) もしくはワイルドカードからシーンのパスのリストを作る｡ 重複は除く"""
+    scenes = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                scenes.extend(os.path.join(root, x) for x in sorted(files) if x.lower().endswith(scene_extensions))
+        elif any(c in path for c in "*?["):
+            scenes.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            scenes.append(path)
+
+    unique = []
+    seen = set()
+    for scene in scenes:
+        key = os.path.normcase(os.path.abspath(scene))
+
+        if key not in seen:
+            seen.add(key)
+            unique.append(scene)
+
+    return unique
+
+
+def load_results(results_path):
+    """結果ファイルを読み込みシーンから最後の結果への辞書を返す｡ 書き込み途中で壊れた行は無視する"""
+    records = dict()
+
+    if not results_path or not os.path.exists(results_path):
+        return records
+
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+
+            except ValueError:
+                continue
+
+            records[record["scene"]] = record
+
+    return records
+
+
+def summarize(records):
+    """結果をシーンとタスク毎の状態の数と合計時間にまとめる"""
+    summary = {"scenes": len(records), "status": dict(), "seconds": 0.0, "tasks": dict()}
+
+    for record in records:
+        summary["status"][record["status"]] = summary["status"].get(record["status"], 0) + 1
+        summary["seconds"] += record.get("seconds", 0.0)
+
+        for task_record in record["tasks"]:
+            task_summary = summary["tasks"].setdefault(task_record["name"], {"status": dict(), "seconds": 0.0})
+            task_summary["status"][task_record["status"]] = task_summary["status"].get(task_record["status"], 0) + 1
+            task_summary["seconds"] += task_record.get("seconds", 0.0)
+
+    return summary
+
+
+class BatchRunner(object):
+    """シーンのリストにタスクのパイプラインを実行するランナー
+
+    Args:
+        pipeline (list): タスク名､ (名前, オプション) もしくは {"name", "options"} のリスト
+        results_path (str, optional): 結果を追記する JSON Lines ファイル｡ 省略時は書き出さない. Defaults to None.
+        backend (object, optional): run(job) を持つバックエンド. Defaults to MayapyBackend().
+        processes (int, optional): 並列数｡ 1 ならプールを使わずに実行する. Defaults to CPU 数.
+        modules (list[str], optional): タスクを定義しているモジュール. Defaults to None.
+        save (bool, optional): True で修正タスクがシーンを変更した場合に保存する. Defaults to False.
+        output_dir (str, optional): 保存先のディレクトリ｡ 省略時は上書き. Defaults to None.
+    """
+    def __init__(self, pipeline, results_path=None, backend=None, processes=None, modules=None, save=False, output_dir=None):
+        self.pipeline = normalize_pipeline(pipeline)
+        self.results_path = results_path
+        self.backend = backend or MayapyBackend()
+        self.processes = processes or multiprocessing.cpu_count()
+        self.modules = list(modules or [])
+        self.save = save
+        self.output_dir = output_dir
+
+        # 存在しないタスク名はシーンを開く前に検出する
+        tasks.load_modules(self.modules)
+        for spec in self.pipeline:
+            tasks.get_task(spec["name"])
+
+    def make_job(self, scene):
+        return {
+            "scene": scene,
+            "tasks": self.pipeline,
+            "modules": self.modules,
+            "save": self.save,
+            "output_dir": self.output_dir,
+        }
+
+    def pending_scenes(self, scenes, retry_crashed=False):
+        """結果ファイルに実行済みの結果が無いシーン"""
+        done = load_results(self.results_path)
+        statuses = done_statuses if retry_crashed else done_statuses + (tasks.STATUS_CRASHED,)
+
+        return [x for x in scenes if x not in done or done[x]["status"] not in statuses]
+
+    def _open_results(self):
+        # 前回が行の途中で止まっていた場合は改行してから追記する
+        needs_newline = False
+
+        if os.path.exists(self.results_path) and os.path.getsize(self.results_path):
+            with open(self.results_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        f = open(self.results_path, "a", encoding="utf-8")
+
+        if needs_newline:
+            f.write("\n")
+
+        return f
+
+    def _write(self, f, record):
+        f.write(json.dumps(record, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    def run(self, scenes, retry_crashed=False, callback=None):
+        """未実行のシーンに対してパイプラインを実行する
+
+        Args:
+            scenes (list[str]): シーンのパス
+            retry_crashed (bool, optional): True で前回 crashed だったシーンも再実行する. Defaults to False.
+            callback (function, optional): シーン毎の結果を受け取る関数 (進捗表示用). Defaults to None.
+
+        Returns:
+            list[dict]: 今回実行したシーンの結果 (終了順)
+        """
+        jobs = [(self.backend, self.make_job(scene)) for scene in self.pending_scenes(scenes, retry_crashed)]
+        records = []
+
+        if not jobs:
+            return records
+
+        f = self._open_results() if self.results_path else None
+
+        try:
+            if self.processes == 1 or len(jobs) == 1:
+                results = (_run_job(job) for job in jobs)
+                pool = None
+            else:
+                pool = multiprocessing.Pool(min(self.processes, len(jobs)))
+                results = pool.imap_unordered(_run_job, jobs)
+
+            try:
+                for record in results:
+                    records.append(record)
+
+                    if f:
+                        self._write(f, record)
+
+                    if callback:
+                        callback(record)
+
+            finally:
+                if pool:
+                    pool.close()
+                    pool.join()
+
+        finally:
+            if f:
+                f.close()
+
+        return records
+
+
+def main(argv=None):
+    """コマンドラインのエントリーポイント"""
+    parser = argparse.ArgumentParser(prog="nnbatch", description="Run nntools check/fix tasks over many Maya scenes.")
+    parser.add_argument("scenes", nargs="*", help="scene files, directories or wildcards")
+    parser.add_argument("--tasks", default="", help="comma separated task names")
+    parser.add_argument("--results", default="nnbatch_results.jsonl", help="JSON Lines file to append results to (also used to resume)")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--mayapy", default=None, help="mayapy executable (defaults to $MAYAPY or mayapy)")
+    parser.add_argument("--modules", default="", help="comma separated modules that register extra tasks")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per scene")
+    parser.add_argument("--save", action="store_true", help="save scenes modified by fix tasks")
+    parser.add_argument("--output-dir", default=None, help="save modified scenes here instead of overwriting")
+    parser.add_argument("--retry-crashed", action="store_true")
+    parser.add_argument("--list-tasks", action="store_true")
+    args = parser.parse_args(argv)
+
+    modules = [x for x in args.modules.split(",") if x]
+
+    if args.list_tasks:
+        tasks.load_modules(modules)
+        for name in tasks.task_names():
+            task = tasks.get_task(name)
+            print("%-36s %-6s %s" % (name, task.kind, task.description))
+        return 0
+
+    pipeline = [x for x in args.tasks.split(",") if x]
+
+    if not pipeline:
+        parser.error("--tasks is required")
+
+    runner = BatchRunner(
+        pipeline,
+        results_path=args.results,
+        backend=MayapyBackend(args.mayapy, timeout=args.timeout),
+        processes=args.processes,
+        modules=modules,
+        save=args.save,
+        output_dir=args.output_dir)
+
+    scenes = expand_scenes(args.scenes)
+
+    def progress(record):
+        print("[%s] %s (%.1fs)" % (record["status"], record["scene"], record.get("seconds", 0.0)))
+
+    runner.run(scenes, retry_crashed=args.retry_crashed, callback=progress)
+
+    # 再開した分も含めた全体の集計
+    records = load_results(args.results)
+    summary = summarize([records[x] for x in scenes if x in records])
+    print(json.dumps(summary, indent=2))
+
+    return 0 if set(summary["status"]) <= {tasks.STATUS_OK} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+バッチ処理で実行するチェック･修正タスクの登録
+
+    import nnbatch.tasks as tasks
+
+    @tasks.register("check_something")
+    def check_something(threshold=0.1):
+        return {"issues": [...]}
+
+タスクはキーワード引数でオプションを受け取り､ JSON に変換できる辞書を返す｡
+チェックタスクは問題のある対象を "issues" のリストで返し､空でなければ失敗とする｡
+修正タスクは修正した数を "fixed" で返し､ 0 より大きければシーンが変更されたものとする｡
+ワーカープロセスでも登録されるように､タスクを定義するモジュールはトップレベルで maya をインポートしない｡
+"""
+import importlib
+import time
+import traceback
+
+
+# タスクの種類
+KIND_CHECK = "check"
+KIND_FIX = "fix"
+
+# 実行結果
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"
+STATUS_CRASHED = "crashed"
+
+# 結果をまとめる際の優先順 (後ろほど悪い)
+status_order = [STATUS_OK, STATUS_FAILED, STATUS_ERROR, STATUS_CRASHED]
+
+# ワーカーで常に読み込むタスク定義モジュール
+default_modules = ["nnbatch.builtin_tasks"]
+
+
+def worst_status(statuses):
+    """status_order で最も悪い状態を返す｡ 空なら STATUS_OK"""
+    return max(statuses, key=status_order.index) if statuses else STATUS_OK
+
+
+class Task(object):
+    """登録されたタスク
+
+    Args:
+        name (str): タスク名
+        func (function): オプションをキーワード引数で受け取り結果の辞書を返す関数
+        kind (str): KIND_CHECK か KIND_FIX
+        description (str, optional): 説明｡ 省略時は func の docstring の一行目
+    """
+    def __init__(self, name, func, kind=KIND_CHECK, description=None):
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.description = description or (func.__doc__ or "").strip().split("\n")[0]
+
+    def run(self, options=None):
+        """タスクを実行して時間と結果を記録した辞書を返す｡ 例外は STATUS_ERROR として記録する"""
+        record = {"name": self.name, "kind": self.kind}
+        start = time.perf_counter()
+
+        try:
+            result = self.func(**(options or dict())) or dict()
+            record["result"] = result
+
+            if self.kind == KIND_CHECK and result.get("issues"):
+                record["status"] = STATUS_FAILED
+            else:
+                record["status"] = STATUS_OK
+
+        except Exception:
+            record["status"] = STATUS_ERROR
+            record["error"] = traceback.format_exc()
+
+        record["seconds"] = time.perf_counter() - start
+
+        return record
+
+    @property
+    def modifies_scene(self):
+        return self.kind == KIND_FIX
+
+
+_registry = dict()
+
+
+def register(name, kind=KIND_CHECK, description=None):
+    """関数をタスクとして登録するデコレーター"""
+    def decorator(func):
+        _registry[name] = Task(name, func, kind, description)
+        return func
+
+    return decorator
+
+
+def unregister(name):
+    _registry.pop(name, None)
+
+
+def get_task(name):
+    """登録されたタスクを返す
+
+    Raises:
+        KeyError: 登録されていないタスク名の場合
+    """
+    if name not in _registry:
+        raise KeyError("unknown task: %s (registered: %s)" % (name, ", ".join(task_names())))
+
+    return _registry[name]
+
+
+def task_names():
+    return sorted(_registry)
+
+
+def load_modules(module_names=None):
+    """default_modules と指定したモジュールを読み込んでタスクを登録する"""
+    for name in default_modules + list(module_names or []):
+        importlib.import_module(name)
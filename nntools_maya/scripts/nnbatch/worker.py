@@ -0,0 +1,119 @@
+"""
+シーン 1 つ分のタスクを実行するワーカー
+
+mayapy から実行すると Maya をスタンドアロンで初期化し､ジョブの JSON を読んで結果の JSON を書き出す｡
+
+    mayapy -m nnbatch.worker job.json result.json
+
+ジョブは {"scene": シーンのパス, "tasks": [{"name": タスク名, "options": {...}}, ...],
+"modules": [タスク定義モジュール], "save": bool, "output_dir": 保存先} の辞書｡
+"""
+import json
+import os
+import sys
+import time
+import traceback
+
+import nnbatch.tasks as tasks
+
+
+def open_scene(path):
+    """シーンを開く"""
+    import maya.cmds as cmds
+
+    cmds.file(path, open=True, force=True, prompt=False, ignoreVersion=True)
+
+
+def save_scene(path, output_dir=None):
+    """シーンを保存して保存先のパスを返す｡ output_dir を指定した場合は同名のファイルとして別の場所に保存する"""
+    import maya.cmds as cmds
+
+    if output_dir:
+        path = os.path.join(output_dir, os.path.basename(path))
+        cmds.file(rename=path)
+
+    file_type = "mayaBinary" if path.lower().endswith(".mb") else "mayaAscii"
+    cmds.file(save=True, force=True, type=file_type)
+
+    return path
+
+
+def run_job(job, opener=open_scene, saver=save_scene):
+    """ジョブを実行して結果の辞書を返す
+
+    シーンが開けなかった場合やタスクが例外を投げた場合も結果として記録し､例外は投げない｡
+
+    Args:
+        job (dict): ジョブ
+        opener (function, optional): シーンのパスを受け取って開く関数. Defaults to open_scene.
+        saver (function, optional): シーンのパスと保存先を受け取って保存する関数. Defaults to save_scene.
+
+    Returns:
+        dict: {"scene", "status", "seconds", "open_seconds", "tasks", "saved", "pid"}
+    """
+    scene = job["scene"]
+    record = {"scene": scene, "pid": os.getpid(), "tasks": [], "saved": None}
+    start = time.perf_counter()
+
+    try:
+        tasks.load_modules(job.get("modules"))
+        opener(scene)
+
+    except Exception:
+        record["status"] = tasks.STATUS_ERROR
+        record["error"] = traceback.format_exc()
+        record["seconds"] = time.perf_counter() - start
+
+        return record
+
+    record["open_seconds"] = time.perf_counter() - start
+    modified = False
+
+    for spec in job["tasks"]:
+        try:
+            task = tasks.get_task(spec["name"])
+
+        except KeyError as e:
+            record["tasks"].append({"name": spec["name"], "status": tasks.STATUS_ERROR, "error": str(e), "seconds": 0.0})
+            continue
+
+        task_record = task.run(spec.get("options"))
+        record["tasks"].append(task_record)
+
+        if task.modifies_scene and task_record["status"] == tasks.STATUS_OK and task_record["result"].get("fixed"):
+            modified = True
+
+    if modified and job.get("save"):
+        try:
+            record["saved"] = saver(scene, job.get("output_dir"))
+
+        except Exception:
+            record["tasks"].append({"name": "save", "status": tasks.STATUS_ERROR, "error": traceback.format_exc(), "seconds": 0.0})
+
+    record["status"] = tasks.worst_status([x["status"] for x in record["tasks"]])
+    record["seconds"] = time.perf_counter() - start
+
+    return record
+
+
+def main(argv=None):
+    """mayapy から呼ばれるエントリーポイント"""
+    job_path, result_path = (argv or sys.argv[1:])[:2]
+
+    with open(job_path, encoding="utf-8") as f:
+        job = json.load(f)
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    record = run_job(job)
+
+    # Maya の終了処理で落ちても結果が残るように先に書き出す
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+
+    maya.standalone.uninitialize()
+
+
+if __name__ == "__main__":
+    main()
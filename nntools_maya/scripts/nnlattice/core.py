@@ -11,6 +11,8 @@ import nnutil.ui as ui
 import nnutil.display as nd
 import plugin_util.snapshotState as ss
 
+from . import mask as lmask
+
 
 window_name = "NN_Lattice"
 window = None
@@ -433,118 +435,146 @@ def smooth_lattice_point(ratio=0.1, prevent_dent=True):
         cmds.xform(lattice + f".pt[{s}][{t}][{u}]", ws=True, t=tuple(new_coord))
 
 
+def get_selected_lattice_mask():
+    """選択されているラティスとラティスポイントのマスクを返す
+
+    ラティスポイントが選択されていれば最初のポイントのラティスとそのラティスの選択ポイントのマスク､
+    ラティスが選択されていればそのラティスと空のマスク､どちらでもなければ None を返す｡
+
+    Returns:
+        tuple[str, LatticeMask]: ラティスのトランスフォームとマスク
+    """
+    sel = om.MGlobal.getActiveSelectionList()
+    lattice_dag = None
+    indices = []
+
+    for i in range(sel.length()):
+        dag, comp = sel.getComponent(i)
+
+        if comp.isNull() or not comp.hasFn(om.MFn.kLatticeComponent):
+            continue
+
+        dag.extendToShape()
+
+        if lattice_dag is None:
+            lattice_dag = dag
+
+        if dag == lattice_dag:
+            indices.extend(om.MFnTripleIndexedComponent(comp).getElements())
+
+    if lattice_dag is None:
+        for i in range(sel.length()):
+            dag = sel.getDagPath(i)
+
+            if dag.hasFn(om.MFn.kLattice):
+                lattice_dag = dag
+                break
+
+    if lattice_dag is None:
+        return None
+
+    lattice_dag.extendToShape()
+    lattice_dag.pop()
+    lattice = lattice_dag.partialPathName()
+
+    return lattice, lmask.LatticeMask.from_indices(get_divisions(lattice), indices)
+
+
+def select_lattice_mask(lattice, mask):
+    """マスクが 1 のラティスポイントを選択する
+
+    ポイントは一つの三重インデックスコンポーネントにまとめ､範囲表記の選択文字列で一度に選択する｡
+
+    Args:
+        lattice (str): ラティス
+        mask (LatticeMask): 選択するポイントのマスク
+    """
+    indices = mask.indices()
+
+    if not indices:
+        cmds.select(clear=True)
+        return
+
+    sel = om.MSelectionList()
+    sel.add(lattice)
+    dag = sel.getDagPath(0)
+    dag.extendToShape()
+
+    fn_comp = om.MFnTripleIndexedComponent()
+    comp = fn_comp.create(om.MFn.kLatticeComponent)
+    fn_comp.addElements([list(x) for x in indices])
+
+    points = om.MSelectionList()
+    points.add((dag, comp))
+    cmds.select(points.getSelectionStrings(), replace=True)
+
+
 def select_inner(lattice=None):
     """ ラティスポイントの内側だけを選択する
     Args:
-        lattice (Lattice):
+        lattice (Lattice): 省略時は選択されているラティス
     """
-    # 対象ラティスの取得
-    lattice, points = get_selected_lattice_and_points()
-
-    # 最終的に選択するポイント
-    selections = []
+    if not lattice:
+        selection = get_selected_lattice_mask()
 
-    div_s = cmds.getAttr(lattice + ".sDivisions")
-    div_t = cmds.getAttr(lattice + ".tDivisions")
-    div_u = cmds.getAttr(lattice + ".uDivisions")
+        if not selection:
+            return
 
-    for s in range(div_s):
-        for t in range(div_t):
-            for u in range(div_u):
-                if not is_surface_indices(s, t, u, div_s, div_t, div_u):
-                    selections.append(lattice + f".pt[{s}][{t}][{u}]")
+        lattice = selection[0]
 
     cmds.selectMode(component=True)
     cmds.selectType(latticePoint=True)
-    cmds.select(selections, replace=True)
+    select_lattice_mask(lattice, lmask.LatticeMask.inner(get_divisions(lattice)))
 
 
 def select_surface(lattice=None):
     """ ラティスポイントの表面だけを選択する
+    Args:
+        lattice (Lattice): 省略時は選択されているラティス
     """
-    # 対象ラティスの取得
-    lattice, points = get_selected_lattice_and_points()
-
-    # 最終的に選択するポイント
-    selections = []
+    if not lattice:
+        selection = get_selected_lattice_mask()
 
-    div_s = cmds.getAttr(lattice + ".sDivisions")
-    div_t = cmds.getAttr(lattice + ".tDivisions")
-    div_u = cmds.getAttr(lattice + ".uDivisions")
+        if not selection:
+            return
 
-    for s in range(div_s):
-        for t in range(div_t):
-            for u in range(div_u):
-                if is_surface_indices(s, t, u, div_s, div_t, div_u):
-                    selections.append(lattice + f".pt[{s}][{t}][{u}]")
+        lattice = selection[0]
 
     cmds.selectMode(component=True)
     cmds.selectType(latticePoint=True)
-    cmds.select(selections, replace=True)
+    select_lattice_mask(lattice, lmask.LatticeMask.surface(get_divisions(lattice)))
 
 
-def select_grow(r=1):
+def select_grow(r=1, element=lmask.ELEMENT_BOX):
     """ ラティスポイントの選択を拡大する
 
     Args
         r (int, optinal):  拡大ホップ数
+        element (str, optional): 構造要素 (lmask.ELEMENT_BOX か lmask.ELEMENT_CROSS). Defaults to lmask.ELEMENT_BOX.
     """
-    # 対象ラティスの取得
-    lattice, points = get_selected_lattice_and_points()
-
-    selected_indices = [nu.get_indices(p) for p in points]
+    selection = get_selected_lattice_mask()
 
-    # 最終的に選択するポイント
-    selections = []
-
-    div_s = cmds.getAttr(lattice + ".sDivisions")
-    div_t = cmds.getAttr(lattice + ".tDivisions")
-    div_u = cmds.getAttr(lattice + ".uDivisions")
-
-    for s in range(div_s):
-        for t in range(div_t):
-            for u in range(div_u):
-                for ss, st, su in selected_indices:
-                    if abs(s-ss) <= r and abs(t-st) <= r and abs(u-su) <= r:
-                        selections.append(lattice + f".pt[{s}][{t}][{u}]")
-                    else:
-                        continue
+    if not selection:
+        return
 
-    cmds.select(selections, replace=True)
+    lattice, mask = selection
+    select_lattice_mask(lattice, mask.dilate(radius=r, element=element))
 
 
-def select_shrink():
+def select_shrink(r=1, element=lmask.ELEMENT_CROSS):
     """ ラティスポイントの選択を縮小する
-    """
-    # 対象ラティスの取得
-    lattice, points = get_selected_lattice_and_points()
 
-    selected_indices = [tuple(nu.get_indices(p)) for p in points]
-
-    # 最終的に選択するポイント
-    new_selections = []
+    Args
+        r (int, optinal):  縮小ホップ数
+        element (str, optional): 構造要素 (lmask.ELEMENT_BOX か lmask.ELEMENT_CROSS). Defaults to lmask.ELEMENT_CROSS.
+    """
+    selection = get_selected_lattice_mask()
 
-    div_s = cmds.getAttr(lattice + ".sDivisions")
-    div_t = cmds.getAttr(lattice + ".tDivisions")
-    div_u = cmds.getAttr(lattice + ".uDivisions")
+    if not selection:
+        return
 
-    for s in range(div_s):
-        for t in range(div_t):
-            for u in range(div_u):
-                for ss, st, su in selected_indices:
-                    if ((s, t, u) in selected_indices and
-                       (s, t, u+1) in selected_indices and
-                       (s, t, u-1) in selected_indices and
-                       (s, t+1, u) in selected_indices and
-                       (s, t-1, u) in selected_indices and
-                       (s+1, t, u) in selected_indices and
-                       (s-1, t, u) in selected_indices):
-
-                        new_selections.append(lattice + f".pt[{s}][{t}][{u}]")
-                    else:
-                        continue
-
-    cmds.select(new_selections, replace=True)
+    lattice, mask = selection
+    select_lattice_mask(lattice, mask.erode(radius=r, element=element))
 
 
 def toggle_envelope(lattices=None):
@@ -0,0 +1,169 @@
+"""ラティスポイントの選択を 3 次元のブールマスクとして扱うモジュール
+
+Maya 非依存｡ マスクは (s, t, u) を s, t, u の順に並べた一次元の bytearray で保持し､
+膨張･収縮は軸毎の一次元の処理の組み合わせで行う｡
+"""
+
+# 構造要素
+ELEMENT_BOX = "box"  # チェビシェフ距離が radius 以内 (26 近傍の radius 回)
+ELEMENT_CROSS = "cross"  # マンハッタン距離が radius 以内 (6 近傍の radius 回)
+
+
+class LatticeMask(object):
+    """ラティスポイントのブールマスク
+
+    Args:
+        divisions (tuple[int, int, int]): s, t, u の分割数
+        data (bytearray, optional): 各ポイントの値 (0 か 1)｡ 省略時は全て 0
+    """
+    def __init__(self, divisions, data=None):
+        self.divisions = tuple(divisions)
+        div_s, div_t, div_u = self.divisions
+        self.strides = (div_t * div_u, div_u, 1)
+        self.size = div_s * div_t * div_u
+        self.data = bytearray(data) if data is not None else bytearray(self.size)
+
+    @classmethod
+    def from_indices(cls, divisions, indices):
+        """(s, t, u) のリストからマスクを作る｡ 範囲外のインデックスは無視する"""
+        mask = cls(divisions)
+
+        for s, t, u in indices:
+            if mask.contains(s, t, u):
+                mask.data[mask.index(s, t, u)] = 1
+
+        return mask
+
+    @classmethod
+    def surface(cls, divisions):
+        """いずれかの軸で端にあるポイントのマスク"""
+        mask = cls(divisions)
+        div_s, div_t, div_u = mask.divisions
+        plane = mask.strides[0]
+
+        # s の端は連続した範囲､ t と u の端は s 毎の範囲を切り出して立てる
+        mask.data[0:plane] = b"\x01" * plane
+        mask.data[(div_s - 1) * plane:] = b"\x01" * plane
+
+        for s in range(div_s):
+            offset = s * plane
+            mask.data[offset:offset + div_u] = b"\x01" * div_u
+            mask.data[offset + (div_t - 1) * div_u:offset + plane] = b"\x01" * div_u
+            mask.data[offset:offset + plane:div_u] = b"\x01" * div_t
+            mask.data[offset + div_u - 1:offset + plane:div_u] = b"\x01" * div_t
+
+        return mask
+
+    @classmethod
+    def inner(cls, divisions):
+        """どの軸でも端にないポイントのマスク"""
+        return ~cls.surface(divisions)
+
+    def contains(self, s, t, u):
+        return 0 <= s < self.divisions[0] and 0 <= t < self.divisions[1] and 0 <= u < self.divisions[2]
+
+    def index(self, s, t, u):
+        return s * self.strides[0] + t * self.strides[1] + u
+
+    def indices(self):
+        """値が 1 のポイントの (s, t, u) のリスト"""
+        div_t, div_u = self.divisions[1:]
+        result = []
+
+        for i, value in enumerate(self.data):
+            if value:
+                result.append((i // self.strides[0], i // div_u % div_t, i % div_u))
+
+        return result
+
+    def count(self):
+        return self.data.count(1)
+
+    def copy(self):
+        return LatticeMask(self.divisions, self.data)
+
+    def __eq__(self, other):
+        return self.divisions == other.divisions and self.data == other.data
+
+    def __invert__(self):
+        return LatticeMask(self.divisions, bytes(1 - x for x in self.data))
+
+    def __or__(self, other):
+        return LatticeMask(self.divisions, bytes(a | b for a, b in zip(self.data, other.data)))
+
+    def __and__(self, other):
+        return LatticeMask(self.divisions, bytes(a & b for a, b in zip(self.data, other.data)))
+
+    def __sub__(self, other):
+        return LatticeMask(self.divisions, bytes(a & (1 - b) for a, b in zip(self.data, other.data)))
+
+    def lines(self, axis):
+        """axis 方向に並ぶポイントのインデックスの range を全て返す"""
+        n = self.divisions[axis]
+        stride = self.strides[axis]
+        other_axes = [x for x in range(3) if x != axis]
+        a, b = other_axes
+        starts = [i * self.strides[a] + j * self.strides[b] for i in range(self.divisions[a]) for j in range(self.divisions[b])]
+
+        return [range(start, start + n * stride, stride) for start in starts]
+
+    def dilate(self, radius=1, element=ELEMENT_BOX):
+        """膨張したマスクを返す"""
+        return self._morph(radius, element, erode=False)
+
+    def erode(self, radius=1, element=ELEMENT_BOX):
+        """収縮したマスクを返す｡ ラティスの外側は 0 として扱うので端のポイントは必ず外れる"""
+        return self._morph(radius, element, erode=True)
+
+    def _morph(self, radius, element, erode):
+        data = self.data
+
+        if element == ELEMENT_CROSS:
+            for _ in range(radius):
+                data = self._cross_step(data, erode)
+        else:
+            for axis in range(3):
+                data = self._box_pass(data, axis, radius, erode)
+
+        return LatticeMask(self.divisions, data)
+
+    def _box_pass(self, data, axis, radius, erode):
+        """一つの軸方向に幅 2 * radius + 1 の窓で最大 (膨張) か最小 (収縮) を取る"""
+        result = bytearray(self.size)
+
+        for line in self.lines(axis):
+            values = [data[i] for i in line]
+            n = len(values)
+            prefix = [0]
+
+            for value in values:
+                prefix.append(prefix[-1] + value)
+
+            for k, i in enumerate(line):
+                begin = k - radius
+                end = k + radius + 1
+
+                if erode:
+                    result[i] = begin >= 0 and end <= n and prefix[end] - prefix[begin] == end - begin
+                else:
+                    result[i] = prefix[min(end, n)] - prefix[max(begin, 0)] > 0
+
+        return result
+
+    def _cross_step(self, data, erode):
+        """6 近傍で一段階膨張か収縮する"""
+        result = bytearray(data)
+
+        for axis in range(3):
+            for line in self.lines(axis):
+                last = len(line) - 1
+
+                for k, i in enumerate(line):
+                    if erode:
+                        if result[i] and (k == 0 or k == last or not data[line[k - 1]] or not data[line[k + 1]]):
+                            result[i] = 0
+
+                    elif not result[i] and ((k > 0 and data[line[k - 1]]) or (k < last and data[line[k + 1]])):
+                        result[i] = 1
+
+        return result
@@ -1,22 +1,11 @@
 """
 ツールの概要
 """
-import sys
-
-if sys.version_info.major >= 3:
-    import importlib
-
 import maya.cmds as cmds
 
-import nnutil.core as nu
-import nnutil.decorator as deco
 import nnutil.ui as ui
-import nnutil.display as nd
 
-if int(cmds.about(version=True)) >= 2025:
-    from PySide6 import QtGui
-else:
-    from PySide2 import QtGui
+from .registry import registry
 
 window_name = "NN_Launcher"
 window = None
@@ -26,6 +15,16 @@ def get_window():
     return window
 
 
+def get_cursor_pos():
+    """マウスカーソルのスクリーン座標を返す｡ PySide はここで初めて読み込む"""
+    if int(cmds.about(version=True)) >= 2025:
+        from PySide6 import QtGui
+    else:
+        from PySide2 import QtGui
+
+    return QtGui.QCursor().pos()
+
+
 class NN_ToolWindow(object):
     all_modules = [
         "nnmirror",
@@ -64,7 +63,7 @@ class NN_ToolWindow(object):
         if cmds.window(self.window, exists=True):
             cmds.deleteUI(self.window, window=True)
 
-        cursor_pos = QtGui.QCursor().pos()
+        cursor_pos = get_cursor_pos()
 
         # プリファレンスの有無による分岐
         if cmds.windowPref(self.window, exists=True):
@@ -157,154 +156,104 @@ class NN_ToolWindow(object):
 
         ui.end_layout()
 
-    def onMirror(self, *args):
-        """"""
-        import nnmirror.core
-        nnmirror.core.main()
+    def _launch(self, module_name):
+        """ツールのモジュールを必要なら読み込んでウィンドウを表示する"""
+        registry.load(module_name).main()
+
         if not ui.is_shift():
             cmds.deleteUI(self.window, window=True)
 
+    def onMirror(self, *args):
+        """"""
+        self._launch("nnmirror.core")
+
     def onUV(self, *args):
         """"""
-        import nnuvtoolkit.core
-        nnuvtoolkit.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnuvtoolkit.core")
 
     def onCamera(self, *args):
         """"""
-        import nncamera.core
-        nncamera.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nncamera.core")
 
     def onRingWidth(self, *args):
         """"""
-        import nnringwidth.core
-        nnringwidth.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnringwidth.core")
 
     def onCurve(self, *args):
         """"""
-        import nncurve.core
-        nncurve.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nncurve.core")
 
     def onSimplify(self, *args):
         """"""
-        import nnsimplify.core
-        nnsimplify.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnsimplify.core")
 
     def onStraighten(self, *args):
         """"""
-        import nnstraighten.core
-        nnstraighten.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnstraighten.core")
 
     def onAlign(self, *args):
         """"""
-        import nnalign.core
-        nnalign.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnalign.core")
 
     def onPrimitive(self, *args):
         """"""
-        import nnprimitive.core
-        nnprimitive.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnprimitive.core")
 
     def onDeform(self, *args):
         """"""
-        import nndeform.core
-        nndeform.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nndeform.core")
 
     def onTexture(self, *args):
         """"""
-        import nntexture.core
-        nntexture.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nntexture.core")
 
     def onLine(self, *args):
         """"""
-        import nnline.core
-        nnline.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnline.core")
 
     def onLattice(self, *args):
         """"""
-        import nnlattice.core
-        nnlattice.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnlattice.core")
 
     def onNormal(self, *args):
         """"""
-        import altunt.core
-        altunt.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("altunt.core")
 
     def onVColor(self, *args):
         """"""
-        import nnvcolor.core
-        nnvcolor.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnvcolor.core")
 
     def onSweep(self, *args):
         """"""
-        import nnsweep.core
-        nnsweep.core.main()        
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnsweep.core")
 
     def onSKin(self, *args):
         """"""
-        import nnskin.core
-        nnskin.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnskin.core")
 
     def onSubdiv(self, *args):
         """"""
-        import nnsubdiv.core
-        nnsubdiv.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnsubdiv.core")
 
     def onAnim(self, *args):
         """"""
-        import nnanim.core
-        nnanim.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nnanim.core")
 
     def onTransform(self, *args):
         """"""
-        import nntransform.core
-        nntransform.core.main()
-        if not ui.is_shift():
-            cmds.deleteUI(self.window, window=True)
+        self._launch("nntransform.core")
 
     def onCloseAll(self, *args):
-        """全ての NNTools ダイアログを閉じる"""
+        """全ての NNTools ダイアログを閉じる｡ 読み込まれていないツールはウィンドウも無いので対象外"""
         for module_name in self.all_modules:
-            module = __import__(module_name)
+            if not registry.is_loaded(module_name + ".core"):
+                continue
+
+            module = registry.load(module_name + ".core")
 
             try:
-                if cmds.window(module.core.window_name, exists=True):
-                    cmds.deleteUI(module.core.window_name, window=True)
+                if cmds.window(module.window_name, exists=True):
+                    cmds.deleteUI(module.window_name, window=True)
             except Exception as e:
                 print(e)
                 continue
@@ -314,19 +263,9 @@ class NN_ToolWindow(object):
                 cmds.deleteUI(self.window, window=True)
 
     def onReloadAll(self, *args):
-        """全ての NNTools のモジュールをリロードする"""
-        for module_name in self.all_modules:
+        """ソースが変更された NNTools のモジュールを依存先から順にリロードする"""
+        for module_name in registry.reload_changed():
             print("reload %s" % module_name)
-            module = __import__(module_name)
-
-            if sys.version_info.major >= 3:
-                if hasattr(module, "core"):
-                    importlib.reload(module.core)
-                else:
-                    print("%s has no attribute 'core'" % module_name)
-
-            else:
-                reload(module.core)
 
         if not ui.is_shift():
             cmds.deleteUI(self.window, window=True)
@@ -0,0 +1,303 @@
+"""
+ランチャーから起動するツールモジュールの遅延読み込みとリロード
+
+ツールのモジュールはボタンが初めて押された時に読み込み､その際のモジュール毎のインポート時間を記録する｡
+リロードはソースの更新日時が変わったモジュールだけを依存関係の順 (依存先が先) に行う｡
+"""
+import ast
+import importlib
+import importlib.abc
+import os
+import sys
+import time
+
+
+# nntools のモジュールが置かれているディレクトリ
+scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportCost(object):
+    """モジュール一つ分のインポート時間
+
+    Args:
+        name (str): モジュール名
+        total (float): 依存モジュールの読み込みを含むモジュール実行の時間 (秒)
+        self_time (float): 依存モジュールの読み込みを除いた時間 (秒)
+    """
+    def __init__(self, name, total, self_time):
+        self.name = name
+        self.total = total
+        self.self_time = self_time
+
+    def __repr__(self):
+        return "ImportCost(%s, total=%.6f, self=%.6f)" % (self.name, self.total, self.self_time)
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """exec_module の時間を計測するローダーのラッパー"""
+    def __init__(self, loader, recorder):
+        self.loader = loader
+        self.recorder = recorder
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.recorder.begin(module.__name__)
+
+        try:
+            self.loader.exec_module(module)
+
+        finally:
+            self.recorder.end(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """他のファインダーが返したスペックのローダーを _TimingLoader に差し替えるファインダー"""
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimingLoader(spec.loader, self.recorder)
+
+                return spec
+
+        return None
+
+
+class _ImportRecorder(object):
+    """入れ子のインポートの時間を記録する"""
+    def __init__(self):
+        self.costs = dict()
+        self._stack = []
+
+    def begin(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def end(self, name):
+        name, start, children = self._stack.pop()
+        total = time.perf_counter() - start
+
+        if self._stack:
+            self._stack[-1][2] += total
+
+        self.costs[name] = ImportCost(name, total, total - children)
+
+
+def _source_imports(module):
+    """モジュールのソースからインポートしているモジュール名を集める (関数内のインポートも含む)"""
+    path = getattr(module, "__file__", None)
+
+    if not path or not path.endswith(".py"):
+        return set()
+
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+
+    except (OSError, SyntaxError):
+        return set()
+
+    package = module.__name__ if path.endswith("__init__.py") else module.__name__.rpartition(".")[0]
+    names = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.split(".")
+                base = base[:len(base) - node.level + 1]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module
+
+            # from X import Y の Y がサブモジュールの場合もあるので両方を候補にする
+            names.add(prefix)
+            names.update(prefix + "." + alias.name for alias in node.names)
+
+    return names
+
+
+class ToolRegistry(object):
+    """ツールモジュールの読み込み状態と依存関係を管理するクラス
+
+    Args:
+        root (str, optional): 管理対象とするモジュールのディレクトリ. Defaults to scripts_dir.
+    """
+    def __init__(self, root=scripts_dir):
+        self.root = os.path.normcase(os.path.abspath(root))
+        self.import_costs = dict()
+        self.mtimes = dict()
+        self.imports = dict()
+
+    def is_tracked(self, module):
+        """root 以下のファイルから読み込まれたモジュールなら True"""
+        path = getattr(module, "__file__", None)
+
+        if not path:
+            return False
+
+        return os.path.normcase(os.path.abspath(path)).startswith(self.root + os.sep)
+
+    def tracked_modules(self):
+        """読み込み済みの管理対象モジュールの辞書"""
+        return {name: module for name, module in list(sys.modules.items()) if module is not None and self.is_tracked(module)}
+
+    def is_loaded(self, module_name):
+        return module_name in sys.modules
+
+    def load(self, module_name):
+        """モジュールを読み込んで返す｡ 初回の読み込み時はインポート時間を記録する"""
+        module = sys.modules.get(module_name)
+
+        if module is not None:
+            return module
+
+        recorder = _ImportRecorder()
+        finder = _TimingFinder(recorder)
+        sys.meta_path.insert(0, finder)
+
+        try:
+            module = importlib.import_module(module_name)
+
+        finally:
+            sys.meta_path.remove(finder)
+
+        self.import_costs.update(recorder.costs)
+        self.update()
+
+        return module
+
+    def update(self):
+        """読み込み済みの管理対象モジュールの更新日時とインポート文を記録する｡ 記録済みのものはそのまま"""
+        for name, module in self.tracked_modules().items():
+            if name not in self.mtimes:
+                self.mtimes[name] = self._mtime(module)
+                self.imports[name] = _source_imports(module)
+
+    @property
+    def dependencies(self):
+        """モジュール名から読み込み済みの依存モジュール名の集合への辞書"""
+        loaded = set(self.mtimes)
+
+        return {name: {x for x in imports if x in loaded and x != name} for name, imports in self.imports.items()}
+
+    def _mtime(self, module):
+        try:
+            return os.path.getmtime(module.__file__)
+
+        except OSError:
+            return None
+
+    def changed_modules(self):
+        """記録時からソースの更新日時が変わった読み込み済みモジュール名のリスト"""
+        self.update()
+
+        return sorted(name for name, module in self.tracked_modules().items() if self._mtime(module) != self.mtimes.get(name))
+
+    def dependents(self, names):
+        """names のいずれかに (間接的に) 依存しているモジュール名の集合"""
+        dependencies = self.dependencies
+        result = set()
+        queue = list(names)
+
+        while queue:
+            target = queue.pop()
+
+            for name, deps in dependencies.items():
+                if target in deps and name not in result and name not in names:
+                    result.add(name)
+                    queue.append(name)
+
+        return result
+
+    def topological_order(self, names):
+        """names を依存先が先になる順に並べる｡ 循環がある場合は残りを名前順で末尾に追加する"""
+        names = set(names)
+        dependencies = self.dependencies
+        deps = {name: dependencies.get(name, set()) & names for name in names}
+        order = []
+        ready = sorted(name for name, d in deps.items() if not d)
+
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+
+            for other in sorted(names):
+                if name in deps[other]:
+                    deps[other].discard(name)
+
+                    if not deps[other] and other not in order and other not in ready:
+                        ready.append(other)
+
+        order.extend(sorted(names - set(order)))
+
+        return order
+
+    def reload_changed(self, with_dependents=False):
+        """ソースが変更されたモジュールをリロードする
+
+        Args:
+            with_dependents (bool, optional): True で変更されたモジュールに依存するモジュールもリロードする. Defaults to False.
+
+        Returns:
+            list[str]: リロードしたモジュール名 (リロードした順)
+        """
+        targets = set(self.changed_modules())
+
+        if with_dependents:
+            targets |= self.dependents(targets)
+
+        reloaded = []
+
+        for name in self.topological_order(targets):
+            module = sys.modules.get(name)
+
+            if module is None:
+                continue
+
+            start = time.perf_counter()
+            importlib.reload(module)
+            elapsed = time.perf_counter() - start
+
+            self.import_costs[name] = ImportCost(name, elapsed, elapsed)
+            self.mtimes[name] = self._mtime(module)
+            self.imports[name] = _source_imports(module)
+            reloaded.append(name)
+
+        self.update()
+
+        return reloaded
+
+    def total_import_cost(self, names=None):
+        """names (省略時は記録済みの全モジュール) の自己時間の合計"""
+        costs = self.import_costs.values() if names is None else [self.import_costs[x] for x in names if x in self.import_costs]
+
+        return sum(c.self_time for c in costs)
+
+    def cost_report(self, limit=20):
+        """インポート時間の上位 limit 件を表形式の文字列で返す｡ 時間はミリ秒"""
+        costs = sorted(self.import_costs.values(), key=lambda c: -c.self_time)[:limit]
+        width = max([len(c.name) for c in costs] + [6])
+        lines = ["%s  %10s  %10s" % ("module".ljust(width), "total", "self")]
+
+        for c in costs:
+            lines.append("%s  %10.3f  %10.3f" % (c.name.ljust(width), c.total * 1000, c.self_time * 1000))
+
+        return "\n".join(lines)
+
+
+registry = ToolRegistry()
@@ -12,10 +12,13 @@ import nnutil.core as nu
 import nnutil.misc as nm
 import nnutil.display as nd
 import nnutil.ui as ui
+import nnutil.symmetry as nsym
 import nnskin.core as nnskin
 
 import plugin_util.snapshotState as ss
 
+from . import skeleton
+
 
 window_name = "NN_Mirror"
 window = None
@@ -38,19 +41,7 @@ def mirror_objects(objects=None, axis=0, direction=1, cut=False, center_toleranc
         for obj in objects:
             if cmds.listRelatives(obj, shapes=True):
                 # シンメトリ面から誤差範囲内にある頂点の座標を 0 にする
-                points = nu.get_points(obj, space=om.MSpace.kObject)
-
-                for point in points:
-                    if axis == 0 and abs(point.x) <= center_tolerance:
-                        point.x = 0
-
-                    if axis == 1 and abs(point.y) <= center_tolerance:
-                        point.y = 0
-
-                    if axis == 2 and abs(point.z) <= center_tolerance:
-                        point.z = 0
-
-                nu.set_points(obj, points=points, space=om.MSpace.kObject)
+                nsym.snap_center(obj, axis=axis, tolerance=center_tolerance)
 
                 # ミラーの実行
                 cmds.polyMirrorFace(obj, cutMesh=1, axis=axis, axisDirection=direction, mergeMode=merge_mode, mergeThresholdType=1, mergeThreshold=0.01, mirrorAxis=1, mirrorPosition=0, smoothingAngle=180, flipUVs=0, ch=1)
@@ -724,29 +715,43 @@ class NN_ToolWindow(object):
     def onFlattenZ(self, *args):
         nm.align_horizontally(each_polyline=True, axis="z")
 
+    def _mirror_weight(self, axis, mirror_mode, inverse):
+        """選択オブジェクトのウェイトをシンメトリマップでミラーする
+
+        コンポーネント選択時と左右の対応が取れない頂点のあるオブジェクトは copySkinWeights でミラーする｡
+        """
+        method = nsym.INFLUENCE_LABEL if ui.get_value(self.cb_label_mirror) else nsym.INFLUENCE_CLOSEST
+        direction = -1 if inverse else 1
+        selections = cmds.ls(selection=True)
+        objects = [x for x in selections if "." not in x]
+
+        if not objects or len(objects) != len(selections):
+            cmds.copySkinWeights(mirrorMode=mirror_mode, mirrorInverse=inverse, surfaceAssociation="closestPoint", influenceAssociation=method)
+            return
+
+        for obj in objects:
+            unmatched = nsym.mirror_weights(obj, axis=axis, direction=direction, influence_association=method)
+
+            if unmatched:
+                cmds.copySkinWeights(obj, mirrorMode=mirror_mode, mirrorInverse=inverse, surfaceAssociation="closestPoint", influenceAssociation=method)
+
     def onMirrorWeightXPosi(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="YZ", mirrorInverse=True, surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=0, mirror_mode="YZ", inverse=True)
 
     def onMirrorWeightXNega(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="YZ", surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=0, mirror_mode="YZ", inverse=False)
 
     def onMirrorWeightYPosi(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="XZ", mirrorInverse=True, surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=1, mirror_mode="XZ", inverse=True)
 
     def onMirrorWeightYNega(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="XZ", surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=1, mirror_mode="XZ", inverse=False)
 
     def onMirrorWeightZPosi(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="XY", mirrorInverse=True, surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=2, mirror_mode="XY", inverse=True)
 
     def onMirrorWeightZNega(self, *args):
-        method = "label" if ui.get_value(self.cb_label_mirror) else "closestJoint"
-        cmds.copySkinWeights(mirrorMode="XY", surfaceAssociation="closestPoint", influenceAssociation=method)
+        self._mirror_weight(axis=2, mirror_mode="XY", inverse=False)
 
     def onMirrorWeightOp(self, *args):
         mel.eval('MirrorSkinWeightsOptions')
@@ -831,71 +836,14 @@ class NN_ToolWindow(object):
     def onMirrorJointOp(self, *args):
         mel.eval('MirrorJointOptions')
 
-    def _get_opposite_joint(self, joint_name):    
+    def _symmetrize_joints(self, joints, pos=True, ori=True):
         prefix_from = ui.get_value(self.eb_prefix_from)
         prefix_to = ui.get_value(self.eb_prefix_to)
 
-        basename = joint_name.split("|")[-1]
-        
-        if re.search(prefix_from, basename):
-            return re.sub(prefix_from, prefix_to, basename)
-        
-        if re.search(prefix_to, basename):
-            return re.sub(prefix_to, prefix_from, basename)
-        
-        return None
+        missing = skeleton.symmetrize_joints(joints, prefix_from, prefix_to, pos=pos, ori=ori)
 
-    def _mirror_joint(self, joint, pos=True, ori=True):
-        opposite_joint = self._get_opposite_joint(joint)
-        if not opposite_joint or not cmds.objExists(opposite_joint):
+        for joint in missing:
             print(f"{joint}に対応するジョイントが見つかりませんでした。")
-            return
-        
-        # ジョイントのワールドマトリクス
-        matrix = cmds.xform(joint, query=True, matrix=True, worldSpace=True)
-
-        # 対向ジョイントのワールドマトリクス
-        opposite_matrix = cmds.xform(opposite_joint, query=True, matrix=True, worldSpace=True)
-
-        # 対向ジョイントの基底ベクトルと位置を取得
-        obx = om.MVector(opposite_matrix[0:3])
-        oby = om.MVector(opposite_matrix[4:7])
-        obz = om.MVector(opposite_matrix[8:11])
-        op = om.MVector(opposite_matrix[12:15])
-
-        # 新しい基底ベクトルと位置を計算
-        new_bx = om.MVector(-obx.x, obx.y, obx.z)
-        new_by = om.MVector(-oby.x, oby.y, oby.z)
-        new_bz = new_bx ^ new_by
-        new_p = om.MVector(-op.x, op.y, op.z)
-
-        # 新しいマトリックスを作成
-        new_matrix = matrix
-        
-        if pos:
-            new_matrix[12:15] = [new_p.x, new_p.y, new_p.z]
-
-        if ori:
-            new_matrix[0:3] = [new_bx.x, new_bx.y, new_bx.z]
-            new_matrix[4:7] = [new_by.x, new_by.y, new_by.z]
-            new_matrix[8:11] = [new_bz.x, new_bz.y, new_bz.z]
-
-        # 子があればワールドマトリックスを取得
-        children = cmds.listRelatives(joint, children=True, fullPath=True)
-        child_matrix = None
-        if children:
-            child_matrix = cmds.xform(children[0], query=True, matrix=True, worldSpace=True)
-
-        # 新しいマトリクスを適用
-        cmds.xform(joint, matrix=new_matrix, worldSpace=True)
-        
-        # 回転をフリーズ
-        cmds.makeIdentity(joint, apply=True, rotate=True)
-
-        # 子を復帰
-        if child_matrix:
-            cmds.xform(children[0], matrix=child_matrix, worldSpace=True)
-            cmds.makeIdentity(children[0], apply=True, rotate=True)
 
     def onSymmetrizeJointOriPos(self, *args):
         # 選択されたジョイントを取得
@@ -904,78 +852,15 @@ class NN_ToolWindow(object):
             cmds.error("ジョイントを選択してください。")
             return
 
-        # 階層が浅い順にソート
-        selected_joints.sort(key=lambda x: x.count('|'))
-
         # ジョイントの対象化
-        for joint in selected_joints:
-            self._mirror_joint(joint)
+        self._symmetrize_joints(selected_joints)
 
     def onOrientJointOp(self, *args):
         mel.eval('OrientJointOptions')
 
     def onOrientRadial(self, *args):
         """ジョイントを親に対して放射状にやるように方向付けする"""
-        for joint in cmds.ls(selection=True, type="joint", long=True):
-            parent = (cmds.listRelatives(joint, parent=True) or [None])[0]
-            child = (cmds.listRelatives(joint, children=True) or [None])[0]
-
-            if not parent:
-                continue
-
-            if not child:
-                cmds.xform(joint, rotation=(0, 0, 0))
-                cmds.setAttr(f"{joint}.jointOrientX", 0)
-                cmds.setAttr(f"{joint}.jointOrientY", 0)
-                cmds.setAttr(f"{joint}.jointOrientZ", 0)
-                continue
-
-            # この復帰用に子の姿勢を保存
-            children = cmds.listRelatives(joint, children=True, fullPath=True)
-            children_matrix = dict()
-            for child in children:
-                children_matrix[child] = cmds.xform(child, q=True, matrix=True, worldSpace=True)
-
-            joint_matrix = cmds.xform(joint, q=True, matrix=True, worldSpace=True)
-            parent_matrix = cmds.xform(parent, q=True, matrix=True, worldSpace=True)
-            child_matrix = cmds.xform(child, q=True, matrix=True, worldSpace=True)
-
-            joint_pos = om.MVector(joint_matrix[12:15])
-            parent_pos = om.MVector(parent_matrix[12:15])
-            child_pos = om.MVector(child_matrix[12:15])
-
-            parent_dir = (joint_pos - parent_pos).normal()
-            child_dir = (child_pos - joint_pos).normal()
-            parent_dir
-
-            # 基底ベクトルの計算
-            x_basis = child_dir
-            z_basis = x_basis ^ parent_dir
-            y_basis = -x_basis ^ z_basis
-
-            # 3ジョイントが直線上になっているときは親のYZ軸を使用する
-            if abs(parent_dir * child_dir) > 0.99:
-                y_basis = om.MVector(parent_matrix[4:7])
-                z_basis = om.MVector(parent_matrix[8:11])
-
-            x_basis.normalize()
-            y_basis.normalize()
-            z_basis.normalize()
-
-            new_matrix = joint_matrix
-            new_matrix[0:3] = list(x_basis)
-            new_matrix[4:7] = list(y_basis)
-            new_matrix[8:11] = list(z_basis)
-
-            # ジョイントの姿勢を変更
-            cmds.xform(joint, m=new_matrix, worldSpace=True)
-
-            # 子の復帰
-            for child in children:
-                cmds.xform(child, m=children_matrix[child], worldSpace=True)
-
-            # 回転のフリーズ
-            cmds.makeIdentity(joint, apply=True, rotate=True)
+        skeleton.orient_radial(cmds.ls(selection=True, type="joint", long=True))
 
     def onOrientPreserveY(self, *args):
         """Y軸を維持してX軸を子に向ける"""
@@ -0,0 +1,352 @@
+"""ジョイント階層の姿勢をまとめて計算して書き込むモジュール
+
+対象ジョイントとその親･子･対向ジョイントのワールド行列を最初に全て読み､新しいワールド行列は読み込んだ状態だけから計算する｡
+書き込みは浅い順に translate, rotate, jointOrient を設定する一度の処理で行い､
+対象外の子はワールドでの姿勢を維持する｡ 結果は対象ジョイントの処理順に依存しない｡
+
+行列は Maya と同じ行ベクトル･行優先の 16 要素のリストで扱う｡ 回転は rotate を 0 にして jointOrient に持たせる (makeIdentity の回転の適用と同じ)｡
+"""
+import math
+import re
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+def multiply(a, b):
+    """行列の積 a * b"""
+    return [sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4)) for r in range(4) for c in range(4)]
+
+
+def inverse(m):
+    """アフィン変換行列の逆行列"""
+    a, b, c = m[0:3]
+    d, e, f = m[4:7]
+    g, h, i = m[8:11]
+    det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+    rows = [
+        [(e * i - f * h) / det, (c * h - b * i) / det, (b * f - c * e) / det],
+        [(f * g - d * i) / det, (a * i - c * g) / det, (c * d - a * f) / det],
+        [(d * h - e * g) / det, (b * g - a * h) / det, (a * e - b * d) / det],
+    ]
+    position = [-sum(m[12 + k] * rows[k][c] for k in range(3)) for c in range(3)]
+
+    return compose(rows, position)
+
+
+def compose(rows, position):
+    """3 つの基底ベクトルと位置から行列を作る"""
+    return list(rows[0]) + [0.0] + list(rows[1]) + [0.0] + list(rows[2]) + [0.0] + list(position) + [1.0]
+
+
+def basis(m, axis):
+    return m[axis * 4:axis * 4 + 3]
+
+
+def position(m):
+    return m[12:15]
+
+
+def normalize(v):
+    length = math.sqrt(sum(x * x for x in v))
+    return [x / length for x in v] if length else list(v)
+
+
+def cross(a, b):
+    return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
+
+
+def dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def euler_xyz(m):
+    """回転行列 (行が正規化されていなくてもよい) から回転順 XYZ のオイラー角 (度) を返す"""
+    r0, r1, r2 = [normalize(basis(m, i)) for i in range(3)]
+    sy = max(-1.0, min(1.0, -r0[2]))
+    y = math.asin(sy)
+
+    if abs(sy) < 1.0 - 1e-9:
+        x = math.atan2(r1[2], r2[2])
+        z = math.atan2(r0[1], r0[0])
+    else:
+        x = math.atan2(-r2[1], r1[1])
+        z = 0.0
+
+    return [math.degrees(x), math.degrees(y), math.degrees(z)]
+
+
+def rotation_xyz(angles):
+    """回転順 XYZ のオイラー角 (度) の回転行列"""
+    cx, cy, cz = [math.cos(math.radians(a)) for a in angles]
+    sx, sy, sz = [math.sin(math.radians(a)) for a in angles]
+    rows = [
+        [cy * cz, cy * sz, -sy],
+        [-cx * sz + sx * sy * cz, cx * cz + sx * sy * sz, sx * cy],
+        [sx * sz + cx * sy * cz, -sx * cz + cx * sy * sz, cx * cy],
+    ]
+
+    return compose(rows, [0.0, 0.0, 0.0])
+
+
+def mirror_matrix(m, axis=0):
+    """対向ジョイントのワールド行列を axis の軸で鏡像にした右手系の行列
+
+    X 軸と Y 軸は軸成分を反転し､ Z 軸はその外積で作り直す｡ 位置も軸成分を反転する｡
+    """
+    def flip(v):
+        return [-x if i == axis else x for i, x in enumerate(v)]
+
+    bx = flip(basis(m, 0))
+    by = flip(basis(m, 1))
+
+    return compose([bx, by, cross(bx, by)], flip(position(m)))
+
+
+def radial_matrix(m, parent_m, child_position):
+    """X 軸を子に向け､親･自身･子が作る平面の法線を Z 軸にした行列
+
+    3 点がほぼ直線上にある場合は親の Y 軸と Z 軸を使う｡
+    """
+    joint_position = position(m)
+    parent_dir = normalize([a - b for a, b in zip(joint_position, position(parent_m))])
+    child_dir = normalize([a - b for a, b in zip(child_position, joint_position)])
+
+    if abs(dot(parent_dir, child_dir)) > 0.99:
+        rows = [child_dir, basis(parent_m, 1), basis(parent_m, 2)]
+    else:
+        z_basis = cross(child_dir, parent_dir)
+        y_basis = cross([-x for x in child_dir], z_basis)
+        rows = [child_dir, y_basis, z_basis]
+
+    return compose([normalize(x) for x in rows], joint_position)
+
+
+def local_transform(world, parent_world):
+    """ワールド行列と親のワールド行列から translate と jointOrient (rotate は 0) を返す"""
+    local = multiply(world, inverse(parent_world))
+
+    return position(local), euler_xyz(local)
+
+
+class PairTable(object):
+    """左右の名前の対応表
+
+    置換パターンは一度だけコンパイルし､全ジョイントの短い名前からフルパスへの辞書を作っておく｡
+
+    Args:
+        prefix_from (str): 片側の名前に含まれる正規表現
+        prefix_to (str): 反対側の名前に含まれる正規表現
+        joints (list[str]): 対応を探すジョイントのフルパス
+    """
+    def __init__(self, prefix_from, prefix_to, joints):
+        self.patterns = [(re.compile(prefix_from), prefix_to), (re.compile(prefix_to), prefix_from)]
+        self.name_to_path = dict()
+
+        for path in joints:
+            self.name_to_path.setdefault(path.split("|")[-1], path)
+
+    def opposite_name(self, name):
+        """反対側の短い名前｡ どちらのパターンにも一致しなければ None"""
+        basename = name.split("|")[-1]
+
+        for pattern, replacement in self.patterns:
+            if pattern.search(basename):
+                return pattern.sub(replacement, basename)
+
+        return None
+
+    def opposite(self, path):
+        """反対側のジョイントのフルパス｡ 見つからなければ None"""
+        return self.name_to_path.get(self.opposite_name(path))
+
+    def is_from_side(self, path):
+        """短い名前が prefix_from に一致すれば True"""
+        return bool(self.patterns[0][0].search(path.split("|")[-1]))
+
+    def driven_pairs(self, joints):
+        """対象ジョイントと､その鏡像の元にする反対側のジョイントの組を返す
+
+        対象に左右両方が含まれる場合は prefix_from 側を元にして prefix_to 側だけを変更する｡
+
+        Args:
+            joints (list[str]): 対象ジョイントのフルパス
+
+        Returns:
+            tuple[list[tuple[str, str]], list[str]]: (対象ジョイント, 反対側のジョイント) のリストと反対側が見つからなかったジョイント
+        """
+        targets = set(joints)
+        pairs = []
+        missing = []
+
+        for joint in joints:
+            opposite = self.opposite(joint)
+
+            if not opposite:
+                missing.append(joint)
+
+            elif opposite not in targets or not self.is_from_side(joint):
+                pairs.append((joint, opposite))
+
+        return pairs, missing
+
+
+def _matrix_to_list(matrix):
+    return [matrix.getElement(r, c) for r in range(4) for c in range(4)]
+
+
+class SkeletonState(object):
+    """対象ジョイントの行列と親子関係を読み込み､新しいワールド行列をまとめて書き込む
+
+    Args:
+        joints (list[str]): 対象ジョイント
+        references (list[str], optional): 対象ではないが行列を参照するノード (対向ジョイントなど)
+    """
+    def __init__(self, joints, references=None):
+        self.world = dict()  # パス -> 読み込んだワールド行列
+        self.parent_world = dict()  # パス -> 親のワールド行列
+        self.parent = dict()  # パス -> 親のパス
+        self.children = dict()  # パス -> [(子のパス, ジョイントか)]
+        self.new_world = dict()  # パス -> 新しいワールド行列
+        self.targets = []
+
+        for joint in joints:
+            path = self.read(joint)
+
+            if path not in self.targets:
+                self.targets.append(path)
+
+        for path in list(self.targets):
+            for child, _ in self.children[path]:
+                self.read(child)
+
+        for name in references or []:
+            self.read(name)
+
+    def read(self, name):
+        """ノードとその子の行列を読み込んでフルパスを返す"""
+        sel = om.MSelectionList()
+        sel.add(name)
+        dag = sel.getDagPath(0)
+        path = dag.fullPathName()
+
+        if path in self.world:
+            return path
+
+        self.world[path] = _matrix_to_list(dag.inclusiveMatrix())
+        self.parent_world[path] = _matrix_to_list(dag.exclusiveMatrix())
+
+        parent = om.MDagPath(dag)
+        parent.pop()
+        self.parent[path] = parent.fullPathName() if parent.length() else None
+
+        fn_dag = om.MFnDagNode(dag)
+        self.children[path] = []
+
+        for i in range(fn_dag.childCount()):
+            child = fn_dag.child(i)
+
+            if child.hasFn(om.MFn.kTransform):
+                child_path = om.MDagPath(dag)
+                child_path.push(child)
+                self.children[path].append((child_path.fullPathName(), child.hasFn(om.MFn.kJoint)))
+
+        return path
+
+    def current_parent_world(self, path):
+        parent = self.parent.get(path)
+
+        if parent and parent in self.new_world:
+            return self.new_world[parent]
+
+        return self.parent_world[path]
+
+    def depth(self, path):
+        return path.count("|")
+
+    def write(self):
+        """新しいワールド行列を浅い順に書き込み､対象外の子のワールド姿勢を維持する"""
+        changed = sorted(self.new_world, key=self.depth)
+        joints = []
+        others = []
+
+        for path in changed:
+            joints.append((path, self.new_world[path]))
+
+            for child, is_joint in self.children.get(path, []):
+                if child not in self.new_world:
+                    (joints if is_joint else others).append((child, self.world[child]))
+
+        for path, world in joints:
+            translate, joint_orient = local_transform(world, self.current_parent_world(path))
+            cmds.setAttr(path + ".translate", *translate)
+            cmds.setAttr(path + ".rotate", 0, 0, 0)
+            cmds.setAttr(path + ".jointOrient", *joint_orient)
+
+        for path, world in others:
+            cmds.xform(path, matrix=world, worldSpace=True)
+
+
+def symmetrize_joints(joints, prefix_from, prefix_to, pos=True, ori=True):
+    """ジョイントの位置と方向を名前で対応する反対側のジョイントの鏡像にする
+
+    左右両方のジョイントが対象に含まれる場合は prefix_from 側を元にして prefix_to 側だけを変更する｡
+
+    Args:
+        joints (list[str]): 対象ジョイント
+        prefix_from (str): 片側の名前に含まれる正規表現
+        prefix_to (str): 反対側の名前に含まれる正規表現
+        pos (bool, optional): 位置を対称にする. Defaults to True.
+        ori (bool, optional): 方向を対称にする. Defaults to True.
+
+    Returns:
+        list[str]: 反対側のジョイントが見つからなかったジョイント
+    """
+    table = PairTable(prefix_from, prefix_to, cmds.ls(type="joint", long=True))
+    pairs, missing = table.driven_pairs(cmds.ls(joints, long=True))
+
+    state = SkeletonState([x for x, _ in pairs], references=[x for _, x in pairs])
+
+    for joint, opposite in pairs:
+        mirrored = mirror_matrix(state.world[opposite])
+        new_matrix = list(state.world[joint])
+
+        if pos:
+            new_matrix[12:15] = position(mirrored)
+
+        if ori:
+            new_matrix[0:12] = mirrored[0:12]
+
+        state.new_world[joint] = new_matrix
+
+    state.write()
+
+    return missing
+
+
+def orient_radial(joints):
+    """ジョイントの X 軸を子に向け､親に対して放射状になるように方向付けする
+
+    親の無いジョイントは対象外｡ 子の無いジョイントは親と同じ方向にする｡
+
+    Args:
+        joints (list[str]): 対象ジョイント
+    """
+    state = SkeletonState(cmds.ls(joints, type="joint", long=True))
+
+    # 一直線の場合に親の軸を使うので浅い順に計算する
+    for path in sorted(state.targets, key=state.depth):
+        if not state.parent[path]:
+            continue
+
+        parent_world = state.current_parent_world(path)
+        joint_world = state.world[path]
+
+        if not state.children[path]:
+            state.new_world[path] = compose([basis(parent_world, i) for i in range(3)], position(joint_world))
+            continue
+
+        child_position = position(state.world[state.children[path][0][0]])
+        state.new_world[path] = radial_matrix(joint_world, parent_world, child_position)
+
+    state.write()
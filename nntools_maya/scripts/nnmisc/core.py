@@ -11,6 +11,9 @@ import nnutil.ui as ui
 import nnutil.misc as nm
 import nnutil.decorator as nd
 import nnutil.inview_editor as nie
+import nnutil.extrude as nex
+import nnutil.skin_index as nsi
+import nnutil.uv_quantize as nuq
 
 if int(cmds.about(version=True)) >= 2025:
     from PySide6 import QtWidgets, QtGui
@@ -207,180 +210,42 @@ def spin_or_triangulate(targets=None):
 
 
 def snap_to_pixels(targets=None, texture_resolution=1024, snap_pixels=1):
-    """指定した UV をテクスチャのピクセル境界にスナップさせる."""
-    snap_uv = 1 / texture_resolution * snap_pixels
+    """指定した UV をテクスチャのピクセル境界にスナップさせる.
 
-    targets = targets or cmds.ls(selection=True, flatten=True)
-
-    if not targets:
-        return
-
-    uvs = cmds.filterExpand(targets, selectionMask=35)
-    uv_coords = {}
-
-    for uv_str in uvs:
-        u, v = cmds.polyEditUV(uv_str, q=True)
-        uv_coords[uv_str] = [u, v]
-
-    max_u = max([uv[0] for uv in uv_coords.values()])
-    min_u = min([uv[0] for uv in uv_coords.values()])
-    max_v = max([uv[1] for uv in uv_coords.values()])
-    min_v = min([uv[1] for uv in uv_coords.values()])
-
-    is_snap_u = (max_u - min_u) < (max_v - min_v)
-
-    for uv_str, uv in uv_coords.items():
-        new_v = uv[1]
-        new_u = uv[0]
-
-        if is_snap_u:
-            new_u = round(uv[0] / snap_uv, 0) * snap_uv
-        else:
-            new_v = round(uv[1] / snap_uv, 0) * snap_uv
-
-        cmds.polyEditUV(uv_str, relative=False, uValue=new_u, vValue=new_v)
+    Returns:
+        list[ShellDisplacement]: シェル毎のスナップ移動量の集計
+    """
+    return nuq.snap_uvs(targets, mode=nuq.SM_PIXEL, texture_resolution=texture_resolution, snap_pixels=snap_pixels)
 
 
 @nd.repeatable
 def snap_to_ordinal_in_block(targets=None, texture_resolution=1024, block_width=8, ordinal=5, nearest=False):
-    """指定した UV をテクスチャのピクセル境界にスナップさせる."""
-
-    def calc_coord_to_snap(coord):
-        uv_per_pixel = 1.0 / texture_resolution
-        uv_per_block = uv_per_pixel * block_width
-
-        current_ordinal = (coord % uv_per_block) / uv_per_pixel
-
-        # nearest オプションが有効な場合は ordinal を反対側から数えた場合と比較して近い方にスナップする
-        if nearest:
-            if current_ordinal < block_width / 2:
-                actual_ordinal = min(ordinal, block_width - ordinal)
-            else:
-                actual_ordinal = max(ordinal, block_width - ordinal)
-
-        else:
-            actual_ordinal = ordinal
-
-        # 現在 UV が存在するブロック内のスナップ座標
-        block_index = coord // uv_per_block
-
-        new_coord = block_index * uv_per_block + uv_per_pixel * actual_ordinal
-
-        return new_coord
-
-    # tagets が未指定なら選択 UV を使用
-    targets = targets or cmds.ls(selection=True, flatten=True)
+    """指定した UV をテクスチャのピクセル境界にスナップさせる.
 
-    if not targets:
-        return
-
-    # UV 座標取得
-    uvs = cmds.filterExpand(targets, selectionMask=35)
-    uv_coords = {}
-
-    for uv_str in uvs:
-        u, v = cmds.polyEditUV(uv_str, q=True)
-        uv_coords[uv_str] = [u, v]
-
-    # 揃えるのが U か V かの判定
-    max_u = max([uv[0] for uv in uv_coords.values()])
-    min_u = min([uv[0] for uv in uv_coords.values()])
-    max_v = max([uv[1] for uv in uv_coords.values()])
-    min_v = min([uv[1] for uv in uv_coords.values()])
-
-    is_snap_u = (max_u - min_u) < (max_v - min_v)
-
-    # 各 UV ごとにスナップ処理
-    for uv_str, uv in uv_coords.items():
-        new_v = uv[1]
-        new_u = uv[0]
-
-        # スナップ後の座標
-        if is_snap_u:
-            new_u = calc_coord_to_snap(uv[0])
-        else:
-            new_v = calc_coord_to_snap(uv[1])
-
-        # 座標の更新
-        cmds.polyEditUV(uv_str, relative=False, uValue=new_u, vValue=new_v)
+    Returns:
+        list[ShellDisplacement]: シェル毎のスナップ移動量の集計
+    """
+    return nuq.snap_uvs(targets, mode=nuq.SM_ORDINAL, texture_resolution=texture_resolution, block_width=block_width, ordinal=ordinal, nearest=nearest)
 
 
 @nd.undo_chunk
 def extrude_edges(offset):
-    """UV･頂点カラー等が設定されたエッジのextrude."""
+    """UV･頂点カラー等が設定されたエッジのextrude.
+
+    UV と頂点カラーの引き継ぎと縫合は nnutil.extrude で配列単位で行う｡
+    """
     selected_edges = cmds.ls(selection=True, flatten=True)
 
-    extrude_node = cmds.polyExtrudeEdge(
-        selected_edges,
-        constructionHistory=True,
-        keepFacesTogether=True,
-        divisions=1,
-        offset=offset,
-        thickness=0,
-        smoothingAngle=180)
+    if not selected_edges:
+        return
+
+    # 押し出したエッジと根元の UV が分離していない側面エッジは UV ID の割り当てで縫合済みになる
+    nex.extrude_edges_with_attributes(selected_edges, offset=offset)
 
+    # 押し出しで新規作成されたボーダーエッジの展開
     extruded_edges = cmds.ls(selection=True, flatten=True)
-    extruded_faces = cmds.filterExpand(cmds.polyListComponentConversion(extruded_edges, fe=True, tf=True), selectionMask=34)
-    perimeter_faces = cmds.filterExpand(cmds.polyListComponentConversion(selected_edges, fe=True, tf=True), selectionMask=34)
-    all_bace_faces = list(set(perimeter_faces) - set(extruded_faces))
-    all_bace_vfaces = list(set(cmds.filterExpand(cmds.polyListComponentConversion(all_bace_faces, ff=True, tvf=True), selectionMask=70)))
-
-    saw_edges = []
-
-    # 押し出されたフェース毎に反復
-    for extruded_face in extruded_faces:
-        perimeter_edges = cmds.filterExpand(cmds.polyListComponentConversion(extruded_face, ff=True, te=True), selectionMask=32)
-        selected_edge = [x for x in perimeter_edges if x in selected_edges]
-        extruded_edge = [x for x in perimeter_edges if x in extruded_edges]
-        side_edges = [x for x in perimeter_edges if x not in extruded_edges + selected_edges]
-        base_face = cmds.filterExpand(cmds.polyListComponentConversion(selected_edge, fe=True, tf=True), selectionMask=34)
-        base_face.remove(extruded_face)
-        ext_vfaces = cmds.filterExpand(cmds.polyListComponentConversion(extruded_face, ff=True, tvf=True), selectionMask=70)
-        base_vfaces = cmds.filterExpand(cmds.polyListComponentConversion(base_face, ff=True, tvf=True), selectionMask=70)
-        sel_vfaces = cmds.filterExpand(cmds.polyListComponentConversion(selected_edge, fe=True, tvf=True), selectionMask=70)
-
-        # 押し出しで作成されたフェース同士の境界エッジごとの反復
-        for side_edge in side_edges:
-            side_vts = cmds.filterExpand(cmds.polyListComponentConversion(side_edge, fe=True, tv=True), selectionMask=31)
-            side_vfaces = cmds.filterExpand(cmds.polyListComponentConversion(side_vts, fv=True, tvf=True), selectionMask=70)
-
-            vf_src = list(set(side_vfaces) & set(base_vfaces))[0]
-            vf_dst_list = list(set(side_vfaces) & set(ext_vfaces))
-
-            has_uv = cmds.polyListComponentConversion(vf_src, fvf=True, tuv=True)
-            has_vcolor = cmds.polyColorSet(q=True, allColorSets=True)
-
-            for vf_dst in vf_dst_list:
-
-                if has_uv:
-                    uv_src = cmds.polyListComponentConversion(vf_src, fvf=True, tuv=True)[0]
-                    uv_dst = cmds.polyListComponentConversion(vf_dst, fvf=True, tuv=True)[0]
-
-                    uv = cmds.polyEditUV(uv_src, q=True)
-                    cmds.polyEditUV(uv_dst, u=uv[0], v=uv[1], relative=False)
-
-                if has_vcolor:
-                    rgb = cmds.polyColorPerVertex(vf_src, q=True, colorRGB=True)
-                    a = cmds.polyColorPerVertex(vf_src, q=True, alpha=True)[0]
-                    cmds.polyColorPerVertex(vf_dst, colorRGB=rgb, alpha=a)
-
-            # 根元のUVが分離していなければ Saw 対象リストへ追加
-            vf = list(set(all_bace_vfaces) & set(side_vfaces))
-            uv = cmds.filterExpand(cmds.polyListComponentConversion(vf, fvf=True, tuv=True), selectionMask=35)
-
-            if len(set(uv)) == 1:
-                saw_edges.append(side_edge)
-
-    # 押し出しで新規作成されたボーダーエッジの Saw
     cmds.u3dUnfold(extruded_edges, ite=2, p=0, bi=1, tf=1, ms=1024, rs=0)
 
-    # 押し出したフェース同士の境界の Saw
-    if saw_edges:
-        cmds.polyMapSew(saw_edges)
-
-    # 最初に選択していたエッジの Saw
-    cmds.polyMapSew(selected_edges)
-
     # 選択復帰
     cmds.select(extruded_edges)
 
@@ -589,31 +454,20 @@ def select_all_skined_meshes_from_root_joint(root_object=None, select=True, resu
 
         root_object = selected_object[0]
 
-    all_joints = cmds.listRelatives(root_object, allDescendents=True)
-    all_skinclusters = []
-
-    for joint in all_joints:
-        skinclusters = cmds.listConnections(joint, destination=True, type="skinCluster")
-
-        if skinclusters:
-            all_skinclusters.extend(skinclusters)
+    all_joints = cmds.listRelatives(root_object, allDescendents=True) or []
 
-    all_skinclusters = list(set(all_skinclusters))
+    # スキンクラスターとメッシュの対応はシーン共通のインデックスから引く
+    skin_index = nsi.get_index()
+    all_skinclusters = [sc for joint in all_joints for sc in skin_index.skinclusters_from_joint(joint)]
 
     if not all_skinclusters:
         print("no skincluster.")
         return None
 
-    skined_meshes = []
-
-    for sc in all_skinclusters:
-        meshes = cmds.listConnections(sc, destination=True, type="mesh")
-        skined_meshes.extend(meshes)
-
-    skined_meshes = list(set(skined_meshes))
+    skined_meshes = skin_index.meshes_from_joints(all_joints)
 
     if not skined_meshes:
-        print("no skined meshes.", all_skinclusters)
+        print("no skined meshes.", sorted(set(all_skinclusters)))
         return None
 
     if select:
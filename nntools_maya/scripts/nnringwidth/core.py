@@ -2,6 +2,7 @@
 import maya.cmds as cmds
 import math
 
+import nnutil.core as nu
 import nnutil.ui as ui
 
 
@@ -586,6 +587,7 @@ class NN_AlignedgeRingWindow(object):
         self.last_relative_mode = None
 
     # 選択エッジの幅を揃える機能本体
+    @nu.timer
     def _align_edge_ring(self, length1, length2, alignMode, relativeMode=None):
         constMode = cmds.checkBox(self.constMode, q=True, v=True)
         if constMode:
@@ -7,54 +7,68 @@ def fix_command():
     print("dummy_fix_command")
 
 
-def main(model_root_grp=None, min_unit=0.01, fast_mode=True):
+def find_weight_fractions(objects, min_unit=0.01, fast_mode=True):
+    """ウェイトに min_unit の倍数以外の値を持つ頂点を探す｡ 選択は変更しない
 
-    selections = cmds.ls(selection=True, flatten=True)
-    objects = None
-
-    if len(selections) != 0:
-        objects = selections
-    else:
-        if model_root_grp:
-            objects = cmds.listRelatives(model_root_grp)
-        else:
-            print("no target")
+    Args:
+        objects (list[str]): 調べるオブジェクト｡ スキンクラスターの無いものは無視する
+        min_unit (float, optional): ウェイトの最小単位. Defaults to 0.01.
+        fast_mode (bool, optional): True でオブジェクト毎に最初に見つかった頂点で打ち切る. Defaults to True.
 
+    Returns:
+        tuple[list[str], list[str]]: 端数のあるオブジェクトと頂点
+    """
     fraction_objs = []
     fraction_comp = []
 
     for obj in objects:
         sc = mel.eval('findRelatedSkinCluster %(obj)s' % locals())
         if sc == "":
-            next
-        else:
-            print("check %s" % obj)
+            continue
+
+        print("check %s" % obj)
+
+        vertices = cmds.ls(cmds.polyListComponentConversion(obj, toVertex=True), flatten=True)
+
+        has_fraction = False
 
-            cmds.select(obj)
-            cmds.ConvertSelectionToVertices()
-            vertices = cmds.ls(selection=True, flatten=True)
+        for vtx in vertices:
+            weights = cmds.skinPercent(sc, vtx, q=True, v=True)
 
-            has_fraction = False
+            for w in weights:
+                f1 = (w % min_unit)
+                f2 = min_unit - f1
+                f = min(f1, f2)
+                t = 0.00000000000001  # 無視する浮動小数誤差
+                fraction_is_too_small = (f < t)
 
-            for vtx in vertices:
-                weights = cmds.skinPercent(sc, vtx, q=True, v=True)
+                if not fraction_is_too_small:
+                    has_fraction = True
+                    fraction_comp.append(vtx)
 
-                for w in weights:
-                    f1 = (w % min_unit)
-                    f2 = min_unit - f1
-                    f = min(f1, f2)
-                    t = 0.00000000000001  # 無視する浮動小数誤差
-                    fraction_is_too_small = (f < t)
+            if fast_mode and has_fraction:
+                break
 
-                    if not fraction_is_too_small:
-                        has_fraction = True
-                        fraction_comp.append(vtx)
+        if has_fraction:
+            fraction_objs.append(obj)
 
-                if fast_mode and has_fraction:
-                    break
+    return fraction_objs, fraction_comp
+
+
+def main(model_root_grp=None, min_unit=0.01, fast_mode=True):
+
+    selections = cmds.ls(selection=True, flatten=True)
+    objects = None
+
+    if len(selections) != 0:
+        objects = selections
+    else:
+        if model_root_grp:
+            objects = cmds.listRelatives(model_root_grp)
+        else:
+            print("no target")
 
-            if has_fraction:
-                fraction_objs.append(obj)
+    fraction_objs, fraction_comp = find_weight_fractions(objects or [], min_unit, fast_mode)
 
     message = ""
 
@@ -1,7 +1,6 @@
 import math
 import re
 import maya.cmds as cmds
-import maya.mel as mel
 
 import maya.api.OpenMaya as om
 import maya.api.OpenMayaAnim as oma
@@ -9,6 +8,7 @@ import maya.api.OpenMayaAnim as oma
 import nnutil.core as nu
 import nnutil.ui as ui
 import nnutil.decorator as deco
+import nnutil.skin_index as nsi
 
 import nnskin.smooth_weights
 
@@ -25,7 +25,7 @@ def get_skincluster(target):
     スキンクラスターの取得
     """
     object = nu.get_object(target)
-    sc = mel.eval("findRelatedSkinCluster %(object)s" % locals())
+    sc = nsi.get_index().skincluster_of(object)
     return sc
 
 
@@ -285,6 +285,7 @@ def copy_from_proxy_vts():
 weightclipboard = None
 
 
+@nu.timer
 def copy_weight(selections=None):
     """
     選択頂点からウェイトをコピーする
@@ -314,6 +315,7 @@ def paste_weight(selections=None):
     paste_weight_as_possible(selections)
 
 
+@nu.timer
 def paste_weight_as_possible(selections=None):
     """
     選択頂点へ保存したウェイトをペーストする
@@ -366,7 +368,7 @@ def get_influence_order(obj):
     skincluster = get_skincluster(obj)
 
     if skincluster:
-        return cmds.skinCluster(skincluster, q=True, influence=True)
+        return nsi.get_index().influences(skincluster)
 
     if not skincluster:
         return None
@@ -507,6 +509,31 @@ def copy_weights_from_nearest_unselected_vertex(max_distance=1.0):
     if failed_vtx:
         cmds.select(failed_vtx, replace=True)
 
+
+def get_unconnected_orig_meshes():
+    """どこにも接続されていない中間オブジェクトのメッシュ (不要な Orig シェイプ) のリストを返す"""
+    orig_meshes = []
+
+    for mesh in cmds.ls(type="mesh"):
+        if cmds.getAttr(mesh + ".intermediateObject"):
+            connections = cmds.listConnections(mesh, destination=True) or []
+            non_info_nodes = [c for c in connections if cmds.objectType(c) != "nodeGraphEditorInfo"]
+            if not non_info_nodes:
+                orig_meshes.append(mesh)
+
+    return orig_meshes
+
+
+def delete_unconnected_orig_meshes():
+    """接続されていない Orig シェイプを削除し､削除したメッシュのリストを返す"""
+    orig_meshes = get_unconnected_orig_meshes()
+
+    if orig_meshes:
+        print(orig_meshes)
+        cmds.delete(orig_meshes)
+
+    return orig_meshes
+
 ###################################################################################################
 ###################################################################################################
 # UI部
@@ -813,18 +840,7 @@ class NN_ToolWindow(object):
                     cmds.skinPercent(skincluster, vtx, transformMoveWeights=[before_name, after_name])
 
     def on_delete_unconnected_orig_mesh(self, *args):
-        error_objects = []
-
-        for mesh in cmds.ls(type="mesh"):
-            if cmds.getAttr(mesh + ".intermediateObject"):
-                connections = cmds.listConnections(mesh, destination=True) or []
-                non_info_nodes = [c for c in connections if cmds.objectType(c) != "nodeGraphEditorInfo"]
-                if not non_info_nodes:
-                    error_objects.append(mesh)
-
-        if error_objects:
-            print(error_objects)
-            cmds.delete(error_objects)
+        delete_unconnected_orig_meshes()
 
     def on_skin_checker(self, *args):
         import nnskin.check_skin_tool
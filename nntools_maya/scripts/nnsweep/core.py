@@ -8,6 +8,8 @@ import nnutil.decorator as deco
 import nnutil.ui as ui
 import nnutil.display as nd
 
+from . import rebuild
+
 
 window_name = "NN_Sweep"
 
@@ -61,6 +63,8 @@ def rebuild_curve(curves=None, span=1):
 
     curves が未指定の場合は 選択オブジェクトを対象とする｡
     span=0 の場合は 1 スパンの直線にする｡
+    span=None の場合は弧長と曲率からカーブ毎にスパン数を決めて一括でリビルドする｡
+    この場合はヒストリーを削除し､ rebuildCurve とは異なる弧長基準の最小二乗で CV を決める｡
 
     """
     curves = curves or get_selected_curves()
@@ -69,12 +73,16 @@ def rebuild_curve(curves=None, span=1):
         print("curves should be selected.")
         return
 
-    for curve in curves:
-        if span == 0:
-            cmds.rebuildCurve(curve, ch=1, rpo=1, rt=0, end=1, kr=2, kcp=0, kep=0, kt=0, fr=0, s=1, d=1, tol=0.01)
+    if span is None:
+        rebuild.rebuild_curves(curves, span=None, degree=2)
 
-        else:
-            cmds.rebuildCurve(curve, ch=1, rpo=1, rt=0, end=1, kr=2, kcp=0, kep=0, kt=0, fr=0, s=span, d=2, tol=0.01)
+    else:
+        for curve in curves:
+            if span == 0:
+                cmds.rebuildCurve(curve, ch=1, rpo=1, rt=0, end=1, kr=2, kcp=0, kep=0, kt=0, fr=0, s=1, d=1, tol=0.01)
+
+            else:
+                cmds.rebuildCurve(curve, ch=1, rpo=1, rt=0, end=1, kr=2, kcp=0, kep=0, kt=0, fr=0, s=span, d=2, tol=0.01)
 
     print("rebuild")
 
@@ -180,6 +188,7 @@ class NN_ToolWindow(object):
         ui.button(label="2", c=self.onRebuild2)
         ui.button(label="3", c=self.onRebuild3)
         ui.button(label="4", c=self.onRebuild4)
+        ui.button(label="Auto", c=self.onRebuildAuto)
         ui.check_box(label="with taper pos")
         ui.end_layout()
 
@@ -403,6 +412,10 @@ class NN_ToolWindow(object):
         """"""
         rebuild_curve(span=4)
 
+    def onRebuildAuto(self, *args):
+        """弧長と曲率からスパン数を自動で決めてリビルドする"""
+        rebuild_curve(span=None)
+
     def onMatchSpanAndTaperPoints(self, *args):
         """"""
         print("not impl")
@@ -0,0 +1,433 @@
+"""
+カーブの一括リビルド
+
+rebuildCurve をカーブ毎に実行する代わりに､ MFnNurbsCurve で全カーブの CV とノットをまとめて読み込み､
+弧長等間隔のサンプル点の評価､弧長と曲率からのスパン数の決定､帯行列の最小二乗による CV の再計算を API を使わずに行う｡
+書き込みはヒストリーを作らずに全カーブ分を一つの MEL コマンド文字列にまとめて実行する｡
+"""
+import bisect
+import math
+
+import maya.cmds as cmds
+import maya.mel as mel
+import maya.api.OpenMaya as om
+
+
+# カーブのサンプル数｡ 元カーブの CV 1 つあたりの数と 1 本あたりの最小数
+samples_per_cv = 8
+min_samples = 32
+
+# 弧長の近似に使う評価点のサンプル数に対する倍率
+oversampling = 4
+
+# スパン数自動決定のデフォルト値
+default_tolerance = 0.01
+default_min_spans = 1
+default_max_spans = 32
+
+
+def get_curve_shapes(curves):
+    """トランスフォームとシェイプが混在したリストから nurbsCurve シェイプのリストを返す
+
+    Args:
+        curves (list[str]): カーブのトランスフォームノード名もしくはシェイプ名
+
+    Returns:
+        list[str]: nurbsCurve シェイプ名のリスト (重複無し･順序維持)
+    """
+    shapes = []
+
+    for curve in curves:
+        if cmds.objectType(curve, isType="nurbsCurve"):
+            shapes.append(curve)
+
+        else:
+            shapes.extend(cmds.listRelatives(curve, shapes=True, type="nurbsCurve", path=True) or [])
+
+    return list(dict.fromkeys(shapes))
+
+
+def read_curves(shapes):
+    """カーブの CV とノットを一括で読み込む
+
+    サンプル点の計算には API を使わないので､カーブ 1 本あたりの API 呼び出しはサンプル数によらず一定になる｡
+
+    Args:
+        shapes (list[str]): nurbsCurve シェイプ名のリスト
+
+    Returns:
+        list[dict]: カーブ毎の情報｡ shape, degree, form, cvs (オブジェクト空間の [x, y, z] のリスト), knots (Maya 形式) を持つ
+    """
+    slist = om.MSelectionList()
+
+    for shape in shapes:
+        slist.add(shape)
+
+    curve_data = []
+
+    for i in range(slist.length()):
+        fn_curve = om.MFnNurbsCurve(slist.getDagPath(i))
+        cvs = fn_curve.cvPositions(om.MSpace.kObject)
+
+        curve_data.append({
+            "shape": shapes[i],
+            "degree": fn_curve.degree,
+            "form": fn_curve.form,
+            "cvs": [[p.x, p.y, p.z] for p in cvs],
+            "knots": list(fn_curve.knots()),
+        })
+
+    return curve_data
+
+
+def curve_polyline(cvs, knots, degree, num_points):
+    """CV とノットからパラメーター等間隔の評価点と各点までの累積弧長を求める
+
+    Args:
+        cvs (list[list[float]]): CV 座標
+        knots (list[float]): Maya 形式のノットベクトル
+        degree (int): 次数
+        num_points (int): 評価点の数 (2 以上)
+
+    Returns:
+        tuple[list[list[float]], list[float]]: 評価点列と累積弧長
+    """
+    num_cvs = len(cvs)
+    full_knots = [knots[0]] + list(knots) + [knots[-1]]
+    t0 = full_knots[degree]
+    t1 = full_knots[num_cvs]
+
+    points = []
+    for i in range(num_points):
+        offset, values = _basis_functions(full_knots, degree, num_cvs, t0 + (t1 - t0) * i / (num_points - 1))
+        x = y = z = 0.0
+
+        for p, v in zip(cvs[offset:offset + degree + 1], values):
+            x += v * p[0]
+            y += v * p[1]
+            z += v * p[2]
+
+        points.append([x, y, z])
+
+    accumulated = [0.0]
+    for a, b in zip(points[:-1], points[1:]):
+        accumulated.append(accumulated[-1] + math.sqrt((b[0] - a[0])**2 + (b[1] - a[1])**2 + (b[2] - a[2])**2))
+
+    return points, accumulated
+
+
+def resample_polyline(points, accumulated, num_samples):
+    """折れ線上の弧長で等間隔な num_samples 個の点を返す"""
+    length = accumulated[-1]
+
+    if length == 0:
+        return [points[0][:] for _ in range(num_samples)]
+
+    samples = []
+    segment = 0
+
+    for j in range(num_samples):
+        target = length * j / (num_samples - 1)
+
+        while segment < len(points) - 2 and accumulated[segment + 1] < target:
+            segment += 1
+
+        a, b = points[segment], points[segment + 1]
+        seg_length = accumulated[segment + 1] - accumulated[segment]
+        ratio = max(0.0, min(1.0, (target - accumulated[segment]) / seg_length)) if seg_length else 0.0
+        samples.append([a[0] + (b[0] - a[0]) * ratio, a[1] + (b[1] - a[1]) * ratio, a[2] + (b[2] - a[2]) * ratio])
+
+    return samples
+
+
+def sample_curve(cvs, knots, degree, num_samples, oversampling=oversampling):
+    """CV とノットから弧長で等間隔なサンプル点と弧長を求める
+
+    num_samples * oversampling 点をパラメーター等間隔で評価した折れ線の長さで弧長を近似し､
+    その折れ線上を等間隔に補間する｡
+
+    Args:
+        cvs (list[list[float]]): CV 座標
+        knots (list[float]): Maya 形式のノットベクトル
+        degree (int): 次数
+        num_samples (int): サンプル数 (2 以上)
+        oversampling (int, optional): 弧長の近似に使う評価点のサンプル数に対する倍率. Defaults to oversampling.
+
+    Returns:
+        tuple[list[list[float]], float]: サンプル点列と弧長
+    """
+    points, accumulated = curve_polyline(cvs, knots, degree, max(2, num_samples * oversampling))
+
+    return resample_polyline(points, accumulated, num_samples), accumulated[-1]
+
+
+def total_turning_angles(sample_lists):
+    """サンプル点列毎の折れ線の総回転角 (ラジアン) を返す
+
+    Args:
+        sample_lists (list[list[list[float]]]): カーブ毎のサンプル点列
+
+    Returns:
+        list[float]: カーブ毎の総回転角
+    """
+    turnings = []
+
+    for samples in sample_lists:
+        # 隣接サンプル間の方向ベクトル
+        dirs = [[b[k] - a[k] for k in range(3)] for a, b in zip(samples[:-1], samples[1:])]
+        lengths = [math.sqrt(d[0]**2 + d[1]**2 + d[2]**2) for d in dirs]
+        dirs = [[c / l for c in d] for d, l in zip(dirs, lengths) if l > 0]
+
+        # 隣接方向ベクトル間の角度の総和
+        dots = [d1[0]*d2[0] + d1[1]*d2[1] + d1[2]*d2[2] for d1, d2 in zip(dirs[:-1], dirs[1:])]
+        turnings.append(sum(math.acos(max(-1.0, min(1.0, x))) for x in dots))
+
+    return turnings
+
+
+def plan_spans(lengths, turnings, degree=2, tolerance=default_tolerance, span_length=None, min_spans=default_min_spans, max_spans=default_max_spans):
+    """弧長と曲率から各カーブのスパン数を決める
+
+    総弧長 L ･総回転角 Θ が n スパンに均等に分布するとして､次数 d での近似誤差を L * Θ / (8 * n^(d+1)) と見積もり
+    (d=1 では各スパンの弦と円弧の距離 h * θ / 8 に一致する) 誤差が tolerance 以下になる最小の n を求める｡
+    span_length が指定されている場合はスパン長がそれ以下になることも条件に加える｡
+
+    Args:
+        lengths (list[float]): カーブ毎の弧長
+        turnings (list[float]): カーブ毎の総回転角 (ラジアン)
+        degree (int, optional): リビルド後の次数. Defaults to 2.
+        tolerance (float, optional): 許容する形状誤差 (距離). Defaults to default_tolerance.
+        span_length (float, optional): 1 スパンの最大長. None で長さによる制限無し. Defaults to None.
+        min_spans (int, optional): 最小スパン数. Defaults to default_min_spans.
+        max_spans (int, optional): 最大スパン数. Defaults to default_max_spans.
+
+    Returns:
+        list[int]: カーブ毎のスパン数
+    """
+    exponent = 1.0 / (degree + 1)
+    tolerance = max(tolerance, 1e-9)
+
+    curvature_spans = [math.ceil((L * T / (8.0 * tolerance)) ** exponent) for L, T in zip(lengths, turnings)]
+
+    if span_length:
+        length_spans = [math.ceil(L / span_length) for L in lengths]
+    else:
+        length_spans = [0] * len(lengths)
+
+    return [max(min_spans, min(max_spans, max(cs, ls))) for cs, ls in zip(curvature_spans, length_spans)]
+
+
+def uniform_knots(spans, degree):
+    """Maya 形式 (両端の多重度が degree) の一様ノットベクトルを返す｡ 範囲は 0 ～ spans"""
+    return [0.0] * degree + [float(i) for i in range(1, spans)] + [float(spans)] * degree
+
+
+def _basis_functions(full_knots, degree, num_cvs, t):
+    """パラメーター t における非ゼロの基底関数値と最初の CV インデックスを返す (Piegl & Tiller A2.2)"""
+    # t を含むノット区間の検索
+    span = min(max(bisect.bisect_right(full_knots, t) - 1, degree), num_cvs - 1)
+
+    values = [1.0] + [0.0] * degree
+    left = [0.0] * (degree + 1)
+    right = [0.0] * (degree + 1)
+
+    for j in range(1, degree + 1):
+        left[j] = t - full_knots[span + 1 - j]
+        right[j] = full_knots[span + j] - t
+        saved = 0.0
+
+        for r in range(j):
+            temp = values[r] / (right[r + 1] + left[j - r])
+            values[r] = saved + right[r + 1] * temp
+            saved = left[j - r] * temp
+
+        values[j] = saved
+
+    return span - degree, values
+
+
+def _solve_banded(band, rhs, bandwidth):
+    """対称正定値の帯行列の連立方程式を帯コレスキー分解で解く
+
+    Args:
+        band (list[list[float]]): 下三角の帯｡ band[i][k] が行列の (i, i - k) 成分 (0 <= k <= bandwidth)
+        rhs (list[list[float]]): 右辺｡ 列ベクトルを並べた行のリスト
+        bandwidth (int): 帯幅
+
+    Returns:
+        list[list[float]]: 解｡ rhs と同じ形
+    """
+    n = len(band)
+    lower = [[0.0] * (bandwidth + 1) for _ in range(n)]
+
+    # A = L L^T
+    for i in range(n):
+        for k in range(min(i, bandwidth), -1, -1):
+            j = i - k
+            s = band[i][k] - sum(lower[i][i - m] * lower[j][j - m] for m in range(max(0, i - bandwidth), j))
+
+            if k == 0:
+                # サンプル不足等で特異な場合は僅かに正則化する
+                lower[i][0] = math.sqrt(s) if s > 1e-12 else 1e-6
+            else:
+                lower[i][k] = s / lower[j][0]
+
+    width = len(rhs[0]) if rhs else 0
+
+    # L y = b
+    y = [row[:] for row in rhs]
+    for i in range(n):
+        for m in range(max(0, i - bandwidth), i):
+            y[i] = [a - lower[i][i - m] * b for a, b in zip(y[i], y[m])]
+        y[i] = [a / lower[i][0] for a in y[i]]
+
+    # L^T x = y
+    x = [[0.0] * width for _ in range(n)]
+    for i in reversed(range(n)):
+        row = y[i][:]
+        for m in range(i + 1, min(n, i + bandwidth + 1)):
+            row = [a - lower[m][m - i] * b for a, b in zip(row, x[m])]
+        x[i] = [a / lower[i][0] for a in row]
+
+    return x
+
+
+def fit_curve(samples, spans, degree):
+    """弧長で等間隔なサンプル点列を両端固定の最小二乗でフィッティングした CV とノットを返す
+
+    Args:
+        samples (list[list[float]]): 弧長で等間隔なサンプル点列
+        spans (int): スパン数
+        degree (int): 次数
+
+    Returns:
+        tuple[list[list[float]], list[float]]: CV 座標のリストと Maya 形式のノットベクトル
+    """
+    knots = uniform_knots(spans, degree)
+    num_cvs = spans + degree
+    full_knots = [knots[0]] + knots + [knots[-1]]
+    num_samples = len(samples)
+
+    first = samples[0]
+    last = samples[-1]
+
+    # 両端以外に未知数が無ければ終了
+    if num_cvs <= 2:
+        return [first[:], last[:]], knots
+
+    # 正規方程式 (N^T N) P = N^T R の構築 (未知数は両端を除いた CV)
+    # 各サンプルで非ゼロの基底関数は degree + 1 個なので N^T N は帯幅 degree の帯行列になる
+    num_unknowns = num_cvs - 2
+    band = [[0.0] * (degree + 1) for _ in range(num_unknowns)]
+    atb = [[0.0] * 3 for _ in range(num_unknowns)]
+
+    for i, sample in enumerate(samples):
+        t = spans * i / (num_samples - 1)
+        offset, values = _basis_functions(full_knots, degree, num_cvs, t)
+
+        # 固定した両端 CV の寄与を差し引いた残差
+        residual = sample[:]
+        for k, v in enumerate(values):
+            index = offset + k
+            if index == 0:
+                residual = [r - v * p for r, p in zip(residual, first)]
+            elif index == num_cvs - 1:
+                residual = [r - v * p for r, p in zip(residual, last)]
+
+        for k1, v1 in enumerate(values):
+            row = offset + k1 - 1
+            if row < 0 or row >= num_unknowns:
+                continue
+
+            atb[row] = [b + v1 * r for b, r in zip(atb[row], residual)]
+
+            for k2, v2 in enumerate(values[:k1 + 1]):
+                col = offset + k2 - 1
+                if 0 <= col:
+                    band[row][row - col] += v1 * v2
+
+    inner_cvs = _solve_banded(band, atb, degree)
+
+    return [first[:]] + inner_cvs + [last[:]], knots
+
+
+def _curve_attr_command(shape, cvs, knots, degree):
+    """.ma と同じ形式でシェイプの形状を上書きする setAttr の MEL 文字列を返す"""
+    spans = len(cvs) - degree
+    knot_str = " ".join("%.10g" % k for k in knots)
+    cv_str = " ".join("%.10g %.10g %.10g" % tuple(p) for p in cvs)
+
+    return 'setAttr "%s.cc" -type "nurbsCurve" %d %d 0 no 3 %d %s %d %s;' % (shape, degree, spans, len(knots), knot_str, len(cvs), cv_str)
+
+
+def rebuild_curves(curves, span=None, degree=2, tolerance=default_tolerance, span_length=None, min_spans=default_min_spans, max_spans=default_max_spans):
+    """複数のカーブをヒストリー無しで一括リビルドする
+
+    span を指定した場合は全カーブをそのスパン数に､ None の場合は弧長と曲率から決めたスパン数にする｡
+    span=0 の場合は rebuild_curve と同様に 1 スパンの直線にする｡
+    ヒストリーを持つカーブは事前にヒストリーを削除する｡ ピリオディックカーブは対象外｡
+
+    Args:
+        curves (list[str]): カーブのトランスフォームノード名もしくはシェイプ名
+        span (int, optional): 固定のスパン数. None で自動. Defaults to None.
+        degree (int, optional): リビルド後の次数. Defaults to 2.
+        tolerance (float, optional): 自動決定時の許容誤差. Defaults to default_tolerance.
+        span_length (float, optional): 自動決定時の 1 スパンの最大長. Defaults to None.
+        min_spans (int, optional): 自動決定時の最小スパン数. Defaults to default_min_spans.
+        max_spans (int, optional): 自動決定時の最大スパン数. Defaults to default_max_spans.
+
+    Returns:
+        dict[str, int]: リビルドしたシェイプ名とスパン数の辞書
+    """
+    shapes = get_curve_shapes(curves)
+
+    if not shapes:
+        return {}
+
+    # ヒストリーの削除
+    shapes_with_history = [x for x in shapes if cmds.listConnections(x + ".create", source=True, destination=False)]
+    if shapes_with_history:
+        cmds.delete(shapes_with_history, constructionHistory=True)
+
+    curve_data = [x for x in read_curves(shapes) if x["form"] != om.MFnNurbsCurve.kPeriodic]
+
+    if len(curve_data) < len(shapes):
+        print("periodic curves are skipped: %d" % (len(shapes) - len(curve_data)))
+
+    # 評価した折れ線はスパン数の決定と再フィッティングで共有する
+    for data in curve_data:
+        num_samples = max(min_samples, len(data["cvs"]) * samples_per_cv)
+        data["polyline"] = curve_polyline(data["cvs"], data["knots"], data["degree"], num_samples * oversampling)
+        data["samples"] = resample_polyline(data["polyline"][0], data["polyline"][1], num_samples)
+        data["length"] = data["polyline"][1][-1]
+
+    # スパン数と次数の決定
+    if span == 0:
+        degree = 1
+        spans_list = [1] * len(curve_data)
+
+    elif span:
+        spans_list = [span] * len(curve_data)
+
+    else:
+        lengths = [x["length"] for x in curve_data]
+        turnings = total_turning_angles([x["samples"] for x in curve_data])
+        spans_list = plan_spans(lengths, turnings, degree=degree, tolerance=tolerance, span_length=span_length, min_spans=min_spans, max_spans=max_spans)
+
+    # 再フィッティングしてまとめて書き込み
+    commands = []
+    result = {}
+
+    for data, spans in zip(curve_data, spans_list):
+        # 未知数に対してサンプルが少なければサンプルを増やす
+        if len(data["samples"]) < (spans + degree) * samples_per_cv:
+            data["samples"] = resample_polyline(data["polyline"][0], data["polyline"][1], (spans + degree) * samples_per_cv)
+
+        cvs, knots = fit_curve(data["samples"], spans, degree)
+        commands.append(_curve_attr_command(data["shape"], cvs, knots, degree))
+        result[data["shape"]] = spans
+
+    if commands:
+        mel.eval("\n".join(commands))
+
+    return result
@@ -93,6 +93,16 @@ class NN_ToolWindow(object):
 
         ui.end_layout()
 
+        ui.row_layout()
+        ui.header(label="")
+        ui.text(label="tol(px)")
+        self.eb_tolerance = ui.eb_float(v=0.5, width=ui.width2)
+        ui.text(label="size")
+        self.eb_image_size = ui.eb_int(v=4096, width=ui.width2)
+        self.cb_merge_collinear = ui.check_box(label="Merge Collinear", v=True)
+
+        ui.end_layout()
+
     def onTest(self, *args):
         """Testハンドラ."""
         pass
@@ -125,7 +135,11 @@ class NN_ToolWindow(object):
         shape = Shape(subpaths)
 
         # Photoshopでシェイプを作成
-        jsx_path = create_shape_with_photoshop([shape])
+        # 許容誤差はピクセル単位なので UV 座標に掛ける画像サイズも渡す
+        tolerance = ui.get_value(self.eb_tolerance)
+        image_size = ui.get_value(self.eb_image_size)
+        merge_collinear = ui.get_value(self.cb_merge_collinear)
+        jsx_path = create_shape_with_photoshop([shape], tolerance=tolerance, image_size=(image_size, image_size), merge_collinear=merge_collinear)
         print("execute jsx: ", jsx_path)
 
 
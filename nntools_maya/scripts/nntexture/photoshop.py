@@ -12,9 +12,12 @@ shape = Shape(subpaths)
 create_shape_with_photoshop([shape])
 
 """
+import io
 import subprocess
 import tempfile
 
+from . import simplify as nsp
+
 
 class UVCoord:
     """UV座標を表すクラス。
@@ -48,114 +51,186 @@ class Shape:
         self.subpaths = subpaths
 
 
-def make_points_block(points):
-    """Pointオブジェクトのリストから、JSX用のpoints.push文を生成する。
+# JSX の配列リテラル 1 行あたりの数値の数
+jsx_values_per_line = 32
+
+# 図形を描画する JSX 関数の定義
+jsx_header = r"""
+function convertUvToXy(u, v, width, height){
+    var x = u * width;
+    var y = (1 - v) * height;
+    var pObj = new PathPointInfo(); // パス情報オブジェクトを作成
+    pObj.kind = PointKind.CORNERPOINT;
+    pObj.anchor = [x, y];   // アンカー座標
+    pObj.leftDirection = [x, y];    // 左ハンドル部分のパス座標
+    pObj.rightDirection = [x, y];   // 右ハンドル部分のパス座標
+    return pObj;
+}
+
+var doc = app.activeDocument;
+var activeLayer = doc.activeLayer;
+// PathPointInfo の anchor はポイント単位で解釈されるため px ではなく pt で取得
+var width = doc.width.as('pt');
+var height = doc.height.as('pt');
+
+// サブパス毎の [u0, v0, u1, v1, ...] の配列から塗りつぶしレイヤーを作成する
+function addShape(subPathData){
+    var pathName = "testpath";
+    var subPaths = [];
+
+    for (var i = 0; i < subPathData.length; i++){
+        var coords = subPathData[i];
+        var points = [];
+
+        for (var j = 0; j < coords.length; j += 2){
+            points.push(convertUvToXy(coords[j], coords[j + 1], width, height));
+        }
+
+        // サブパス情報の追加
+        var subPathInfo = new SubPathInfo();
+        subPathInfo.operation = ShapeOperation.SHAPEADD;
+        subPathInfo.closed = true;
+        subPathInfo.entireSubPath = points;
+        subPaths.push(subPathInfo);
+    }
+
+    // サブパスを一つのパスとして追加
+    doc.pathItems.add(pathName, subPaths);
+
+    var d = new ActionDescriptor();
+    var d2 = new ActionDescriptor();
+    var d3 = new ActionDescriptor();
+    var d4 = new ActionDescriptor();
+    var r = new ActionReference();
+
+    r.putClass( stringIDToTypeID( "contentLayer" ));
+    d.putReference( charIDToTypeID( "null" ), r );
+    d4.putDouble( charIDToTypeID( "Rd  " ), 255);
+    d4.putDouble( charIDToTypeID( "Grn " ), 255);
+    d4.putDouble( charIDToTypeID( "Bl  " ), 255);
+    d3.putObject( charIDToTypeID( "Clr " ), charIDToTypeID( "RGBC" ), d4 );
+    d2.putObject( charIDToTypeID( "Type" ), stringIDToTypeID( "solidColorLayer" ), d3 );
+    d.putObject( charIDToTypeID( "Usng" ), stringIDToTypeID( "contentLayer" ), d2 );
+    executeAction( charIDToTypeID( "Mk  " ), d, DialogModes.NO );
+
+    doc.pathItems.getByName(pathName).remove();
+}
+"""
+
+
+class JsxWriter:
+    """シェイプを順に JSX としてファイルに書き込むクラス。
+
+    ヘッダーで定義した addShape 関数に座標の配列リテラルを渡す呼び出しを 1 シェイプ毎に書き込むので、
+    点の数に比例した文字列を組み立てずに出力できる。
 
     Args:
-        points (list[Point]): 点のリスト
-    Returns:
-        str: JSXコード断片
+        f (file): 書き込み先のファイルオブジェクト
+        tolerance (float, optional): 簡略化の許容誤差 (ピクセル)。0 以下なら簡略化しない. Defaults to 0.0.
+        image_size (tuple[int, int], optional): 許容誤差をピクセルに換算する画像サイズ (幅, 高さ). Defaults to (4096, 4096).
+        method (str, optional): 簡略化の手法 (simplify.METHOD_RDP か simplify.METHOD_VISVALINGAM). Defaults to METHOD_RDP.
+        merge_collinear (bool, optional): True で直線上に並ぶ点をまとめる. Defaults to False.
     """
-    points_block = ""
-    for point in points:
-        points_block += f"points.push(convertUvToXy({point.u},{point.v}, width, height));\n"
-    return points_block
+    def __init__(self, f, tolerance=0.0, image_size=(4096, 4096), method=nsp.METHOD_RDP, merge_collinear=False):
+        self.f = f
+        self.tolerance = tolerance
+        self.image_size = image_size
+        self.method = method
+        self.merge_collinear = merge_collinear
+        self.num_input_points = 0
+        self.num_output_points = 0
+        self.f.write(jsx_header)
+
+    def simplified_points(self, subpath):
+        """サブパスの点を簡略化した UVCoord のリストを返す"""
+        points = subpath.points
+
+        if self.tolerance <= 0 and not self.merge_collinear:
+            return points
+
+        indices = nsp.simplify_path(
+            [(p.u, p.v) for p in points],
+            self.tolerance,
+            method=self.method,
+            closed=True,
+            merge=self.merge_collinear,
+            scale=self.image_size)
+
+        return [points[i] for i in indices]
+
+    def write_subpath(self, subpath):
+        """サブパスを [u0, v0, u1, v1, ...] の配列リテラルとして書き込む"""
+        points = self.simplified_points(subpath)
+        self.num_input_points += len(subpath.points)
+        self.num_output_points += len(points)
+
+        self.f.write("[")
 
+        for i in range(0, len(points), jsx_values_per_line // 2):
+            if i:
+                self.f.write(",\n")
 
-def make_subpaths_block(subpaths):
-    """サブパスリストから、JSXでサブパスを定義するコード断片を生成する。
+            chunk = points[i:i + jsx_values_per_line // 2]
+            self.f.write(",".join("%.7g,%.7g" % (p.u, p.v) for p in chunk))
+
+        self.f.write("]")
+
+    def write_shape(self, shape):
+        """シェイプを addShape の呼び出しとして書き込む"""
+        self.f.write("\naddShape([\n")
+
+        for i, subpath in enumerate(shape.subpaths):
+            if i:
+                self.f.write(",\n")
+
+            self.write_subpath(subpath)
+
+        self.f.write("\n]);\n")
+
+
+def write_jsx(f, shapes, **kwargs):
+    """Shapeオブジェクト群からPhotoshop用のJSXコードをファイルに書き込む。
 
     Args:
-        subpaths (list[SubPath]): サブパスのリスト
+        f (file): 書き込み先のファイルオブジェクト
+        shapes (list[Shape]): シェイプのリスト
+        **kwargs: JsxWriter に渡す簡略化の設定
     Returns:
-        str: JSXコード断片
+        JsxWriter: 書き込みに使ったライター
     """
-    subpaths_block = "// サブパスの作成\n"
-    for subpath in subpaths:
-        points_block = make_points_block(subpath.points)
-        subpaths_block += "    points = [];\n"
-        subpaths_block += points_block
-        subpaths_block += r"""
-        // サブパス情報の追加
-        subPathInfo = new SubPathInfo();
-        subPathInfo.operation = ShapeOperation.SHAPEADD;
-        subPathInfo.closed = true;
-        subPathInfo.entireSubPath = points;
-        subPaths.push(subPathInfo);
-        """
+    writer = JsxWriter(f, **kwargs)
+
+    for shape in shapes:
+        writer.write_shape(shape)
 
-    return subpaths_block
+    return writer
 
 
-def make_jsx_code(shapes):
+def make_jsx_code(shapes, **kwargs):
     """Shapeオブジェクト群からPhotoshop用のJSXコードを生成する。
 
     Args:
         shapes (list[Shape]): シェイプのリスト
+        **kwargs: JsxWriter に渡す簡略化の設定
     Returns:
         str: JSXコード全体
     """
-    jsx_code = r"""
-        function convertUvToXy(u, v, width, height){
-            var x = u * width;
-            var y = (1 - v) * height;
-            var pObj = new PathPointInfo(); // パス情報オブジェクトを作成
-            pObj.kind = PointKind.CORNERPOINT;
-            pObj.anchor = [x, y];   // アンカー座標
-            pObj.leftDirection = [x, y];    // 左ハンドル部分のパス座標
-            pObj.rightDirection = [x, y];   // 右ハンドル部分のパス座標
-            return pObj;
-        }
+    f = io.StringIO()
+    write_jsx(f, shapes, **kwargs)
 
-        var doc = app.activeDocument;
-        var activeLayer = doc.activeLayer;
-        // PathPointInfo の anchor はポイント単位で解釈されるため px ではなく pt で取得
-        var width = doc.width.as('pt');
-        var height = doc.height.as('pt');
-    """
+    return f.getvalue()
 
-    for shape in shapes:
-        subpaths = shape.subpaths
-        subpaths_block = make_subpaths_block(subpaths)
-        jsx_code += r"""
-        // シェイプを描画するパスを定義
-        var pathName = "testpath";
-        var points = [];
-        var subPaths = [];
-        """
-        jsx_code += subpaths_block
-        jsx_code += r"""
-        // サブパスを一つのパスとして追加
-        app.activeDocument.pathItems.add(pathName, subPaths);
-
-        var d = new ActionDescriptor();
-        var d2 = new ActionDescriptor();
-        var d3 = new ActionDescriptor();
-        var d4 = new ActionDescriptor();
-        var r = new ActionReference();
-
-        r.putClass( stringIDToTypeID( "contentLayer" ));
-        d.putReference( charIDToTypeID( "null" ), r );
-        d4.putDouble( charIDToTypeID( "Rd  " ), 255);
-        d4.putDouble( charIDToTypeID( "Grn " ), 255);
-        d4.putDouble( charIDToTypeID( "Bl  " ), 255);
-        d3.putObject( charIDToTypeID( "Clr " ), charIDToTypeID( "RGBC" ), d4 );
-        d2.putObject( charIDToTypeID( "Type" ), stringIDToTypeID( "solidColorLayer" ), d3 );
-        d.putObject( charIDToTypeID( "Usng" ), stringIDToTypeID( "contentLayer" ), d2 );
-        executeAction( charIDToTypeID( "Mk  " ), d, DialogModes.NO );
-
-        app.activeDocument.pathItems.getByName(pathName).remove()
-        """
-
-    return jsx_code
-
-
-def create_shape_with_photoshop(shapes):
+
+def create_shape_with_photoshop(shapes, tolerance=0.0, image_size=(4096, 4096), method=nsp.METHOD_RDP, merge_collinear=False):
     """
     Photoshopを自動操作してシェイプを生成・描画する。
 
     Args:
         shapes (list[Shape]): 描画するシェイプのリスト
+        tolerance (float, optional): パスの簡略化の許容誤差 (ピクセル)。0 以下なら簡略化しない. Defaults to 0.0.
+        image_size (tuple[int, int], optional): 許容誤差をピクセルに換算する画像サイズ (幅, 高さ). Defaults to (4096, 4096).
+        method (str, optional): 簡略化の手法 (simplify.METHOD_RDP か simplify.METHOD_VISVALINGAM). Defaults to METHOD_RDP.
+        merge_collinear (bool, optional): True で直線上に並ぶ点をまとめる. Defaults to False.
 
     Returns:
         str: 実行したJSXファイルのパス
@@ -177,10 +252,9 @@ def create_shape_with_photoshop(shapes):
     else:
         raise
 
-    # jsx コードを生成し一時ファイル経由で実行
-    jsx_code = make_jsx_code(shapes)
+    # jsx コードを一時ファイルに直接書き込んで実行
     with tempfile.NamedTemporaryFile(mode="w", suffix=".jsx", delete=False, encoding="utf-8") as tmp:
-        tmp.write(jsx_code)
+        write_jsx(tmp, shapes, tolerance=tolerance, image_size=image_size, method=method, merge_collinear=merge_collinear)
         jsx_path = tmp.name
 
     cmd = f'"{ps_path}" -r "{jsx_path}"'
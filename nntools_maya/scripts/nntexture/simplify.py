@@ -0,0 +1,265 @@
+"""折れ線の簡略化
+
+UV 境界の点列 ((u, v) のリスト) を Photoshop のパスにする前に点数を減らすための Maya 非依存の関数群｡
+簡略化関数は残す点のインデックスのリストを返すので､呼び出し側は元の点オブジェクトをそのまま使える｡
+許容誤差は scale を掛けた座標系で判定するので､ scale に画像サイズを渡せばピクセル単位で指定できる｡
+
+どの手法でも削除された点から簡略化後の折れ線までの距離は許容誤差以下になる｡
+"""
+import heapq
+import math
+
+
+# 簡略化の手法
+METHOD_RDP = "rdp"
+METHOD_VISVALINGAM = "visvalingam"
+
+
+def segment_distance(p, a, b):
+    """点 p と線分 ab の距離"""
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+
+    if length_sq == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq
+    t = max(0.0, min(1.0, t))
+
+    return math.hypot(p[0] - (a[0] + t * dx), p[1] - (a[1] + t * dy))
+
+
+def span_deviation(points, start, end):
+    """start から end まで (end が小さければ末尾から先頭に回り込む) の間にある点と線分 start-end の最大距離"""
+    n = len(points)
+    a = points[start]
+    b = points[end]
+    deviation = 0.0
+    i = (start + 1) % n
+
+    while i != end:
+        deviation = max(deviation, segment_distance(points[i], a, b))
+        i = (i + 1) % n
+
+    return deviation
+
+
+def scaled(points, scale):
+    """(u, v) のリストに scale (sx, sy) を掛けたリスト"""
+    sx, sy = scale
+
+    return [(p[0] * sx, p[1] * sy) for p in points]
+
+
+def _rdp_span(points, start, end, tolerance, kept):
+    # 再帰せずにスタックで分割する
+    stack = [(start, end)]
+
+    while stack:
+        s, e = stack.pop()
+
+        if e - s < 2:
+            continue
+
+        a = points[s]
+        b = points[e]
+        max_distance = -1.0
+        index = s
+
+        for i in range(s + 1, e):
+            d = segment_distance(points[i], a, b)
+
+            if d > max_distance:
+                max_distance = d
+                index = i
+
+        if max_distance > tolerance:
+            kept.add(index)
+            stack.append((s, index))
+            stack.append((index, e))
+
+
+def simplify_rdp(points, tolerance, closed=False):
+    """Ramer-Douglas-Peucker 法で折れ線を簡略化する
+
+    閉じた折れ線は先頭の点と､そこから最も遠い点で 2 本に分けてそれぞれを簡略化する｡
+
+    Args:
+        points (list[tuple[float, float]]): 点列
+        tolerance (float): 許容誤差
+        closed (bool, optional): True で末尾と先頭が繋がった折れ線として扱う. Defaults to False.
+
+    Returns:
+        list[int]: 残す点のインデックス (昇順)
+    """
+    n = len(points)
+
+    if n <= 2 or (closed and n <= 3):
+        return list(range(n))
+
+    if not closed:
+        kept = set([0, n - 1])
+        _rdp_span(points, 0, n - 1, tolerance, kept)
+
+        return sorted(kept)
+
+    p0 = points[0]
+    far = max(range(n), key=lambda i: (points[i][0] - p0[0]) ** 2 + (points[i][1] - p0[1]) ** 2)
+
+    # 全点が同一座標
+    if far == 0:
+        return [0]
+
+    kept = set([0, far])
+    _rdp_span(points, 0, far, tolerance, kept)
+
+    # 後半は先頭の点を末尾に付けた列で処理する
+    rest = points[far:] + points[:1]
+    rest_kept = set()
+    _rdp_span(rest, 0, len(rest) - 1, tolerance, rest_kept)
+    kept.update(far + i for i in rest_kept)
+
+    return sorted(kept)
+
+
+def _triangle_area(a, b, c):
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])) * 0.5
+
+
+def simplify_visvalingam(points, tolerance, closed=False):
+    """Visvalingam-Whyatt 法で折れ線を簡略化する
+
+    隣接 2 点と作る三角形の面積が小さい点から順に削除する｡
+    削除で線分に置き換わる区間の元の点が tolerance より離れる場合はその点を残す｡
+
+    Args:
+        points (list[tuple[float, float]]): 点列
+        tolerance (float): 許容誤差
+        closed (bool, optional): True で末尾と先頭が繋がった折れ線として扱う. Defaults to False.
+
+    Returns:
+        list[int]: 残す点のインデックス (昇順)
+    """
+    n = len(points)
+    min_count = 3 if closed else 2
+
+    if n <= min_count:
+        return list(range(n))
+
+    prev_ids = [(i - 1) % n for i in range(n)]
+    next_ids = [(i + 1) % n for i in range(n)]
+    removed = [False] * n
+    fixed = [False] * n
+    versions = [0] * n
+    heap = []
+
+    def push(i):
+        if not closed and (i == 0 or i == n - 1):
+            return
+
+        versions[i] += 1
+        heapq.heappush(heap, (_triangle_area(points[prev_ids[i]], points[i], points[next_ids[i]]), i, versions[i]))
+
+    for i in range(n):
+        push(i)
+
+    count = n
+
+    while heap and count > min_count:
+        area, i, version = heapq.heappop(heap)
+
+        if removed[i] or fixed[i] or version != versions[i]:
+            continue
+
+        p = prev_ids[i]
+        q = next_ids[i]
+
+        if span_deviation(points, p, q) > tolerance:
+            # 区間が広がると誤差は小さくならないので以後は削除しない
+            fixed[i] = True
+            continue
+
+        removed[i] = True
+        count -= 1
+        next_ids[p] = q
+        prev_ids[q] = p
+
+        for j in (p, q):
+            if not fixed[j]:
+                push(j)
+
+    return [i for i in range(n) if not removed[i]]
+
+
+def merge_collinear(points, tolerance=1e-6, closed=False):
+    """直線上に並ぶ連続した点をまとめる
+
+    Args:
+        points (list[tuple[float, float]]): 点列
+        tolerance (float, optional): 直線とみなす距離. Defaults to 1e-6.
+        closed (bool, optional): True で末尾と先頭が繋がった折れ線として扱う. Defaults to False.
+
+    Returns:
+        list[int]: 残す点のインデックス (昇順)
+    """
+    n = len(points)
+
+    if n <= 2:
+        return list(range(n))
+
+    kept = [0]
+
+    for i in range(1, n - 1):
+        # i を飛ばしても直前に残した点から i + 1 までの区間が直線なら i を削除する
+        if span_deviation(points, kept[-1], i + 1) > tolerance:
+            kept.append(i)
+
+    kept.append(n - 1)
+
+    if not closed:
+        return kept
+
+    # 末尾から先頭を経由して次の点まで直線なら先頭の点も削除する
+    if len(kept) > 3 and span_deviation(points, kept[-1], kept[1]) <= tolerance:
+        kept = kept[1:]
+
+    # 末尾の点も同様に先頭と直前の点の間で判定する
+    if len(kept) > 3 and span_deviation(points, kept[-2], kept[0]) <= tolerance:
+        kept = kept[:-1]
+
+    return kept
+
+
+def simplify_path(points, tolerance, method=METHOD_RDP, closed=False, merge=False, scale=(1.0, 1.0)):
+    """折れ線を簡略化して残す点のインデックスを返す
+
+    Args:
+        points (list[tuple[float, float]]): 点列
+        tolerance (float): scale を掛けた座標系での許容誤差｡ 0 以下なら簡略化しない
+        method (str, optional): METHOD_RDP か METHOD_VISVALINGAM. Defaults to METHOD_RDP.
+        closed (bool, optional): True で末尾と先頭が繋がった折れ線として扱う. Defaults to False.
+        merge (bool, optional): True で簡略化の前に直線上に並ぶ点をまとめる. Defaults to False.
+        scale (tuple[float, float], optional): 判定前に座標に掛ける値｡ 画像サイズを渡すと tolerance がピクセル単位になる. Defaults to (1.0, 1.0).
+
+    Returns:
+        list[int]: 残す点のインデックス (昇順)
+    """
+    indices = list(range(len(points)))
+    coords = scaled(points, scale)
+
+    if merge:
+        indices = merge_collinear(coords, closed=closed)
+        coords = [coords[i] for i in indices]
+
+    if tolerance <= 0:
+        return indices
+
+    if method == METHOD_VISVALINGAM:
+        kept = simplify_visvalingam(coords, tolerance, closed)
+    elif method == METHOD_RDP:
+        kept = simplify_rdp(coords, tolerance, closed)
+    else:
+        raise ValueError("unknown method: %s" % method)
+
+    return [indices[i] for i in kept]
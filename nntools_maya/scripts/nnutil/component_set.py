@@ -0,0 +1,238 @@
+"""
+コンポーネント選択を (ノード, 種類, ソート済みの int32 インデックス配列) で扱うモジュール
+
+cmds のコンポーネント文字列 (範囲表記 .vtx[0:99] を含む) との相互変換と､
+インデックス配列の和･差･積を提供する｡ 任意の要素のリストを順番を保ったまま扱う
+ordered_diff などのハッシュによる集合演算もここに置き､ nnutil.core の list_diff などはこれを使う｡
+Maya 非依存｡
+
+    import nnutil.component_set as ncs
+    selection = ncs.ComponentSelection.from_strings(cmds.ls(selection=True))
+    rest = selection - ncs.ComponentSelection.from_strings(border_vertices)
+    cmds.select(rest.to_strings())
+"""
+import array
+import bisect
+import heapq
+import re
+
+
+# 一次元のインデックスを持つコンポーネントの種類
+KIND_VTX = "vtx"
+KIND_EDGE = "e"
+KIND_FACE = "f"
+KIND_UV = "map"
+KIND_CV = "cv"
+
+supported_kinds = (KIND_VTX, KIND_EDGE, KIND_FACE, KIND_UV, KIND_CV)
+
+_component_re = re.compile(r"^(?P<node>[^\[\]]+)\.(?P<kind>\w+)\[(?P<start>\d+)(?::(?P<stop>\d+))?\]$")
+
+
+def _key(x):
+    """ハッシュ不可能な要素は str() をキーにする"""
+    try:
+        hash(x)
+        return x
+
+    except TypeError:
+        return str(x)
+
+
+def ordered_unique(items):
+    """重複を取り除いたリスト｡ 最初に現れた順を保つ"""
+    try:
+        return list(dict.fromkeys(items))
+
+    except TypeError:
+        pass
+
+    seen = set()
+    result = []
+
+    for x in items:
+        k = _key(x)
+
+        if k not in seen:
+            seen.add(k)
+            result.append(x)
+
+    return result
+
+
+def ordered_diff(items, others):
+    """items から others に含まれる要素を取り除いたリスト｡ items の順と重複を保つ"""
+    try:
+        keys = set(others)
+        return [x for x in items if x not in keys]
+
+    except TypeError:
+        keys = set(_key(x) for x in others)
+        return [x for x in items if _key(x) not in keys]
+
+
+def ordered_intersection(items, others):
+    """items のうち others にも含まれる要素のリスト｡ items の順と重複を保つ"""
+    try:
+        keys = set(others)
+        return [x for x in items if x in keys]
+
+    except TypeError:
+        keys = set(_key(x) for x in others)
+        return [x for x in items if _key(x) in keys]
+
+
+def ordered_union(items, others):
+    """items の後ろに others のうち items に無い要素を加えたリスト｡ 重複は取り除く"""
+    return ordered_unique(list(items) + list(others))
+
+
+def _sorted_array(indices):
+    return array.array("i", sorted(set(indices)))
+
+
+class ComponentSet(object):
+    """一つのノードの一種類のコンポーネントの集合
+
+    Args:
+        node (str): ノード名 (コンポーネント文字列の . より前)
+        kind (str): コンポーネントの種類 ("vtx", "e", "f", "map", "cv")
+        indices (iterable[int]): インデックス｡ 重複と順番は問わない
+    """
+    def __init__(self, node, kind, indices=()):
+        self.node = node
+        self.kind = kind
+        self.indices = _sorted_array(indices)
+
+    @classmethod
+    def _from_sorted(cls, node, kind, indices):
+        component_set = cls(node, kind)
+        component_set.indices = indices
+        return component_set
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __contains__(self, index):
+        i = bisect.bisect_left(self.indices, index)
+        return i < len(self.indices) and self.indices[i] == index
+
+    def __eq__(self, other):
+        return (self.node, self.kind, self.indices) == (other.node, other.kind, other.indices)
+
+    def _check(self, other):
+        if (self.node, self.kind) != (other.node, other.kind):
+            raise ValueError("different components: %s.%s, %s.%s" % (self.node, self.kind, other.node, other.kind))
+
+    def __or__(self, other):
+        self._check(other)
+        merged = array.array("i")
+        last = None
+
+        for i in heapq.merge(self.indices, other.indices):
+            if i != last:
+                merged.append(i)
+                last = i
+
+        return ComponentSet._from_sorted(self.node, self.kind, merged)
+
+    def __and__(self, other):
+        self._check(other)
+        others = set(other.indices)
+        return ComponentSet._from_sorted(self.node, self.kind, array.array("i", [i for i in self.indices if i in others]))
+
+    def __sub__(self, other):
+        self._check(other)
+        others = set(other.indices)
+        return ComponentSet._from_sorted(self.node, self.kind, array.array("i", [i for i in self.indices if i not in others]))
+
+    def ranges(self):
+        """連続するインデックスを (開始, 終了) のリストにまとめる｡ 終了を含む"""
+        result = []
+
+        for i in self.indices:
+            if result and result[-1][1] == i - 1:
+                result[-1][1] = i
+            else:
+                result.append([i, i])
+
+        return [tuple(x) for x in result]
+
+    def to_strings(self, flatten=False):
+        """コンポーネント文字列のリスト
+
+        Args:
+            flatten (bool, optional): True で一要素ずつの文字列にする｡ False なら範囲表記にまとめる. Defaults to False.
+        """
+        prefix = "%s.%s" % (self.node, self.kind)
+
+        if flatten:
+            return ["%s[%d]" % (prefix, i) for i in self.indices]
+
+        return ["%s[%d]" % (prefix, a) if a == b else "%s[%d:%d]" % (prefix, a, b) for a, b in self.ranges()]
+
+
+class ComponentSelection(object):
+    """複数のノード･種類にまたがるコンポーネントの集合
+
+    Args:
+        sets (list[ComponentSet], optional): 含めるコンポーネントの集合
+    """
+    def __init__(self, sets=()):
+        self.sets = dict()  # (node, kind) -> ComponentSet｡ 追加順
+
+        for component_set in sets:
+            self.add(component_set)
+
+    @classmethod
+    def from_strings(cls, components):
+        """コンポーネント文字列のリストから作る
+
+        Raises:
+            ValueError: 一次元のインデックスで表せないコンポーネントが含まれる
+        """
+        indices = dict()
+
+        for component in components:
+            m = _component_re.match(str(component))
+
+            if m is None or m.group("kind") not in supported_kinds:
+                raise ValueError("unsupported component: %s" % component)
+
+            start = int(m.group("start"))
+            stop = int(m.group("stop")) if m.group("stop") is not None else start
+            indices.setdefault((m.group("node"), m.group("kind")), []).extend(range(start, stop + 1))
+
+        return cls(ComponentSet(node, kind, ids) for (node, kind), ids in indices.items())
+
+    def add(self, component_set):
+        key = (component_set.node, component_set.kind)
+
+        if key in self.sets:
+            self.sets[key] = self.sets[key] | component_set
+        else:
+            self.sets[key] = component_set
+
+    def __len__(self):
+        return sum(len(x) for x in self.sets.values())
+
+    def __eq__(self, other):
+        return self.to_strings() == other.to_strings()
+
+    def __or__(self, other):
+        result = ComponentSelection(self.sets.values())
+
+        for component_set in other.sets.values():
+            result.add(component_set)
+
+        return result
+
+    def __and__(self, other):
+        return ComponentSelection(x & other.sets[key] for key, x in self.sets.items() if key in other.sets)
+
+    def __sub__(self, other):
+        return ComponentSelection(x - other.sets[key] if key in other.sets else x for key, x in self.sets.items())
+
+    def to_strings(self, flatten=False):
+        """コンポーネント文字列のリスト｡ 空の集合は含めない"""
+        return [s for x in self.sets.values() for s in x.to_strings(flatten)]
@@ -8,7 +8,6 @@ import math
 import re
 import os
 import sys
-import hashlib
 
 import itertools as it
 import functools
@@ -17,21 +16,12 @@ import maya.cmds as cmds
 
 import maya.api.OpenMaya as om
 
+from . import component_set
+from . import polyline
+from . import profiler
 
-DEBUG = False
-
-
-class Hashable:
-    def __init__(self, object, hash):
-        hash_str = hashlib.md5(hash.encode())
-        self.hash = int(hash_str.hexdigest(), 16)
-        self.object = object
-
-    def __hash__(self):
-        return self.hash
 
-    def object(self):
-        return self.object
+DEBUG = False
 
 
 def is_python2():
@@ -72,11 +62,13 @@ def undo_chunk(function):
 
 if DEBUG:
     def timer(function):
-        """時間計測デコレーター"""
+        """時間計測デコレーター｡ nnutil.profiler が有効な間はスコープとしても記録する"""
+        profiled = profiler.profile(function)
+
         @functools.wraps(function)
         def wrapper(*args, **kwargs):
             start = datetime.datetime.today()
-            ret = function(*args, **kwargs)
+            ret = profiled(*args, **kwargs)
             end = datetime.datetime.today()
             delta = (end - start)
             sec = delta.seconds + delta.microseconds/1000000.0
@@ -87,12 +79,8 @@ if DEBUG:
 
 else:
     def timer(function):
-        """デバッグ無効時の時間計測デコレーター"""
-        @functools.wraps(function)
-        def wrapper(*args, **kwargs):
-            return function(*args, **kwargs)
-
-        return wrapper
+        """デバッグ無効時の時間計測デコレーター｡ nnutil.profiler が有効な間だけスコープとして記録する"""
+        return profiler.profile(function)
 
 
 def no_warning(function):
@@ -126,7 +114,7 @@ def list_add(l1, l2):
 def list_diff(l1, l2):
     """ リスト同士の差集合 (l1 - l2) を返す
 
-    list(set() - set()) よりは軽い
+    l1 の順番と重複は保たれる｡ l2 をハッシュで引くので O(n + m)
     TODO: *args で可変長 (l1 - l2 - l3 - ... )に対応して
 
     """
@@ -135,13 +123,13 @@ def list_diff(l1, l2):
         l1 = list(l1)
         l2 = list(l2)
 
-    return list(filter(lambda x: x not in l2, l1))
+    return component_set.ordered_diff(l1, l2)
 
 
 def list_intersection(l1, l2):
     """ リストの積集合 (l1 & l2) を返す
 
-    list(set() & set()) よりは軽い
+    l1 の順番と重複は保たれる｡ l2 をハッシュで引くので O(n + m)
     TODO: *args で可変長 (l1 & l2 & l3 & ...) に対応して
 
     """
@@ -150,7 +138,7 @@ def list_intersection(l1, l2):
         l1 = list(l1)
         l2 = list(l2)
 
-    return list(filter(lambda x: x in l2, l1))
+    return component_set.ordered_intersection(l1, l2)
 
 
 def distance(p1, p2):
@@ -1042,22 +1030,9 @@ def flatten(a):
 
 
 def uniq(a):
-    """ 配列の重複要素を取り除く """
+    """ 配列の重複要素を取り除く｡ 最初に現れた順を保つ """
     if a:
-        elemtype = type(a[0])
-        string_types = [type(""), type(u"")]  # Supports python2.x and python3.x
-        if elemtype in string_types:
-            elements_tuple_list = list(set([tuple(x) for x in a]))
-            return ["".join(elements_tuple) for elements_tuple in elements_tuple_list]
-        else:
-            if is_python2():
-                return list(set(a))
-            else:
-                hashable_a = [Hashable(x, str(x)) for x in a]
-                list(set(hashable_a))
-                a = [x.object for x in hashable_a]
-
-                return a
+        return component_set.ordered_unique(a)
 
     else:
         return a
@@ -1147,9 +1122,10 @@ def get_poly_line(edges, intersections=[]):
 
 
 def get_all_polylines(edges):
-    """ [cmds] edges で指定したエッジ列を連続するエッジ列の集まりに分割してリストを返す
+    """ [om] edges で指定したエッジ列を連続するエッジ列の集まりに分割してリストを返す
 
-    edges の型で pm/cmds を判断する｡
+    選択エッジが 3 本以上集まる頂点ではエッジ列を分割する｡
+    各エッジ列は端から順に並び､結果は同じ選択とトポロジーに対してキャッシュされる (nnutil.polyline)｡
 
     Args:
         edges (list[str]):
@@ -1158,16 +1134,7 @@ def get_all_polylines(edges):
         list[list[str]]:
 
     """
-    polylines = []
-    rest_edges = edges
-    intersections = [v for v in to_vtx(edges) if len(set(to_edge(v)) & set(edges)) > 2]
-
-    while len(rest_edges) > 0:
-        polyline = get_poly_line(rest_edges, intersections)
-        polylines.append(polyline)
-        rest_edges = list_diff(rest_edges, polyline)
-
-    return polylines
+    return [list(x.edges) for x in polyline.get_polylines(edges)]
 
 
 def name_to_uuid(name):
@@ -1,8 +1,10 @@
-import datetime
 import functools
+import time
 
 import maya.cmds as cmds
 
+from . import profiler
+
 
 def undo_chunk(function):
     """ Undo チャンク用デコレーター """
@@ -17,14 +19,17 @@ def undo_chunk(function):
 
 
 def timer(function):
-    """時間計測デコレーター"""
+    """時間計測デコレーター
+
+    経過時間を print する｡ nnutil.profiler が有効な間はスコープとしても記録する
+    """
+    profiled = profiler.profile(function)
+
     @functools.wraps(function)
     def wrapper(*args, **kwargs):
-        start = datetime.datetime.today()
-        ret = function(*args, **kwargs)
-        end = datetime.datetime.today()
-        delta = (end - start)
-        sec = delta.seconds + delta.microseconds/1000000.0
+        start = time.perf_counter()
+        ret = profiled(*args, **kwargs)
+        sec = time.perf_counter() - start
         print('time(sec): ' + str(sec) + " " + str(function))
         return ret
 
@@ -0,0 +1,392 @@
+"""
+UV と頂点カラーを引き継ぐエッジの押し出し
+
+押し出し前にフェース頂点から UV ID･頂点カラーへの対応を配列で保存し､
+polyExtrudeEdge 後のトポロジーとの差分から新しいフェース頂点の元になったフェース頂点を求める｡
+ヒストリーの無いメッシュはヒストリー無しで押し出し､ UV ID の割り当ては assignUVs 一回､
+頂点カラーは setFaceVertexColors 一回でメッシュ毎に書き込む｡
+ヒストリーのあるメッシュは API での書き込みがヒストリーの再評価で失われるので､
+polyEditUV･polyColorPerVertex･polyMapSew を同じ値毎にまとめて実行してヒストリーに残す｡
+"""
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import nnutil.decorator as deco
+import plugin_util.snapshotState as ss
+
+
+class FaceVertexTable(object):
+    """メッシュ 1 つ分のフェース頂点の配列
+
+    Args:
+        shape (str): メッシュシェイプ名もしくはトランスフォームノード名
+        colors (bool, optional): False で頂点カラーを取得しない. Defaults to True.
+    """
+    def __init__(self, shape, colors=True):
+        sel = om.MSelectionList()
+        sel.add(shape)
+        self.dag = sel.getDagPath(0)
+        self.dag.extendToShape()
+        self.fn_mesh = om.MFnMesh(self.dag)
+        self.shape = self.dag.partialPathName()
+
+        vertex_counts, vertex_ids = self.fn_mesh.getVertices()
+        self.vertex_counts = list(vertex_counts)
+        self.vertex_ids = list(vertex_ids)
+        self.num_vertices = self.fn_mesh.numVertices
+
+        self.face_offsets = []
+        offset = 0
+        for count in self.vertex_counts:
+            self.face_offsets.append(offset)
+            offset += count
+
+        # UV セットが無いメッシュは uv_set が None
+        uv_sets = self.fn_mesh.getUVSetNames()
+        self.uv_set = self.fn_mesh.currentUVSetName() if uv_sets else None
+
+        if self.uv_set:
+            uv_counts, uv_ids = self.fn_mesh.getAssignedUVs(self.uv_set)
+            self.uv_counts = list(uv_counts)
+            self.uv_ids = list(uv_ids)
+        else:
+            self.uv_counts = [0] * len(self.vertex_counts)
+            self.uv_ids = []
+
+        # UV を持たないフェースがあると uv_ids はフェース頂点の通し番号と一致しないので別にオフセットを持つ
+        self.uv_offsets = []
+        offset = 0
+        for count in self.uv_counts:
+            self.uv_offsets.append(offset)
+            offset += count
+
+        self.colors = self.fn_mesh.getFaceVertexColors() if colors and self.fn_mesh.getColorSetNames() else None
+
+    @property
+    def num_faces(self):
+        return len(self.vertex_counts)
+
+    def face(self, fi):
+        """フェースの頂点 ID のリスト"""
+        offset = self.face_offsets[fi]
+        return self.vertex_ids[offset:offset + self.vertex_counts[fi]]
+
+    def corner_uv(self, fi, local_index):
+        """フェース頂点の UV ID｡ UV を持たないフェースは -1"""
+        if not self.uv_counts[fi]:
+            return -1
+
+        return self.uv_ids[self.uv_offsets[fi] + local_index]
+
+
+class ExtrudedCorner(object):
+    """押し出しで作成されたフェース頂点と､その値の元になる押し出し前のフェース頂点
+
+    Args:
+        face (int): 作成されたフェースの ID
+        local_index (int): フェース内での頂点の順番
+        vertex (int): 頂点 ID
+        source_vertex (int): 元の頂点 ID｡ 押し出しの根元の頂点なら vertex と同じ
+        source_face (int): 元のフェース (押し出したエッジに接していたフェース) の ID
+        source_local_index (int): 元のフェース内での source_vertex の順番
+    """
+    __slots__ = ("face", "local_index", "vertex", "source_vertex", "source_face", "source_local_index")
+
+    def __init__(self, face, local_index, vertex, source_vertex, source_face, source_local_index):
+        self.face = face
+        self.local_index = local_index
+        self.vertex = vertex
+        self.source_vertex = source_vertex
+        self.source_face = source_face
+        self.source_local_index = source_local_index
+
+    @property
+    def is_root(self):
+        return self.vertex == self.source_vertex
+
+
+def map_extruded_corners(before, after):
+    """押し出し前後のトポロジーの差分から､新しいフェース頂点と元のフェース頂点の対応を求める
+
+    押し出しで追加された頂点とフェースは ID の末尾に追加される前提｡
+    追加された頂点はフェース内で隣接する既存頂点を元の頂点とし､
+    フェースに含まれる既存頂点 2 つで作られるエッジに接していた既存フェースを元のフェースとする｡
+
+    Args:
+        before (FaceVertexTable): 押し出し前のフェース頂点
+        after (FaceVertexTable): 押し出し後のフェース頂点
+
+    Returns:
+        list[ExtrudedCorner]: 追加されたフェースのフェース頂点
+    """
+    # 既存頂点 2 つが作るエッジから既存フェースへの辞書
+    edge_faces = dict()
+    for fi in range(before.num_faces):
+        face = before.face(fi)
+
+        for k, vi in enumerate(face):
+            vj = face[(k + 1) % len(face)]
+            edge_faces.setdefault((min(vi, vj), max(vi, vj)), []).append(fi)
+
+    corners = []
+
+    for fi in range(before.num_faces, after.num_faces):
+        face = after.face(fi)
+        n = len(face)
+        source_vertices = []
+
+        for k, vi in enumerate(face):
+            if vi < before.num_vertices:
+                source_vertices.append(vi)
+                continue
+
+            # 追加された頂点はフェース内で隣接する既存頂点から押し出されたもの
+            neighbors = [face[(k - 1) % n], face[(k + 1) % n]]
+            olds = [x for x in neighbors if x < before.num_vertices]
+            source_vertices.append(olds[0] if olds else -1)
+
+        roots = [vi for vi in face if vi < before.num_vertices]
+        source_faces = edge_faces.get((min(roots), max(roots)), []) if len(roots) == 2 else []
+
+        if not source_faces or -1 in source_vertices:
+            continue
+
+        source_face = source_faces[0]
+        source_face_vertices = before.face(source_face)
+
+        for k, (vi, src) in enumerate(zip(face, source_vertices)):
+            corners.append(ExtrudedCorner(fi, k, vi, src, source_face, source_face_vertices.index(src)))
+
+    return corners
+
+
+def assign_extruded_uvs(before, after, corners, us, vs):
+    """押し出しで作成されたフェース頂点に元のフェース頂点の UV を割り当てる
+
+    根元のフェース頂点は元の UV ID をそのまま使うので押し出したエッジは縫合された状態になる｡
+    押し出し先の頂点は (頂点, 元の UV ID) 毎に UV を 1 つ割り当てるので､
+    根元の UV が分離していない隣り合うフェース同士は側面のエッジで縫合された状態になる｡
+    押し出し先の UV には押し出しで作られた UV ID を再利用し､足りない場合は末尾に追加する｡
+
+    Args:
+        before (FaceVertexTable): 押し出し前のフェース頂点
+        after (FaceVertexTable): 押し出し後のフェース頂点
+        corners (list[ExtrudedCorner]): map_extruded_corners の戻り値
+        us (list[float]): 押し出し後の U 座標｡ 追加した UV の分が書き換えられる
+        vs (list[float]): 押し出し後の V 座標｡ 追加した UV の分が書き換えられる
+
+    Returns:
+        tuple[list[int], list[int], list[tuple[int, int]]]: assignUVs に渡す (uv_counts, uv_ids) と縫合された側面エッジの頂点ペア
+    """
+    face_uvs = [[after.corner_uv(fi, k) for k in range(after.vertex_counts[fi])] for fi in range(after.num_faces)]
+    claimed = set()
+    tip_uvs = dict()
+
+    for c in corners:
+        src_uv = before.corner_uv(c.source_face, c.source_local_index)
+
+        if src_uv < 0:
+            continue
+
+        if c.is_root:
+            face_uvs[c.face][c.local_index] = src_uv
+            continue
+
+        key = (c.vertex, src_uv)
+
+        if key not in tip_uvs:
+            uvi = face_uvs[c.face][c.local_index]
+
+            # 押し出しで作られた UV が別のキーで使用済みなら新しい UV を追加する
+            if uvi < 0 or uvi in claimed:
+                uvi = len(us)
+                us.append(0.0)
+                vs.append(0.0)
+
+            claimed.add(uvi)
+            us[uvi] = us[src_uv]
+            vs[uvi] = vs[src_uv]
+            tip_uvs[key] = uvi
+
+        face_uvs[c.face][c.local_index] = tip_uvs[key]
+
+    # 2 つの押し出しフェースが共有し､根元の UV が共通の側面エッジが縫合対象
+    root_uvs = dict()
+    side_edge_faces = dict()
+    for c in corners:
+        if c.is_root:
+            root_uvs.setdefault(c.vertex, set()).add(face_uvs[c.face][c.local_index])
+        else:
+            side_edge_faces.setdefault((c.source_vertex, c.vertex), set()).add(c.face)
+
+    sewn_edges = sorted(e for e, faces in side_edge_faces.items() if len(faces) > 1 and len(root_uvs.get(e[0], ())) == 1)
+
+    uv_counts = [len(f) if all(uvi >= 0 for uvi in f) else 0 for f in face_uvs]
+    uv_ids = [uvi for f, count in zip(face_uvs, uv_counts) if count for uvi in f]
+
+    return uv_counts, uv_ids, sewn_edges
+
+
+def extruded_colors(before, corners):
+    """setFaceVertexColors に渡す (colors, face_ids, vertex_ids) を返す"""
+    colors = om.MColorArray()
+    face_ids = om.MIntArray()
+    vertex_ids = om.MIntArray()
+
+    for c in corners:
+        colors.append(before.colors[before.face_offsets[c.source_face] + c.source_local_index])
+        face_ids.append(c.face)
+        vertex_ids.append(c.vertex)
+
+    return colors, face_ids, vertex_ids
+
+
+def _group_edges_by_shape(edges):
+    """エッジ文字列をシェイプ名毎にまとめる
+
+    Returns:
+        dict[str, list[str]]: シェイプ名をキーとしたエッジ文字列のリスト｡ 最初に現れた順
+    """
+    sel = om.MSelectionList()
+    for edge in edges:
+        sel.add(edge)
+
+    shape_edges = dict()
+    for i in range(sel.length()):
+        dag = sel.getDagPath(i)
+        dag.extendToShape()
+        shape_edges.setdefault(dag.partialPathName(), []).extend(sel.getSelectionStrings(i))
+
+    return shape_edges
+
+
+def _has_history(shape):
+    """メッシュの inMesh に上流のノードが接続されていれば True"""
+    return bool(cmds.listConnections(shape + ".inMesh", source=True, destination=False))
+
+
+def _write_with_history(before, after, corners, edges):
+    """ヒストリーのあるメッシュに押し出し後の UV と頂点カラーをコマンドで書き込む
+
+    押し出し先の UV を元の UV の位置に移動してから､押し出したエッジと縫合対象の側面エッジを polyMapSew で縫合する｡
+
+    Returns:
+        list[tuple[int, int]]: 縫合した側面エッジの頂点ペア
+    """
+    sewn_edges = []
+
+    if before.uv_set and after.uv_set:
+        us, vs = after.fn_mesh.getUVs(after.uv_set)
+        us = list(us)
+        vs = list(vs)
+
+        # 押し出し前の UV ID は押し出し後も変わらない
+        _, _, sewn_edges = assign_extruded_uvs(before, after, corners, list(us), list(vs))
+
+        # 同じ位置に移動する UV は一度の polyEditUV にまとめる
+        targets = dict()
+        for c in corners:
+            src_uv = before.corner_uv(c.source_face, c.source_local_index)
+            dst_uv = after.corner_uv(c.face, c.local_index)
+
+            if src_uv >= 0 and dst_uv >= 0:
+                targets.setdefault((us[src_uv], vs[src_uv]), []).append("%s.map[%d]" % (after.shape, dst_uv))
+
+        for (u, v), uvs in targets.items():
+            cmds.polyEditUV(uvs, uValue=u, vValue=v, relative=False)
+
+        to_sew = list(edges)
+        for a, b in sewn_edges:
+            vertices = ["%s.vtx[%d]" % (after.shape, a), "%s.vtx[%d]" % (after.shape, b)]
+            to_sew.extend(cmds.polyListComponentConversion(vertices, fromVertex=True, toEdge=True, internal=True) or [])
+
+        cmds.polyMapSew(to_sew)
+
+    if before.colors is not None:
+        # 同じ色のフェース頂点は一度の polyColorPerVertex にまとめる
+        vertex_faces = dict()
+        for c in corners:
+            color = tuple(before.colors[before.face_offsets[c.source_face] + c.source_local_index])
+
+            if color[0] >= 0:
+                vertex_faces.setdefault(color, []).append("%s.vtxFace[%d][%d]" % (after.shape, c.vertex, c.face))
+
+        for color, names in vertex_faces.items():
+            cmds.polyColorPerVertex(names, colorRGB=color[:3], alpha=color[3])
+
+    return sewn_edges
+
+
+@deco.undo_chunk
+def extrude_edges_with_attributes(edges, offset=0.0):
+    """UV と頂点カラーを引き継いでエッジを押し出す
+
+    押し出したエッジと､根元の UV が分離していない側面のエッジは UV が縫合された状態になる｡
+    押し出し後は押し出し先のエッジを選択する｡
+
+    Args:
+        edges (list[str]): 押し出すエッジ
+        offset (float, optional): polyExtrudeEdge の offset. Defaults to 0.0.
+
+    Returns:
+        dict[str, list[tuple[int, int]]]: シェイプ名をキーとした､縫合された側面エッジの頂点ペアのリスト
+    """
+    shape_edges = _group_edges_by_shape(edges)
+    shapes = list(shape_edges)
+    befores = [FaceVertexTable(shape) for shape in shapes]
+    history = dict((shape, _has_history(shape)) for shape in shapes)
+
+    # ヒストリーの有無で分けて押し出す｡ ヒストリーの無いメッシュには作らない
+    groups = [x for x in (False, True) if any(history[shape] == x for shape in shapes)]
+    extruded_edges = []
+
+    for with_history in groups:
+        cmds.polyExtrudeEdge(
+            [e for shape in shapes if history[shape] == with_history for e in shape_edges[shape]],
+            constructionHistory=with_history,
+            keepFacesTogether=True,
+            divisions=1,
+            offset=offset,
+            thickness=0,
+            smoothingAngle=180)
+
+        if len(groups) > 1:
+            extruded_edges.extend(cmds.ls(selection=True, flatten=True))
+
+    # 両方を押し出した場合は押し出し先のエッジを全て選択し直す
+    if extruded_edges:
+        cmds.select(extruded_edges, replace=True)
+
+    # 押し出し後は頂点カラーを書き込むだけなので読まない
+    afters = [FaceVertexTable(shape, colors=False) for shape in shapes]
+    sewn_edges = dict()
+
+    for before, after in zip(befores, afters):
+        if history[before.shape]:
+            sewn_edges[after.shape] = _write_with_history(before, after, map_extruded_corners(before, after), shape_edges[before.shape])
+
+    pairs = [(before, after) for before, after in zip(befores, afters) if not history[before.shape]]
+
+    if not pairs:
+        return sewn_edges
+
+    has_color = any(before.colors is not None for before, _ in pairs)
+
+    with ss.snapshot_state(targets=[after.shape for _, after in pairs], uv=True, color=has_color):
+        for before, after in pairs:
+            corners = map_extruded_corners(before, after)
+
+            if before.uv_set and after.uv_set:
+                us, vs = after.fn_mesh.getUVs(after.uv_set)
+                us = list(us)
+                vs = list(vs)
+                uv_counts, uv_ids, sewn_edges[after.shape] = assign_extruded_uvs(before, after, corners, us, vs)
+                after.fn_mesh.setUVs(us, vs, after.uv_set)
+                after.fn_mesh.assignUVs(uv_counts, uv_ids, after.uv_set)
+
+            if before.colors is not None and corners:
+                after.fn_mesh.setFaceVertexColors(*extruded_colors(before, corners))
+
+            after.fn_mesh.updateSurface()
+
+    return sewn_edges
@@ -1,6 +1,14 @@
+"""
+RGBA 画像の簡易ラスタライザー
+
+画素は幅 x 高さ x 4 (RGBA, 各 8bit) の連続した bytearray に保持する｡ y = 0 が画像の下端 (UV の v と同じ向き)｡
+線分と多角形は複数をまとめて描画でき､水平方向の連続した画素はスライス代入で一度に書き込む｡
+色のアルファが 255 未満の場合はアルファブレンドする｡ BMP と PNG (zlib) で保存できる｡
+"""
+import math
 import struct
 import sys
-import decimal
+import zlib
 
 
 def quantize(r):
@@ -52,6 +60,15 @@ class Pixel:
         self.b = b
         self.a = a
 
+    def __iter__(self):
+        return iter((self.r, self.g, self.b, self.a))
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return "Pixel(%d, %d, %d, %d)" % tuple(self)
+
 
 black = Pixel(0, 0, 0, 255)
 white = Pixel(255, 255, 255, 255)
@@ -63,14 +80,33 @@ blue = Pixel(0, 0, 255, 255)
 magenta = Pixel(255, 0, 255, 255)
 
 
+def _rgba(color):
+    """Pixel もしくは (r, g, b[, a]) を 0-255 の整数 4 要素のタプルにする"""
+    if color is None:
+        return (0, 0, 0, 255)
+
+    c = tuple(int(x) for x in color)
+
+    return c if len(c) == 4 else c + (255,)
+
+
 class Image:
+    """RGBA の画像
+
+    Args:
+        width (int): 幅
+        height (int): 高さ
+        r, g, b, a (int, optional): 初期色
+    """
     def __init__(self, width, height, r=0, g=0, b=0, a=255):
         self.width = int(width)
         self.height = int(height)
-        self.pixels = [None] * self.width * self.height
+        self.stride = self.width * 4
+        self.buffer = bytearray(bytes((r, g, b, a)) * (self.width * self.height))
 
-        for i in range(len(self.pixels)):
-            self.pixels[i] = Pixel(r=r, g=g, b=b, a=a)
+    def offset(self, x, y):
+        """整数座標の画素のバッファ内の位置"""
+        return y * self.stride + x * 4
 
     def get_pixel(self, x, y):
         qx = quantize(x)
@@ -78,7 +114,8 @@ class Image:
         if qx < 0 or self.width <= qx or qy < 0 or self.height <= qy:
             return None
         else:
-            return self.pixels[qy * self.width + qx]
+            o = self.offset(qx, qy)
+            return Pixel(*self.buffer[o:o + 4])
 
     def set_pixel(self, x, y, pixel):
         qx = quantize(x)
@@ -86,64 +123,271 @@ class Image:
         if qx < 0 or self.width <= qx or qy < 0 or self.height <= qy:
             pass
         else:
-            self.pixels[qy * self.width + qx] = pixel
+            o = self.offset(qx, qy)
+            self.buffer[o:o + 4] = bytes(_rgba(pixel))
+
+    def fill(self, color):
+        """画像全体を color で塗りつぶす"""
+        self.buffer[:] = bytes(_rgba(color)) * (self.width * self.height)
+
+    def tobytes(self):
+        """RGBA の画素列 (下の行から) を bytes で返す"""
+        return bytes(self.buffer)
 
     def save_bmp(self, filepath):
+        """32bit BMP で保存する"""
+        size = self.width * self.height * 4
+
+        # RGBA を BGRA に並べ替える (チャンネル毎のスライス代入で行う)
+        data = bytearray(self.buffer)
+        data[0::4] = self.buffer[2::4]
+        data[2::4] = self.buffer[0::4]
+
         with open(filepath, "wb") as f:
             # ファイルヘッダ 14B
             f.write(b"BM")  # type 2B
-            f.write(struct.pack("<I", 54 + self.width * self.height * 4))  # size 4B
-            f.write(struct.pack("<H", 0))  # reserved1 2B
-            f.write(struct.pack("<H", 0))  # reserved2 2B
-            f.write(struct.pack("<I", 54))  # offset 4B
+            f.write(struct.pack("<IHHI", 54 + size, 0, 0, 54))  # size 4B, reserved1 2B, reserved2 2B, offset 4B
 
             # 情報ヘッダ 40B
-            f.write(struct.pack("<I", 40))  # 情報ヘッダサイズ 4B
-            f.write(struct.pack("<I", self.width))  # 幅 4B
-            f.write(struct.pack("<I", self.height))  # 高さ 4B
-            f.write(struct.pack("<H", 1))  # プレーン数 2B
-            f.write(struct.pack("<H", 32))  # 色ビット深度 2B
-            f.write(struct.pack("<I", 0))  # 圧縮形式 4B
-            f.write(struct.pack("<I", self.width * self.height * 4))  # 画像データサイズ 4B
-            f.write(struct.pack("<I", 0))  # 水平解像度 4B
-            f.write(struct.pack("<I", 0))  # 垂直解像度 4B
-            f.write(struct.pack("<I", 0))  # 格納パレット数 4B
-            f.write(struct.pack("<I", 0))  # 重要色数 4B
+            f.write(struct.pack(
+                "<IIIHHIIIIII",
+                40,  # 情報ヘッダサイズ 4B
+                self.width,  # 幅 4B
+                self.height,  # 高さ 4B (正の値なので下の行から)
+                1,  # プレーン数 2B
+                32,  # 色ビット深度 2B
+                0,  # 圧縮形式 4B
+                size,  # 画像データサイズ 4B
+                0,  # 水平解像度 4B
+                0,  # 垂直解像度 4B
+                0,  # 格納パレット数 4B
+                0,  # 重要色数 4B
+            ))
 
             # 画像データ
-            for p in self.pixels:
-                f.write(struct.pack("<B", p.b))
-                f.write(struct.pack("<B", p.g))
-                f.write(struct.pack("<B", p.r))
-                f.write(struct.pack("<B", p.a))
+            f.write(data)
 
             # ファイルが 4 の倍数バイトになるようパディング
-            f.write(struct.pack("<B", 0))
-            f.write(struct.pack("<B", 0))
+            f.write(b"\0\0")
 
+    def save_png(self, filepath, level=6):
+        """RGBA 8bit の PNG で保存する
 
-def draw_line(image, p1, p2, color):
-    if color is None:
-        color = Pixel(0, 0, 0, 255)
+        Args:
+            filepath (str): 保存先
+            level (int, optional): zlib の圧縮レベル. Defaults to 6.
+        """
+        # PNG は上の行から格納し､各行の先頭にフィルタ種別 (0: なし) を置く
+        view = memoryview(self.buffer)
+        rows = []
+        for y in range(self.height - 1, -1, -1):
+            rows.append(b"\0")
+            rows.append(view[y * self.stride:(y + 1) * self.stride])
+
+        def chunk(tag, data):
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+
+        with open(filepath, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            f.write(chunk(b"IHDR", header))
+            f.write(chunk(b"IDAT", zlib.compress(b"".join(rows), level)))
+            f.write(chunk(b"IEND", b""))
+
+
+# 画素の書き込み
+def _blend(buffer, o, color):
+    """位置 o の画素に color をアルファブレンドする"""
+    r, g, b, a = color
+    t = a / 255.0
+    s = 1.0 - t
+    buffer[o] = int(r * t + buffer[o] * s + 0.5)
+    buffer[o + 1] = int(g * t + buffer[o + 1] * s + 0.5)
+    buffer[o + 2] = int(b * t + buffer[o + 2] * s + 0.5)
+    buffer[o + 3] = int(a + buffer[o + 3] * s + 0.5)
+
+
+def _fill_span(image, x_start, x_end, y, color, pixel_bytes):
+    """y 行の x_start から x_end (含まない) までを塗る｡ 範囲外はクリップする"""
+    if y < 0 or image.height <= y:
+        return
+
+    x_start = max(x_start, 0)
+    x_end = min(x_end, image.width)
+
+    if x_end <= x_start:
+        return
+
+    o = image.offset(x_start, y)
+
+    if color[3] == 255:
+        image.buffer[o:o + (x_end - x_start) * 4] = pixel_bytes * (x_end - x_start)
+    else:
+        for k in range(o, o + (x_end - x_start) * 4, 4):
+            _blend(image.buffer, k, color)
+
+
+def _draw_vertical(image, x, y_start, y_end, color, pixel_bytes):
+    """x 列の y_start から y_end (含む) までを塗る｡ 不透明ならチャンネル毎のスライス代入で書き込む"""
+    if x < 0 or image.width <= x:
+        return
 
-    # x に対する y の変化
-    x_slope = (p2 - p1).x_slope()
+    y_start = max(y_start, 0)
+    y_end = min(y_end, image.height - 1)
 
-    # y に対する x の変化
-    y_slope = (p2 - p1).y_slope()
+    if y_end < y_start:
+        return
 
-    if abs(x_slope) < abs(y_slope):
-        less = min(int(p1.x), int(p2.x))
-        greater = max(int(p1.x), int(p2.x))
-        for i, x in enumerate(range(less, greater)):
-            y = p1.y + x_slope * i
-            image.set_pixel(x, y, color)
+    n = y_end - y_start + 1
+    o = image.offset(x, y_start)
+    stride = image.stride
+
+    if color[3] == 255:
+        for c in range(4):
+            image.buffer[o + c:o + c + n * stride:stride] = bytes((color[c],)) * n
     else:
-        less = min(int(p1.y), int(p2.y))
-        greater = max(int(p1.y), int(p2.y))
-        for i, y in enumerate(range(less, greater)):
-            x = p1.x + y_slope * i
-            image.set_pixel(x, y, color)
+        for k in range(o, o + n * stride, stride):
+            _blend(image.buffer, k, color)
+
+
+def draw_lines(image, segments, color=None, antialias=False):
+    """複数の線分を描画する
+
+    Args:
+        image (Image): 描画先
+        segments (iterable[tuple[float, float, float, float]]): (x1, y1, x2, y2) の並び
+        color (Pixel | tuple, optional): 線の色. Defaults to black.
+        antialias (bool, optional): True で Wu のアルゴリズムによるアンチエイリアス線にする. Defaults to False.
+    """
+    color = _rgba(color)
+
+    if antialias:
+        for x1, y1, x2, y2 in segments:
+            _draw_line_wu(image, x1, y1, x2, y2, color)
+        return
+
+    pixel_bytes = bytes(color)
+    opaque = color[3] == 255
+    buffer = image.buffer
+    width = image.width
+    height = image.height
+    stride = image.stride
+
+    for x1, y1, x2, y2 in segments:
+        x0 = quantize(x1)
+        y0 = quantize(y1)
+        dx = quantize(x2) - x0
+        dy = quantize(y2) - y0
+
+        if dy == 0:
+            _fill_span(image, min(x0, x0 + dx), max(x0, x0 + dx) + 1, y0, color, pixel_bytes)
+            continue
+
+        if dx == 0:
+            _draw_vertical(image, x0, min(y0, y0 + dy), max(y0, y0 + dy), color, pixel_bytes)
+            continue
+
+        # 長い方の軸で 1 画素ずつ進める (Bresenham と同じ画素になるよう四捨五入で短い方の軸を決める)
+        n = max(abs(dx), abs(dy))
+        n2 = 2 * n
+        inside = 0 <= x0 < width and 0 <= x0 + dx < width and 0 <= y0 < height and 0 <= y0 + dy < height
+
+        for i in range(n + 1):
+            x = x0 + (2 * dx * i + n) // n2
+            y = y0 + (2 * dy * i + n) // n2
+
+            if not inside and (x < 0 or width <= x or y < 0 or height <= y):
+                continue
+
+            o = y * stride + x * 4
+
+            if opaque:
+                buffer[o:o + 4] = pixel_bytes
+            else:
+                _blend(buffer, o, color)
+
+
+def _plot_weighted(image, x, y, color, weight):
+    if 0 <= x < image.width and 0 <= y < image.height and weight > 0:
+        _blend(image.buffer, image.offset(x, y), color[:3] + (int(color[3] * weight + 0.5),))
+
+
+def _draw_line_wu(image, x1, y1, x2, y2, color):
+    """Xiaolin Wu のアルゴリズムによるアンチエイリアス線"""
+    steep = abs(y2 - y1) > abs(x2 - x1)
+
+    if steep:
+        x1, y1, x2, y2 = y1, x1, y2, x2
+
+    if x2 < x1:
+        x1, y1, x2, y2 = x2, y2, x1, y1
+
+    dx = x2 - x1
+    gradient = (y2 - y1) / dx if dx else 1.0
+
+    def plot(x, y, weight):
+        if steep:
+            _plot_weighted(image, y, x, color, weight)
+        else:
+            _plot_weighted(image, x, y, color, weight)
+
+    # 端点
+    x_start = quantize(x1)
+    x_end = quantize(x2)
+    y = y1 + gradient * (x_start - x1)
+
+    for x in range(x_start, x_end + 1):
+        fy = math.floor(y)
+        frac = y - fy
+        plot(x, fy, 1.0 - frac)
+        plot(x, fy + 1, frac)
+        y += gradient
+
+
+def fill_polygons(image, polygons, color=None):
+    """複数の多角形を偶奇規則で塗りつぶす
+
+    画素 (x, y) は中心 (x, y) が多角形の内側にある場合に塗られる｡ 多角形同士は独立して塗る｡
+
+    Args:
+        image (Image): 描画先
+        polygons (iterable[list[tuple[float, float]]]): 頂点 (x, y) のリストの並び
+        color (Pixel | tuple, optional): 塗りの色. Defaults to black.
+    """
+    color = _rgba(color)
+    pixel_bytes = bytes(color)
+
+    for points in polygons:
+        n = len(points)
+
+        if n < 3:
+            continue
+
+        edges = [(points[k], points[(k + 1) % n]) for k in range(n)]
+        y_min = max(int(math.ceil(min(p[1] for p in points))), 0)
+        y_max = min(int(math.floor(max(p[1] for p in points))), image.height - 1)
+
+        for y in range(y_min, y_max + 1):
+            xs = []
+
+            for (xa, ya), (xb, yb) in edges:
+                # 下端を含み上端を含まない規則で頂点の二重計上を避ける
+                if (ya <= y < yb) or (yb <= y < ya):
+                    xs.append(xa + (y - ya) * (xb - xa) / (yb - ya))
+
+            xs.sort()
+
+            for k in range(0, len(xs) - 1, 2):
+                _fill_span(image, int(math.ceil(xs[k])), int(math.ceil(xs[k + 1])), y, color, pixel_bytes)
+
+
+def fill_polygon(image, points, color=None):
+    fill_polygons(image, [points], color)
+
+
+def draw_line(image, p1, p2, color):
+    draw_lines(image, [(p1.x, p1.y, p2.x, p2.y)], color)
 
 
 def draw_rect(image, p1, p2, color):
@@ -152,6 +396,8 @@ def draw_rect(image, p1, p2, color):
     min_y = int(min(p1.y, p2.y))
     max_y = int(max(p1.y, p2.y))
 
-    for x in range(min_x, max_x+1):
-        for y in range(min_y, max_y+1):
-            image.set_pixel(x, y, color)
+    color = _rgba(color)
+    pixel_bytes = bytes(color)
+
+    for y in range(min_y, max_y+1):
+        _fill_span(image, min_x, max_x + 1, y, color, pixel_bytes)
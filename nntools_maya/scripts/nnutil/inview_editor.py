@@ -1,11 +1,132 @@
 """複数ノードの同一アトリビュートを一括編集するダイアログ"""
+import time
+
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
 
 import nnutil.ui as ui
+import plugin_util.attributeEdit as ae
 
 
 window_name = "NNInviewEditor"
 
+# ドラッグ中に値を適用する最短の間隔 (秒)｡ ビューポートの更新頻度程度
+default_refresh_interval = 1.0 / 60
+
+
+class AttributeEditSession(object):
+    """複数ノードの同一の数値アトリビュートの編集セッション
+
+    プラグは開始時に一度だけ解決し､値は一つの MDGModifier でまとめて適用する｡
+    ドラッグ中に間引いた値はアイドル時に適用するので､ドラッグを止めればビューポートは最後の値になる｡
+    適用した値は Undo に記録せず､ commit() で確定時までの変更を一回の Undo として記録する｡
+
+    Args:
+        nodes (list[str]): 対象ノード
+        attribute (str): アトリビュート名
+        relative (bool, optional): True で各ノードの値に基準値からの差分を加える. Defaults to False.
+        refresh_interval (float, optional): ドラッグ中に値を適用する最短の間隔 (秒). Defaults to default_refresh_interval.
+    """
+    def __init__(self, nodes, attribute, relative=False, refresh_interval=default_refresh_interval):
+        self.plug_names = [f"{node}.{attribute}" for node in nodes]
+        self.relative = relative
+        self.refresh_interval = refresh_interval
+
+        sel = om.MSelectionList()
+
+        for name in self.plug_names:
+            sel.add(name)
+
+        self.plugs = [sel.getPlug(i) for i in range(sel.length())]
+
+        # 開始時の値 (キャンセル用) と確定済みの値 (次の編集の変更前の値)
+        self.initial_values = [plug.asDouble() for plug in self.plugs]
+        self.committed_values = list(self.initial_values)
+        self.current_values = list(self.initial_values)
+
+        # 相対モードでスライダーのこの値が変更なしに対応する
+        self.reference_value = self.initial_values[0] if self.initial_values else 0.0
+
+        self.last_apply_time = None
+        self.pending_value = None
+        self.flush_scheduled = False
+
+    def values_for(self, value):
+        """スライダーの値に対応するプラグ毎の値"""
+        if self.relative:
+            delta = value - self.reference_value
+            return [v + delta for v in self.committed_values]
+
+        return [value] * len(self.plugs)
+
+    def _write(self, values):
+        modifier = om.MDGModifier()
+
+        for plug, value in zip(self.plugs, values):
+            modifier.newPlugValueDouble(plug, value)
+
+        modifier.doIt()
+        self.current_values = list(values)
+
+    def apply(self, value):
+        """スライダーの値を適用する
+
+        前回の適用から refresh_interval 経っていない場合は値を保留し､アイドル時に flush() で適用する｡
+
+        Returns:
+            bool: 適用した場合は True
+        """
+        now = time.perf_counter()
+
+        if self.last_apply_time is not None and now - self.last_apply_time < self.refresh_interval:
+            self.pending_value = value
+
+            if not self.flush_scheduled:
+                self.flush_scheduled = True
+                cmds.evalDeferred(self.flush, lowestPriority=True)
+
+            return False
+
+        self._write(self.values_for(value))
+        self.last_apply_time = now
+        self.pending_value = None
+
+        return True
+
+    def flush(self):
+        """保留中の値があれば適用する"""
+        self.flush_scheduled = False
+
+        if self.pending_value is None:
+            return
+
+        self._write(self.values_for(self.pending_value))
+        self.last_apply_time = time.perf_counter()
+        self.pending_value = None
+
+    def commit(self, value):
+        """値を適用し､前回の確定からの変更を一回の Undo として記録する"""
+        self._write(self.values_for(value))
+        self.pending_value = None
+        self.last_apply_time = None
+
+        if self.current_values != self.committed_values:
+            ae.attribute_edit(self.plug_names, self.committed_values, self.current_values)
+
+        self.committed_values = list(self.current_values)
+        self.reference_value = value
+
+    def cancel(self):
+        """開始時の値に戻す｡ 確定済みの変更があれば戻す操作も一回の Undo として記録する"""
+        self._write(self.initial_values)
+        self.pending_value = None
+
+        if self.committed_values != self.initial_values:
+            ae.attribute_edit(self.plug_names, self.committed_values, self.initial_values)
+
+        self.committed_values = list(self.initial_values)
+        self.reference_value = self.initial_values[0] if self.initial_values else 0.0
+
 
 class InviewEditor(object):
     """複数ノードの同一アトリビュートを一括編集するダイアログクラス"""
@@ -21,13 +142,14 @@ class InviewEditor(object):
         self.slider = None
         self.min_field = None
         self.max_field = None
+        self.cb_relative = None
 
-        self.is_chunk_open = False
+        self.session = None
 
     def show(self, nodes, attribute):
         """ダイアログを表示する"""
-        # 現在のアトリビュート値を保存
-        original_values = {node: cmds.getAttr(f"{node}.{attribute}") for node in nodes}
+        # 対象のプラグと現在のアトリビュート値を保存
+        self.session = AttributeEditSession(nodes, attribute)
 
         # アトリビュートが変更された場合、最小値と最大値をリセット
         if InviewEditor.last_attribute != attribute:
@@ -35,26 +157,17 @@ class InviewEditor(object):
             InviewEditor.max_value = 1.0
             InviewEditor.last_attribute = attribute
 
-        def apply_changes(value):
-            """値の適用"""
-            for node in nodes:
-                cmds.setAttr(f"{node}.{attribute}", value)
-
         def on_drag_slider(value):
             """スライダーのドラッグハンドラ"""
-            if not self.is_chunk_open:
-                self.is_chunk_open = True
-                cmds.undoInfo(openChunk=True)
-
-            apply_changes(value)
+            self.session.apply(value)
 
         def on_change_slider(value):
             """スライダーの確定ハンドラ"""
-            if self.is_chunk_open:
-                self.is_chunk_open = False
-                cmds.undoInfo(closeChunk=True)
+            self.session.commit(value)
 
-            apply_changes(value)
+        def on_change_relative(value):
+            """相対モードの変更ハンドラ"""
+            self.session.relative = value
 
         def on_min_change(value):
             """minの変更ハンドラ"""
@@ -72,8 +185,7 @@ class InviewEditor(object):
 
         def on_cancel(*args):
             """Cancelボタンハンドラ"""
-            for node, value in original_values.items():
-                cmds.setAttr(f"{node}.{attribute}", value)
+            self.session.cancel()
 
             cmds.deleteUI(self.window, window=True)
 
@@ -110,7 +222,12 @@ class InviewEditor(object):
 
         ui.row_layout()
         ui.header(label="Value")
-        self.slider = ui.float_slider(min=InviewEditor.min_value, max=InviewEditor.max_value, value=original_values[nodes[0]], dc=on_drag_slider, cc=on_change_slider, width=ui.width(4))
+        self.slider = ui.float_slider(min=InviewEditor.min_value, max=InviewEditor.max_value, value=self.session.reference_value, dc=on_drag_slider, cc=on_change_slider, width=ui.width(4))
+        ui.end_layout()
+
+        ui.row_layout()
+        ui.header(label="Mode")
+        self.cb_relative = ui.check_box(label="Relative", v=False, cc=on_change_relative)
         ui.end_layout()
 
         ui.row_layout()
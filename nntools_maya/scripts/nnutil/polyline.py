@@ -0,0 +1,222 @@
+"""
+エッジ選択を連続するエッジ列 (ポリライン) に分解するモジュール
+
+エッジ→頂点の整数配列から Union-Find で連続するエッジをまとめ､それぞれを端から順に並べて開閉を判定する｡
+選択されたエッジが 3 本以上集まる頂点 (交点) ではエッジ列を繋げない｡
+結果は入力のエッジ列とメッシュのトポロジーのハッシュをキーにキャッシュし､
+同じ選択への繰り返しの操作では分解を省略する｡
+
+    import nnutil.polyline as npl
+    for polyline in npl.get_polylines(edges):
+        print(polyline.edges, polyline.closed)
+"""
+import array
+import hashlib
+import re
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+_edge_re = re.compile(r"^(?P<node>.+)\.e\[(?P<index>\d+)\]$")
+
+# キャッシュするエッジ選択の数
+max_cache_size = 16
+
+
+class Polyline(object):
+    """連続するエッジ列
+
+    Attributes:
+        edges (list[str]): 端から順に並べたエッジ (入力と同じ文字列)
+        vertices (list[str]): 端から順に並べた頂点｡ 閉じている場合は先頭と末尾が同じ
+        closed (bool): 閉じたループなら True
+    """
+    def __init__(self, edges, vertices, closed):
+        self.edges = edges
+        self.vertices = vertices
+        self.closed = closed
+
+
+def find(parents, i):
+    """Union-Find の根を返す (経路圧縮あり)"""
+    root = i
+
+    while parents[root] != root:
+        root = parents[root]
+
+    while parents[i] != root:
+        parents[i], i = root, parents[i]
+
+    return root
+
+
+def decompose(edge_vertices):
+    """エッジ毎の両端の頂点 ID からエッジ列を求める
+
+    Args:
+        edge_vertices (list[tuple[int, int]]): 選択エッジ毎の両端の頂点 ID
+
+    Returns:
+        list[tuple[list[int], list[int], bool]]: エッジ列毎の (端から順のエッジ番号, 端から順の頂点 ID, 閉じているか)｡
+            エッジ番号は edge_vertices での位置で､エッジ列は最初のエッジの番号順
+    """
+    vertex_edges = dict()
+
+    for i, (v0, v1) in enumerate(edge_vertices):
+        vertex_edges.setdefault(v0, []).append(i)
+        vertex_edges.setdefault(v1, []).append(i)
+
+    # 交点以外で接するエッジを同じ集合にする
+    parents = list(range(len(edge_vertices)))
+
+    for edges in vertex_edges.values():
+        if len(edges) == 2:
+            a, b = find(parents, edges[0]), find(parents, edges[1])
+
+            if a != b:
+                parents[max(a, b)] = min(a, b)
+
+    groups = dict()
+
+    for i in range(len(edge_vertices)):
+        groups.setdefault(find(parents, i), []).append(i)
+
+    return [_order_chain(groups[root], edge_vertices, vertex_edges) for root in sorted(groups)]
+
+
+def _order_chain(edges, edge_vertices, vertex_edges):
+    """一つの集合のエッジを端から順に並べる"""
+    members = set(edges)
+    degrees = dict()
+
+    for i in edges:
+        for vi in edge_vertices[i]:
+            degrees[vi] = degrees.get(vi, 0) + 1
+
+    # 開いたエッジ列は次数 1 の頂点か交点から始める
+    starts = [vi for i in edges for vi in edge_vertices[i] if degrees[vi] == 1 or len(vertex_edges[vi]) > 2]
+    current = starts[0] if starts else edge_vertices[edges[0]][0]
+
+    ordered_edges = []
+    ordered_vertices = [current]
+    used = set()
+
+    while len(used) < len(members):
+        candidates = [i for i in vertex_edges[current] if i in members and i not in used]
+
+        if not candidates:
+            break
+
+        edge = candidates[0]
+        used.add(edge)
+        ordered_edges.append(edge)
+        v0, v1 = edge_vertices[edge]
+        current = v1 if v0 == current else v0
+        ordered_vertices.append(current)
+
+    # 分岐が残った場合も全エッジを含める
+    ordered_edges.extend(i for i in edges if i not in used)
+    closed = len(ordered_edges) > 2 and ordered_vertices[0] == ordered_vertices[-1]
+
+    return ordered_edges, ordered_vertices, closed
+
+
+def _flatten(edges):
+    """エッジを (ノード名, エッジ ID, 入力文字列) のリストにする｡ 範囲指定は展開する"""
+    result = []
+    to_expand = []
+
+    for edge in edges:
+        name = str(edge)
+        m = _edge_re.match(name)
+
+        if m:
+            result.append((m.group("node"), int(m.group("index")), name))
+        else:
+            to_expand.append(name)
+
+    if to_expand:
+        for name in cmds.ls(to_expand, flatten=True):
+            m = _edge_re.match(name)
+
+            if m:
+                result.append((m.group("node"), int(m.group("index")), name))
+
+    return result
+
+
+def _topology_key(fn_mesh):
+    counts, ids = fn_mesh.getVertices()
+    return hashlib.md5(array.array("i", list(counts) + list(ids)).tobytes()).hexdigest()
+
+
+class PolylineCache(object):
+    """エッジ選択毎の分解結果のキャッシュ
+
+    キーは入力のエッジ列で､分解時のメッシュ毎のトポロジーのハッシュが一致する場合だけ再利用する｡
+    """
+    def __init__(self):
+        self.entries = dict()  # tuple(edges) -> (dict[node, topology_key], list[Polyline])
+        self.build_count = 0
+
+    def get(self, edges):
+        """最新の分解結果を返す"""
+        key = tuple(str(x) for x in edges)
+        flattened = _flatten(edges)
+        fn_meshes = dict()
+
+        for node, _, _ in flattened:
+            if node not in fn_meshes:
+                dag = om.MGlobal.getSelectionListByName(node).getDagPath(0)
+                dag.extendToShape()
+                fn_meshes[node] = om.MFnMesh(dag)
+
+        topology_keys = dict((node, _topology_key(fn_mesh)) for node, fn_mesh in fn_meshes.items())
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[0] == topology_keys:
+            return entry[1]
+
+        polylines = []
+
+        for node, fn_mesh in fn_meshes.items():
+            targets = [(ei, name) for n, ei, name in flattened if n == node]
+            edge_vertices = [tuple(fn_mesh.getEdgeVertices(ei)) for ei, _ in targets]
+
+            for edge_indices, vertex_ids, closed in decompose(edge_vertices):
+                polylines.append(Polyline(
+                    [targets[i][1] for i in edge_indices],
+                    ["%s.vtx[%d]" % (node, vi) for vi in vertex_ids],
+                    closed))
+
+        if len(self.entries) >= max_cache_size:
+            self.entries.pop(next(iter(self.entries)))
+
+        self.entries[key] = (topology_keys, polylines)
+        self.build_count += 1
+
+        return polylines
+
+    def clear(self):
+        self.entries = dict()
+
+
+# シーン共通のキャッシュ
+_cache = PolylineCache()
+
+
+def get_polylines(edges):
+    """エッジを連続するエッジ列に分解する
+
+    Args:
+        edges (list[str]): エッジ
+
+    Returns:
+        list[Polyline]: エッジ列｡ オブジェクト毎に入力の最初のエッジの順
+    """
+    return _cache.get(edges)
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,381 @@
+"""
+計測結果を蓄積するプロファイラー
+
+nnutil.decorator.timer と nnutil.core.timer で計測した区間をスレッド毎の入れ子のスコープとして記録し､
+関数毎の呼び出し回数と所要時間の統計､ Chrome のトレース形式 (chrome://tracing, Perfetto) での書き出しを行う｡
+記録は enable() してから disable() するまでの間だけ行われる｡
+
+    import nnutil.profiler as prof
+    prof.enable(count_cmds=True)
+    # ツールを操作する
+    prof.disable()
+    prof.print_summary()
+    prof.export_chrome_trace("C:/tmp/trace.json")
+"""
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+
+class _Frame(object):
+    """実行中のスコープ"""
+    __slots__ = ("name", "start", "cmds_self", "cmds_total")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.cmds_self = dict()
+        self.cmds_total = 0
+
+
+class Event(object):
+    """完了したスコープ一つ分の記録
+
+    Args:
+        name (str): スコープ名
+        thread_id (int): 実行スレッドの ID
+        start (float): 開始時刻 (秒, perf_counter 基準)
+        duration (float): 所要時間 (秒)
+        depth (int): 入れ子の深さ｡ 最上位が 0
+        cmds_count (int): スコープ内 (子スコープ含む) の cmds 呼び出し回数
+        cmds_self (dict[str, int]): 子スコープを除いたコマンド毎の呼び出し回数
+    """
+    __slots__ = ("name", "thread_id", "start", "duration", "depth", "cmds_count", "cmds_self")
+
+    def __init__(self, name, thread_id, start, duration, depth, cmds_count, cmds_self):
+        self.name = name
+        self.thread_id = thread_id
+        self.start = start
+        self.duration = duration
+        self.depth = depth
+        self.cmds_count = cmds_count
+        self.cmds_self = cmds_self
+
+
+class Profiler(object):
+    """スコープの記録を保持するレジストリ
+
+    Args:
+        max_events (int, optional): 保持するイベント数の上限｡ 超えた分は統計にのみ反映する. Defaults to 1000000.
+    """
+    def __init__(self, max_events=1000000):
+        self.enabled = False
+        self.max_events = max_events
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        """記録を全て破棄する"""
+        with self._lock:
+            self.events = []
+            self.dropped_events = 0
+            self.durations = dict()
+            self.cmds_counts = dict()
+            self.cmds_outside = dict()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+
+        return stack
+
+    def push(self, name):
+        """スコープを開始する"""
+        self._stack().append(_Frame(name, time.perf_counter()))
+
+    def pop(self):
+        """最後に開始したスコープを終了して記録する"""
+        end = time.perf_counter()
+        stack = self._stack()
+
+        if not stack:
+            return
+
+        frame = stack.pop()
+        duration = end - frame.start
+
+        if stack:
+            stack[-1].cmds_total += frame.cmds_total
+
+        event = Event(frame.name, threading.get_ident(), frame.start - self._origin, duration, len(stack), frame.cmds_total, frame.cmds_self)
+
+        with self._lock:
+            self.durations.setdefault(frame.name, []).append(duration)
+            self.cmds_counts[frame.name] = self.cmds_counts.get(frame.name, 0) + frame.cmds_total
+
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+            else:
+                self.dropped_events += 1
+
+    def count_command(self, command):
+        """cmds の呼び出しを現在のスコープに加算する"""
+        stack = self._stack()
+
+        if stack:
+            frame = stack[-1]
+            frame.cmds_self[command] = frame.cmds_self.get(command, 0) + 1
+            frame.cmds_total += 1
+
+        else:
+            with self._lock:
+                self.cmds_outside[command] = self.cmds_outside.get(command, 0) + 1
+
+    def scope(self, name):
+        """with で囲んだ区間を name のスコープとして記録するコンテキストマネージャーを返す"""
+        return _Scope(self, name)
+
+    def stats(self):
+        """スコープ名毎の統計を所要時間の合計の降順で返す
+
+        Returns:
+            list[dict]: name, count, total, min, mean, p95, max, cmds をキーに持つ辞書のリスト
+        """
+        with self._lock:
+            items = [(name, list(durations)) for name, durations in self.durations.items()]
+            cmds_counts = dict(self.cmds_counts)
+
+        rows = []
+        for name, durations in items:
+            durations.sort()
+            total = sum(durations)
+            rows.append({
+                "name": name,
+                "count": len(durations),
+                "total": total,
+                "min": durations[0],
+                "mean": total / len(durations),
+                "p95": durations[min(len(durations) - 1, int(math.ceil(len(durations) * 0.95)) - 1)],
+                "max": durations[-1],
+                "cmds": cmds_counts.get(name, 0),
+            })
+
+        rows.sort(key=lambda x: -x["total"])
+
+        return rows
+
+    def summary(self):
+        """統計を表形式の文字列で返す｡ 時間はミリ秒"""
+        header = ("name", "count", "total", "min", "mean", "p95", "cmds")
+        lines = [header]
+
+        for row in self.stats():
+            lines.append((
+                row["name"],
+                str(row["count"]),
+                "%.3f" % (row["total"] * 1000),
+                "%.3f" % (row["min"] * 1000),
+                "%.3f" % (row["mean"] * 1000),
+                "%.3f" % (row["p95"] * 1000),
+                str(row["cmds"]),
+            ))
+
+        widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+        text_lines = []
+
+        for line in lines:
+            cells = [line[0].ljust(widths[0])] + [cell.rjust(widths[i + 1]) for i, cell in enumerate(line[1:])]
+            text_lines.append("  ".join(cells))
+
+        text_lines.insert(1, "-" * len(text_lines[0]))
+
+        if self.dropped_events:
+            text_lines.append("(%d events dropped)" % self.dropped_events)
+
+        return "\n".join(text_lines)
+
+    def chrome_trace(self):
+        """Chrome のトレース形式の辞書を返す"""
+        pid = os.getpid()
+
+        with self._lock:
+            events = list(self.events)
+
+        trace_events = []
+        for e in events:
+            args = {"cmds": e.cmds_count}
+            args.update(e.cmds_self)
+            trace_events.append({
+                "name": e.name,
+                "cat": "nntools",
+                "ph": "X",
+                "ts": e.start * 1e6,
+                "dur": e.duration * 1e6,
+                "pid": pid,
+                "tid": e.thread_id,
+                "args": args,
+            })
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Chrome のトレース形式の JSON ファイルを書き出す"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class _Scope(object):
+    """Profiler.scope() の戻り値"""
+    __slots__ = ("profiler", "name", "active")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.active = False
+
+    def __enter__(self):
+        self.active = self.profiler.enabled
+
+        if self.active:
+            self.profiler.push(self.name)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.active:
+            self.profiler.pop()
+
+
+class CmdsProxy(object):
+    """maya.cmds の代わりにモジュールに差し込み､コマンドの呼び出し回数をプロファイラーに通知するプロキシ"""
+    def __init__(self, module, profiler):
+        self.__dict__["_module"] = module
+        self.__dict__["_profiler"] = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+
+        if not callable(attr):
+            return attr
+
+        profiler = self._profiler
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            profiler.count_command(name)
+            return attr(*args, **kwargs)
+
+        # 二回目以降は __getattr__ を通らないようにキャッシュする
+        self.__dict__[name] = wrapper
+
+        return wrapper
+
+    def __setattr__(self, name, value):
+        setattr(self._module, name, value)
+
+
+# モジュール共通のプロファイラー
+profiler = Profiler()
+
+# プロキシに差し替えたモジュールと元の cmds
+_patched_modules = []
+
+
+def install_cmds_proxy():
+    """読み込み済みモジュールの cmds を呼び出し回数を数えるプロキシに差し替える
+
+    `import maya.cmds as cmds` しているモジュールが対象｡ 差し替え後に読み込まれたモジュールは対象外｡
+    """
+    import maya.cmds
+
+    # maya パッケージ自体の cmds 属性は差し替えないので sys.modules から取得しておく
+    cmds_module = sys.modules["maya.cmds"]
+    proxy = CmdsProxy(cmds_module, profiler)
+
+    for name, module in list(sys.modules.items()):
+        if module is None or name == "maya" or name.startswith("maya."):
+            continue
+
+        if getattr(module, "cmds", None) is cmds_module:
+            module.cmds = proxy
+            _patched_modules.append(module)
+
+
+def uninstall_cmds_proxy():
+    """install_cmds_proxy() で差し替えた cmds を元に戻す"""
+    cmds_module = sys.modules.get("maya.cmds")
+
+    for module in _patched_modules:
+        module.cmds = cmds_module
+
+    del _patched_modules[:]
+
+
+def enable(count_cmds=False, reset=True):
+    """記録を開始する
+
+    Args:
+        count_cmds (bool, optional): True でスコープ内の cmds 呼び出し回数も数える. Defaults to False.
+        reset (bool, optional): True で以前の記録を破棄する. Defaults to True.
+    """
+    if reset:
+        profiler.reset()
+
+    if count_cmds and not _patched_modules:
+        install_cmds_proxy()
+
+    profiler.enabled = True
+
+
+def disable():
+    """記録を停止する｡ 記録済みの内容は reset() するまで保持される"""
+    profiler.enabled = False
+    uninstall_cmds_proxy()
+
+
+def reset():
+    profiler.reset()
+
+
+def scope(name):
+    """with で囲んだ区間を計測する
+
+        with prof.scope("build table"):
+            ...
+    """
+    return profiler.scope(name)
+
+
+def profile(function, name=None):
+    """関数の実行をスコープとして記録するラッパーを返す｡ 記録停止中のコストは enabled の確認のみ"""
+    name = name or "%s.%s" % (function.__module__, function.__qualname__)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return function(*args, **kwargs)
+
+        profiler.push(name)
+
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            profiler.pop()
+
+    return wrapper
+
+
+def stats():
+    return profiler.stats()
+
+
+def summary():
+    return profiler.summary()
+
+
+def print_summary():
+    print(profiler.summary())
+
+
+def export_chrome_trace(path):
+    profiler.export_chrome_trace(path)
@@ -0,0 +1,200 @@
+"""
+シーン全体のスキンバインドの逆引きインデックス
+
+全スキンクラスターを一度走査してジョイント→スキンクラスター→メッシュの対応とインフルエンスの順番を保持する｡
+スキンクラスターの追加･削除､スキンクラスターへの接続の変更､インデックスに含まれるノードの名前･親の変更､
+シーンの新規作成･読み込みのコールバックで無効化され､次の問い合わせ時に再構築される｡
+
+    import nnutil.skin_index as nsi
+    meshes = nsi.get_index().meshes_from_joints(joints)
+"""
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+
+class SkinIndex(object):
+    """スキンクラスターとインフルエンス･メッシュの対応表
+
+    名前は全て partialPathName で保持する｡
+    """
+    def __init__(self):
+        self.valid = False
+        self.build_count = 0
+        self._callback_ids = []
+        self._clear()
+
+    def _clear(self):
+        self.joint_to_skinclusters = dict()
+        self.skincluster_to_meshes = dict()
+        self.skincluster_to_influences = dict()
+        self.mesh_to_skincluster = dict()
+        self.shape_to_transform = dict()
+        self.influence_indices = dict()
+        self.node_names = set()  # 名前･親の変更を監視するノードの短い名前
+
+    def build(self):
+        """全スキンクラスターを走査して対応表を作り直す"""
+        self._clear()
+
+        it = om.MItDependencyNodes(om.MFn.kSkinClusterFilter)
+
+        while not it.isDone():
+            fn_skin = oma.MFnSkinCluster(it.thisNode())
+            skincluster = fn_skin.name()
+
+            influences = [dag.partialPathName() for dag in fn_skin.influenceObjects()]
+            self.skincluster_to_influences[skincluster] = influences
+            self.influence_indices[skincluster] = dict((name, i) for i, name in enumerate(influences))
+
+            for influence in influences:
+                self.joint_to_skinclusters.setdefault(influence, []).append(skincluster)
+
+            meshes = []
+
+            for i in range(fn_skin.numOutputConnections()):
+                dag = fn_skin.getPathAtIndex(fn_skin.indexForOutputConnection(i))
+                shape = dag.partialPathName()
+                transform = om.MFnDagNode(dag.transform()).partialPathName()
+
+                # シェイプ名とトランスフォーム名のどちらでも引けるようにする
+                self.mesh_to_skincluster[shape] = skincluster
+                self.mesh_to_skincluster[transform] = skincluster
+                self.shape_to_transform[shape] = transform
+                meshes.append(transform)
+
+            self.skincluster_to_meshes[skincluster] = meshes
+            self.node_names.update(x.split("|")[-1] for x in [skincluster] + influences + meshes)
+
+            it.next()
+
+        self.node_names.update(x.split("|")[-1] for x in self.shape_to_transform)
+
+        self.valid = True
+        self.build_count += 1
+
+    def ensure(self):
+        """無効化されていれば再構築し､コールバックが未登録なら登録する"""
+        if not self._callback_ids:
+            self.install_callbacks()
+
+        if not self.valid:
+            self.build()
+
+        return self
+
+    def invalidate(self, *args):
+        """対応表を無効にする｡ コールバックから呼ばれるので任意の引数を受け付ける"""
+        self.valid = False
+
+    def _on_connection(self, src_plug, dst_plug, made, client_data=None):
+        # スキンクラスターが関係する接続の変更だけを対象にする
+        if src_plug.node().hasFn(om.MFn.kSkinClusterFilter) or dst_plug.node().hasFn(om.MFn.kSkinClusterFilter):
+            self.valid = False
+
+    def _on_name_changed(self, node, prev_name, client_data=None):
+        # 対応表に含まれるノードの名前の変更だけを対象にする
+        if prev_name in self.node_names:
+            self.valid = False
+
+    def _on_parent_changed(self, child, parent, client_data=None):
+        # 親の変更で partialPathName が変わり得るので対応表に含まれるノードなら無効にする
+        if child.partialPathName().split("|")[-1] in self.node_names:
+            self.valid = False
+
+    def install_callbacks(self):
+        """無効化用のコールバックを登録する"""
+        if self._callback_ids:
+            return
+
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self.invalidate, "skinCluster"),
+            om.MDGMessage.addNodeRemovedCallback(self.invalidate, "skinCluster"),
+            om.MDGMessage.addConnectionCallback(self._on_connection),
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, self._on_name_changed),
+            om.MDagMessage.addParentAddedCallback(self._on_parent_changed),
+            om.MDagMessage.addParentRemovedCallback(self._on_parent_changed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self.invalidate),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self.invalidate),
+        ]
+
+    def remove_callbacks(self):
+        """登録したコールバックを削除する"""
+        if self._callback_ids:
+            om.MMessage.removeCallbacks(self._callback_ids)
+
+        self._callback_ids = []
+        self.valid = False
+
+    # 問い合わせ
+    def skinclusters_from_joint(self, joint):
+        """ジョイントをインフルエンスに持つスキンクラスターのリスト"""
+        return list(self.ensure().joint_to_skinclusters.get(joint, []))
+
+    def meshes_from_joints(self, joints):
+        """ジョイントのいずれかをインフルエンスに持つスキンクラスターのメッシュ (トランスフォーム名) のリスト｡ 出現順"""
+        self.ensure()
+        skinclusters = []
+        seen = set()
+
+        for joint in joints:
+            for skincluster in self.joint_to_skinclusters.get(joint, []):
+                if skincluster not in seen:
+                    seen.add(skincluster)
+                    skinclusters.append(skincluster)
+
+        meshes = []
+        for skincluster in skinclusters:
+            for mesh in self.skincluster_to_meshes[skincluster]:
+                if mesh not in meshes:
+                    meshes.append(mesh)
+
+        return meshes
+
+    def skincluster_of(self, mesh):
+        """メッシュのスキンクラスター名｡ 無ければ空文字列 (findRelatedSkinCluster と同じ)
+
+        Args:
+            mesh (str): メッシュのトランスフォーム名､シェイプ名もしくはコンポーネント
+        """
+        self.ensure()
+        skincluster = self.mesh_to_skincluster.get(mesh)
+
+        if skincluster is not None:
+            return skincluster
+
+        # フルパスやコンポーネントの場合はシェイプ名に直して引く
+        try:
+            dag = om.MGlobal.getSelectionListByName(mesh.split(".")[0]).getDagPath(0)
+            dag.extendToShape()
+
+        except RuntimeError:
+            return ""
+
+        return self.mesh_to_skincluster.get(dag.partialPathName(), "")
+
+    def influences(self, skincluster):
+        """スキンクラスターのインフルエンス名のリスト (influenceObjects の順)"""
+        return list(self.ensure().skincluster_to_influences.get(skincluster, []))
+
+    def influence_index(self, skincluster, influence):
+        """インフルエンスのスキンクラスター内での順番｡ インフルエンスでなければ -1"""
+        return self.ensure().influence_indices.get(skincluster, dict()).get(influence, -1)
+
+
+# モジュールを再読み込みした場合は古いインスタンスのコールバックを削除する
+_previous_index = globals().get("_index")
+
+if _previous_index is not None:
+    _previous_index.remove_callbacks()
+
+# シーン共通のインデックス
+_index = SkinIndex()
+
+
+def get_index():
+    """最新の状態のシーン共通のインデックスを返す"""
+    return _index.ensure()
+
+
+def invalidate():
+    _index.invalidate()
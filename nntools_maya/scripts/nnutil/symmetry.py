@@ -0,0 +1,630 @@
+"""
+メッシュの頂点の左右対応 (シンメトリマップ) を計算してキャッシュするモジュール
+
+頂点毎の反対側の頂点 ID のリストを位置 (空間ハッシュ) かトポロジー (中心エッジからのフェースの辿り) で求め､
+シェイプ毎にトポロジーと頂点座標のハッシュで有効性を確認しながら使い回す｡
+中心へのスナップ･頂点座標の対称化･ウェイトと頂点カラーのミラーはいずれもマップを引くだけの一括処理で､
+読み込みと書き込みはメッシュ毎に一度ずつ行う｡
+
+    import nnutil.symmetry as nsym
+    nsym.symmetrize_points("pSphere1", axis=0, direction=1)
+    nsym.mirror_weights("pSphere1", axis=0, direction=1, influence_association=nsym.INFLUENCE_LABEL)
+"""
+import array
+import hashlib
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+import plugin_util.snapshotState as ss
+
+from . import skin_index as nsi
+
+
+# 対応の求め方
+METHOD_POSITION = "position"  # 鏡像の位置にある頂点
+METHOD_TOPOLOGY = "topology"  # 中心エッジからフェースを左右逆向きに辿った頂点
+
+# インフルエンスの対応の求め方
+INFLUENCE_LABEL = "label"  # ジョイントラベル (side, type, otherType)｡ ラベルが無ければ名前
+INFLUENCE_CLOSEST = "closestJoint"  # 鏡像の位置に最も近いインフルエンス
+
+default_tolerance = 0.001
+
+# ジョイントラベルの side
+SIDE_CENTER = 0
+SIDE_LEFT = 1
+SIDE_RIGHT = 2
+
+# ジョイントラベルの type
+TYPE_NONE = 0
+TYPE_OTHER = 18
+
+
+def mirror_point(point, axis):
+    """axis の軸で鏡像にした座標のリスト"""
+    return [-x if i == axis else x for i, x in enumerate(point)]
+
+
+def _on_plane(point, axis):
+    return [0.0 if i == axis else point[i] for i in range(3)]
+
+
+def positional_map(points, axis=0, tolerance=default_tolerance):
+    """鏡像の位置で頂点の対応を求める
+
+    座標を tolerance の大きさのセルに分けた空間ハッシュで､鏡像の位置の周囲 27 セルにある頂点から最も近いものを選ぶ｡
+    軸成分が tolerance 以内の頂点は中心の頂点として自身に対応させる｡
+
+    Args:
+        points (list[list[float]]): 頂点座標
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        tolerance (float, optional): 許容誤差. Defaults to default_tolerance.
+
+    Returns:
+        list[int]: 頂点毎の反対側の頂点 ID｡ 見つからない頂点は -1
+    """
+    cell_size = max(tolerance, 1e-9)
+    cells = dict()
+
+    def cell_of(p):
+        return (int(p[0] // cell_size), int(p[1] // cell_size), int(p[2] // cell_size))
+
+    for i, p in enumerate(points):
+        cells.setdefault(cell_of(p), []).append(i)
+
+    limit = tolerance * tolerance
+    mirror = [-1] * len(points)
+
+    for i, p in enumerate(points):
+        if abs(p[axis]) <= tolerance:
+            mirror[i] = i
+            continue
+
+        target = mirror_point(p, axis)
+        cx, cy, cz = cell_of(target)
+        nearest = -1
+        nearest_distance = limit
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    for j in cells.get((cx + dx, cy + dy, cz + dz), ()):
+                        q = points[j]
+                        distance = (q[0] - target[0]) ** 2 + (q[1] - target[1]) ** 2 + (q[2] - target[2]) ** 2
+
+                        if distance <= nearest_distance:
+                            nearest = j
+                            nearest_distance = distance
+
+        mirror[i] = nearest
+
+    return mirror
+
+
+def half_edge_faces(polygons):
+    """ハーフエッジ (a, b) -> (フェース ID, フェース内での a の位置) の辞書"""
+    half_edges = dict()
+
+    for fi, polygon in enumerate(polygons):
+        n = len(polygon)
+
+        for k in range(n):
+            half_edges[(polygon[k], polygon[(k + 1) % n])] = (fi, k)
+
+    return half_edges
+
+
+def find_center_edge(points, polygons, axis=0, tolerance=default_tolerance):
+    """両端が対称面上にあり､両側にフェースがあるエッジを返す｡ 無ければ None"""
+    half_edges = half_edge_faces(polygons)
+
+    for a, b in half_edges:
+        if a < b and (b, a) in half_edges and abs(points[a][axis]) <= tolerance and abs(points[b][axis]) <= tolerance:
+            return (a, b)
+
+    return None
+
+
+def topological_map(polygons, num_vertices, seed_edge):
+    """中心エッジから左右のフェースを逆向きに辿って頂点の対応を求める
+
+    フェース F を順方向､反対側のフェース G を逆方向に辿って頂点を対応させ､
+    F のエッジの向こうのフェースと G の対応するエッジの向こうのフェースを同じように対応させていく｡
+
+    Args:
+        polygons (list[list[int]]): フェース毎の頂点 ID
+        num_vertices (int): 頂点数
+        seed_edge (tuple[int, int]): 対称面上のエッジの両端の頂点 ID
+
+    Raises:
+        ValueError: 中心エッジの両側にフェースが無いか､トポロジーが対称でない
+
+    Returns:
+        list[int]: 頂点毎の反対側の頂点 ID｡ 辿り着かなかった頂点は -1
+    """
+    half_edges = half_edge_faces(polygons)
+    a, b = seed_edge
+
+    if (a, b) not in half_edges or (b, a) not in half_edges:
+        raise ValueError("seed edge is not an inner edge: %s" % (seed_edge,))
+
+    mirror = [-1] * num_vertices
+    mirror[a] = a
+    mirror[b] = b
+
+    # (F, i, G, j) は F[i + k] と G[j - k] が対応することを表す
+    face, i = half_edges[(a, b)]
+    mirror_face, j = half_edges[(b, a)]
+    queue = [(face, i, mirror_face, (j + 1) % len(polygons[mirror_face]))]
+    visited = set()
+
+    while queue:
+        face, i, mirror_face, j = queue.pop()
+
+        if face in visited:
+            continue
+
+        polygon = polygons[face]
+        mirror_polygon = polygons[mirror_face]
+        n = len(polygon)
+
+        if len(mirror_polygon) != n:
+            raise ValueError("asymmetric topology at face %d" % face)
+
+        visited.add(face)
+        pairs = [(polygon[(i + k) % n], mirror_polygon[(j - k) % n]) for k in range(n)]
+
+        for vi, mirror_vi in pairs:
+            if mirror[vi] not in (-1, mirror_vi):
+                raise ValueError("asymmetric topology at vertex %d" % vi)
+
+            mirror[vi] = mirror_vi
+            mirror[mirror_vi] = vi
+
+        for k in range(n):
+            v0, m0 = pairs[k]
+            v1, m1 = pairs[(k + 1) % n]
+            neighbor = half_edges.get((v1, v0))
+            mirror_neighbor = half_edges.get((m0, m1))
+
+            if neighbor is None or mirror_neighbor is None:
+                continue
+
+            if neighbor[0] not in visited:
+                mirror_n = len(polygons[mirror_neighbor[0]])
+                queue.append((neighbor[0], neighbor[1], mirror_neighbor[0], (mirror_neighbor[1] + 1) % mirror_n))
+
+    return mirror
+
+
+def influence_map(influences, labels=None, positions=None, association=INFLUENCE_LABEL, axis=0, prefix_pairs=(("L_", "R_"), ("_L", "_R"))):
+    """インフルエンス毎の反対側のインフルエンスの番号を求める
+
+    Args:
+        influences (list[str]): インフルエンス名
+        labels (list[tuple[int, int, str]], optional): インフルエンス毎のジョイントラベル (side, type, otherType)
+        positions (list[list[float]], optional): インフルエンス毎のワールド座標
+        association (str, optional): INFLUENCE_LABEL か INFLUENCE_CLOSEST. Defaults to INFLUENCE_LABEL.
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        prefix_pairs (tuple[tuple[str, str]], optional): ラベルで対応しない場合に使う左右の名前の組｡
+            type が None のラベルと複数のインフルエンスで共有されるラベルも名前で対応させる
+
+    Returns:
+        list[int]: インフルエンス毎の反対側のインフルエンスの番号｡ 対応が無ければ自身
+    """
+    n = len(influences)
+
+    if association == INFLUENCE_CLOSEST:
+        result = []
+
+        for i in range(n):
+            target = mirror_point(positions[i], axis)
+            distances = [sum((a - b) ** 2 for a, b in zip(target, p)) for p in positions]
+            result.append(distances.index(min(distances)))
+
+        return result
+
+    result = list(range(n))
+    short_names = [x.split("|")[-1] for x in influences]
+    name_to_index = dict((name, i) for i, name in enumerate(short_names))
+    label_keys = [None] * n
+    label_to_index = dict()
+    ambiguous = set()
+
+    # type が None のラベルと重複するラベルは対応が一意に決まらないので使わない
+    if labels:
+        for i, (side, joint_type, other_type) in enumerate(labels):
+            if side != SIDE_CENTER and joint_type != TYPE_NONE:
+                key = (side, joint_type, other_type if joint_type == TYPE_OTHER else "")
+                label_keys[i] = key
+
+                if key in label_to_index:
+                    ambiguous.add(key)
+                label_to_index[key] = i
+
+    for key in ambiguous:
+        del label_to_index[key]
+
+    for i in range(n):
+        if label_keys[i] is not None and label_keys[i] in label_to_index:
+            side, joint_type, other_type = label_keys[i]
+            key = (SIDE_RIGHT if side == SIDE_LEFT else SIDE_LEFT, joint_type, other_type)
+
+            if key in label_to_index:
+                result[i] = label_to_index[key]
+                continue
+
+        for name in _opposite_names(short_names[i], prefix_pairs):
+            if name in name_to_index:
+                result[i] = name_to_index[name]
+                break
+
+    return result
+
+
+def _opposite_names(name, prefix_pairs):
+    """左右の名前の組で置き換えた反対側の名前の候補"""
+    for left, right in prefix_pairs:
+        for src, dst in ((left, right), (right, left)):
+            if src in name:
+                yield name.replace(src, dst, 1)
+
+
+def _dag_path(target):
+    sel = om.MSelectionList()
+    sel.add(target)
+    dag = sel.getDagPath(0)
+    dag.extendToShape()
+
+    return dag
+
+
+def _points_key(points):
+    return hashlib.md5(array.array("d", [c for p in points for c in (p[0], p[1], p[2])]).tobytes()).hexdigest()
+
+
+class SymmetryMap(object):
+    """一つのメッシュの頂点の左右対応
+
+    Args:
+        shape (str): シェイプ名
+        polygons (list[list[int]]): フェース毎の頂点 ID
+        points (list[list[float]]): オブジェクト空間の頂点座標
+        axis (int): 対称面の法線の軸
+        method (str): METHOD_POSITION か METHOD_TOPOLOGY
+        tolerance (float): 許容誤差
+        seed_edge (tuple[int, int], optional): トポロジーで求める場合の中心エッジ｡ 省略時は自動で探す
+    """
+    def __init__(self, shape, polygons, points, axis=0, method=METHOD_POSITION, tolerance=default_tolerance, seed_edge=None):
+        self.shape = shape
+        self.axis = axis
+        self.method = method
+        self.tolerance = tolerance
+        self.polygons = polygons
+        self.topology_key = None
+        self.points_key = None
+        self._face_vertex_mirror = None
+
+        if method == METHOD_TOPOLOGY:
+            seed_edge = seed_edge or find_center_edge(points, polygons, axis, tolerance)
+
+            if seed_edge is None:
+                raise ValueError("no center edge on %s" % shape)
+
+            self.mirror = topological_map(polygons, len(points), seed_edge)
+        else:
+            self.mirror = positional_map(points, axis, tolerance)
+
+    def center_vertices(self):
+        """自身に対応する頂点 ID のリスト"""
+        return [i for i, m in enumerate(self.mirror) if m == i]
+
+    def unmatched_vertices(self):
+        """対応の見つからなかった頂点 ID のリスト"""
+        return [i for i, m in enumerate(self.mirror) if m < 0]
+
+    def destination_vertices(self, points, direction=1):
+        """direction 側から書き込まれる反対側の頂点 ID のリスト (中心と対応の無い頂点は含まない)
+
+        左右は対応する頂点同士の位置で決めるので､トポロジーで求めたマップは変形後の形状でも使える｡
+
+        Args:
+            points (list[list[float]]): 頂点座標
+            direction (int, optional): コピー元の側 (1 で正の側から負の側へ). Defaults to 1.
+        """
+        axis = self.axis
+        return [i for i, m in enumerate(self.mirror) if m >= 0 and m != i and points[i][axis] * direction < points[m][axis] * direction]
+
+    def face_vertex_mirror(self):
+        """フェース頂点 (getFaceVertexColors の並び) 毎の反対側のフェース頂点の番号｡ 無ければ -1"""
+        if self._face_vertex_mirror is not None:
+            return self._face_vertex_mirror
+
+        offsets = []
+        offset = 0
+        face_of_vertices = dict()
+
+        for fi, polygon in enumerate(self.polygons):
+            offsets.append(offset)
+            offset += len(polygon)
+            face_of_vertices[frozenset(polygon)] = fi
+
+        result = [-1] * offset
+
+        for fi, polygon in enumerate(self.polygons):
+            mirrored = [self.mirror[vi] for vi in polygon]
+
+            if -1 in mirrored:
+                continue
+
+            mirror_face = face_of_vertices.get(frozenset(mirrored))
+
+            if mirror_face is None:
+                continue
+
+            mirror_polygon = self.polygons[mirror_face]
+
+            for k, mirror_vi in enumerate(mirrored):
+                result[offsets[fi] + k] = offsets[mirror_face] + mirror_polygon.index(mirror_vi)
+
+        self._face_vertex_mirror = result
+
+        return result
+
+
+class SymmetryCache(object):
+    """シェイプ毎のシンメトリマップのキャッシュ
+
+    トポロジー (getVertices) のハッシュが変われば作り直す｡ 位置で求めたマップは頂点座標のハッシュも確認する｡
+    """
+    def __init__(self):
+        self.maps = dict()
+        self.build_count = 0
+
+    def get(self, target, axis=0, method=METHOD_POSITION, tolerance=default_tolerance, seed_edge=None, points=None):
+        """最新のシンメトリマップを返す
+
+        Args:
+            target (str): メッシュのトランスフォーム名かシェイプ名
+            points (list[list[float]], optional): 読み込み済みのオブジェクト空間の頂点座標
+
+        Returns:
+            SymmetryMap: シンメトリマップ
+        """
+        dag = _dag_path(target)
+        shape = dag.fullPathName()
+        fn_mesh = om.MFnMesh(dag)
+        counts, ids = fn_mesh.getVertices()
+        topology_key = hashlib.md5(array.array("i", list(counts) + list(ids)).tobytes()).hexdigest()
+
+        if points is None:
+            points = fn_mesh.getPoints(om.MSpace.kObject)
+
+        points_key = _points_key(points)
+        key = (shape, axis, method, tolerance, seed_edge)
+        symmetry_map = self.maps.get(key)
+
+        if symmetry_map is not None and symmetry_map.topology_key == topology_key:
+            if method == METHOD_TOPOLOGY or symmetry_map.points_key == points_key:
+                return symmetry_map
+
+        polygons = []
+        offset = 0
+
+        for count in counts:
+            polygons.append(list(ids[offset:offset + count]))
+            offset += count
+
+        symmetry_map = SymmetryMap(shape, polygons, [[p[0], p[1], p[2]] for p in points], axis, method, tolerance, seed_edge)
+        symmetry_map.topology_key = topology_key
+        symmetry_map.points_key = points_key
+        self.maps[key] = symmetry_map
+        self.build_count += 1
+
+        return symmetry_map
+
+    def update_points(self, symmetry_map, points):
+        """マップ自身が書き込んだ頂点座標を有効な状態として記録する"""
+        symmetry_map.points_key = _points_key(points)
+
+    def clear(self):
+        self.maps = dict()
+
+
+# シーン共通のキャッシュ
+_cache = SymmetryCache()
+
+
+def get_map(target, axis=0, method=METHOD_POSITION, tolerance=default_tolerance, seed_edge=None):
+    """最新のシンメトリマップを返す"""
+    return _cache.get(target, axis, method, tolerance, seed_edge)
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def snap_center(target, axis=0, tolerance=default_tolerance, method=METHOD_POSITION):
+    """対称面の近くにある頂点の軸成分を 0 にする
+
+    Args:
+        target (str): メッシュのトランスフォーム名かシェイプ名
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        tolerance (float, optional): 許容誤差. Defaults to default_tolerance.
+        method (str, optional): METHOD_POSITION か METHOD_TOPOLOGY. Defaults to METHOD_POSITION.
+
+    Returns:
+        int: 移動した頂点数
+    """
+    fn_mesh = om.MFnMesh(_dag_path(target))
+    points = fn_mesh.getPoints(om.MSpace.kObject)
+    symmetry_map = _cache.get(target, axis, method, tolerance, points=points)
+    moved = [i for i in symmetry_map.center_vertices() if points[i][axis] != 0]
+
+    if not moved:
+        return 0
+
+    for i in moved:
+        points[i] = om.MPoint(_on_plane(points[i], axis))
+
+    with ss.snapshot_state(targets=[symmetry_map.shape], position=True):
+        fn_mesh.setPoints(points, om.MSpace.kObject)
+        fn_mesh.updateSurface()
+
+    _cache.update_points(symmetry_map, points)
+
+    return len(moved)
+
+
+def symmetrize_points(target, axis=0, direction=1, method=METHOD_POSITION, tolerance=default_tolerance):
+    """direction 側の頂点座標を反対側に鏡像コピーし､中心の頂点を対称面に乗せる
+
+    Args:
+        target (str): メッシュのトランスフォーム名かシェイプ名
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        direction (int, optional): コピー元の側 (1 で正の側から負の側へ). Defaults to 1.
+        method (str, optional): METHOD_POSITION か METHOD_TOPOLOGY. Defaults to METHOD_POSITION.
+        tolerance (float, optional): 許容誤差. Defaults to default_tolerance.
+
+    Returns:
+        list[int]: 対応の見つからなかった頂点 ID
+    """
+    fn_mesh = om.MFnMesh(_dag_path(target))
+    points = fn_mesh.getPoints(om.MSpace.kObject)
+    symmetry_map = _cache.get(target, axis, method, tolerance, points=points)
+    mirror = symmetry_map.mirror
+    source = [[p[0], p[1], p[2]] for p in points]
+
+    for i in symmetry_map.destination_vertices(source, direction):
+        points[i] = om.MPoint(mirror_point(source[mirror[i]], axis))
+
+    for i in symmetry_map.center_vertices():
+        points[i] = om.MPoint(_on_plane(source[i], axis))
+
+    with ss.snapshot_state(targets=[symmetry_map.shape], position=True):
+        fn_mesh.setPoints(points, om.MSpace.kObject)
+        fn_mesh.updateSurface()
+
+    _cache.update_points(symmetry_map, points)
+
+    return symmetry_map.unmatched_vertices()
+
+
+def _influence_labels(influences):
+    labels = []
+
+    for influence in influences:
+        if cmds.objectType(influence) != "joint":
+            labels.append((SIDE_CENTER, 0, ""))
+            continue
+
+        side = cmds.getAttr(influence + ".side") or SIDE_CENTER
+        joint_type = cmds.getAttr(influence + ".type") or 0
+        other_type = cmds.getAttr(influence + ".otherType") or ""
+        labels.append((side, joint_type, other_type))
+
+    return labels
+
+
+def mirror_weights(target, axis=0, direction=1, influence_association=INFLUENCE_LABEL, method=METHOD_POSITION, tolerance=default_tolerance):
+    """direction 側のウェイトを左右のインフルエンスを入れ替えて反対側にコピーする
+
+    中心の頂点は自身のウェイトと左右を入れ替えたウェイトの平均にする｡
+
+    Args:
+        target (str): メッシュのトランスフォーム名かシェイプ名
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        direction (int, optional): コピー元の側 (1 で正の側から負の側へ). Defaults to 1.
+        influence_association (str, optional): INFLUENCE_LABEL か INFLUENCE_CLOSEST. Defaults to INFLUENCE_LABEL.
+        method (str, optional): METHOD_POSITION か METHOD_TOPOLOGY. Defaults to METHOD_POSITION.
+        tolerance (float, optional): 許容誤差. Defaults to default_tolerance.
+
+    Returns:
+        list[int]: 対応の見つからなかった頂点 ID｡ スキンクラスターが無ければ None
+    """
+    skincluster = nsi.get_index().skincluster_of(target)
+
+    if not skincluster:
+        return None
+
+    dag = _dag_path(target)
+    fn_mesh = om.MFnMesh(dag)
+    points = fn_mesh.getPoints(om.MSpace.kObject)
+    symmetry_map = _cache.get(target, axis, method, tolerance, points=points)
+    mirror = symmetry_map.mirror
+
+    fn_skin = oma.MFnSkinCluster(om.MGlobal.getSelectionListByName(skincluster).getDependNode(0))
+    influences = [x.partialPathName() for x in fn_skin.influenceObjects()]
+    n = len(influences)
+
+    if influence_association == INFLUENCE_CLOSEST:
+        positions = [cmds.xform(x, q=True, ws=True, t=True) for x in influences]
+        pairs = influence_map(influences, positions=positions, association=influence_association, axis=axis)
+    else:
+        pairs = influence_map(influences, labels=_influence_labels(influences), association=influence_association)
+
+    # 全頂点のコンポーネント
+    fn_comp = om.MFnSingleIndexedComponent()
+    all_vtx_comp = fn_comp.create(om.MFn.kMeshVertComponent)
+    fn_comp.addElements(list(range(fn_mesh.numVertices)))
+
+    weights = list(fn_skin.getWeights(dag, all_vtx_comp)[0])
+    new_weights = list(weights)
+
+    for i in symmetry_map.destination_vertices(points, direction):
+        src = mirror[i] * n
+        new_weights[i * n:(i + 1) * n] = [weights[src + pairs[k]] for k in range(n)]
+
+    for i in symmetry_map.center_vertices():
+        own = weights[i * n:(i + 1) * n]
+        new_weights[i * n:(i + 1) * n] = [(own[k] + own[pairs[k]]) * 0.5 for k in range(n)]
+
+    with ss.snapshot_state(targets=[symmetry_map.shape], weight=True):
+        fn_skin.setWeights(dag, all_vtx_comp, om.MIntArray(range(n)), om.MDoubleArray(new_weights), normalize=False)
+
+    return symmetry_map.unmatched_vertices()
+
+
+def mirror_colors(target, axis=0, direction=1, method=METHOD_POSITION, tolerance=default_tolerance):
+    """direction 側の頂点フェースカラーを反対側にコピーする
+
+    Args:
+        target (str): メッシュのトランスフォーム名かシェイプ名
+        axis (int, optional): 対称面の法線の軸. Defaults to 0.
+        direction (int, optional): コピー元の側 (1 で正の側から負の側へ). Defaults to 1.
+        method (str, optional): METHOD_POSITION か METHOD_TOPOLOGY. Defaults to METHOD_POSITION.
+        tolerance (float, optional): 許容誤差. Defaults to default_tolerance.
+
+    Returns:
+        list[int]: 対応の見つからなかった頂点 ID
+    """
+    fn_mesh = om.MFnMesh(_dag_path(target))
+    points = fn_mesh.getPoints(om.MSpace.kObject)
+    symmetry_map = _cache.get(target, axis, method, tolerance, points=points)
+    fv_mirror = symmetry_map.face_vertex_mirror()
+    destinations = set(symmetry_map.destination_vertices(points, direction))
+
+    colors = fn_mesh.getFaceVertexColors()
+    new_colors = om.MColorArray()
+    face_ids = om.MIntArray()
+    vertex_ids = om.MIntArray()
+    fvi = 0
+
+    for fi, polygon in enumerate(symmetry_map.polygons):
+        for vi in polygon:
+            src = fv_mirror[fvi]
+
+            if vi in destinations and src >= 0:
+                new_colors.append(colors[src])
+                face_ids.append(fi)
+                vertex_ids.append(vi)
+
+            fvi += 1
+
+    if len(new_colors):
+        with ss.snapshot_state(targets=[symmetry_map.shape], color=True):
+            fn_mesh.setFaceVertexColors(new_colors, face_ids, vertex_ids)
+
+    return symmetry_map.unmatched_vertices()
@@ -1,5 +1,6 @@
 import maya.cmds as cmds
 import maya.mel as mel
+import maya.api.OpenMaya as om
 
 import nnutil.core as nu
 
@@ -23,3 +24,136 @@ def align_uv(components=None, axis="U", side="max"):
 
     elif cmds.selectType(q=True, msh=True):
         mel.eval(f"texAlignShells {side}{axis} {{}} \"\";")
+
+
+class MeshUV(object):
+    """メッシュ 1 つ分の UV 座標とトポロジーを API で一括取得して保持するクラス
+
+    UV 毎の cmds 呼び出しを避けるための読み書きバッファ｡
+    us, vs を編集して write() で一度に書き戻す｡ Undo が必要な場合は snapshot_state(uv=True) で囲む｡
+
+    Args:
+        shape (str): メッシュシェイプ名もしくはトランスフォームノード名
+        uv_set (str, optional): 対象の UV セット｡ 省略時はカレント UV セット
+    """
+    def __init__(self, shape, uv_set=None):
+        sel = om.MSelectionList()
+        sel.add(shape)
+        self.dag = sel.getDagPath(0)
+        self.dag.extendToShape()
+        self.fn_mesh = om.MFnMesh(self.dag)
+        self.shape = self.dag.partialPathName()
+        self.uv_set = uv_set or self.fn_mesh.currentUVSetName()
+
+        us, vs = self.fn_mesh.getUVs(self.uv_set)
+        self.us = list(us)
+        self.vs = list(vs)
+
+        num_shells, shell_ids = self.fn_mesh.getUvShellsIds(self.uv_set)
+        self.num_shells = num_shells
+        self.shell_ids = list(shell_ids)
+
+        self._face_vertex_cache = None
+        self._uv_to_vertex = None
+        self._shell_uvs = None
+
+    @property
+    def num_uvs(self):
+        return len(self.us)
+
+    def face_vertices(self):
+        """フェース毎の頂点数と UV 数､フェース頂点毎の頂点 ID と UV ID を返す
+
+        Returns:
+            tuple[list[int], list[int], list[int], list[int]]: (vertex_counts, vertex_ids, uv_counts, uv_ids)
+            uv_counts が 0 のフェースは UV を持たない
+        """
+        if self._face_vertex_cache is None:
+            vertex_counts, vertex_ids = self.fn_mesh.getVertices()
+            uv_counts, uv_ids = self.fn_mesh.getAssignedUVs(self.uv_set)
+            self._face_vertex_cache = (list(vertex_counts), list(vertex_ids), list(uv_counts), list(uv_ids))
+
+        return self._face_vertex_cache
+
+    def face_uv_ids(self):
+        """UV を持つフェースの (フェース ID, UV ID リスト, 頂点 ID リスト) のリストを返す"""
+        vertex_counts, vertex_ids, uv_counts, uv_ids = self.face_vertices()
+        faces = []
+        vertex_offset = 0
+        uv_offset = 0
+
+        for fi, (vc, uc) in enumerate(zip(vertex_counts, uv_counts)):
+            if uc:
+                faces.append((fi, uv_ids[uv_offset:uv_offset + uc], vertex_ids[vertex_offset:vertex_offset + vc]))
+
+            vertex_offset += vc
+            uv_offset += uc
+
+        return faces
+
+    def uv_to_vertex(self):
+        """UV ID をインデックスとした頂点 ID のリストを返す｡ どのフェースにも使われていない UV は -1"""
+        if self._uv_to_vertex is None:
+            table = [-1] * self.num_uvs
+
+            for _, uv_ids, vertex_ids in self.face_uv_ids():
+                for uvi, vi in zip(uv_ids, vertex_ids):
+                    table[uvi] = vi
+
+            self._uv_to_vertex = table
+
+        return self._uv_to_vertex
+
+    def shell_uvs(self):
+        """シェル ID をインデックスとした UV ID リストのリストを返す"""
+        if self._shell_uvs is None:
+            shells = [[] for _ in range(self.num_shells)]
+
+            for uvi, si in enumerate(self.shell_ids):
+                shells[si].append(uvi)
+
+            self._shell_uvs = shells
+
+        return self._shell_uvs
+
+    def points(self, space=om.MSpace.kWorld):
+        """頂点座標を [x, y, z] のリストで返す"""
+        return [[p.x, p.y, p.z] for p in self.fn_mesh.getPoints(space)]
+
+    def write(self):
+        """us, vs を一度の setUVs でメッシュに書き戻す"""
+        self.fn_mesh.setUVs(self.us, self.vs, self.uv_set)
+        self.fn_mesh.updateSurface()
+
+
+def get_selected_uv_ids(components=None):
+    """コンポーネントを UV に変換し､シェイプ毎の UV ID のリストを返す
+
+    変換は polyListComponentConversion 一回で行い､ UV ID の取得は API で行う
+
+    Args:
+        components (list[str], optional): 対象のコンポーネントもしくはオブジェクト｡ 省略時は選択
+
+    Returns:
+        dict[str, list[int]]: シェイプ名をキーとした UV ID リストの辞書
+    """
+    components = components or cmds.ls(selection=True)
+
+    if not components:
+        return dict()
+
+    uv_comps = cmds.polyListComponentConversion(components, toUV=True) or []
+
+    sel = om.MSelectionList()
+    for comp in uv_comps:
+        sel.add(comp)
+
+    shape_to_uv_ids = dict()
+
+    for i in range(sel.length()):
+        dag, comp = sel.getComponent(i)
+        dag.extendToShape()
+        uv_ids = om.MFnSingleIndexedComponent(comp).getElements()
+        shape_to_uv_ids.setdefault(dag.partialPathName(), []).extend(uv_ids)
+
+    return shape_to_uv_ids
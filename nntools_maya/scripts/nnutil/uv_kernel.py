@@ -0,0 +1,249 @@
+"""
+UV シェル編集用の配列カーネル
+
+MeshUV の us, vs (getUVs 一回で取得した座標配列) と UV ID のリストに対して動作する Maya 非依存の関数群｡
+座標は (u, v) タプルのリスト (N x 2) か､ us, vs の並列リストで受け取る｡
+"""
+import math
+
+
+# 軸
+AXIS_U = 0
+AXIS_V = 1
+
+# 面の向き
+FACING_FRONT = 1
+FACING_BACK = -1
+FACING_DEGENERATE = 0
+
+
+def polygon_signed_area(us, vs, uv_ids):
+    """UV 空間での多角形の符号付き面積を返す｡ 反時計回り (表面) で正"""
+    area = 0.0
+
+    for a, b in zip(uv_ids, uv_ids[1:] + uv_ids[:1]):
+        area += us[a] * vs[b] - us[b] * vs[a]
+
+    return area * 0.5
+
+
+def gather(us, vs, uv_ids):
+    """UV ID のリストに対応する (u, v) のリストを返す"""
+    return [(us[i], vs[i]) for i in uv_ids]
+
+
+def scatter(us, vs, uv_ids, points):
+    """(u, v) のリストを UV ID の位置に書き込む"""
+    for i, (u, v) in zip(uv_ids, points):
+        us[i] = u
+        vs[i] = v
+
+
+def bounds(points):
+    """(u, v) のリストのバウンディングボックス ((min_u, min_v), (max_u, max_v)) を返す"""
+    us = [p[0] for p in points]
+    vs = [p[1] for p in points]
+
+    return (min(us), min(vs)), (max(us), max(vs))
+
+
+def narrow_axis(points):
+    """範囲が狭い方の軸を返す｡ 縦に並んだ点なら AXIS_U"""
+    (min_u, min_v), (max_u, max_v) = bounds(points)
+
+    return AXIS_U if (max_u - min_u) < (max_v - min_v) else AXIS_V
+
+
+def centroid(points):
+    """(u, v) のリストの平均"""
+    n = float(len(points))
+
+    return (sum(p[0] for p in points) / n, sum(p[1] for p in points) / n)
+
+
+# 反転
+def mirror(us, vs, uv_ids, pivot, axis):
+    """指定した UV を pivot を通る軸で反転する (us, vs を直接書き換える)
+
+    Args:
+        us (list[float]): U 座標
+        vs (list[float]): V 座標
+        uv_ids (list[int]): 反転する UV ID
+        pivot (tuple[float, float]): 反転の中心
+        axis (int): AXIS_U で U 座標､ AXIS_V で V 座標を反転する
+    """
+    coords = us if axis == AXIS_U else vs
+    c = pivot[axis]
+
+    for i in uv_ids:
+        coords[i] = 2.0 * c - coords[i]
+
+
+def beyond_pivot(us, vs, uv_ids, pivot, axis, positive):
+    """pivot の軸座標より正側 (positive=False なら負側) にある UV ID のリストを返す"""
+    coords = us if axis == AXIS_U else vs
+    c = pivot[axis]
+
+    if positive:
+        return [i for i in uv_ids if coords[i] > c]
+    else:
+        return [i for i in uv_ids if coords[i] < c]
+
+
+# 面の向き
+def classify_facing(us, vs, face_uv_ids, eps=1e-12):
+    """フェース毎の UV の向きを返す
+
+    Args:
+        us (list[float]): U 座標
+        vs (list[float]): V 座標
+        face_uv_ids (list[list[int]]): フェース毎の UV ID
+        eps (float, optional): これ以下の面積は FACING_DEGENERATE とする. Defaults to 1e-12.
+
+    Returns:
+        list[int]: FACING_FRONT, FACING_BACK, FACING_DEGENERATE のいずれか
+    """
+    facings = []
+
+    for uv_ids in face_uv_ids:
+        area = polygon_signed_area(us, vs, list(uv_ids))
+
+        if area > eps:
+            facings.append(FACING_FRONT)
+        elif area < -eps:
+            facings.append(FACING_BACK)
+        else:
+            facings.append(FACING_DEGENERATE)
+
+    return facings
+
+
+def backfacing_uv_ids(us, vs, face_uv_ids, eps=1e-12):
+    """裏返っているフェースに含まれる UV ID の集合を返す"""
+    result = set()
+
+    for uv_ids, facing in zip(face_uv_ids, classify_facing(us, vs, face_uv_ids, eps)):
+        if facing == FACING_BACK:
+            result.update(uv_ids)
+
+    return result
+
+
+# 最遠点ペア
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _distance_sq(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2
+
+
+def convex_hull(points):
+    """凸包の頂点のインデックスを反時計回りで返す (モノトーンチェイン法｡ 辺上の点は含まない)"""
+    order = sorted(range(len(points)), key=lambda i: (points[i][0], points[i][1]))
+
+    if len(order) <= 2:
+        return order
+
+    lower = []
+    for i in order:
+        while len(lower) >= 2 and _cross(points[lower[-2]], points[lower[-1]], points[i]) <= 0:
+            lower.pop()
+        lower.append(i)
+
+    upper = []
+    for i in reversed(order):
+        while len(upper) >= 2 and _cross(points[upper[-2]], points[upper[-1]], points[i]) <= 0:
+            upper.pop()
+        upper.append(i)
+
+    hull = lower[:-1] + upper[:-1]
+
+    # 全点が同一座標の場合
+    return hull or order[:1]
+
+
+def farthest_pair(points):
+    """最も離れた 2 点のインデックスを返す
+
+    凸包上で回転キャリパー法を使うので点数 N に対して O(N log N)｡
+
+    Args:
+        points (list[tuple[float, float]]): (u, v) のリスト｡ 2 点以上
+
+    Returns:
+        tuple[int, int]: points のインデックスのペア
+    """
+    hull = convex_hull(points)
+    m = len(hull)
+
+    if m == 1:
+        return hull[0], hull[0]
+
+    if m == 2:
+        return hull[0], hull[1]
+
+    best = (-1.0, hull[0], hull[1])
+    j = 1
+
+    for i in range(m):
+        p = points[hull[i]]
+        q = points[hull[(i + 1) % m]]
+
+        # 辺 pq から最も遠い頂点まで j を進める
+        while abs(_cross(p, q, points[hull[(j + 1) % m]])) > abs(_cross(p, q, points[hull[j]])):
+            j = (j + 1) % m
+
+        for k in (hull[i], hull[(i + 1) % m]):
+            d = _distance_sq(points[k], points[hull[j]])
+
+            if d > best[0]:
+                best = (d, k, hull[j])
+
+    return best[1], best[2]
+
+
+# 直線上への整列
+def project_to_line(points, start, end, preserve_arc=True):
+    """点を start から end への線分上に再配置した座標のリストを返す
+
+    preserve_arc=True の場合は線分方向への射影順に並べた折れ線の弧長の比率を保ち､
+    False の場合は start からの距離と線分長の比率で配置する｡
+
+    Args:
+        points (list[tuple[float, float]]): (u, v) のリスト
+        start (int): 始点のインデックス
+        end (int): 終点のインデックス
+        preserve_arc (bool, optional): True で弧長の比率を保つ. Defaults to True.
+
+    Returns:
+        list[tuple[float, float]]: points と同じ順の新しい座標｡ 始点と終点が同じ座標なら None
+    """
+    a = points[start]
+    b = points[end]
+    ab = (b[0] - a[0], b[1] - a[1])
+    ab_len = math.hypot(*ab)
+
+    if ab_len == 0:
+        return None
+
+    if preserve_arc:
+        def t_of(i):
+            return ((points[i][0] - a[0]) * ab[0] + (points[i][1] - a[1]) * ab[1]) / ab_len ** 2
+
+        # 始点と終点は必ず両端になるようにする
+        order = [start] + sorted((i for i in range(len(points)) if i not in (start, end)), key=t_of) + [end]
+        arcs = [0.0]
+
+        for i, j in zip(order, order[1:]):
+            arcs.append(arcs[-1] + math.hypot(points[j][0] - points[i][0], points[j][1] - points[i][1]))
+
+        total = arcs[-1]
+        ratios = dict((i, arc / total) for i, arc in zip(order, arcs))
+
+    else:
+        ratios = dict((i, math.hypot(p[0] - a[0], p[1] - a[1]) / ab_len) for i, p in enumerate(points))
+        ratios[start] = 0.0
+        ratios[end] = 1.0
+
+    return [(a[0] + ab[0] * ratios[i], a[1] + ab[1] * ratios[i]) for i in range(len(points))]
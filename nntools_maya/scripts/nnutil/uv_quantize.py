@@ -0,0 +1,170 @@
+"""
+UV 座標をテクスチャのピクセルグリッドにスナップする
+
+メッシュ毎に getUVs で全 UV を読み､選択 UV の ID をマスクとして座標を丸め､setUVs 一回で書き戻す｡
+スナップによる移動量はシェル毎にピクセル単位のヒストグラムとして集計する｡
+"""
+import nnutil.decorator as deco
+import nnutil.uv as nuv
+import plugin_util.snapshotState as ss
+
+
+# スナップの種類
+SM_PIXEL = "pixel"
+SM_ORDINAL = "ordinal"
+
+# 移動量ヒストグラムの区切り (ピクセル)
+default_histogram_bins = (0.25, 0.5, 1.0, 2.0, 4.0)
+
+
+def snap_pixel(coords, texture_resolution, snap_pixels=1):
+    """座標を snap_pixels ピクセル毎の境界に丸めたリストを返す"""
+    step = 1.0 / texture_resolution * snap_pixels
+
+    return [round(c / step, 0) * step for c in coords]
+
+
+def snap_ordinal(coords, texture_resolution, block_width=8, ordinal=5, nearest=False):
+    """座標を block_width ピクセルのブロック内の ordinal 番目のピクセル境界に移動したリストを返す
+
+    nearest=True の場合はブロックの反対側から数えた ordinal と比べて近い方にスナップする
+    """
+    uv_per_pixel = 1.0 / texture_resolution
+    uv_per_block = uv_per_pixel * block_width
+    near_ordinal = min(ordinal, block_width - ordinal)
+    far_ordinal = max(ordinal, block_width - ordinal)
+    result = []
+
+    for c in coords:
+        if nearest:
+            current_ordinal = (c % uv_per_block) / uv_per_pixel
+            actual_ordinal = near_ordinal if current_ordinal < block_width / 2 else far_ordinal
+        else:
+            actual_ordinal = ordinal
+
+        result.append((c // uv_per_block) * uv_per_block + uv_per_pixel * actual_ordinal)
+
+    return result
+
+
+def snap_axis(mesh_uvs, masks):
+    """選択 UV 全体の範囲が狭い方の軸を返す｡ U なら 0, V なら 1"""
+    us = [mu.us[i] for mu, mask in zip(mesh_uvs, masks) for i in mask]
+    vs = [mu.vs[i] for mu, mask in zip(mesh_uvs, masks) for i in mask]
+
+    return 0 if (max(us) - min(us)) < (max(vs) - min(vs)) else 1
+
+
+def displacement_histogram(displacements, bins=default_histogram_bins):
+    """移動量 (ピクセル) のリストを bins で区切った個数のリストを返す｡ 要素数は len(bins) + 1"""
+    counts = [0] * (len(bins) + 1)
+
+    for d in displacements:
+        for i, edge in enumerate(bins):
+            if d < edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+
+    return counts
+
+
+class ShellDisplacement(object):
+    """シェル毎のスナップ移動量の集計
+
+    Args:
+        shape (str): シェイプ名
+        shell_id (int): シェル ID
+        displacements (list[float]): シェル内の各スナップ対象 UV の移動量 (ピクセル)
+        bins (tuple[float]): ヒストグラムの区切り (ピクセル)
+    """
+    def __init__(self, shape, shell_id, displacements, bins=default_histogram_bins):
+        self.shape = shape
+        self.shell_id = shell_id
+        self.count = len(displacements)
+        self.max = max(displacements) if displacements else 0.0
+        self.mean = sum(displacements) / len(displacements) if displacements else 0.0
+        self.bins = bins
+        self.histogram = displacement_histogram(displacements, bins)
+
+    def __repr__(self):
+        return "ShellDisplacement(%s, %d, max=%.3f, mean=%.3f, histogram=%s)" % (self.shape, self.shell_id, self.max, self.mean, self.histogram)
+
+
+def format_report(report):
+    """snap_uvs が返す集計を表形式の文字列にする"""
+    if not report:
+        return ""
+
+    bins = report[0].bins
+    bin_labels = ["<%g" % b for b in bins] + [">=%g" % bins[-1]]
+    lines = ["shape shell count max mean " + " ".join(bin_labels)]
+
+    for r in report:
+        lines.append("%s %d %d %.3f %.3f %s" % (r.shape, r.shell_id, r.count, r.max, r.mean, " ".join(str(c) for c in r.histogram)))
+
+    return "\n".join(lines)
+
+
+@deco.undo_chunk
+def snap_uvs(targets=None, mode=SM_PIXEL, texture_resolution=1024, snap_pixels=1, block_width=8, ordinal=5, nearest=False, warn_pixels=None, bins=default_histogram_bins):
+    """指定した UV をテクスチャのピクセルグリッドにスナップする
+
+    スナップする軸は選択 UV 全体の範囲が狭い方の軸 (縦に並んだ UV なら U) になる｡
+
+    Args:
+        targets (list[str], optional): 対象のコンポーネント｡ UV 以外は UV に変換する｡ 省略時は選択
+        mode (str, optional): SM_PIXEL でピクセル境界､ SM_ORDINAL でブロック内の序数位置にスナップ. Defaults to SM_PIXEL.
+        texture_resolution (int, optional): テクスチャ解像度. Defaults to 1024.
+        snap_pixels (int, optional): SM_PIXEL でのスナップ間隔 (ピクセル). Defaults to 1.
+        block_width (int, optional): SM_ORDINAL でのブロック幅 (ピクセル). Defaults to 8.
+        ordinal (int, optional): SM_ORDINAL でのブロック内の位置 (ピクセル). Defaults to 5.
+        nearest (bool, optional): SM_ORDINAL でブロックの両側から数えた近い方の位置にする. Defaults to False.
+        warn_pixels (float, optional): 移動量の最大値がこれを超えたシェルを警告として出力する. Defaults to None.
+        bins (tuple[float], optional): 移動量ヒストグラムの区切り (ピクセル). Defaults to default_histogram_bins.
+
+    Returns:
+        list[ShellDisplacement]: スナップ対象 UV を含むシェル毎の移動量の集計
+    """
+    shape_to_uv_ids = nuv.get_selected_uv_ids(targets)
+
+    if not shape_to_uv_ids:
+        return []
+
+    # メッシュ毎に全 UV を一括取得し､選択 UV の ID をマスクにする
+    mesh_uvs = [nuv.MeshUV(shape) for shape in shape_to_uv_ids]
+    masks = [sorted(set(uv_ids)) for uv_ids in shape_to_uv_ids.values()]
+
+    axis = snap_axis(mesh_uvs, masks)
+    report = []
+
+    for mesh_uv, mask in zip(mesh_uvs, masks):
+        coords = mesh_uv.us if axis == 0 else mesh_uv.vs
+        old_coords = [coords[i] for i in mask]
+
+        if mode == SM_ORDINAL:
+            new_coords = snap_ordinal(old_coords, texture_resolution, block_width=block_width, ordinal=ordinal, nearest=nearest)
+        else:
+            new_coords = snap_pixel(old_coords, texture_resolution, snap_pixels=snap_pixels)
+
+        # シェル毎の移動量 (ピクセル)
+        shell_displacements = dict()
+
+        for i, old, new in zip(mask, old_coords, new_coords):
+            coords[i] = new
+            shell_displacements.setdefault(mesh_uv.shell_ids[i], []).append(abs(new - old) * texture_resolution)
+
+        for shell_id in sorted(shell_displacements):
+            report.append(ShellDisplacement(mesh_uv.shape, shell_id, shell_displacements[shell_id], bins))
+
+    with ss.snapshot_state(targets=[x.shape for x in mesh_uvs], uv=True):
+        for mesh_uv in mesh_uvs:
+            mesh_uv.write()
+
+    if warn_pixels is not None:
+        for r in report:
+            if r.max > warn_pixels:
+                print("shell moved %.3f px: %s shell %d" % (r.max, r.shape, r.shell_id))
+
+    return report
@@ -1,66 +1,290 @@
-# 選択した UV シェルを左右対称に配置する
+"""選択した UV シェルを左右対称に配置する
 
-import maya.cmds as cmds
+3D 空間で鏡像関係にあるシェル同士を重心と UV 面積で対応付け､
+ターゲット側のシェルをソース側のシェルの UV 軸に対する鏡像の位置に移動する｡
+UV の読み書きはメッシュ毎に getUVs/setUVs 一回ずつで行う｡
+"""
+import math
 
-def arrange_uvshell_symmetrically():
-    def printd(description, message):
-            print(str(description) + ": " + str(message))
+import maya.api.OpenMaya as om
 
-    def distance2(p1, p2):
-            return math.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2)
+import nnutil.uv as nuv
+import nnutil.uv_kernel as nuvk
+import plugin_util.snapshotState as ss
 
-    def distance3(p1, p2):
-            return math.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2 + (p2[2]-p1[2])**2)
 
-    def getUV(uv_comp):
-        uv_coord = cmds.polyEditUV(uv_comp, query=True)
-        return uv_coord
+# 左右対称か上下対称か
+AA_U = "u"
+AA_V = "v"
 
-    def setUV(lhs, rhs):
-        rhs_coord = cmds.polyEditUV(rhs, q=True, relative=False)
-        cmds.polyEditUV(lhs, relative=False, u=rhs_coord[0], v=rhs_coord[1])
+# 3D 空間の対称面の + 側と - 側のどちらを基準にするか
+SS_POSITIVE = "positive"
+SS_NEGATIVE = "negative"
 
-    def uvDistance(uv1, uv2):
-        uvCoord1 = getUV(uv1)
-        uvCoord2 = getUV(uv2)
-        return distance2(uvCoord1, uvCoord2)
+# 対称面の法線軸
+axis_index = {"x": 0, "y": 1, "z": 2}
 
-    def getBackFaceUVcomp(uv_comp_list):
-        cmds.SelectUVBackFacingComponents()
-        backface_uvs = list(set(cmds.ls(selection=True, flatten=True)) & set(uv_comp_list) )
-        return backface_uvs
 
-    def selectUVs(target_uvs):
-        cmds.select(clear=True)
+class ShellInfo(object):
+    """シェルの対応付けに使う情報
 
-    def getUVShell(uv_comp):
-        pass
+    Args:
+        mesh_uv (MeshUV): シェルが所属するメッシュの UV
+        shell_id (int): シェル ID
+        uv_ids (list[int]): シェルを構成する UV ID
+        points (list[list[float]]): メッシュの頂点座標
+        faces (list[tuple]): シェルを構成するフェースの (フェース ID, UV ID リスト, 頂点 ID リスト)
+    """
+    def __init__(self, mesh_uv, shell_id, uv_ids, points, faces):
+        self.mesh_uv = mesh_uv
+        self.shell_id = shell_id
+        self.uv_ids = uv_ids
 
-    def getUVShellList(uv_comp_list):
-        #   uvs[0] から順にシェル変換して変換後のシェルuvs を母集合から除外していく事で
-        #   シェルのリスト作成する
-        pass
+        us = mesh_uv.us
+        vs = mesh_uv.vs
+        uv_to_vertex = mesh_uv.uv_to_vertex()
 
-    # 左右対称か上下対称か
-    AA_U = 0
-    AA_V = 1
-    arrange_axis = AA_U
+        # 3D 重心は UV の所属頂点の平均
+        vertex_ids = list({uv_to_vertex[i] for i in uv_ids if uv_to_vertex[i] >= 0})
+        n = float(len(vertex_ids)) or 1.0
+        self.vertex_ids = vertex_ids
+        self.center3d = [sum(points[vi][k] for vi in vertex_ids) / n for k in range(3)]
 
-    # 軸の + 側と - 側のどちらを基準にするか
-    SS_POSITIVE = 0
-    SS_NEGATIVE = 1
-    source_side = SS_POSITIVE
+        # UV 重心
+        self.center_uv = [sum(us[i] for i in uv_ids) / len(uv_ids), sum(vs[i] for i in uv_ids) / len(uv_ids)]
 
-    # 選択頂点の取得
-    # 選択頂点からシェルのリスト取得
+        # UV 面積 (符号付き面積の和の絶対値で表裏も区別しない)
+        self.area_uv = sum(abs(nuvk.polygon_signed_area(us, vs, face_uv_ids)) for _, face_uv_ids, _ in faces)
 
-    # シェルが 2 つ出ない場合は終了
 
-    # ソースとターゲット 決定
-    # ソースシェルの中心求める
-    # ターゲットシェルの中心求める
-    # ターゲットシェル移動
+def get_shell_infos(mesh_uv, shell_ids, space):
+    """指定シェルの ShellInfo のリストを返す"""
+    points = mesh_uv.points(space)
+    shell_uvs = mesh_uv.shell_uvs()
 
+    # シェル毎のフェース
+    shell_faces = dict()
+    for face in mesh_uv.face_uv_ids():
+        si = mesh_uv.shell_ids[face[1][0]]
+        if si in shell_ids:
+            shell_faces.setdefault(si, []).append(face)
 
-# 実行
-arrange_uvshell_symmetrically()
+    return [ShellInfo(mesh_uv, si, shell_uvs[si], points, shell_faces.get(si, [])) for si in shell_ids]
+
+
+def pair_shells(shells, symmetry_axis="x", source_side=SS_POSITIVE, tolerance=0.01, area_tolerance=0.05):
+    """3D 重心の鏡像位置と UV 面積でシェルをソースとターゲットのペアにする
+
+    tolerance は全シェルの重心のバウンディングボックス対角長に対する比率｡
+    重心距離と面積差の小さい組み合わせから順に確定させる｡
+
+    Args:
+        shells (list[ShellInfo]): 対応付けるシェル
+        symmetry_axis (str, optional): 3D 空間の対称面の法線軸 "x", "y", "z". Defaults to "x".
+        source_side (str, optional): ソースとするシェルの 3D 空間での側. Defaults to SS_POSITIVE.
+        tolerance (float, optional): 重心距離の許容値. Defaults to 0.01.
+        area_tolerance (float, optional): UV 面積の相対誤差の許容値. Defaults to 0.05.
+
+    Returns:
+        list[tuple[ShellInfo, ShellInfo]]: (ソース, ターゲット) のリスト
+    """
+    ai = axis_index[symmetry_axis]
+    sign = 1 if source_side == SS_POSITIVE else -1
+
+    sources = [s for s in shells if s.center3d[ai] * sign > 0]
+    targets = [s for s in shells if s.center3d[ai] * sign < 0]
+
+    if not sources or not targets:
+        return []
+
+    # 距離の許容値をシーンのスケールに合わせる
+    centers = [s.center3d for s in shells]
+    diagonal = math.sqrt(sum((max(c[k] for c in centers) - min(c[k] for c in centers))**2 for k in range(3)))
+    max_distance = max(diagonal, 1e-6) * tolerance
+
+    # 全組み合わせのコスト
+    candidates = []
+    for si, src in enumerate(sources):
+        mirrored = src.center3d[:]
+        mirrored[ai] = -mirrored[ai]
+
+        for ti, dst in enumerate(targets):
+            if len(src.uv_ids) != len(dst.uv_ids):
+                continue
+
+            distance = math.sqrt(sum((mirrored[k] - dst.center3d[k])**2 for k in range(3)))
+            area_diff = abs(src.area_uv - dst.area_uv) / max(src.area_uv, dst.area_uv, 1e-12)
+
+            if distance <= max_distance and area_diff <= area_tolerance:
+                candidates.append((distance / max_distance + area_diff / max(area_tolerance, 1e-12), si, ti))
+
+    # コストの小さい順に確定
+    candidates.sort()
+    used_sources = set()
+    used_targets = set()
+    pairs = []
+
+    for _, si, ti in candidates:
+        if si in used_sources or ti in used_targets:
+            continue
+
+        used_sources.add(si)
+        used_targets.add(ti)
+        pairs.append((sources[si], targets[ti]))
+
+    return pairs
+
+
+def mirror_coords(us, vs, axis, pivot):
+    """UV 座標を axis の pivot を軸に反転した座標を返す"""
+    if axis == AA_U:
+        return [2 * pivot - u for u in us], list(vs)
+    else:
+        return list(us), [2 * pivot - v for v in vs]
+
+
+def _vertex_key(p, cell):
+    """頂点座標の空間ハッシュキー"""
+    return (int(round(p[0] / cell)), int(round(p[1] / cell)), int(round(p[2] / cell)))
+
+
+def match_uvs(src, dst, points_src, points_dst, symmetry_axis, cell):
+    """ターゲットシェルの各 UV に対応するソースシェルの UV を 3D 鏡像頂点から求める
+
+    対応の取れない UV があった場合は None を返す
+
+    Returns:
+        list[int] or None: ターゲットの uv_ids と同順のソース UV ID リスト
+    """
+    ai = axis_index[symmetry_axis]
+    uv_to_vertex_src = src.mesh_uv.uv_to_vertex()
+    uv_to_vertex_dst = dst.mesh_uv.uv_to_vertex()
+
+    # ソースシェル頂点の空間ハッシュ
+    vertex_to_uv = dict()
+    for uvi in src.uv_ids:
+        vi = uv_to_vertex_src[uvi]
+        if vi >= 0:
+            vertex_to_uv.setdefault(_vertex_key(points_src[vi], cell), uvi)
+
+    matched = []
+    for uvi in dst.uv_ids:
+        vi = uv_to_vertex_dst[uvi]
+        if vi < 0:
+            return None
+
+        p = points_dst[vi][:]
+        p[ai] = -p[ai]
+        key = _vertex_key(p, cell)
+
+        # セル境界をまたいだ場合のために近傍セルも探す
+        src_uv = vertex_to_uv.get(key)
+        if src_uv is None:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        src_uv = vertex_to_uv.get((key[0] + dx, key[1] + dy, key[2] + dz))
+                        if src_uv is not None:
+                            break
+                    if src_uv is not None:
+                        break
+                if src_uv is not None:
+                    break
+
+        if src_uv is None:
+            return None
+
+        matched.append(src_uv)
+
+    return matched
+
+
+def arrange_uvshell_symmetrically(components=None, axis=AA_U, pivot=0.5, symmetry_axis="x", source_side=SS_POSITIVE, mirror_shape=True, space="world", tolerance=0.01):
+    """選択した UV シェルを左右対称に配置する
+
+    選択に含まれるシェルを 3D 空間で対称な位置にあるもの同士でペアにし､
+    ターゲットシェルをソースシェルの鏡像位置へ配置する｡
+    mirror_shape=True の場合は頂点単位で対応を取ってソースの形状を反転コピーし､
+    対応が取れない場合や False の場合は重心を合わせる平行移動のみを行う｡
+
+    Args:
+        components (list[str], optional): 対象のコンポーネント｡ 省略時は選択
+        axis (str, optional): UV 空間の反転軸 AA_U (左右) か AA_V (上下). Defaults to AA_U.
+        pivot (float, optional): 反転軸の座標. Defaults to 0.5.
+        symmetry_axis (str, optional): 3D 空間の対称面の法線軸. Defaults to "x".
+        source_side (str, optional): ソースとする 3D 空間の側. Defaults to SS_POSITIVE.
+        mirror_shape (bool, optional): True でシェル形状も反転コピーする. Defaults to True.
+        space (str, optional): 3D 座標の空間 "world" か "object". Defaults to "world".
+        tolerance (float, optional): ペアリング時の重心距離の許容比率. Defaults to 0.01.
+
+    Returns:
+        int: 配置したペアの数
+    """
+    om_space = om.MSpace.kWorld if space == "world" else om.MSpace.kObject
+    shape_to_uv_ids = nuv.get_selected_uv_ids(components)
+
+    # 選択 UV からメッシュ毎のシェルを取得
+    mesh_uvs = []
+    shells = []
+    for shape, uv_ids in shape_to_uv_ids.items():
+        mesh_uv = nuv.MeshUV(shape)
+        shell_ids = sorted({mesh_uv.shell_ids[i] for i in uv_ids})
+        mesh_uvs.append(mesh_uv)
+        shells.extend(get_shell_infos(mesh_uv, shell_ids, om_space))
+
+    # シェルが 2 つ以上無い場合は終了
+    if len(shells) < 2:
+        print("select two or more uv shells")
+        return 0
+
+    pairs = pair_shells(shells, symmetry_axis=symmetry_axis, source_side=source_side, tolerance=tolerance)
+
+    if not pairs:
+        print("no symmetric shell pairs found")
+        return 0
+
+    # 頂点単位の対応に使うセルサイズはシェル重心の広がりの 1/1000
+    points_table = {id(x): x.points(om_space) for x in mesh_uvs}
+    centers = [s.center3d for s in shells]
+    cell = max(max(max(c[k] for c in centers) - min(c[k] for c in centers) for k in range(3)), 1e-6) * 0.001
+
+    for src, dst in pairs:
+        mu_src = src.mesh_uv
+        mu_dst = dst.mesh_uv
+        matched = None
+
+        if mirror_shape:
+            matched = match_uvs(src, dst, points_table[id(mu_src)], points_table[id(mu_dst)], symmetry_axis, cell)
+
+        if matched:
+            # ソースの対応 UV を反転してコピー
+            new_us, new_vs = mirror_coords([mu_src.us[i] for i in matched], [mu_src.vs[i] for i in matched], axis, pivot)
+
+        else:
+            # ソース重心の鏡像位置へ平行移動
+            (target_u,), (target_v,) = mirror_coords([src.center_uv[0]], [src.center_uv[1]], axis, pivot)
+            du = target_u - dst.center_uv[0]
+            dv = target_v - dst.center_uv[1]
+            new_us = [mu_dst.us[i] + du for i in dst.uv_ids]
+            new_vs = [mu_dst.vs[i] + dv for i in dst.uv_ids]
+
+        for uvi, u, v in zip(dst.uv_ids, new_us, new_vs):
+            mu_dst.us[uvi] = u
+            mu_dst.vs[uvi] = v
+
+    # メッシュ毎に一度だけ書き込み
+    with ss.snapshot_state(targets=[x.shape for x in mesh_uvs], uv=True):
+        for mesh_uv in mesh_uvs:
+            mesh_uv.write()
+
+    print("arranged %d shell pairs" % len(pairs))
+
+    return len(pairs)
+
+
+def main():
+    arrange_uvshell_symmetrically()
+
+
+if __name__ == "__main__":
+    main()
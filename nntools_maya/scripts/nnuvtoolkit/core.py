@@ -1,13 +1,16 @@
-import re
-
 import maya.cmds as cmds
 import maya.mel as mel
 
 import nnutil.core as nu
 import nnutil.ui as ui
 import nnutil.decorator as nd
+import nnutil.uv as nuv
+import nnutil.uv_kernel as nuvk
+import plugin_util.snapshotState as ss
 
 from . import rectilinearize
+from . import arrange_uvshell_symmetrically
+from . import texel as uvtexel
 
 window_name = "NN_UVToolkit"
 window = None
@@ -125,89 +128,58 @@ def snap_uv_to_pin():
 
 
 @nd.repeatable
+@nd.undo_chunk
 def half_expand_fold(right_down=True):
     """
     right_down=True で横なら右、縦なら下へ畳む
-    """
-    # フリップの軸
-    FA_U = 0
-    FA_V = 1
-    flip_axis = FA_U
-
-    # フリップ方向
-    # fold 時のみ使用
-    FD_TO_LEFT = 0
-    FD_TO_RIGHT = 1
-    FD_TO_UP = 2
-    FD_TO_DOWN = 3
-    flip_direction = FD_TO_LEFT
 
+    選択 UV を含むシェルに裏返ったフェースがあれば裏面を展開 (expand) し､
+    無ければ選択 UV の並びを軸にしてシェルの反対側を折り畳む (fold)｡
+    UV の読み書きはメッシュ毎に getUVs/setUVs 一回ずつで行う｡
+    """
     # 選択UV取得
-    selected_uvs = cmds.ls(selection=True, flatten=True)
-    cmds.SelectUVShell()
-    selected_sehll_uvs = cmds.ls(selection=True, flatten=True)
+    shape_to_uv_ids = nuv.get_selected_uv_ids(cmds.ls(selection=True))
 
-    if len(selected_uvs) == 0:
+    if not shape_to_uv_ids:
         return
 
-    # フリップ軸の決定
-    u_dist = [cmds.polyEditUV(x, q=True)[0] for x in selected_uvs]
-    u_length = max(u_dist) - min(u_dist)
-    v_dist = [cmds.polyEditUV(x, q=True)[1] for x in selected_uvs]
-    v_length = max(v_dist) - min(v_dist)
+    mesh_uvs = [nuv.MeshUV(shape) for shape in shape_to_uv_ids]
+    selected_uv_ids = [sorted(set(uv_ids)) for uv_ids in shape_to_uv_ids.values()]
+    selected_points = [p for mesh_uv, uv_ids in zip(mesh_uvs, selected_uv_ids) for p in nuvk.gather(mesh_uv.us, mesh_uv.vs, uv_ids)]
 
-    if u_length < v_length:
-        flip_axis = FA_U
-        if right_down:
-            flip_direction = FD_TO_RIGHT
-        else:
-            flip_direction = FD_TO_LEFT
-    else:
-        flip_axis = FA_V
-        if right_down:
-            flip_direction = FD_TO_DOWN
-        else:
-            flip_direction = FD_TO_UP
+    # フリップ軸の決定 (選択 UV の範囲が狭い方の軸) と選択 UV からのピボット決定
+    flip_axis = nuvk.narrow_axis(selected_points)
+    pivot = nuvk.centroid(selected_points)
 
-    # 選択UVからピボット決定
-    selected_uv_coord_list = [nu.get_uv_coord(x) for x in selected_uvs]
-    piv_u = sum([x[0] for x in selected_uv_coord_list]) / len(selected_uv_coord_list)
-    piv_v = sum([x[1] for x in selected_uv_coord_list]) / len(selected_uv_coord_list)
+    # 選択 UV を含むシェルの UV
+    shell_uv_ids = []
+    for mesh_uv, uv_ids in zip(mesh_uvs, selected_uv_ids):
+        shells = sorted({mesh_uv.shell_ids[i] for i in uv_ids})
+        shell_uv_ids.append([i for si in shells for i in mesh_uv.shell_uvs()[si]])
 
     # 裏面の UV 取得
     # expand 用 (expand の操作対象を "軸の外側UV" にすると四つ折りfoldができるけど折ったきりexpandできなくなる)
-    backface_uvs = nu.filter_backface_uv_comp(selected_sehll_uvs)
-
-    # 編集対象 UV
-    target_uvs = []
+    backface_uv_ids = []
+    for mesh_uv, uv_ids in zip(mesh_uvs, shell_uv_ids):
+        backface = nuvk.backfacing_uv_ids(mesh_uv.us, mesh_uv.vs, [face_uv_ids for _, face_uv_ids, _ in mesh_uv.face_uv_ids()])
+        backface_uv_ids.append([i for i in uv_ids if i in backface])
 
-    # 編集対象の決定
-    if len(backface_uvs) > 0:
+    if any(backface_uv_ids):
         # 裏面があれば裏面が編集対象 (expand動作)
-        target_uvs = backface_uvs
+        target_uv_ids = backface_uv_ids
     else:
         # 裏面が無ければフリップ外側のUVを編集対象にする (fold動作)
-        # 軸よりもフリップ反対方向の UV 取得
-        if flip_direction == FD_TO_LEFT:
-            target_uvs = [x for x in selected_sehll_uvs if nu.get_uv_coord(x)[0] > piv_u]
-        if flip_direction == FD_TO_RIGHT:
-            target_uvs = [x for x in selected_sehll_uvs if nu.get_uv_coord(x)[0] < piv_u]
-        if flip_direction == FD_TO_UP:
-            target_uvs = [x for x in selected_sehll_uvs if nu.get_uv_coord(x)[1] < piv_v]
-        if flip_direction == FD_TO_DOWN:
-            target_uvs = [x for x in selected_sehll_uvs if nu.get_uv_coord(x)[1] > piv_v]
-
-    # スケール値の決定
-    su = 1
-    sv = 1
-
-    if flip_axis == FA_U:
-        su = -1
-    if flip_axis == FA_V:
-        sv = -1
+        # 右へ畳むなら軸より左､下へ畳むなら軸より上の UV が対象
+        positive = not right_down if flip_axis == nuvk.AXIS_U else right_down
+        target_uv_ids = [nuvk.beyond_pivot(mesh_uv.us, mesh_uv.vs, uv_ids, pivot, flip_axis, positive) for mesh_uv, uv_ids in zip(mesh_uvs, shell_uv_ids)]
 
     # ピボットを指定して反転処理
-    cmds.polyEditUV(target_uvs, pu=piv_u, pv=piv_v, su=su, sv=sv)
+    for mesh_uv, uv_ids in zip(mesh_uvs, target_uv_ids):
+        nuvk.mirror(mesh_uv.us, mesh_uv.vs, uv_ids, pivot, flip_axis)
+
+    with ss.snapshot_state(targets=[x.shape for x in mesh_uvs], uv=True):
+        for mesh_uv in mesh_uvs:
+            mesh_uv.write()
 
     cmds.select(clear=True)
 
@@ -312,8 +284,13 @@ def straighten_all():
 
 
 @nd.repeatable
-def linear_align():
-    """選択UVコンポーネントのうち最も遠い2点を始点と終点としてそれ以外のUVを始点終点を結ぶ直線上に整列する｡"""
+@nd.undo_chunk
+def linear_align(preserve_arc=True):
+    """選択UVコンポーネントのうち最も遠い2点を始点と終点としてそれ以外のUVを始点終点を結ぶ直線上に整列する｡
+
+    Args:
+        preserve_arc (bool, optional): True で UV の並びの弧長の比率を保って配置する｡ False なら始点からの距離の比率. Defaults to True.
+    """
     uvs = cmds.ls(selection=True, flatten=True)
     uvs = cmds.filterExpand(uvs, sm=35)
     if not uvs or len(uvs) < 2:
@@ -321,54 +298,26 @@ def linear_align():
         return
 
     # UV座標取得
-    uv_coords = {uv: cmds.polyEditUV(uv, q=True) for uv in uvs}
-
-    # 最も遠い2点を探す
-    max_dist = -1
-    uvA, uvB = None, None
-    uv_list = list(uv_coords.items())
-    for i in range(len(uv_list)):
-        for j in range(i+1, len(uv_list)):
-            a, ca = uv_list[i]
-            b, cb = uv_list[j]
-            d = (ca[0]-cb[0])**2 + (ca[1]-cb[1])**2
-            if d > max_dist:
-                max_dist = d
-                uvA, uvB = a, b
-
-    if uvA is None or uvB is None:
-        print("最遠点ペアが見つかりません")
-        return
+    shape_to_uv_ids = nuv.get_selected_uv_ids(uvs)
+    mesh_uvs = [nuv.MeshUV(shape) for shape in shape_to_uv_ids]
+    targets = [(mesh_uv, uvi) for mesh_uv, uv_ids in zip(mesh_uvs, shape_to_uv_ids.values()) for uvi in sorted(set(uv_ids))]
+    points = [(mesh_uv.us[uvi], mesh_uv.vs[uvi]) for mesh_uv, uvi in targets]
+
+    # 最も遠い2点を探して各点を直線上に再配置
+    start, end = nuvk.farthest_pair(points)
+    new_points = nuvk.project_to_line(points, start, end, preserve_arc=preserve_arc)
 
-    A = uv_coords[uvA]
-    B = uv_coords[uvB]
-    AB = [B[0]-A[0], B[1]-A[1]]
-    ab_len = (AB[0]**2 + AB[1]**2) ** 0.5
-    if ab_len == 0:
+    if new_points is None:
         print("2点が同じ座標です")
         return
 
-    # 各点を直線上に再配置
-    for uv, C in uv_coords.items():
-        if uv == uvA:
-            cmds.polyEditUV(uv, u=A[0], v=A[1], relative=False)
-        elif uv == uvB:
-            cmds.polyEditUV(uv, u=B[0], v=B[1], relative=False)
-        else:
-            # AC, CBベクトル
-            AC = [C[0]-A[0], C[1]-A[1]]
-            t = (AC[0]*AB[0] + AC[1]*AB[1]) / (ab_len**2)
-            # AC:CB比率
-            ac_len = (AC[0]**2 + AC[1]**2) ** 0.5
-            cb_len = ab_len - ac_len
-            if ab_len == 0:
-                ratio = 0.5
-            else:
-                ratio = ac_len / ab_len
-            # 新しい位置
-            new_u = A[0] + AB[0] * ratio
-            new_v = A[1] + AB[1] * ratio
-            cmds.polyEditUV(uv, u=new_u, v=new_v, relative=False)
+    for (mesh_uv, uvi), (u, v) in zip(targets, new_points):
+        mesh_uv.us[uvi] = u
+        mesh_uv.vs[uvi] = v
+
+    with ss.snapshot_state(targets=[x.shape for x in mesh_uvs], uv=True):
+        for mesh_uv in mesh_uvs:
+            mesh_uv.write()
 
     print("UVを直線上に整列しました")
 
@@ -414,18 +363,8 @@ def get_texel(eb_texel, mapsize):
         ui.set_value(eb_texel, uvTkTexel)
 
     elif isUVSelection:
-        uvComponents = cmds.ls(os=True)
         uvComponents = cmds.filterExpand(cmds.ls(os=True), sm=35)
-
-        uv1 = cmds.polyEditUV(uvComponents[0], q=True)
-        uv2 = cmds.polyEditUV(uvComponents[1], q=True)
-        vtxComponent1 = cmds.polyListComponentConversion(uvComponents[0], fuv=True, tv=True)
-        vtxComponent2 = cmds.polyListComponentConversion(uvComponents[1], fuv=True, tv=True)
-        p1 = cmds.xform(vtxComponent1, q=True, ws=True, t=True)
-        p2 = cmds.xform(vtxComponent2, q=True, ws=True, t=True)
-        geoLength = nu.distance(p1, p2)
-        uvLength = nu.distance2d(uv1, uv2)
-        currentTexel = uvLength / geoLength * mapsize
+        currentTexel = uvtexel.get_uv_distance_texel(uvComponents, mapsize)
 
         # ダイアログの値を更新
         ui.set_value(eb_texel, currentTexel)
@@ -453,104 +392,15 @@ def set_edge_texel(target_texel, mapsize, mode):
     """
     UVエッジを指定のテクセル密度にする
     エッジ選択モードならすべてのエッジに
-    UV選択モードなら選択した第一UVと第二UVの距離に
+    UV選択モードなら選択した UV 同士を結ぶ UV エッジに (先に選択した UV がピボット)
     """
     isUVSelection = cmds.selectType(q=True, puv=True)
     isEdgeSelection = cmds.selectType(q=True, pe=True)
 
-    targetUVsList = []  # UVコンポーネント文字列のリストのリスト list[list[str, str]]
-    uvComponents = []
-
-    # エッジ選択モードならエッジを構成する 2 頂点の UV をペアとして targetUVsList に追加する
-    if isEdgeSelection:
-        edges = cmds.filterExpand(cmds.ls(os=True), sm=32)
-        for edge in edges:
-            uvComponents = cmds.filterExpand(cmds.polyListComponentConversion(edge, fe=True, tuv=True), sm=35)
-            if len(uvComponents) == 2:  # 非UVシーム
-                targetUVsList.append(uvComponents)
-            elif len(uvComponents) == 4:  # UVシーム
-                targetUVsList.append([uvComponents[0], uvComponents[2]])
-                targetUVsList.append([uvComponents[1], uvComponents[3]])
-            else:
-                pass
-
-    # UV選択モードならエッジを共有する UV 同士をペアにして targetUVsList に追加する
-    elif isUVSelection:
-        edge_uv_dict = dict()
-        uvComponents = cmds.filterExpand(cmds.ls(os=True), sm=35)
-
-        for uvCompStr in uvComponents:
-            edgeCompStrList = cmds.filterExpand(cmds.polyListComponentConversion(uvCompStr, fuv=True, te=True), sm=32)
-            faceCompStrList = cmds.filterExpand(cmds.polyListComponentConversion(uvCompStr, fuv=True, tf=True), sm=34)
-
-            for edgeCompStr in edgeCompStrList:
-                for faceCompStr in faceCompStrList:
-                    ei = re.search(r"\[(\d+)\]", edgeCompStr).groups()[0]
-                    fi = re.search(r"\[(\d+)\]", faceCompStr).groups()[0]
-                    key = "e%sf%s" % (ei, fi)
-
-                    if key not in edge_uv_dict.keys():
-                        edge_uv_dict[key] = []
-
-                    edge_uv_dict[key].append(uvCompStr)
-
-        for uvPair in edge_uv_dict.values():
-            if len(set(uvPair)) == 2:
-                targetUVsList.append(uvPair)
-
     if not isEdgeSelection and not isUVSelection:
         return
 
-    for uvPair in targetUVsList:
-        uv1 = cmds.polyEditUV(uvPair[0], q=True)  # ペアの 1 つめの UV座標を持つリスト
-        uv2 = cmds.polyEditUV(uvPair[1], q=True)  # ペアの 2 つめの UV座標を持つリスト
-        vtxComponent1 = cmds.polyListComponentConversion(uvPair[0], fuv=True, tv=True)  # uv1 に対応する ポリゴン頂点のコンポーネント文字列
-        vtxComponent2 = cmds.polyListComponentConversion(uvPair[1], fuv=True, tv=True)  # uv2 に対応する ポリゴン頂点のコンポーネント文字列
-        p1 = cmds.xform(vtxComponent1, q=True, ws=True, t=True)  # uv1 の XYZ 座標
-        p2 = cmds.xform(vtxComponent2, q=True, ws=True, t=True)  # uv2 の XYZ 座標
-        geoLength = nu.distance(p1, p2)
-        uLength = abs(uv2[0] - uv1[0])
-        vLength = abs(uv2[1] - uv1[1])
-        uvLength = nu.distance2d(uv1, uv2)
-
-        if mode == "u_min":
-            currentTexel = uLength / geoLength * mapsize
-            scale = target_texel / currentTexel
-            pivU = min(uv1[0], uv2[0])
-            pivV = 0
-            cmds.polyEditUV(uvPair[0], pu=pivU, pv=pivV, su=scale, sv=1)
-            cmds.polyEditUV(uvPair[1], pu=pivU, pv=pivV, su=scale, sv=1)
-
-        elif mode == "u_max":
-            currentTexel = uLength / geoLength * mapsize
-            scale = target_texel / currentTexel
-            pivU = max(uv1[0], uv2[0])
-            pivV = 0
-            cmds.polyEditUV(uvPair[0], pu=pivU, pv=pivV, su=scale, sv=1)
-            cmds.polyEditUV(uvPair[1], pu=pivU, pv=pivV, su=scale, sv=1)
-
-        elif mode == "v_min":
-            currentTexel = vLength / geoLength * mapsize
-            scale = target_texel / currentTexel
-            pivU = 0
-            pivV = min(uv1[1], uv2[1])
-            cmds.polyEditUV(uvPair[0], pu=pivU, pv=pivV, su=1, sv=scale)
-            cmds.polyEditUV(uvPair[1], pu=pivU, pv=pivV, su=1, sv=scale)
-
-        elif mode == "v_max":
-            currentTexel = vLength / geoLength * mapsize
-            scale = target_texel / currentTexel
-            pivU = 0
-            pivV = max(uv1[1], uv2[1])
-            cmds.polyEditUV(uvPair[0], pu=pivU, pv=pivV, su=1, sv=scale)
-            cmds.polyEditUV(uvPair[1], pu=pivU, pv=pivV, su=1, sv=scale)
-
-        else:
-            print(MSG_NOT_IMPLEMENTED)
-            currentTexel = uvLength / geoLength * mapsize
-            scale = target_texel / currentTexel
-            cmds.polyEditUV(uvPair[0], pu=uv1[0], pv=uv1[1], su=scale, sv=scale)
-            cmds.polyEditUV(uvPair[1], pu=uv1[0], pv=uv1[1], su=scale, sv=scale)
+    uvtexel.set_edge_texel(target_texel=target_texel, mapsize=mapsize, mode=mode, components=cmds.ls(os=True))
 
 
 @nd.repeatable
@@ -668,7 +518,7 @@ def orient_shells():
 
 @nd.repeatable
 def symmetry_arrange():
-    pass
+    arrange_uvshell_symmetrically.arrange_uvshell_symmetrically()
 
 
 @nd.repeatable
@@ -945,6 +795,7 @@ class NN_ToolWindow(object):
         ui.button(label='Set', c=self.onSetTexel)
         ui.button(label='U', c=self.onSetEdgeTexelUMin, dgc=self.onSetEdgeTexelUMax, bgc=ui.color_u, annotation="L: base on Min\nM: base on Max")
         ui.button(label='V', c=self.onSetEdgeTexelVMin, dgc=self.onSetEdgeTexelVMax, bgc=ui.color_v, annotation="L: base on Min\nM: base on Max")
+        ui.button(label='Stats', c=self.onTexelStatistics, annotation="print texel density per shell")
         ui.end_layout()
 
         ui.row_layout()
@@ -1198,6 +1049,11 @@ class NN_ToolWindow(object):
         mapsize = ui.get_value(self.mapSize)
         get_texel(eb_texel=self.texel, mapsize=mapsize)
 
+    def onTexelStatistics(self, *args):
+        """選択メッシュのシェル毎のテクセル密度を出力する"""
+        mapsize = ui.get_value(self.mapSize)
+        uvtexel.print_texel_statistics(mapsize=mapsize)
+
     @nd.undo_chunk
     def onSetTexel(self, *args):
         """
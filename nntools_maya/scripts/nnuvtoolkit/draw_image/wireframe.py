@@ -0,0 +1,365 @@
+"""
+UV ワイヤーフレームの書き出し
+
+メッシュ毎に getAssignedUVs と getUVs で UV エッジを一括取得し､
+フェース間で共有される UV エッジは UV ID の小さい方から大きい方へ向かう側のフェースでだけ出力し､
+逆向きの半エッジが無い UV 境界のエッジは常に出力する｡
+エッジはジェネレーターで一本ずつ流し､ SVG はパスデータをファイルに直接書き込み､
+画像 (PNG/BMP) は一定本数毎に nnutil.image のバッファに描画する｡
+境界判定用に UV 毎の次の UV ID を整数配列で持つ以外は､エッジ数に比例したオブジェクトを保持しない｡
+シェル毎の色分けと UDIM タイル毎のファイル分割ができる｡
+"""
+import array
+import colorsys
+import math
+import os
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import nnutil.image as nimg
+
+
+# 出力形式
+FORMAT_SVG = "svg"
+FORMAT_PNG = "png"
+FORMAT_BMP = "bmp"
+
+# ファイル名の UDIM タイル番号に置き換える文字列
+UDIM_TOKEN = "<UDIM>"
+
+# 画像に一度に描画するエッジ数
+default_batch_size = 4096
+
+# SVG の 1 パスあたりのエッジ数
+svg_segments_per_path = 1024
+
+
+def shell_color(mesh_index, shell_id):
+    """メッシュとシェルの番号から決まる色 (r, g, b, a)｡ 隣り合う番号の色相が離れるように黄金比で回す"""
+    hue = ((mesh_index * 7919 + shell_id) * 0.618033988749895) % 1.0
+    r, g, b = colorsys.hsv_to_rgb(hue, 0.75, 0.9)
+
+    return (int(r * 255), int(g * 255), int(b * 255), 255)
+
+
+def _tile_index(c):
+    # タイル境界上の座標は下側のタイルに含める (0.0 から 1.0 までがタイル 0)
+    f = int(math.floor(c))
+
+    return f - 1 if f == c and f > 0 else f
+
+
+def udim_of(u, v):
+    """UV 座標の UDIM タイル番号"""
+    return 1001 + _tile_index(u) + 10 * _tile_index(v)
+
+
+def _uv_successors(uv_counts, uv_ids, num_uvs):
+    """フェースの巡回順で各 UV の次に来る UV ID の一覧を CSR 形式で作る
+
+    Returns:
+        tuple[array.array, array.array]: (offsets, successors)｡ UV a の次の UV は successors[offsets[a]:offsets[a + 1]]
+    """
+    offsets = array.array("i", bytes(4 * (num_uvs + 1)))
+
+    for a in uv_ids:
+        offsets[a + 1] += 1
+
+    for i in range(num_uvs):
+        offsets[i + 1] += offsets[i]
+
+    successors = array.array("i", bytes(4 * len(uv_ids)))
+    filled = array.array("i", offsets[:-1])
+    uv_offset = 0
+
+    for count in uv_counts:
+        for k in range(count):
+            a = uv_ids[uv_offset + k]
+            successors[filled[a]] = uv_ids[uv_offset + (k + 1) % count]
+            filled[a] += 1
+
+        uv_offset += count
+
+    return offsets, successors
+
+
+def iter_uv_edges(shape, vertex_pairs=None, with_shells=False):
+    """メッシュの重複の無い UV エッジを順に返すジェネレーター
+
+    Args:
+        shape (str): メッシュのシェイプ名もしくはトランスフォーム名
+        vertex_pairs (set[int], optional): 対象にするエッジの頂点ペアのキー (edge_key) の集合｡ 省略時は全エッジ
+        with_shells (bool, optional): True でシェル ID も返す. Defaults to False.
+
+    Yields:
+        tuple[float, float, float, float, int]: (u1, v1, u2, v2, shell_id)｡ with_shells=False の場合 shell_id は 0
+    """
+    sel = om.MSelectionList()
+    sel.add(shape)
+    dag = sel.getDagPath(0)
+    dag.extendToShape()
+    fn_mesh = om.MFnMesh(dag)
+
+    if not fn_mesh.getUVSetNames():
+        return
+
+    uv_set = fn_mesh.currentUVSetName()
+    us, vs = fn_mesh.getUVs(uv_set)
+    uv_counts, uv_ids = fn_mesh.getAssignedUVs(uv_set)
+    shell_ids = fn_mesh.getUvShellsIds(uv_set)[1] if with_shells else None
+
+    if vertex_pairs is not None:
+        vertex_counts, vertex_ids = fn_mesh.getVertices()
+        num_vertices = fn_mesh.numVertices
+
+    offsets, successors = _uv_successors(uv_counts, uv_ids, len(us))
+    uv_offset = 0
+    vertex_offset = 0
+
+    for fi, count in enumerate(uv_counts):
+        for k in range(count):
+            a = uv_ids[uv_offset + k]
+            b = uv_ids[uv_offset + (k + 1) % count]
+
+            # 共有エッジは a < b の側でだけ出力し､逆向きの半エッジが無い境界エッジは常に出力する
+            if a >= b and a in successors[offsets[b]:offsets[b + 1]]:
+                continue
+
+            if vertex_pairs is not None:
+                va = vertex_ids[vertex_offset + k]
+                vb = vertex_ids[vertex_offset + (k + 1) % count]
+
+                if edge_key(va, vb, num_vertices) not in vertex_pairs:
+                    continue
+
+            yield us[a], vs[a], us[b], vs[b], shell_ids[a] if with_shells else 0
+
+        uv_offset += count
+
+        if vertex_pairs is not None:
+            vertex_offset += vertex_counts[fi]
+
+
+def edge_key(va, vb, num_vertices):
+    """頂点ペアの整数キー"""
+    return va * num_vertices + vb if va < vb else vb * num_vertices + va
+
+
+def _targets_to_shapes(targets):
+    """対象をシェイプ名から選択エッジの頂点ペアのキー集合 (オブジェクト指定なら None) への辞書にする"""
+    shapes = dict()
+    objects = [x for x in targets if "." not in x]
+    components = [x for x in targets if "." in x]
+
+    for obj in objects:
+        sel = om.MSelectionList()
+        sel.add(obj)
+        dag = sel.getDagPath(0)
+        dag.extendToShape()
+
+        if dag.hasFn(om.MFn.kMesh):
+            shapes[dag.partialPathName()] = None
+
+    if components:
+        sel = om.MSelectionList()
+        for comp in cmds.polyListComponentConversion(components, toEdge=True) or []:
+            sel.add(comp)
+
+        for i in range(sel.length()):
+            dag, comp = sel.getComponent(i)
+            dag.extendToShape()
+            shape = dag.partialPathName()
+
+            if shape in shapes and shapes[shape] is None:
+                continue
+
+            fn_mesh = om.MFnMesh(dag)
+            num_vertices = fn_mesh.numVertices
+            pairs = shapes.setdefault(shape, set())
+
+            for ei in om.MFnSingleIndexedComponent(comp).getElements():
+                va, vb = fn_mesh.getEdgeVertices(ei)
+                pairs.add(edge_key(va, vb, num_vertices))
+
+    return shapes
+
+
+class SvgWriter(object):
+    """パスデータを直接ファイルに書き込む SVG の出力
+
+    Args:
+        filepath (str): 出力先
+        size (int): 画像サイズ (ピクセル)
+        stroke_width (float): 線の太さ
+        integer_mode (bool, optional): True で上下反転後の座標の端数を切り捨てる. Defaults to False.
+    """
+    def __init__(self, filepath, size, stroke_width=1, integer_mode=False):
+        self.filepath = filepath
+        self.size = size
+        self.stroke_width = stroke_width
+        self.integer_mode = integer_mode
+        self.f = open(filepath, "w")
+        self.f.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        self.f.write('<svg baseProfile="full" height="%d" version="1.1" width="%d" xmlns="http://www.w3.org/2000/svg">\n' % (size, size))
+        self._color = None
+        self._count = 0
+
+    def _close_path(self):
+        if self._color is not None:
+            self.f.write('" />\n')
+            self._color = None
+            self._count = 0
+
+    def add(self, x1, y1, x2, y2, color):
+        if color != self._color or self._count >= svg_segments_per_path:
+            self._close_path()
+            self.f.write('<path fill="none" stroke="rgb(%d,%d,%d)" stroke-opacity="%g" stroke-width="%g" d="' % (color[0], color[1], color[2], color[3] / 255.0, self.stroke_width))
+            self._color = color
+
+        # SVG は y 軸が下向きなので上下反転する
+        y1 = self.size - y1
+        y2 = self.size - y2
+
+        # 整数座標モードは反転後の座標を切り捨てる
+        if self.integer_mode:
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+        self.f.write("M%g %gL%g %g" % (x1, y1, x2, y2))
+        self._count += 1
+
+    def close(self):
+        self._close_path()
+        self.f.write("</svg>\n")
+        self.f.close()
+
+
+class RasterWriter(object):
+    """一定本数毎にエッジを画像に描画し､最後に PNG か BMP で保存する出力
+
+    Args:
+        filepath (str): 出力先
+        size (int): 画像サイズ (ピクセル)
+        file_format (str): FORMAT_PNG か FORMAT_BMP
+        batch_size (int, optional): 一度に描画するエッジ数. Defaults to default_batch_size.
+        integer_mode (bool, optional): True で座標の端数を切り捨てる. Defaults to False.
+    """
+    def __init__(self, filepath, size, file_format=FORMAT_PNG, batch_size=default_batch_size, integer_mode=False):
+        self.filepath = filepath
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.integer_mode = integer_mode
+        self.image = nimg.Image(size, size, 0, 0, 0, 0)
+        self._batches = dict()
+
+    def add(self, x1, y1, x2, y2, color):
+        # 画像は y 軸が上向きなので反転せずに切り捨てる
+        if self.integer_mode:
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+        batch = self._batches.setdefault(color, [])
+        batch.append((x1, y1, x2, y2))
+
+        if len(batch) >= self.batch_size:
+            self._flush(color)
+
+    def _flush(self, color):
+        nimg.draw_lines(self.image, self._batches.pop(color, []), color)
+
+    def close(self):
+        for color in list(self._batches):
+            self._flush(color)
+
+        if self.file_format == FORMAT_BMP:
+            self.image.save_bmp(self.filepath)
+        else:
+            self.image.save_png(self.filepath)
+
+
+def _format_of(filepath):
+    ext = os.path.splitext(filepath)[1].lower().lstrip(".")
+
+    return ext if ext in (FORMAT_SVG, FORMAT_PNG, FORMAT_BMP) else FORMAT_SVG
+
+
+def _tile_path(filepath, tile):
+    if UDIM_TOKEN in filepath:
+        return filepath.replace(UDIM_TOKEN, str(tile))
+
+    root, ext = os.path.splitext(filepath)
+
+    return "%s.%d%s" % (root, tile, ext)
+
+
+def export_uv_wireframe(filepath, targets=None, image_size=4096, stroke_width=1, integer_mode=False, normalize=True, shell_colors=False, udim=False, color=(0, 0, 0, 255), batch_size=default_batch_size):
+    """UV ワイヤーフレームを SVG もしくは画像で書き出す
+
+    Args:
+        filepath (str): 出力先｡ 拡張子 (.svg/.png/.bmp) で形式を決める｡ udim=True なら <UDIM> をタイル番号に置き換える (無ければ拡張子の前に付ける)
+        targets (list[str], optional): オブジェクトかコンポーネント｡ オブジェクトなら全エッジ､コンポーネントならエッジに変換したもの｡ 省略時は選択
+        image_size (int, optional): 画像サイズ (ピクセル). Defaults to 4096.
+        stroke_width (float, optional): SVG の線の太さ. Defaults to 1.
+        integer_mode (bool, optional): True で UV 座標をピクセル変換後に端数を切り捨てる. Defaults to False.
+        normalize (bool, optional): True なら UV 座標を [0, 1) に納める｡ udim=True の場合はタイル内の座標になる. Defaults to True.
+        shell_colors (bool, optional): True で UV シェル毎に色を変える. Defaults to False.
+        udim (bool, optional): True で UDIM タイル毎にファイルを分ける｡ エッジは中点のタイルに含める. Defaults to False.
+        color (tuple[int, int, int, int], optional): shell_colors=False の場合の線の色. Defaults to (0, 0, 0, 255).
+        batch_size (int, optional): 画像に一度に描画するエッジ数. Defaults to default_batch_size.
+
+    Returns:
+        dict[int, str]: タイル番号 (udim=False なら 1001) から出力したファイルパスへの辞書
+    """
+    targets = targets or cmds.ls(selection=True)
+
+    if not targets:
+        return dict()
+
+    file_format = _format_of(filepath)
+    color = tuple(color)
+    writers = dict()
+
+    def writer_of(tile):
+        if tile not in writers:
+            path = _tile_path(filepath, tile) if udim else filepath
+
+            if file_format == FORMAT_SVG:
+                writers[tile] = SvgWriter(path, image_size, stroke_width, integer_mode)
+            else:
+                writers[tile] = RasterWriter(path, image_size, file_format, batch_size, integer_mode)
+
+        return writers[tile]
+
+    try:
+        for mesh_index, (shape, vertex_pairs) in enumerate(_targets_to_shapes(targets).items()):
+            for u1, v1, u2, v2, shell_id in iter_uv_edges(shape, vertex_pairs, with_shells=shell_colors):
+                tile = 1001
+
+                if udim:
+                    tile = udim_of((u1 + u2) * 0.5, (v1 + v2) * 0.5)
+                    tu = (tile - 1001) % 10
+                    tv = (tile - 1001) // 10
+
+                    if normalize:
+                        u1 -= tu
+                        u2 -= tu
+                        v1 -= tv
+                        v2 -= tv
+
+                elif normalize:
+                    u1 %= 1.0
+                    v1 %= 1.0
+                    u2 %= 1.0
+                    v2 %= 1.0
+
+                x1 = u1 * image_size
+                y1 = v1 * image_size
+                x2 = u2 * image_size
+                y2 = v2 * image_size
+
+                writer_of(tile).add(x1, y1, x2, y2, shell_color(mesh_index, shell_id) if shell_colors else color)
+
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return dict((tile, writer.filepath) for tile, writer in writers.items())
@@ -1,349 +1,333 @@
 import math
-import re
-import random
 
 import maya.cmds as cmds
-import maya.mel as mel
 import maya.api.OpenMaya as om
 
+import nnutil.uv as nuv
+import plugin_util.snapshotState as ss
 
-def get_uv_borders(objects):
-    """指定したオブジェクトやコンポーネントからUVボーダーとなっているエッジを返す
+from . import unfold
 
-    Args:
-        objects (str): オブジェクト名やコンポーネント名を表す文字列
 
-    Returns:
-        list[str]: ボーダーエッジを表す文字列のリスト
-    """
-    if not objects:
-        return None
-    
-    edges = cmds.ls(cmds.polyListComponentConversion(objects, te=True), flatten=True)
-    
-    if not edges:
-        return []
-        
-    uv_border_edges = []
-    for edge in edges:
-        edge_uvs = cmds.ls(cmds.polyListComponentConversion(edge, tuv=True), flatten=True)
-        edge_faces = cmds.ls(cmds.polyListComponentConversion(edge, tf=True), flatten=True)
-        
-        if len(edge_uvs) > 2:  # UV ボーダー
-            uv_border_edges.append(edge)
-            
-        elif len(edge_faces) == 1:  # メッシュボーダー
-            uv_border_edges.append(edge)
-    
-    return uv_border_edges
-
-
-def get_edge_length(edges):
-    """指定したエッジのリストから各エッジの長さのリストを返す.
+# 各辺の名前｡ 最初のコーナーから UV ボーダーを辿った順
+SIDES = ["left", "top", "right", "bottom"]
+
+
+class MeshUVIndex(object):
+    """メッシュ一つ分の UV シェルとボーダーの索引
+
+    フェース頂点の UV 割り当てを一度走査して､シェル毎のフェースと UV ボーダーの接続を作る｡
+    UV 座標は mesh_uv.us, mesh_uv.vs を直接編集し､ write で書き戻す｡
 
     Args:
-        edges (list[str]): エッジを表す文字列のリスト
+        mesh_uv (MeshUV): UV の読み書きバッファ
+    """
+    def __init__(self, mesh_uv):
+        self.mesh_uv = mesh_uv
+        self.points = mesh_uv.points()
+        self.uv_to_vertex = mesh_uv.uv_to_vertex()
+        self.shell_faces = dict()  # シェル ID -> [(フェース ID, UV ID リスト, 頂点 ID リスト)]
+        self.border_prev = dict()  # ボーダー UV -> フェースの巡回と逆向きに隣接するボーダー UV
+
+        edge_to_half_edges = dict()
+
+        for face in mesh_uv.face_uv_ids():
+            uv_ids = face[1]
+            self.shell_faces.setdefault(mesh_uv.shell_ids[uv_ids[0]], []).append(face)
+
+            for i, a in enumerate(uv_ids):
+                b = uv_ids[(i + 1) % len(uv_ids)]
+                edge_to_half_edges.setdefault((min(a, b), max(a, b)), []).append((a, b))
+
+        # 一つのフェースにしか使われていない UV エッジが UV ボーダー (UV シームもしくはメッシュボーダー)
+        for half_edges in edge_to_half_edges.values():
+            if len(half_edges) == 1:
+                a, b = half_edges[0]
+                self.border_prev[b] = a
+
+    def border_loop(self, start_uv):
+        """start_uv からフェースの巡回と逆向きにボーダーを辿った UV ID のリスト (閉じていない)
+
+        逆向きに辿ると left, top, right, bottom の順に配置した時にフェースが表になる｡
+        """
+        loop = [start_uv]
+        current = start_uv
+
+        while len(loop) <= len(self.border_prev):
+            current = self.border_prev.get(current)
+
+            if current is None or current == start_uv:
+                break
+
+            loop.append(current)
+
+        return loop
+
+    def is_border(self, uv_id):
+        return uv_id in self.border_prev
+
+    def write(self):
+        """UV 座標を一度の setUVs で書き戻す"""
+        with ss.snapshot_state(targets=[self.mesh_uv.shape], uv=True):
+            self.mesh_uv.write()
+
+
+def arc_length_params(points, vertex_ids):
+    """頂点列の累積長を全長で正規化したリストと全長を返す
 
     Returns:
-        list[float]: エッジの長さのリスト
+        tuple[list[float], float]: 先頭 0.0 末尾 1.0 の位置のリストと全長｡ 全長が 0 なら等間隔
     """
-    if not edges:
-     return []
+    lengths = [0.0]
 
-    lengths = []
+    for a, b in zip(vertex_ids[:-1], vertex_ids[1:]):
+        lengths.append(lengths[-1] + math.sqrt(sum((q - p) ** 2 for p, q in zip(points[a], points[b]))))
 
-    for edge in edges:
-        v1, v2 = cmds.filterExpand(cmds.polyListComponentConversion(edge, tv=True), sm=31)
-        p1 = cmds.xform(v1, q=True, translation=True)
-        p2 = cmds.xform(v2, q=True, translation=True)
-        length = math.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2 + (p2[2]-p1[2])**2)
-        lengths.append(length)
+    total = lengths[-1]
 
-    return lengths       
+    if total == 0:
+        return [float(i) / max(len(lengths) - 1, 1) for i in range(len(lengths))], 0.0
 
+    return [x / total for x in lengths], total
 
-def sort_uvs_by_connectivity(uvs, first_uv, allowed_edges):
-    """ [cmds] 指定した点から順にエッジたどって末尾まで到達する頂点の列を返す
 
-    Args:
-        edges(list[str]): エッジを表すcmdsコンポーネント文字列のリスト
-        first_vtx (str): 頂点を表すcmdsコンポーネント文字列
-        allowed_edges (list[str]): 接続されていると見なすエッジを表す文字列のリスト
+def signed_uv_area(us, vs, uv_ids):
+    """フェースの頂点順で見た UV 空間での符号付き面積｡ 正なら表"""
+    area = 0.0
 
-    Returns:
-        list[str]: 頂点を表すcmdsコンポーネント文字列のリスト
+    for i, a in enumerate(uv_ids):
+        b = uv_ids[(i + 1) % len(uv_ids)]
+        area += us[a] * vs[b] - us[b] * vs[a]
+
+    return area / 2.0
 
+
+class RectilinearShell(object):
+    """一つの UV シェルを四隅のコーナーで長方形に並べる処理
+
+    Args:
+        index (MeshUVIndex): シェルを含むメッシュの索引
+        corner_uvs (list[int]): コーナーの UV ID｡ 先頭のコーナーから辺を辿る
     """
-    def get_next_uv(current_uv, uv_list, allowed_edges):
-        connected_faces = cmds.filterExpand(cmds.polyListComponentConversion(current_uv, tf=True), sm=34)  # current_uv を含むフェース
-        connected_edges = cmds.filterExpand(cmds.polyListComponentConversion(current_uv, te=True), sm=32)  # current_uv を含むエッジ
-        connected_edges = set(connected_edges) & set(allowed_edges)  # 許可されたエッジ以外は接続性の確認に使用しない
-        connected_face_uvs = set(cmds.filterExpand(cmds.polyListComponentConversion(connected_faces, tuv=True), sm=35)) - set(current_uv)  # 接続フェースに含まれる全UV
-        connected_edge_uvs = set(cmds.filterExpand(cmds.polyListComponentConversion(connected_edges, tuv=True), sm=35)) - set(current_uv)  # 接続エッジに含まれる全UV
-        neighbor_uvs = connected_face_uvs & connected_edge_uvs & set(uv_list)  # フェースに含まれる全UV のうち uv_list に含まれるもの
-
-        if neighbor_uvs:
-            return list(neighbor_uvs)[0]
-        
+    def __init__(self, index, corner_uvs):
+        self.index = index
+        self.shell_id = index.mesh_uv.shell_ids[corner_uvs[0]]
+        self.uvs = index.mesh_uv.shell_uvs()[self.shell_id]
+        self.inner_uvs = [x for x in self.uvs if not index.is_border(x)]
+        self.faces = index.shell_faces.get(self.shell_id, [])
+        self.loop = index.border_loop(corner_uvs[0])
+        self.corners = [x for x in self.loop if x in corner_uvs]
+        self.flipped = False
+        self.original_center = self.center()
+
+    @property
+    def valid(self):
+        """4 つのコーナーが全て同じボーダー上にあるか"""
+        return len(self.corners) == 4
+
+    def center(self):
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+
+        return (sum(us[x] for x in self.uvs) / len(self.uvs), sum(vs[x] for x in self.uvs) / len(self.uvs))
+
+    def scale(self, su, sv):
+        """原点を基準にシェルをスケールする"""
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+
+        for uvi in self.uvs:
+            us[uvi] *= su
+            vs[uvi] *= sv
+
+    def place_border(self):
+        """各辺の UV を 3D の弧長に比例させて配置し､長い方の辺の比で縦横比を合わせる"""
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+        closed = self.loop + [self.loop[0]]
+        corner_positions = [closed.index(x) for x in self.corners] + [len(closed) - 1]
+        total_lengths = dict()
+
+        for i, side in enumerate(SIDES):
+            side_uvs = closed[corner_positions[i]:corner_positions[i + 1] + 1]
+            params, total_lengths[side] = arc_length_params(self.index.points, [self.index.uv_to_vertex[x] for x in side_uvs])
+
+            for uvi, position in zip(side_uvs, params):
+                if side == "left":
+                    us[uvi], vs[uvi] = 0.0, position
+                elif side == "top":
+                    us[uvi], vs[uvi] = position, 1.0
+                elif side == "right":
+                    us[uvi], vs[uvi] = 1.0, 1.0 - position
+                else:
+                    us[uvi], vs[uvi] = 1.0 - position, 0.0
+
+        u_max_length = max(total_lengths["top"], total_lengths["bottom"])
+        v_max_length = max(total_lengths["left"], total_lengths["right"])
+
+        if u_max_length > v_max_length > 0:
+            self.scale(u_max_length / v_max_length, 1.0)
+        elif v_max_length > u_max_length > 0:
+            self.scale(1.0, v_max_length / u_max_length)
+
+    def unfold_interior(self, mode=unfold.MODE_HARMONIC):
+        """ボーダーを固定して内部 UV を展開する"""
+        if not self.inner_uvs:
+            return
+
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+        local_ids = dict((uvi, i) for i, uvi in enumerate(self.uvs))
+        points = [self.index.points[self.index.uv_to_vertex[x]] for x in self.uvs]
+        triangles = unfold.triangulate([[local_ids[x] for x in face[1]] for face in self.faces])
+        fixed = dict((local_ids[x], (us[x], vs[x])) for x in self.uvs if self.index.is_border(x))
+        initial = [(us[x], vs[x]) for x in self.uvs]
+
+        for uvi, (u, v) in zip(self.uvs, unfold.solve(triangles, points, fixed, mode=mode, initial=initial)):
+            us[uvi] = u
+            vs[uvi] = v
+
+    def fix_facing(self):
+        """UV 空間でのシェルの符号付き面積が負なら U 方向に反転する
+
+        Returns:
+            bool: 反転したか
+        """
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+        area = sum(signed_uv_area(us, vs, face[1]) for face in self.faces)
+        self.flipped = area < 0
+
+        if self.flipped:
+            self.scale(-1.0, 1.0)
+
+        return self.flipped
+
+    def set_texel_density(self, target_texel, map_size):
+        """UV 面積と 3D 面積の比から求めたテクセル密度が target_texel になるようにスケールする"""
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+        points = self.index.points
+        uv_area = sum(abs(signed_uv_area(us, vs, face[1])) for face in self.faces)
+        surface_area = sum(unfold.triangle_area(*[points[x] for x in triangle]) for triangle in unfold.triangulate([face[2] for face in self.faces]))
+
+        scale = unfold.texel_scale(uv_area, surface_area, target_texel, map_size)
+        self.scale(scale, scale)
+
+    def direction(self, uv_a, uv_b):
+        """2 つの UV に対応する頂点を結ぶ 3D の単位ベクトル"""
+        p1 = self.index.points[self.index.uv_to_vertex[uv_a]]
+        p2 = self.index.points[self.index.uv_to_vertex[uv_b]]
+
+        return om.MVector([b - a for a, b in zip(p1, p2)]).normal()
+
+    def restore_center_and_orient(self):
+        """元の中心に戻し､ V 方向がワールド Y 軸に近くなるようにシェルを 90 度単位で回転する"""
+        us = self.index.mesh_uv.us
+        vs = self.index.mesh_uv.vs
+        cu, cv = self.original_center
+        current_u, current_v = self.center()
+
+        # UV スペースで上を向いている left の辺と右を向いている bottom の辺 (裏表フリップ前の右) の 3D 空間での方向
+        y_vector = self.direction(self.loop[0], self.loop[1])
+        x_vector = self.direction(self.loop[0], self.loop[-1])
+
+        if self.flipped:
+            x_vector *= -1
+
+        y_axis = om.MVector((0, 1, 0))
+        y_dot_y = y_vector * y_axis
+        x_dot_y = x_vector * y_axis
+
+        if y_dot_y <= -0.5:
+            angle = 180
+        elif y_dot_y < 0.5:
+            angle = math.copysign(90, x_dot_y)
         else:
-            return []
-        
-    sorted_uvs = [first_uv]  # ソート済みUV
-    rest_uvs = uvs.copy()  # 未処理UV
-    rest_uvs.remove(first_uv)
-    current_uv = first_uv
-
-    while rest_uvs:
-        next_uv = get_next_uv(current_uv=current_uv, uv_list=rest_uvs, allowed_edges=allowed_edges)
-        
-        if not next_uv:
-            break
-        
-        sorted_uvs.append(next_uv)
-        rest_uvs.remove(next_uv)
-        current_uv = next_uv
-    
-    return sorted_uvs
-
-
-def length_each_vertices(vtx_comps):
-    """ 頂点間の距離をリストで返す
-
-    戻り値リストの n 番目は vertices[n] と vertices[n+1] の距離
+            angle = 0
+
+        cos = round(math.cos(math.radians(angle)))
+        sin = round(math.sin(math.radians(angle)))
+
+        for uvi in self.uvs:
+            du = us[uvi] - current_u
+            dv = vs[uvi] - current_v
+            us[uvi] = cu + du * cos - dv * sin
+            vs[uvi] = cv + du * sin + dv * cos
+
+
+def group_corners_by_shell(uv_comps):
+    """UV コンポーネントをメッシュとシェル毎のコーナー UV ID にまとめる
 
     Args:
-        vtx_comps (list[str]):
+        uv_comps (list[str]): UV コンポーネント
 
     Returns:
-        list[float]:
-
+        list[tuple[MeshUVIndex, list[list[int]]]]: メッシュの索引とシェル毎のコーナー UV ID のリストの組
     """
-    length_list = []
-
-    for i in range(len(vtx_comps)-1):
-        coord1 = cmds.xform(vtx_comps[i], q=True, translation=True, ws=True)
-        coord2 = cmds.xform(vtx_comps[i+1], q=True, translation=True, ws=True)
-        p1 = om.MVector(coord1)
-        p2 = om.MVector(coord2)
-        length_list.append((p2 - p1).length())
-
-    return length_list
-
-
-def is_frontfacing_uvshell(face):
-    fi = int(re.search(r"\[(\d+)\]", face).group(1))
-    vtx = cmds.filterExpand(cmds.polyListComponentConversion(face, tv=True), sm=31)[0]
-    vi = int(re.search(r"\[(\d+)\]", vtx).group(1))
-        
-    obj_name = cmds.polyListComponentConversion(face)[0]
-    slist = om.MGlobal.getSelectionListByName(obj_name)
-    dagpath = slist.getDagPath(0)
-    fn_mesh = om.MFnMesh(dagpath)
-
-    normal = fn_mesh.getFaceVertexNormal(fi, vi)
-    tangent = fn_mesh.getFaceVertexTangent(fi, vi)
-    binormal = fn_mesh.getFaceVertexBinormal(fi, vi)
-
-    if (tangent ^ binormal) * normal  < 0:
-        return False
-    
-    else:
-        return True
-    
-def get_average_uv(uvs):
-    uv_coords =cmds.polyEditUV(uvs, q=True, u=True, v=True)
-    avg_u = sum([uv_coords[i] for i in range(0, len(uv_coords), 2)]) / len(uv_coords) * 2
-    avg_v = sum([uv_coords[i] for i in range(1, len(uv_coords), 2)]) / len(uv_coords) * 2
-
-    return (avg_u, avg_v)
-
-
-def rectilinearize_uvshell(corner_uv_comps, target_texel=15, map_size=1024):
-    if not corner_uv_comps:
-        return None
-    
-    if len(corner_uv_comps) != 4:
-        return None
-    
-    # 選択の保持
-    current_selections = cmds.ls(selection=True, flatten=True)
-
-    # シェル UV とそのボーダーエッジ
-    shell_uvs = cmds.filterExpand(cmds.polyListComponentConversion(corner_uv_comps[0], tuv=True, uvShell=True),  sm=35)
-    border_edges = get_uv_borders(shell_uvs)
-    border_uvs = cmds.filterExpand(cmds.polyListComponentConversion(border_edges, tuv=True), sm=35)
-
-    # トポロジーの接続順にソートしたUV
-    sorted_uvs = sort_uvs_by_connectivity(border_uvs, corner_uv_comps[0], border_edges)
-    sorted_uvs.append(sorted_uvs[0])
-
-    # sorted_uvs のコーナーを指すインデックス
-    corner_indices = [i for i, x in enumerate(sorted_uvs) if x in corner_uv_comps]
-    corner_indices.append(len(sorted_uvs))
-
-    # 各辺を構成するUVのリストのリスト
-    all_sides_uvs = []
-
-    for i in range(len(corner_uv_comps)):
-        begin_index = corner_indices[i]
-        end_index = corner_indices[i+1] + 1
-        all_sides_uvs.append(sorted_uvs[begin_index:end_index])
-
-    inner_uvs = set(shell_uvs) - set(border_uvs)
-
-    total_lengths = dict()
-
-    # UV修正前の中心を保持
-    original_uv_center = get_average_uv(shell_uvs)
-
-    # UV の再配置
-    # 各辺の UV の比率がジオメトリに比例した状態の [0, 1] 正方形を作る
-    for i, one_side_uvs in enumerate(all_sides_uvs):
-        one_side_vertices = [cmds.polyListComponentConversion(x, tv=True)[0] for x in one_side_uvs]
-        lengths = length_each_vertices(one_side_vertices)
-        total_length = sum(lengths)
-        side = ["left", "top", "right", "bottom"][i]
-        total_lengths[side] = total_length
-
-        for j in range(len(one_side_uvs)):
-            position = sum(lengths[0:j]) / total_length
-            u = 0.0
-            v = 0.0
-
-            if side == "left":
-                u = 0.0
-                v = position
-            if side == "top":
-                u = position
-                v = 1.0
-            if side == "right":
-                u = 1.0
-                v = 1.0 - position
-            if side == "bottom":
-                u = 1.0 - position
-                v = 0.0
-            else:
-                pass
-
-            
-            cmds.polyEditUV(one_side_uvs[j], u=u, v=v, relative=False)
-
-    # 縦横比の調整
-    u_max_length = max(total_lengths["top"], total_lengths["bottom"])
-    v_max_length = max(total_lengths["left"], total_lengths["right"])
-    u_scale = 1.0
-    v_scale = 1.0
-
-    if u_max_length > v_max_length:
-        u_scale = u_max_length / v_max_length
-    elif  v_max_length > u_max_length:    
-        v_scale = v_max_length / u_max_length
-    else:
-        pass
-
-    cmds.polyEditUV(shell_uvs, su=u_scale, sv=v_scale)
-
-    # 内部の unfold
-    if inner_uvs:
-        cmds.u3dUnfold(inner_uvs, ite=1, p=0, bi=1, tf=1, ms=1024, rs=0)
-
-    # 裏表の修正
-    all_faces = cmds.filterExpand(cmds.polyListComponentConversion(shell_uvs, tf=True), sm=34)
-    sample_count = min(len(all_faces), 10)
-    representative_faces = random.sample(all_faces, sample_count)
-    front_face_count = len([x for x in representative_faces if is_frontfacing_uvshell(x)])
-    is_flip = front_face_count < sample_count/2
-
-    if is_flip:
-        cmds.polyEditUV(shell_uvs, su=-1)
-    
-    # 内部の optimize
-    if inner_uvs:
-        cmds.u3dOptimize(inner_uvs, ite=1, pow=1, sa=1, bi=0, tf=1, ms=1024, rs=0)
-
-    cmds.select(shell_uvs)
-    mel.eval("texSetTexelDensity %s %s" % (target_texel, map_size))
-
-    # 中心合わせ
-    current_uv_center = get_average_uv(shell_uvs)
-    offset_u, offset_v = [original - current for original, current in zip(original_uv_center, current_uv_center)]
-    cmds.polyEditUV(shell_uvs, u=offset_u, v=offset_v)
-
-    # シェルの方向修正
-
-    # UVスペースで上を向いているエッジの3D空間での方向ベクトル
-    v1 = cmds.polyListComponentConversion(sorted_uvs[0], tv=True)[0]
-    v2 = cmds.polyListComponentConversion(sorted_uvs[1], tv=True)[0]
-    p1 = cmds.xform(v1, q=True, translation=True, ws=True)
-    p2 = cmds.xform(v2, q=True, translation=True, ws=True)
-    y_vector = om.MVector([b - a for a, b in zip(p1, p2)])
-    y_vector.normalize()
-
-    # UVスペースで右を向いているエッジの3D空間での方向ベクトル (裏表フリップ前の右)
-    v1 = cmds.polyListComponentConversion(sorted_uvs[-1], tv=True)[0]
-    v2 = cmds.polyListComponentConversion(sorted_uvs[-2], tv=True)[0]
-    p1 = cmds.xform(v1, q=True, translation=True, ws=True)
-    p2 = cmds.xform(v2, q=True, translation=True, ws=True)
-    x_vector = om.MVector([b - a for a, b in zip(p1, p2)])
-    x_vector.normalize()
-    if is_flip:
-        x_vector *= -1
-
-    y_axis = om.MVector((0, 1, 0))  # ワールドY軸ベクトル
-
-
-    # ワールドY軸との類似度で UV シェルを近い向きに回転
-    y_dot_y = y_vector * y_axis
-    x_dot_y = x_vector * y_axis
-
-    if -1.0 <= y_dot_y <= -0.5:
-        cmds.polyEditUV(shell_uvs, pu=original_uv_center[0], pv=original_uv_center[1], rotation=True, angle=180)
-
-    elif -0.5 < y_dot_y < 0.5:
-        angle = math.copysign(90, x_dot_y)
-        cmds.polyEditUV(shell_uvs, pu=original_uv_center[0], pv=original_uv_center[1], rotation=True, angle=angle)
-
-    elif 0.5 <= y_dot_y <= 1.0:
-        pass
-
-    else:
-        pass
-
-    # 選択の復帰
-    cmds.select(current_selections)
-
-    return True
-
-
-def split_uvs_each_uv_shell(uvs):
-    """指定したUVリストをUVシェル毎に分割したリストのリストとして返す｡
+    result = []
+
+    for shape, uv_ids in nuv.get_selected_uv_ids(uv_comps).items():
+        index = MeshUVIndex(nuv.MeshUV(shape))
+        shell_to_corners = dict()
+
+        for uvi in sorted(set(uv_ids)):
+            shell_to_corners.setdefault(index.mesh_uv.shell_ids[uvi], []).append(uvi)
+
+        result.append((index, list(shell_to_corners.values())))
+
+    return result
+
+
+def rectilinearize_shells(shell_corners, target_texel=15, map_size=1024, mode=unfold.MODE_HARMONIC):
+    """複数の UV シェルをまとめて長方形に並べる
+
+    全ての処理はメッシュ毎の UV 配列上で行い､メッシュ毎に一度だけ書き戻す｡
 
     Args:
-        uvs (list[str]): UVを表すコンポーネント文字列のリスト
+        shell_corners (list[tuple[MeshUVIndex, list[list[int]]]]): group_corners_by_shell の戻り値
+        target_texel (float, optional): テクセル密度. Defaults to 15.
+        map_size (int, optional): テクスチャサイズ. Defaults to 1024.
+        mode (str, optional): 内部 UV の展開方法 (unfold.MODE_HARMONIC か unfold.MODE_CONFORMAL). Defaults to unfold.MODE_HARMONIC.
 
     Returns:
-        list[list[str]]: UVシェル毎にUVコンポーネント文字列をリストにしたもののリスト
+        list[RectilinearShell]: 処理したシェル｡ コーナーが 4 つでないシェルは含まない
     """
-    shell_id_to_uvs = dict()
+    indices = []
+    shells = []
 
-    for uv in uvs:
-        shell_uvs = cmds.filterExpand(cmds.polyListComponentConversion(uv, tuv=True, uvShell=True), sm=35)
-        shell_id = shell_uvs[0]
+    for index, corner_lists in shell_corners:
+        index_shells = [RectilinearShell(index, x) for x in corner_lists if len(x) == 4]
+        index_shells = [x for x in index_shells if x.valid]
 
-        if shell_id not in shell_id_to_uvs.keys():
-            shell_id_to_uvs[shell_id] = []
+        if index_shells:
+            indices.append(index)
+            shells.extend(index_shells)
 
-        shell_id_to_uvs[shell_id].append(uv)
+    for shell in shells:
+        shell.place_border()
+        shell.unfold_interior(mode)
+        shell.fix_facing()
+        shell.set_texel_density(target_texel, map_size)
+        shell.restore_center_and_orient()
 
-    return shell_id_to_uvs.values()
+    for index in indices:
+        index.write()
 
+    return shells
 
-def main(corner_uv_comps=None, target_texel=15, map_size=1024):
+
+def rectilinearize_uvshell(corner_uv_comps, target_texel=15, map_size=1024, mode=unfold.MODE_HARMONIC):
+    """4 つのコーナー UV を指定して一つの UV シェルを長方形に並べる"""
+    if not corner_uv_comps or len(corner_uv_comps) != 4:
+        return None
+
+    return bool(rectilinearize_shells(group_corners_by_shell(corner_uv_comps), target_texel=target_texel, map_size=map_size, mode=mode))
+
+
+def main(corner_uv_comps=None, target_texel=15, map_size=1024, mode=unfold.MODE_HARMONIC):
 
     if not corner_uv_comps:
         corner_uv_comps = cmds.ls(selection=True, flatten=True)
 
-    uvs_each_uv_shell = split_uvs_each_uv_shell(corner_uv_comps)
-
-    for uvs in uvs_each_uv_shell:
-        rectilinearize_uvshell(uvs, target_texel=target_texel, map_size=map_size)
+    rectilinearize_shells(group_corners_by_shell(corner_uv_comps), target_texel=target_texel, map_size=map_size, mode=mode)
@@ -0,0 +1,372 @@
+"""
+UV エッジのテクセル密度の計測とスケール
+
+メッシュ毎にフェース頂点の UV 割り当てを一度走査して UV エッジ (uv_a, uv_b, vtx_a, vtx_b) の並列リストを作り､
+長さとテクセル密度をリストで計算する｡ スケールは MeshUV の us, vs 上で行い､ setUVs 一回で書き戻す｡
+"""
+import math
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import nnutil.uv as nuv
+import plugin_util.snapshotState as ss
+
+
+# スケールの基準
+MODE_U_MIN = "u_min"
+MODE_U_MAX = "u_max"
+MODE_V_MIN = "v_min"
+MODE_V_MAX = "v_max"
+MODE_UNIFORM = "uv"
+
+# テクセル密度のヒストグラムの分割数
+default_bins = 10
+
+
+class EdgeUVPairs(object):
+    """UV エッジの並列リスト
+
+    i 番目の UV エッジは UV ID (uv_a[i], uv_b[i]) と頂点 ID (vtx_a[i], vtx_b[i]) を結ぶ｡
+
+    Args:
+        mesh_uv (MeshUV): UV の読み書きバッファ
+    """
+    def __init__(self, mesh_uv):
+        self.mesh_uv = mesh_uv
+        self.uv_a = []
+        self.uv_b = []
+        self.vtx_a = []
+        self.vtx_b = []
+
+    def __len__(self):
+        return len(self.uv_a)
+
+    def append(self, uv_a, uv_b, vtx_a, vtx_b):
+        self.uv_a.append(uv_a)
+        self.uv_b.append(uv_b)
+        self.vtx_a.append(vtx_a)
+        self.vtx_b.append(vtx_b)
+
+
+def edge_key(a, b, n):
+    """順序に依らない ID の組の整数キー"""
+    return a * n + b if a < b else b * n + a
+
+
+def collect_edge_uv_pairs(mesh_uv, vertex_pairs=None, uv_ids=None):
+    """フェース頂点の UV 割り当てを一度走査して重複の無い UV エッジを集める
+
+    UV シームのエッジはフェース毎に UV が異なるので 2 つの UV エッジになる｡
+
+    Args:
+        mesh_uv (MeshUV): UV の読み書きバッファ
+        vertex_pairs (set[int], optional): 対象にするエッジの頂点ペアのキー (edge_key)｡ 省略時は全エッジ
+        uv_ids (list[int], optional): 対象にする UV ID｡ 両端がこれに含まれる UV エッジだけを集め､
+            リスト内で先にある UV を uv_a にする｡ 省略時は UV ID の小さい方が uv_a
+
+    Returns:
+        EdgeUVPairs: UV エッジ
+    """
+    pairs = EdgeUVPairs(mesh_uv)
+    num_uvs = mesh_uv.num_uvs
+    num_vertices = mesh_uv.fn_mesh.numVertices
+    order = dict((uvi, i) for i, uvi in enumerate(uv_ids)) if uv_ids is not None else None
+    seen = set()
+
+    for _, face_uvs, face_vertices in mesh_uv.face_uv_ids():
+        count = len(face_uvs)
+
+        for k in range(count):
+            a = face_uvs[k]
+            b = face_uvs[(k + 1) % count]
+            va = face_vertices[k]
+            vb = face_vertices[(k + 1) % count]
+
+            if a == b:
+                continue
+
+            if vertex_pairs is not None and edge_key(va, vb, num_vertices) not in vertex_pairs:
+                continue
+
+            if order is not None:
+                if a not in order or b not in order:
+                    continue
+
+                if order[b] < order[a]:
+                    a, b, va, vb = b, a, vb, va
+
+            elif b < a:
+                a, b, va, vb = b, a, vb, va
+
+            key = edge_key(a, b, num_uvs)
+
+            if key in seen:
+                continue
+
+            seen.add(key)
+            pairs.append(a, b, va, vb)
+
+    return pairs
+
+
+def measure(pairs, points, mapsize):
+    """UV エッジ毎の長さとテクセル密度をリストで返す
+
+    Args:
+        pairs (EdgeUVPairs): UV エッジ
+        points (list[list[float]]): ワールド空間の頂点座標
+        mapsize (int): テクスチャサイズ (ピクセル)
+
+    Returns:
+        dict[str, list[float]]: "geo", "u", "v", "uv" の長さと "texel" (uv / geo * mapsize)｡ 3D の長さが 0 の UV エッジの texel は 0
+    """
+    us = pairs.mesh_uv.us
+    vs = pairs.mesh_uv.vs
+    geo = [math.sqrt(sum((p - q) ** 2 for p, q in zip(points[a], points[b]))) for a, b in zip(pairs.vtx_a, pairs.vtx_b)]
+    u = [abs(us[b] - us[a]) for a, b in zip(pairs.uv_a, pairs.uv_b)]
+    v = [abs(vs[b] - vs[a]) for a, b in zip(pairs.uv_a, pairs.uv_b)]
+    uv = [math.hypot(du, dv) for du, dv in zip(u, v)]
+    texel = [length / g * mapsize if g > 0 else 0.0 for length, g in zip(uv, geo)]
+
+    return {"geo": geo, "u": u, "v": v, "uv": uv, "texel": texel}
+
+
+def scale_pairs(pairs, points, target_texel, mapsize, mode=MODE_UNIFORM):
+    """UV エッジを一本ずつ順にスケールして指定のテクセル密度にする (mesh_uv の us, vs を書き換える)
+
+    UV を共有する UV エッジは前の UV エッジのスケール結果を引き継ぐ｡
+
+    Args:
+        pairs (EdgeUVPairs): UV エッジ
+        points (list[list[float]]): ワールド空間の頂点座標
+        target_texel (float): 目標のテクセル密度
+        mapsize (int): テクスチャサイズ (ピクセル)
+        mode (str, optional): MODE_U_MIN, MODE_U_MAX, MODE_V_MIN, MODE_V_MAX では U か V の長さだけを合わせ､
+            それ以外では uv_a をピボットに UV 距離を合わせる. Defaults to MODE_UNIFORM.
+
+    Returns:
+        int: スケールした UV エッジの数｡ 長さが 0 の UV エッジはスケールしない
+    """
+    us = pairs.mesh_uv.us
+    vs = pairs.mesh_uv.vs
+    count = 0
+
+    for a, b, va, vb in zip(pairs.uv_a, pairs.uv_b, pairs.vtx_a, pairs.vtx_b):
+        geo = math.sqrt(sum((p - q) ** 2 for p, q in zip(points[va], points[vb])))
+
+        if mode in (MODE_U_MIN, MODE_U_MAX):
+            length = abs(us[b] - us[a])
+        elif mode in (MODE_V_MIN, MODE_V_MAX):
+            length = abs(vs[b] - vs[a])
+        else:
+            length = math.hypot(us[b] - us[a], vs[b] - vs[a])
+
+        if geo == 0 or length == 0:
+            continue
+
+        scale = target_texel / (length / geo * mapsize)
+
+        if mode in (MODE_U_MIN, MODE_U_MAX):
+            pivot = min(us[a], us[b]) if mode == MODE_U_MIN else max(us[a], us[b])
+            us[a] = pivot + (us[a] - pivot) * scale
+            us[b] = pivot + (us[b] - pivot) * scale
+
+        elif mode in (MODE_V_MIN, MODE_V_MAX):
+            pivot = min(vs[a], vs[b]) if mode == MODE_V_MIN else max(vs[a], vs[b])
+            vs[a] = pivot + (vs[a] - pivot) * scale
+            vs[b] = pivot + (vs[b] - pivot) * scale
+
+        else:
+            us[b] = us[a] + (us[b] - us[a]) * scale
+            vs[b] = vs[a] + (vs[b] - vs[a]) * scale
+
+        count += 1
+
+    return count
+
+
+def histogram(values, bins=default_bins):
+    """値の範囲を等分したヒストグラム
+
+    Returns:
+        tuple[list[int], list[float]]: 各区間の個数と区間の境界 (bins + 1 個)
+    """
+    if not values:
+        return [0] * bins, [0.0] * (bins + 1)
+
+    low = min(values)
+    high = max(values)
+    width = (high - low) / bins
+    edges = [low + width * i for i in range(bins)] + [high]
+    counts = [0] * bins
+
+    for value in values:
+        i = int((value - low) / width) if width > 0 else 0
+        counts[min(i, bins - 1)] += 1
+
+    return counts, edges
+
+
+def shell_statistics(pairs, texels, bins=default_bins):
+    """UV シェル毎のテクセル密度の統計
+
+    Args:
+        pairs (EdgeUVPairs): UV エッジ
+        texels (list[float]): measure の "texel"
+        bins (int, optional): ヒストグラムの分割数. Defaults to default_bins.
+
+    Returns:
+        dict[int, dict]: シェル ID をキーとした {"count", "min", "max", "mean", "histogram", "bin_edges"}｡ 3D の長さが 0 の UV エッジは含めない
+    """
+    shell_ids = pairs.mesh_uv.shell_ids
+    shell_texels = dict()
+
+    for a, texel in zip(pairs.uv_a, texels):
+        if texel > 0:
+            shell_texels.setdefault(shell_ids[a], []).append(texel)
+
+    stats = dict()
+
+    for shell_id, values in sorted(shell_texels.items()):
+        counts, edges = histogram(values, bins)
+        stats[shell_id] = {
+            "count": len(values),
+            "min": min(values),
+            "max": max(values),
+            "mean": sum(values) / len(values),
+            "histogram": counts,
+            "bin_edges": edges,
+        }
+
+    return stats
+
+
+def _components_by_shape(components):
+    """コンポーネントを選択順のままシェイプ毎の要素 ID のリストにする"""
+    sel = om.MSelectionList()
+    for comp in components:
+        sel.add(comp)
+
+    shape_to_ids = dict()
+
+    for i in range(sel.length()):
+        dag, comp = sel.getComponent(i)
+        dag.extendToShape()
+        ids = shape_to_ids.setdefault(dag.partialPathName(), [])
+
+        for index in om.MFnSingleIndexedComponent(comp).getElements():
+            if index not in ids:
+                ids.append(index)
+
+    return shape_to_ids
+
+
+def selected_edge_uv_pairs(components=None):
+    """選択からシェイプ毎の EdgeUVPairs を作る
+
+    エッジ選択ならエッジに含まれる全 UV エッジ､ UV 選択なら選択 UV 同士を結ぶ UV エッジ (先に選択した UV が uv_a) を対象にする｡
+
+    Args:
+        components (list[str], optional): エッジもしくは UV｡ 省略時は選択順の選択
+
+    Returns:
+        list[EdgeUVPairs]: シェイプ毎の UV エッジ
+    """
+    components = components or cmds.ls(orderedSelection=True)
+    edges = cmds.filterExpand(components, sm=32) or []
+    uvs = cmds.filterExpand(components, sm=35) or []
+    result = []
+
+    for shape, edge_ids in _components_by_shape(edges).items():
+        mesh_uv = nuv.MeshUV(shape)
+        num_vertices = mesh_uv.fn_mesh.numVertices
+        vertex_pairs = set(edge_key(*mesh_uv.fn_mesh.getEdgeVertices(ei), n=num_vertices) for ei in edge_ids)
+        result.append(collect_edge_uv_pairs(mesh_uv, vertex_pairs=vertex_pairs))
+
+    for shape, uv_ids in _components_by_shape(uvs).items():
+        mesh_uv = nuv.MeshUV(shape)
+        result.append(collect_edge_uv_pairs(mesh_uv, uv_ids=uv_ids))
+
+    return result
+
+
+def set_edge_texel(target_texel, mapsize, mode=MODE_UNIFORM, components=None):
+    """選択した UV エッジを指定のテクセル密度にする
+
+    Args:
+        target_texel (float): 目標のテクセル密度
+        mapsize (int): テクスチャサイズ (ピクセル)
+        mode (str, optional): スケールの基準 (scale_pairs を参照). Defaults to MODE_UNIFORM.
+        components (list[str], optional): エッジもしくは UV｡ 省略時は選択順の選択
+
+    Returns:
+        int: スケールした UV エッジの数
+    """
+    all_pairs = [x for x in selected_edge_uv_pairs(components) if len(x)]
+
+    if not all_pairs:
+        return 0
+
+    count = 0
+
+    with ss.snapshot_state(targets=[x.mesh_uv.shape for x in all_pairs], uv=True):
+        for pairs in all_pairs:
+            count += scale_pairs(pairs, pairs.mesh_uv.points(), target_texel, mapsize, mode)
+            pairs.mesh_uv.write()
+
+    return count
+
+
+def get_uv_distance_texel(uv_components, mapsize):
+    """2 つの UV の UV 距離と対応する頂点の距離から求めたテクセル密度｡ 3D の距離が 0 なら 0"""
+    shape_to_ids = _components_by_shape(uv_components[:2])
+
+    # 別のメッシュの UV 同士は対象外
+    if len(shape_to_ids) != 1:
+        return 0.0
+
+    shape, uv_ids = list(shape_to_ids.items())[0]
+
+    if len(uv_ids) < 2:
+        return 0.0
+
+    mesh_uv = nuv.MeshUV(shape)
+    pairs = EdgeUVPairs(mesh_uv)
+    uv_to_vertex = mesh_uv.uv_to_vertex()
+    pairs.append(uv_ids[0], uv_ids[1], uv_to_vertex[uv_ids[0]], uv_to_vertex[uv_ids[1]])
+
+    return measure(pairs, mesh_uv.points(), mapsize)["texel"][0]
+
+
+def texel_statistics(mapsize, components=None, bins=default_bins):
+    """メッシュの全 UV エッジのテクセル密度をシェル毎に集計する
+
+    Args:
+        mapsize (int): テクスチャサイズ (ピクセル)
+        components (list[str], optional): 対象のオブジェクトもしくはコンポーネント｡ 省略時は選択
+        bins (int, optional): ヒストグラムの分割数. Defaults to default_bins.
+
+    Returns:
+        dict[str, dict[int, dict]]: シェイプ名をキーとした shell_statistics の結果
+    """
+    result = dict()
+
+    for shape in nuv.get_selected_uv_ids(components):
+        mesh_uv = nuv.MeshUV(shape)
+        pairs = collect_edge_uv_pairs(mesh_uv)
+        texels = measure(pairs, mesh_uv.points(), mapsize)["texel"]
+        result[shape] = shell_statistics(pairs, texels, bins)
+
+    return result
+
+
+def print_texel_statistics(mapsize, components=None, bins=default_bins):
+    """texel_statistics の結果をシェル毎に出力する"""
+    stats = texel_statistics(mapsize, components, bins)
+
+    for shape, shells in stats.items():
+        for shell_id, s in shells.items():
+            print("%s shell %d: min %.3f max %.3f mean %.3f (%d edges) %s" % (shape, shell_id, s["min"], s["max"], s["mean"], s["count"], s["histogram"]))
+
+    return stats
@@ -0,0 +1,235 @@
+"""境界を固定した UV シェル内部の展開
+
+三角形分割したシェルの接続と各 UV に対応する 3D 座標から内部 UV を求める Maya 非依存の関数群｡
+三角形毎の線形関数の勾配から作った二次形式を最小化する｡
+
+- MODE_HARMONIC: u, v それぞれのディリクレエネルギー (コタンジェントラプラシアン) を最小化する
+- MODE_CONFORMAL: 等角性からのずれ (LSCM) を最小化する
+
+境界全体を固定した場合は両者の解は一致する｡ MODE_CONFORMAL は 2 点以上を固定すれば境界も自由に動かせる｡
+連立方程式は Jacobi 前処理付きの共役勾配法で解く｡
+"""
+import math
+
+
+# 展開の手法
+MODE_HARMONIC = "harmonic"
+MODE_CONFORMAL = "conformal"
+
+# 面積がこれ以下の三角形は無視する
+degenerate_area = 1e-12
+
+
+def triangulate(polygons):
+    """ポリゴンを扇状に三角形分割する
+
+    Args:
+        polygons (list[list[int]]): ポリゴン毎の頂点 ID のリスト
+
+    Returns:
+        list[tuple[int, int, int]]: 三角形の頂点 ID｡ 巡回の向きはポリゴンと同じ
+    """
+    return [(polygon[0], a, b) for polygon in polygons for a, b in zip(polygon[1:-1], polygon[2:])]
+
+
+def triangle_local_coords(p0, p1, p2):
+    """3D の三角形を自身の平面上に置いた 2D 座標と面積を返す｡ 巡回は反時計回りになる"""
+    e1 = [b - a for a, b in zip(p0, p1)]
+    e2 = [b - a for a, b in zip(p0, p2)]
+    length1 = math.sqrt(sum(x * x for x in e1))
+
+    if length1 == 0:
+        return None, 0.0
+
+    x2 = sum(a * b for a, b in zip(e1, e2)) / length1
+    y2 = math.sqrt(max(sum(x * x for x in e2) - x2 * x2, 0.0))
+
+    return [(0.0, 0.0), (length1, 0.0), (x2, y2)], length1 * y2 / 2.0
+
+
+def triangle_area(p0, p1, p2):
+    """3D の三角形の面積"""
+    return triangle_local_coords(p0, p1, p2)[1]
+
+
+def signed_area(coords):
+    """2D ポリゴンの符号付き面積｡ 反時計回りなら正"""
+    area = 0.0
+
+    for i, (u0, v0) in enumerate(coords):
+        u1, v1 = coords[(i + 1) % len(coords)]
+        area += u0 * v1 - u1 * v0
+
+    return area / 2.0
+
+
+def texel_density(uv_area, surface_area, map_size):
+    """UV 面積と 3D 面積の比から求めたテクセル密度｡ 面積が 0 なら 0"""
+    if uv_area <= 0 or surface_area <= 0:
+        return 0.0
+
+    return math.sqrt(uv_area / surface_area) * map_size
+
+
+def texel_scale(uv_area, surface_area, target_texel, map_size):
+    """テクセル密度を target_texel にするための UV のスケール｡ 求められなければ 1.0"""
+    density = texel_density(uv_area, surface_area, map_size)
+
+    return target_texel / density if density > 0 else 1.0
+
+
+def _add_rows(matrix, rows, weight):
+    """重み付きの行ベクトルの二乗和を二次形式の行列 (行毎の辞書) に足す"""
+    for row in rows:
+        for i, a in row:
+            matrix_row = matrix[i]
+
+            for j, b in row:
+                matrix_row[j] = matrix_row.get(j, 0.0) + weight * a * b
+
+
+def build_energy(num_uvs, triangles, points, mode=MODE_HARMONIC):
+    """UV を 2 * uv_id (u), 2 * uv_id + 1 (v) に並べた変数に対するエネルギーの二次形式
+
+    三角形のエッジ e_k (頂点 k の対辺) を使うと線形関数の勾配は Σ f_k R(e_k) / 2A (R は 90 度回転) なので､
+    ハーモニックは A |∇u|^2 + A |∇v|^2､ 等角は A |∇v - R ∇u|^2 = |Σ u_k e_k + v_k R(e_k)|^2 / 4A になる｡
+
+    Args:
+        num_uvs (int): UV の数
+        triangles (list[tuple[int, int, int]]): 三角形の UV ID
+        points (list[list[float]]): UV ID をインデックスとした 3D 座標
+        mode (str, optional): MODE_HARMONIC か MODE_CONFORMAL. Defaults to MODE_HARMONIC.
+
+    Returns:
+        list[dict[int, float]]: 行毎に列をキーとした非ゼロ要素の辞書
+    """
+    matrix = [dict() for _ in range(num_uvs * 2)]
+
+    for triangle in triangles:
+        coords, area = triangle_local_coords(*[points[x] for x in triangle])
+
+        if area <= degenerate_area:
+            continue
+
+        edges = [[coords[(k + 2) % 3][c] - coords[(k + 1) % 3][c] for c in range(2)] for k in range(3)]
+        us = [2 * x for x in triangle]
+        vs = [2 * x + 1 for x in triangle]
+
+        if mode == MODE_CONFORMAL:
+            rows = [
+                [(us[k], edges[k][0]) for k in range(3)] + [(vs[k], -edges[k][1]) for k in range(3)],
+                [(us[k], edges[k][1]) for k in range(3)] + [(vs[k], edges[k][0]) for k in range(3)],
+            ]
+        else:
+            rows = [[(ids[k], component * edges[k][1 - c]) for k in range(3)] for ids in (us, vs) for c, component in ((0, -1), (1, 1))]
+
+        _add_rows(matrix, rows, 1.0 / (4.0 * area))
+
+    return matrix
+
+
+def conjugate_gradient(matrix, rhs, x, tolerance=1e-10, max_iterations=None):
+    """対称正定値な疎行列の連立方程式を Jacobi 前処理付きの共役勾配法で解く (x を書き換える)
+
+    Args:
+        matrix (list[dict[int, float]]): 行毎の非ゼロ要素
+        rhs (list[float]): 右辺
+        x (list[float]): 初期値
+        tolerance (float, optional): 右辺のノルムに対する残差の比の許容値. Defaults to 1e-10.
+        max_iterations (int, optional): 最大反復回数｡ 省略時は未知数の数の 10 倍
+
+    Returns:
+        int: 反復回数
+    """
+    n = len(rhs)
+    max_iterations = max_iterations or n * 10
+    inverse_diagonal = [1.0 / row.get(i) if row.get(i) else 1.0 for i, row in enumerate(matrix)]
+
+    def multiply(vector):
+        return [sum(value * vector[j] for j, value in row.items()) for row in matrix]
+
+    residual = [b - ax for b, ax in zip(rhs, multiply(x))]
+    z = [d * r for d, r in zip(inverse_diagonal, residual)]
+    direction = list(z)
+    rz = sum(r * zi for r, zi in zip(residual, z))
+    threshold = tolerance * max(math.sqrt(sum(b * b for b in rhs)), 1e-30)
+
+    for iteration in range(max_iterations):
+        if math.sqrt(sum(r * r for r in residual)) <= threshold:
+            return iteration
+
+        ad = multiply(direction)
+        dad = sum(d * a for d, a in zip(direction, ad))
+
+        if dad <= 0:
+            return iteration
+
+        alpha = rz / dad
+
+        for i in range(n):
+            x[i] += alpha * direction[i]
+            residual[i] -= alpha * ad[i]
+
+        z = [d * r for d, r in zip(inverse_diagonal, residual)]
+        rz_next = sum(r * zi for r, zi in zip(residual, z))
+        beta = rz_next / rz if rz else 0.0
+        rz = rz_next
+        direction = [zi + beta * d for zi, d in zip(z, direction)]
+
+    return max_iterations
+
+
+def solve(triangles, points, fixed, mode=MODE_HARMONIC, initial=None, tolerance=1e-10, max_iterations=None):
+    """固定した UV 以外の UV を求める
+
+    Args:
+        triangles (list[tuple[int, int, int]]): 三角形の UV ID (0 から始まる連番)
+        points (list[list[float]]): UV ID をインデックスとした 3D 座標
+        fixed (dict[int, tuple[float, float]]): 固定する UV ID と UV 座標｡ MODE_CONFORMAL では 2 つ以上､
+            MODE_HARMONIC では三角形で繋がった領域毎に 1 つ以上必要
+        mode (str, optional): MODE_HARMONIC か MODE_CONFORMAL. Defaults to MODE_HARMONIC.
+        initial (list[tuple[float, float]], optional): 固定しない UV の初期値｡ 省略時は固定した UV の平均
+        tolerance (float, optional): 共役勾配法の許容値. Defaults to 1e-10.
+        max_iterations (int, optional): 共役勾配法の最大反復回数
+
+    Returns:
+        list[tuple[float, float]]: UV ID をインデックスとした UV 座標｡ 固定した UV はそのまま
+    """
+    num_uvs = len(points)
+    matrix = build_energy(num_uvs, triangles, points, mode)
+
+    if initial is None:
+        center = [sum(uv[c] for uv in fixed.values()) / max(len(fixed), 1) for c in range(2)]
+        initial = [center] * num_uvs
+
+    values = [initial[i // 2][i % 2] for i in range(num_uvs * 2)]
+
+    for uvi, uv in fixed.items():
+        values[2 * uvi], values[2 * uvi + 1] = uv
+
+    # 固定した変数を右辺に移した自由な変数だけの連立方程式
+    free = [i for i in range(num_uvs * 2) if i // 2 not in fixed]
+    free_index = dict((var, k) for k, var in enumerate(free))
+    free_matrix = []
+    rhs = []
+
+    for var in free:
+        row = dict()
+        b = 0.0
+
+        for j, value in matrix[var].items():
+            if j in free_index:
+                row[free_index[j]] = value
+            else:
+                b -= value * values[j]
+
+        free_matrix.append(row)
+        rhs.append(b)
+
+    x = [values[var] for var in free]
+    conjugate_gradient(free_matrix, rhs, x, tolerance=tolerance, max_iterations=max_iterations)
+
+    for var, value in zip(free, x):
+        values[var] = value
+
+    return [(values[2 * i], values[2 * i + 1]) for i in range(num_uvs)]
@@ -23,6 +23,7 @@ else:
 from maya.app.general.mayaMixin import MayaQWidgetBaseMixin
 
 import nnutil.ui as ui
+import nnvcolor.layers as vlayers
 import plugin_util.snapshotState as ss
 
 
@@ -255,6 +256,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
         self.is_chunk_open = False
         self.editbox_precision = 4
         self.vf_color_caches = dict()  # スライド開始時の頂点カラーキャッシュ dict[obj_name, list[MColor]]
+        self.layer = None  # 編集先のレイヤー｡ None なら頂点カラーを直接編集する
 
         self.brush_size_mode = False
         self.cached_value = 1.0  # ブラシサイズ変更開始時のスライダーの値
@@ -317,7 +319,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
         column1.setSpacing(0)
         column1.setContentsMargins(outer_margin, outer_margin, outer_margin, outer_margin)
 
-        rows = [QHBoxLayout() for _ in range(10)]
+        rows = [QHBoxLayout() for _ in range(11)]
         for row in rows:
             row.setSpacing(spacing)
             row.setContentsMargins(0, 0, 0, 0)
@@ -629,6 +631,19 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
 
         rows[9].setContentsMargins(0, 0, 0, separater_height2)
 
+        # 編集先のレイヤー
+        c = QLineEdit()
+        c.setPlaceholderText("Layer")
+        c.editingFinished.connect(self.onChangeLayerName)
+        c.setFixedHeight(row_height2)
+        rows[10].addWidget(c)
+        self.eb_layer = c
+
+        c = PushButtonLRM("Apply Layers")
+        c.clicked.connect(self.onApplyLayers)
+        c.setFixedHeight(row_height2)
+        rows[10].addWidget(c)
+
     def moveEvent(self, event):
         """ウィンドウ位置の保存"""
         self.settings.setValue("geometry", self.saveGeometry())
@@ -776,7 +791,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
 
             self._sync_slider_and_editbox(from_slider=True)
 
-    def _set_unified_color(self, targets, channel, value, via_api=False):
+    def _set_unified_color(self, targets, channel, value, via_api=False, layer=None):
         """指定頂点カラーに同一値を設定する｡同一色での塗りつぶし1回なので早い｡
 
         Args:
@@ -784,6 +799,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
             channel (str): 上書きするチャンネル
             value (float): 上書きする値
             via_api (bool, optional): API での操作. Defaults to False.
+            layer (vlayers.LayerTarget, optional): 編集先のレイヤー｡ 指定時は API でレイヤーに書き込む. Defaults to None.
         """
         if targets:
             # UV選択なら vf 変換､エッジ選択なら vtx 変換する｡それ以外の場合はそのまま
@@ -793,7 +809,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
             elif cmds.selectType(q=True, edge=True):
                 targets = cmds.polyListComponentConversion(targets, tv=True)
 
-            if via_api:
+            if via_api or layer is not None:
                 # API による頂点カラーの設定
 
                 # API の場合､速度は気にしなくて良いので全て頂点フェースに変換して後続処理を簡略化する
@@ -818,8 +834,8 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
                     obj, component = slist.getComponent(0)
                     fn_mesh = om.MFnMesh(obj)
 
-                    # 全頂点フェースのカラー取得
-                    vf_colors = fn_mesh.getFaceVertexColors()
+                    # 全頂点フェースのカラー取得｡ レイヤー指定時はレイヤーの色
+                    vf_colors = layer.get_colors(obj_name) if layer is not None else fn_mesh.getFaceVertexColors()
 
                     # 頂点インデックス･フェースインデックスと 頂点フェースインデックス (1次元) の相互変換辞書
                     vfi_to_fivi = [None] * len(vf_colors)
@@ -863,6 +879,10 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
                             face_indices.append(i)
                             vertex_indices.append(j)
 
+                    if layer is not None:
+                        layer.set_colors(obj_name, vf_colors)
+                        continue
+
                     print(obj_name)
                     with ss.snapshot_state(targets=[obj_name], color=True):
                         fn_mesh.setFaceVertexColors(vf_colors, face_indices, vertex_indices)
@@ -895,7 +915,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
                 else:
                     pass
 
-    def _blend_color(self, vf_color_caches, channel, v, weight_mul=1.0, mode="copy", via_api=False):
+    def _blend_color(self, vf_color_caches, channel, v, weight_mul=1.0, mode="copy", via_api=False, layer=None):
         """頂点カラーそれぞれに指定した値を設定する｡コンポーネント反復するので遅い｡
 
         Args:
@@ -905,6 +925,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
             weight_mul (float, optional): 乗算モードでの倍率. Defaults to 1.0.
             mode (str, optional): 上書きモード. Defaults to "copy".
             via_api (bool, optional): API での操作. Defaults to False.
+            layer (vlayers.LayerTarget, optional): 編集先のレイヤー｡ 指定時はレイヤーの色とブレンドしてレイヤーに書き込む. Defaults to None.
         """
         if not cmds.softSelect(q=True, softSelectEnabled=True):
             return None
@@ -973,6 +994,8 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
             # ブレンド元の頂点カラーが渡されていればそれを使用する｡なければ現在の頂点フェースカラーを取得
             if obj_name in vf_color_caches.keys():
                 current_vf_colors = [om.MColor(x) for x in vf_color_caches[obj_name]]
+            elif layer is not None:
+                current_vf_colors = layer.get_colors(obj_name)
             else:
                 current_vf_colors = fn_mesh.getFaceVertexColors()
 
@@ -1021,7 +1044,11 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
                 else:
                     raise Exception("unknown mode")
 
-            if via_api:
+            if layer is not None:
+                # レイヤーを置き換えてスタックの合成結果を適用
+                layer.set_colors(obj_name, new_vf_colors)
+
+            elif via_api:
                 # API はそのまま全VFに適用
                 fis = [fi for fi, vi in vfi_to_fivi]
                 vis = [vi for fi, vi in vfi_to_fivi]
@@ -1081,18 +1108,22 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
             if cmds.softSelect(q=True, softSelectEnabled=True) and not cmds.selectMode(q=True, object=True):
                 # ソフト選択有効
                 if drag:
-                    self._blend_color(self.vf_color_caches, channel, v, mode=mode, via_api=True)
+                    self._blend_color(self.vf_color_caches, channel, v, mode=mode, via_api=True, layer=self.layer)
 
                 else:
-                    self._blend_color(self.vf_color_caches, channel, v, mode=mode, via_api=True)  # nm.snapshot が使用できない環境では via_api=False にして Undo 対応する
+                    self._blend_color(self.vf_color_caches, channel, v, mode=mode, via_api=True, layer=self.layer)  # nm.snapshot が使用できない環境では via_api=False にして Undo 対応する
 
             else:
                 # 通常選択
                 if drag:
-                    self._set_unified_color(selection, channel, v, via_api=True)
+                    self._set_unified_color(selection, channel, v, via_api=True, layer=self.layer)
 
                 else:
-                    self._set_unified_color(selection, channel, v, via_api=True)  # nm.snapshot が使用できない環境では via_api=False にして Undo 対応する
+                    self._set_unified_color(selection, channel, v, via_api=True, layer=self.layer)  # nm.snapshot が使用できない環境では via_api=False にして Undo 対応する
+
+            # 確定時にレイヤーのスタックを保存する
+            if self.layer is not None and not drag:
+                self.layer.save()
 
     def onSetColorR(self, *args):
         """[R] ボタン押下時のハンドラ｡現在のスライダー値で値を設定する"""
@@ -1492,7 +1523,7 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
 
         for obj_name in obj_names:
             full_path = cmds.ls(obj_name, long=True)[0]
-            self.vf_color_caches[full_path] = get_all_vertex_colors(full_path)
+            self.vf_color_caches[full_path] = self.layer.get_colors(full_path) if self.layer is not None else get_all_vertex_colors(full_path)
 
     def onSliderPressed(self, *args):
         """スライダーが押された瞬間のハンドラ"""
@@ -1506,6 +1537,22 @@ class NN_ToolWindow(MayaQWidgetBaseMixin, QMainWindow):
         # editingFinished による二重適用を避けるためエディットボックスのフォーカスを事前に外す
         self._clear_editboxes_focus()
 
+    def onChangeLayerName(self, *args):
+        """編集先のレイヤー名が変更された時のハンドラ｡ 空なら頂点カラーを直接編集する"""
+        name = self.eb_layer.text().strip()
+
+        if self.layer is not None:
+            self.layer.save()
+
+        self.layer = vlayers.LayerTarget(name) if name else None
+
+    def onApplyLayers(self, *args):
+        """選択オブジェクトの保存されたレイヤーのスタックを合成して頂点カラーに適用する"""
+        selection = cmds.ls(selection=True)
+
+        for obj_name in cmds.polyListComponentConversion(selection) if selection else []:
+            vlayers.apply_stack(obj_name, vlayers.load_stack(obj_name))
+
     def _open_chunk(self):
         """チャンクのオープン処理"""
         if not self.is_chunk_open:
@@ -0,0 +1,385 @@
+"""頂点カラーの非破壊レイヤー
+
+メッシュ毎にフェース頂点カラーのレイヤーを重ね､合成結果をカレントのカラーセットに書き込む｡
+レイヤーはフェース頂点の通し番号順 (getFaceVertexColors の並び) の RGBA を一次元に並べた配列で保持し､
+ブレンドモード･不透明度･フェース頂点毎のマスクを持つ｡
+スタックはシェイプのアトリビュートか JSON ファイルに保存する｡
+nnvcolor.core のウィンドウでレイヤー名を指定すると､スライダーやボタンの編集は LayerTarget を通してそのレイヤーに書き込まれる｡
+
+    import nnvcolor.layers as vlayers
+    stack = vlayers.load_stack("pSphere1")
+    stack.add_layer("ao", colors=ao_colors, mode=vlayers.MODE_MUL, opacity=0.5)
+    vlayers.save_stack("pSphere1", stack)
+    vlayers.apply_stack("pSphere1", stack)
+"""
+import array
+import base64
+import json
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import plugin_util.snapshotState as ss
+
+
+# ブレンドモード｡ 既存の _blend_color のモードと同じ計算
+MODE_COPY = "copy"
+MODE_MUL = "mul"
+MODE_DIV = "div"
+MODE_ADD = "add"
+
+# スタックを保存するシェイプのアトリビュート
+attr_name = "nnvcolorLayers"
+
+format_version = 1
+
+
+class ColorLayer(object):
+    """フェース頂点カラーのレイヤー
+
+    Args:
+        name (str): レイヤー名
+        colors (array.array): フェース頂点毎の RGBA を並べた配列 (要素数はフェース頂点数の 4 倍)
+        mode (str, optional): ブレンドモード. Defaults to MODE_COPY.
+        opacity (float, optional): 不透明度. Defaults to 1.0.
+        mask (array.array, optional): フェース頂点毎の適用率｡ None なら全て 1
+        visible (bool, optional): 合成に含めるか. Defaults to True.
+    """
+    def __init__(self, name, colors, mode=MODE_COPY, opacity=1.0, mask=None, visible=True):
+        self.name = name
+        self.colors = array.array("d", colors)
+        self.mode = mode
+        self.opacity = opacity
+        self.mask = array.array("d", mask) if mask is not None else None
+        self.visible = visible
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "opacity": self.opacity,
+            "visible": self.visible,
+            "colors": _encode(self.colors),
+            "mask": _encode(self.mask) if self.mask is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        mask = _decode(data["mask"]) if data.get("mask") is not None else None
+        return cls(data["name"], _decode(data["colors"]), data["mode"], data["opacity"], mask, data.get("visible", True))
+
+
+def _encode(values):
+    """float 配列を単精度のバイト列の base64 文字列にする"""
+    return base64.b64encode(array.array("f", values).tobytes()).decode("ascii")
+
+
+def _decode(text):
+    values = array.array("f")
+    values.frombytes(base64.b64decode(text))
+
+    return array.array("d", values)
+
+
+def blend(base, layer):
+    """base (RGBA の一次元配列) に layer を合成した新しい配列を返す"""
+    colors = layer.colors
+    mode = layer.mode
+    result = array.array("d", base)
+
+    if layer.mask is None:
+        weights = [layer.opacity] * (len(base) // 4)
+    else:
+        weights = [layer.opacity * m for m in layer.mask]
+
+    for i, w in enumerate(weights):
+        if w == 0.0:
+            continue
+
+        for c in range(i * 4, i * 4 + 4):
+            v = colors[c]
+
+            if mode == MODE_COPY:
+                result[c] = base[c] * (1.0 - w) + v * w
+
+            elif mode == MODE_MUL:
+                result[c] = base[c] * ((1.0 - w) + v * w)
+
+            elif mode == MODE_DIV:
+                safe_v = 1e-9 if v == 0 else v
+                result[c] = base[c] / ((1.0 - w) + safe_v * w)
+
+            elif mode == MODE_ADD:
+                result[c] = base[c] + v * w
+
+            else:
+                raise ValueError("unknown mode: %s" % mode)
+
+    return result
+
+
+class LayerStack(object):
+    """一つのメッシュのレイヤーのスタック｡ layers の先頭が一番下
+
+    Args:
+        num_face_vertices (int): フェース頂点数
+    """
+    def __init__(self, num_face_vertices):
+        self.num_face_vertices = num_face_vertices
+        self.layers = []
+
+    def add_layer(self, name, colors=None, mode=MODE_COPY, opacity=1.0, mask=None, index=None):
+        """レイヤーを追加する｡ 同名のレイヤーがあれば置き換える
+
+        Args:
+            name (str): レイヤー名
+            colors (list[float], optional): フェース頂点毎の RGBA を並べたリスト｡ 省略時は白
+            index (int, optional): 挿入位置｡ 省略時は一番上
+
+        Returns:
+            ColorLayer: 追加したレイヤー
+        """
+        if colors is None:
+            colors = [1.0] * (self.num_face_vertices * 4)
+
+        if len(colors) != self.num_face_vertices * 4:
+            raise ValueError("layer %s has %d values for %d face vertices" % (name, len(colors), self.num_face_vertices))
+
+        if mask is not None and len(mask) != self.num_face_vertices:
+            raise ValueError("mask of layer %s has %d values for %d face vertices" % (name, len(mask), self.num_face_vertices))
+
+        layer = ColorLayer(name, colors, mode, opacity, mask)
+        current = self.index(name)
+
+        if current >= 0:
+            self.layers[current] = layer
+        elif index is None:
+            self.layers.append(layer)
+        else:
+            self.layers.insert(index, layer)
+
+        return layer
+
+    def index(self, name):
+        """レイヤーの位置｡ 無ければ -1"""
+        for i, layer in enumerate(self.layers):
+            if layer.name == name:
+                return i
+
+        return -1
+
+    def layer(self, name):
+        """名前でレイヤーを返す｡ 無ければ None"""
+        i = self.index(name)
+        return self.layers[i] if i >= 0 else None
+
+    def remove_layer(self, name):
+        i = self.index(name)
+
+        if i >= 0:
+            del self.layers[i]
+
+    def move_layer(self, name, index):
+        """レイヤーを index の位置に移動する"""
+        i = self.index(name)
+
+        if i >= 0:
+            self.layers.insert(index, self.layers.pop(i))
+
+    def composite(self):
+        """表示中のレイヤーを下から合成した RGBA の一次元配列｡ 一番下の下地は黒で不透明"""
+        result = array.array("d", [0.0, 0.0, 0.0, 1.0] * self.num_face_vertices)
+
+        for layer in self.layers:
+            if layer.visible:
+                result = blend(result, layer)
+
+        return result
+
+    def to_json(self):
+        return json.dumps({
+            "version": format_version,
+            "num_face_vertices": self.num_face_vertices,
+            "layers": [x.to_dict() for x in self.layers],
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        stack = cls(data["num_face_vertices"])
+        stack.layers = [ColorLayer.from_dict(x) for x in data["layers"]]
+
+        return stack
+
+
+def _mesh(obj):
+    dag = om.MGlobal.getSelectionListByName(obj).getDagPath(0)
+    dag.extendToShape()
+
+    return dag.fullPathName(), om.MFnMesh(dag)
+
+
+def face_vertex_indices(fn_mesh):
+    """フェース頂点の通し番号順のフェース ID と頂点 ID の配列"""
+    counts, vertex_ids = fn_mesh.getVertices()
+    face_ids = om.MIntArray([fi for fi, count in enumerate(counts) for _ in range(count)])
+
+    return face_ids, om.MIntArray(vertex_ids)
+
+
+def current_colors(obj):
+    """カレントのカラーセットのフェース頂点カラーを RGBA の一次元配列で返す｡ 未設定は黒で不透明"""
+    _, fn_mesh = _mesh(obj)
+    result = array.array("d")
+
+    for color in fn_mesh.getFaceVertexColors():
+        if color[0] < 0:
+            result.extend((0.0, 0.0, 0.0, 1.0))
+        else:
+            result.extend((color[0], color[1], color[2], color[3]))
+
+    return result
+
+
+def new_stack(obj):
+    """現在の頂点カラーを "base" レイヤーにしたスタックを作る"""
+    _, fn_mesh = _mesh(obj)
+    stack = LayerStack(fn_mesh.numFaceVertices)
+    stack.add_layer("base", current_colors(obj))
+
+    return stack
+
+
+def load_stack(obj):
+    """シェイプのアトリビュートに保存されたスタックを読み込む｡ 無ければ new_stack() を返す
+
+    Raises:
+        ValueError: 保存時からフェース頂点数が変わっている
+    """
+    shape, fn_mesh = _mesh(obj)
+
+    if not cmds.attributeQuery(attr_name, node=shape, exists=True):
+        return new_stack(obj)
+
+    text = cmds.getAttr(shape + "." + attr_name)
+
+    if not text:
+        return new_stack(obj)
+
+    stack = LayerStack.from_json(text)
+
+    if stack.num_face_vertices != fn_mesh.numFaceVertices:
+        raise ValueError("topology of %s has changed since the layers were saved" % shape)
+
+    return stack
+
+
+def save_stack(obj, stack):
+    """スタックをシェイプのアトリビュートに保存する"""
+    shape, _ = _mesh(obj)
+
+    if not cmds.attributeQuery(attr_name, node=shape, exists=True):
+        cmds.addAttr(shape, ln=attr_name, dt="string")
+
+    cmds.setAttr(shape + "." + attr_name, stack.to_json(), type="string")
+
+
+def export_stack(stack, path):
+    """スタックを JSON ファイルに書き出す"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(stack.to_json())
+
+
+def import_stack(path):
+    """JSON ファイルからスタックを読み込む"""
+    with open(path, encoding="utf-8") as f:
+        return LayerStack.from_json(f.read())
+
+
+def apply_stack(obj, stack):
+    """スタックを合成してカレントのカラーセットに一度で書き込む"""
+    shape, fn_mesh = _mesh(obj)
+
+    if stack.num_face_vertices != fn_mesh.numFaceVertices:
+        raise ValueError("layer stack does not match the topology of %s" % shape)
+
+    values = stack.composite()
+    colors = om.MColorArray(om.MColor(tuple(values[i:i + 4])) for i in range(0, len(values), 4))
+    face_ids, vertex_ids = face_vertex_indices(fn_mesh)
+
+    with ss.snapshot_state(targets=[shape], color=True):
+        fn_mesh.setFaceVertexColors(colors, face_ids, vertex_ids)
+
+
+class LayerTarget(object):
+    """ツールの編集先にするレイヤー｡ 編集中はオブジェクト毎のスタックを保持し save() で保存する
+
+    Args:
+        name (str): 編集先のレイヤー名｡ 無ければ現在の頂点カラーで作る
+    """
+    def __init__(self, name):
+        self.name = name
+        self.stacks = dict()
+
+    def stack(self, obj):
+        """obj のスタック｡ 保存されたものを一度だけ読み込む"""
+        shape, _ = _mesh(obj)
+
+        if shape not in self.stacks:
+            self.stacks[shape] = load_stack(shape)
+
+        return self.stacks[shape]
+
+    def layer(self, obj):
+        stack = self.stack(obj)
+        layer = stack.layer(self.name)
+
+        if layer is None:
+            layer = stack.add_layer(self.name, current_colors(obj))
+
+        return layer
+
+    def get_colors(self, obj):
+        """編集先のレイヤーの色をフェース頂点の通し番号順の MColor のリストで返す"""
+        colors = self.layer(obj).colors
+
+        return [om.MColor((colors[i], colors[i + 1], colors[i + 2], colors[i + 3])) for i in range(0, len(colors), 4)]
+
+    def set_colors(self, obj, colors):
+        """編集先のレイヤーの色を colors (MColor の列) で置き換え､スタックの合成結果をメッシュに書き込む"""
+        layer = self.layer(obj)
+        layer.colors = array.array("d", (x for color in colors for x in (color.r, color.g, color.b, color.a)))
+
+        apply_stack(obj, self.stack(obj))
+
+    def save(self):
+        """編集したスタックをシェイプのアトリビュートに保存する｡ 次の編集では保存されたものを読み直す"""
+        for shape, stack in self.stacks.items():
+            save_stack(shape, stack)
+
+        self.stacks.clear()
+
+
+def soft_selection_mask(obj):
+    """ソフト選択のウェイトをフェース頂点毎のマスクにする｡ 選択されていないフェース頂点は 0"""
+    shape, fn_mesh = _mesh(obj)
+    vertex_weights = dict()
+
+    rich_selection = om.MGlobal.getRichSelection()
+
+    for sel in (rich_selection.getSelection(), rich_selection.getSymmetry()):
+        for i in range(sel.length()):
+            dag, comp = sel.getComponent(i)
+            dag.extendToShape()
+
+            if dag.fullPathName() != shape:
+                continue
+
+            fn_comp = om.MFnSingleIndexedComponent(comp)
+
+            for j, vi in enumerate(fn_comp.getElements()):
+                vertex_weights[vi] = max(vertex_weights.get(vi, 0.0), fn_comp.weight(j).influence)
+
+    _, vertex_ids = face_vertex_indices(fn_mesh)
+
+    return [vertex_weights.get(vi, 0.0) for vi in vertex_ids]
@@ -0,0 +1,20 @@
+"""API で適用済みのアトリビュートの変更を一回の Undo にするためのモジュール。
+
+attributeEditPlugin.py のユーティリティモジュール｡コマンドを呼び出す関数とプラグインをロードする関数｡
+"""
+import maya.cmds as cmds
+
+# undo/redo 用のプラグインロード
+plugin_name = "attributeEditPlugin.py"
+cmds.loadPlugin(plugin_name)
+
+
+def attribute_edit(plugs, before, after):
+    """適用済みのアトリビュートの変更を一回の Undo として記録する。
+
+    Args:
+        plugs (list[str]): "ノード名.アトリビュート名" のリスト
+        before (list[float]): プラグ毎の変更前の値
+        after (list[float]): プラグ毎の変更後の値
+    """
+    cmds.attributeEdit(plug=plugs, before=before, after=after)
@@ -34,5 +34,6 @@ def snapshot_state(*args, **kwargs):
         color (bool, option): True で頂点カラーを保存する
         smooth (bool, option): True でソフトエッジ/ハードエッジを保存する
         weight (bool, option): True でウェイトを保存する
+        uv (uvs) (bool, option): True でカレント UV セットの UV 座標とフェース頂点への割り当てを保存する
     """
     return SnapshotStateWith(*args, **kwargs)
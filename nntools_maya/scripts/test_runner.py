@@ -2,18 +2,22 @@
 
 第1引数に Maya のバージョンを指定することで、そのバージョンの mayapy を使用することができる。
     py test_runner.py 2022
+
+第1引数に mock を指定するか Windows 以外の環境では、mayapy を使わずに tests/mock のモック Maya によるテストを pytest で実行する。
+    python test_runner.py mock
 """
 import os
 import re
 import subprocess
 import sys
-import winreg
 
 MSG_MAYA_NOT_FOUND = ".ma 拡張子の関連付けから maya.exe のパスを特定することが出来ませんでした｡"
 
 
 def get_associated_exe_path(extension):
     """拡張子に関連付けられた実行コマンドを取得する"""
+    import winreg
+
     try:
         with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, extension) as key:
             file_type, _ = winreg.QueryValueEx(key, "")
@@ -29,7 +33,22 @@ def get_associated_exe_path(extension):
         return None
 
 
+def run_mock_tests():
+    """モック Maya によるテストを現在の Python で実行する"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    run_args = [sys.executable, "-m", "pytest", os.path.join(script_dir, "tests", "mock")]
+    print(run_args)
+
+    result = subprocess.run(run_args)
+
+    return result.returncode
+
+
 def main():
+    # Windows 以外では mayapy を探せないのでモックでのテストのみ行う
+    if sys.platform != "win32" or (len(sys.argv) > 1 and sys.argv[1] == "mock"):
+        sys.exit(run_mock_tests())
+
     # .ma の関連付けから maya.exe のパスを取得
     maya_exe_path = get_associated_exe_path(".ma")
 
@@ -0,0 +1,12 @@
+"""pytest 用の設定
+
+test_import_all.py は mayapy で実行する前提なので Maya が無い環境では収集しない｡
+Maya が無い環境では tests/mock のモック Maya によるテストのみが実行される｡
+"""
+collect_ignore = []
+
+try:
+    import maya.standalone  # noqa: F401
+
+except ImportError:
+    collect_ignore.append("test_import_all.py")
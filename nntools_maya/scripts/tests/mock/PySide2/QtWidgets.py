@@ -0,0 +1 @@
+from ._dummy import module_getattr as __getattr__  # noqa: F401
@@ -0,0 +1 @@
+"""テスト用の PySide2 の代替｡ ウィジェットはインスタンス化できるだけのダミー"""
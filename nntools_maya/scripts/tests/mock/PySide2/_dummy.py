@@ -0,0 +1,41 @@
+"""PySide2 代替モジュール共通のダミークラス"""
+
+
+class Dummy(object):
+    """任意の引数で生成でき､任意の属性アクセスにダミーを返すクラス"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return Dummy()
+
+    def __call__(self, *args, **kwargs):
+        return Dummy()
+
+    def __or__(self, other):
+        return self
+
+    __and__ = __or__
+
+
+class Signal(object):
+    def __init__(self, *types):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self._slots:
+            slot(*args)
+
+
+def module_getattr(name):
+    """モジュールの未定義属性に対してダミークラスを返す"""
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    return type(name, (Dummy,), {})
@@ -0,0 +1,59 @@
+"""モック Maya でツールを実行するテストの共通設定
+
+このディレクトリを sys.path の先頭に置き maya パッケージをモックに差し替える｡
+mayapy の unittest discover の対象にならないよう __init__.py は置かない｡
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+mock_dir = Path(__file__).absolute().parent
+scripts_dir = mock_dir.parent.parent
+
+for path in (str(scripts_dir), str(mock_dir)):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+import mayamock  # noqa: E402
+
+budget_path = mock_dir / "call_budgets.json"
+
+
+@pytest.fixture(autouse=True)
+def scene():
+    """テスト毎にシーンと呼び出し記録を初期化する"""
+    mayamock.new_scene()
+
+    yield mayamock.scene
+
+    mayamock.new_scene()
+
+
+@pytest.fixture
+def recorder():
+    return mayamock.recorder
+
+
+@pytest.fixture
+def call_budget():
+    """ホットパスの呼び出し回数を保存済みの上限と比較する関数を返す
+
+    call_budget(key, calls) で calls (CallRecord のリスト) の件数が
+    call_budgets.json の key の値を超えていればテストを失敗させる｡
+    """
+    with open(budget_path, encoding="utf-8") as f:
+        budgets = json.load(f)
+
+    def check(key, calls):
+        assert key in budgets, "no call budget for %s" % key
+
+        summary = dict()
+        for c in calls:
+            summary[c.name] = summary.get(c.name, 0) + 1
+
+        assert len(calls) <= budgets[key], "%s: %d calls exceeds budget %d %s" % (key, len(calls), budgets[key], summary)
+
+    return check
@@ -0,0 +1,11 @@
+"""maya.OpenMayaUI の代替"""
+
+
+class MQtUtil(object):
+    @staticmethod
+    def mainWindow():
+        return None
+
+    @staticmethod
+    def findControl(name):
+        return None
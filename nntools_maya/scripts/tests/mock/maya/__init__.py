@@ -0,0 +1 @@
+"""テスト用の maya パッケージの代替｡ 実体は mayamock を参照"""
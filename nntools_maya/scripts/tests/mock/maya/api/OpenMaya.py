@@ -0,0 +1,717 @@
+"""maya.api.OpenMaya の代替
+
+mayamock のシーンに対して動作する MSelectionList, MDagPath, MFnMesh 等の最小限のサブセット｡
+"""
+import math
+
+import mayamock as mm
+from mayamock import scene
+
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MFn(object):
+    kInvalid = 0
+    kTransform = 110
+    kJoint = 121
+    kMesh = 296
+    kSkinClusterFilter = 682
+    kMeshEdgeComponent = 542
+    kMeshPolygonComponent = 550
+    kMeshMapComponent = 813
+    kMeshVertComponent = 31
+    kMeshVtxFaceComponent = 551
+
+
+_kind_to_api_type = {
+    mm.KIND_VTX: MFn.kMeshVertComponent,
+    mm.KIND_EDGE: MFn.kMeshEdgeComponent,
+    mm.KIND_FACE: MFn.kMeshPolygonComponent,
+    mm.KIND_UV: MFn.kMeshMapComponent,
+    mm.KIND_VF: MFn.kMeshVtxFaceComponent,
+}
+
+_api_type_to_kind = {v: k for k, v in _kind_to_api_type.items()}
+
+_node_type_to_api_type = {
+    "transform": MFn.kTransform,
+    "joint": MFn.kJoint,
+    "mesh": MFn.kMesh,
+    "skinCluster": MFn.kSkinClusterFilter,
+}
+
+
+class MIntArray(list):
+    pass
+
+
+class MDoubleArray(list):
+    pass
+
+
+class MFloatArray(list):
+    pass
+
+
+class MPointArray(list):
+    pass
+
+
+class MVectorArray(list):
+    pass
+
+
+class MColorArray(list):
+    pass
+
+
+class MObject(object):
+    """ノードもしくはコンポーネントへの参照"""
+    def __init__(self, node_name=None, kind=None, indices=None):
+        self.node_name = node_name
+        self.kind = kind
+        self.indices = list(indices) if indices is not None else None
+
+    def isNull(self):
+        return self.node_name is None and self.kind is None
+
+    def apiType(self):
+        if self.kind is not None:
+            return _kind_to_api_type[self.kind]
+
+        if self.node_name is None:
+            return MFn.kInvalid
+
+        return _node_type_to_api_type.get(scene.get(self.node_name).type, MFn.kInvalid)
+
+    def hasFn(self, fn_type):
+        return self.apiType() == fn_type
+
+
+MObject.kNullObj = MObject()
+
+
+class MVector(object):
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])[:3]
+
+        self.x, self.y, self.z = (list(map(float, args)) + [0.0, 0.0, 0.0])[:3]
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __add__(self, other):
+        return MVector(self.x + other[0], self.y + other[1], self.z + other[2])
+
+    def __sub__(self, other):
+        return MVector(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __neg__(self):
+        return MVector(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+        if isinstance(other, MVector):
+            return self.x * other.x + self.y * other.y + self.z * other.z
+
+        return MVector(self.x * other, self.y * other, self.z * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, f):
+        return MVector(self.x / f, self.y / f, self.z / f)
+
+    def __xor__(self, other):
+        return MVector(self.y * other.z - self.z * other.y, self.z * other.x - self.x * other.z, self.x * other.y - self.y * other.x)
+
+    def __eq__(self, other):
+        return self.isEquivalent(other)
+
+    def isEquivalent(self, other, tolerance=1e-10):
+        return all(abs(a - b) <= tolerance for a, b in zip(self, other))
+
+    def length(self):
+        return math.sqrt(self.x**2 + self.y**2 + self.z**2)
+
+    def normal(self):
+        length = self.length()
+        return self / length if length else MVector(self)
+
+    def normalize(self):
+        n = self.normal()
+        self.x, self.y, self.z = n.x, n.y, n.z
+        return self
+
+    def __repr__(self):
+        return "MVector(%s, %s, %s)" % (self.x, self.y, self.z)
+
+
+class MPoint(object):
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])
+
+        values = list(map(float, args))
+        self.x, self.y, self.z = (values + [0.0, 0.0, 0.0])[:3]
+        self.w = values[3] if len(values) > 3 else 1.0
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z, self.w)[i]
+
+    def __len__(self):
+        return 4
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, self.w))
+
+    def __sub__(self, other):
+        if isinstance(other, MPoint):
+            return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+        return MPoint(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __add__(self, other):
+        return MPoint(self.x + other[0], self.y + other[1], self.z + other[2])
+
+    def __mul__(self, f):
+        return MPoint(self.x * f, self.y * f, self.z * f)
+
+    def distanceTo(self, other):
+        return (self - MPoint(other)).length()
+
+    def isEquivalent(self, other, tolerance=1e-10):
+        return all(abs(a - b) <= tolerance for a, b in zip((self.x, self.y, self.z), (other[0], other[1], other[2])))
+
+    def __repr__(self):
+        return "MPoint(%s, %s, %s, %s)" % (self.x, self.y, self.z, self.w)
+
+
+class MColor(object):
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])
+
+        values = list(map(float, args)) + [0.0, 0.0, 0.0, 1.0][len(args):]
+        self.r, self.g, self.b, self.a = values[:4]
+
+    def __getitem__(self, i):
+        return (self.r, self.g, self.b, self.a)[i]
+
+    def __setitem__(self, i, value):
+        setattr(self, "rgba"[i], float(value))
+
+    def __len__(self):
+        return 4
+
+    def __iter__(self):
+        return iter((self.r, self.g, self.b, self.a))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "MColor(%s, %s, %s, %s)" % (self.r, self.g, self.b, self.a)
+
+
+class MDagPath(object):
+    def __init__(self, node_name=None):
+        self.node_name = node_name
+
+    def fullPathName(self):
+        return scene.full_path(self.node_name)
+
+    def partialPathName(self):
+        return self.node_name
+
+    def node(self):
+        return MObject(self.node_name)
+
+    def extendToShape(self):
+        shape = scene.shape_of(self.node_name)
+        if shape is not None:
+            self.node_name = shape.name
+        return self
+
+    def transform(self):
+        node = scene.get(self.node_name)
+        return MObject(node.parent if node.type == "mesh" and node.parent else node.name)
+
+    def apiType(self):
+        return MObject(self.node_name).apiType()
+
+    def hasFn(self, fn_type):
+        return self.apiType() == fn_type
+
+
+# MSelectionList の要素がアトリビュートであることを表す種別
+KIND_PLUG = "plug"
+
+
+class MSelectionList(object):
+    def __init__(self, other=None):
+        self._items = list(other._items) if other is not None else []
+
+    def add(self, item):
+        if isinstance(item, (tuple, list)):
+            dag, comp = item
+            self._items.append((dag.node_name, comp.kind if comp is not None else None, comp.indices if comp is not None else None))
+            return self
+
+        if isinstance(item, MDagPath):
+            self._items.append((item.node_name, None, None))
+            return self
+
+        if isinstance(item, MObject):
+            self._items.append((item.node_name, None, None))
+            return self
+
+        if mm._component_re.match(item) is None and "." in item:
+            node_name, attr = item.split(".", 1)
+            scene.get(node_name)
+            self._items.append((node_name.split("|")[-1], KIND_PLUG, [attr]))
+            return self
+
+        if mm._component_re.match(item) is None:
+            scene.get(item)
+            self._items.append((item.split("|")[-1], None, None))
+            return self
+
+        shape, kind, indices = mm.parse(item)
+        node_name = item.split(".")[0].split("|")[-1]
+
+        # 同じノード･同じ種類のコンポーネントは 1 要素にまとめる
+        for i, (n, k, idx) in enumerate(self._items):
+            if n == node_name and k == kind:
+                merged = list(idx) + [x for x in indices if x not in set(idx)]
+                self._items[i] = (n, k, merged)
+                return self
+
+        self._items.append((node_name, kind, indices))
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def isEmpty(self):
+        return not self._items
+
+    def getDagPath(self, i):
+        return MDagPath(self._items[i][0])
+
+    def getDependNode(self, i):
+        return MObject(self._items[i][0])
+
+    def getPlug(self, i):
+        node_name, kind, indices = self._items[i]
+
+        if kind != KIND_PLUG:
+            raise RuntimeError("not a plug: %s" % node_name)
+
+        return MPlug(node_name, indices[0])
+
+    def getComponent(self, i):
+        node_name, kind, indices = self._items[i]
+        comp = MObject(None, kind, indices) if kind is not None else MObject.kNullObj
+
+        return MDagPath(node_name), comp
+
+    def getSelectionStrings(self, i=None):
+        items = self._items if i is None else [self._items[i]]
+        result = []
+
+        for node_name, kind, indices in items:
+            if kind is None:
+                result.append(node_name)
+            else:
+                result.extend(mm.component_strings(scene.mesh(node_name), kind, indices))
+
+        return result
+
+
+class MGlobal(object):
+    @staticmethod
+    def getSelectionListByName(name):
+        sel = MSelectionList()
+        sel.add(name)
+        return sel
+
+    @staticmethod
+    def getActiveSelectionList(orderedSelectionIfAvailable=False):
+        sel = MSelectionList()
+        for name in scene.selection:
+            sel.add(name)
+        return sel
+
+    @staticmethod
+    def setActiveSelectionList(sel, listAdjustment=0):
+        mm.recorder.call("om.MGlobal.setActiveSelectionList", _set_selection, (sel.getSelectionStrings(),), {})
+
+    @staticmethod
+    def displayInfo(message):
+        print(message)
+
+    @staticmethod
+    def displayWarning(message):
+        scene.warnings.append(message)
+
+    @staticmethod
+    def displayError(message):
+        scene.warnings.append(message)
+
+
+def _set_selection(names):
+    scene.selection = list(names)
+
+
+class MFnSingleIndexedComponent(object):
+    def __init__(self, comp=None):
+        self.comp = comp
+
+    def create(self, api_type):
+        self.comp = MObject(None, _api_type_to_kind[api_type], [])
+        return self.comp
+
+    def addElement(self, i):
+        self.comp.indices.append(int(i))
+
+    def addElements(self, indices):
+        self.comp.indices.extend(int(i) for i in indices)
+
+    def getElements(self):
+        return MIntArray(self.comp.indices)
+
+    @property
+    def elementCount(self):
+        return len(self.comp.indices)
+
+
+class MPlug(object):
+    """ノードの attrs に値を持つアトリビュートのプラグ"""
+    def __init__(self, node_name, attr):
+        self.node_name = node_name
+        self.attr = attr
+
+    def name(self):
+        return self.node_name + "." + self.attr
+
+    def asDouble(self):
+        return float(scene.get(self.node_name).attrs.get(self.attr, 0.0))
+
+
+class MDGModifier(object):
+    def __init__(self):
+        self.plug_values = []
+
+    def newPlugValueDouble(self, plug, value):
+        self.plug_values.append((plug, float(value)))
+
+    def doIt(self):
+        for plug, value in self.plug_values:
+            scene.get(plug.node_name).attrs[plug.attr] = value
+
+    def undoIt(self):
+        pass
+
+
+class MPxCommand(object):
+    """プラグインのコマンドクラスの基底｡ 引数の解析は扱わない"""
+    def __init__(self):
+        pass
+
+
+class MItDependencyNodes(object):
+    def __init__(self, filter=MFn.kInvalid):
+        self._objects = [MObject(name) for name in list(scene.nodes)]
+
+        if filter != MFn.kInvalid:
+            self._objects = [x for x in self._objects if x.hasFn(filter)]
+
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._objects)
+
+    def next(self):
+        self._index += 1
+
+    def thisNode(self):
+        return self._objects[self._index]
+
+
+# コールバック
+_next_callback_id = [1]
+
+
+def _add_callback(event, node_type, function, client_data):
+    callback_id = _next_callback_id[0]
+    _next_callback_id[0] += 1
+    scene.callbacks[callback_id] = (event, node_type, function, client_data)
+
+    return callback_id
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callback_id):
+        scene.callbacks.pop(callback_id, None)
+
+    @staticmethod
+    def removeCallbacks(callback_ids):
+        for callback_id in callback_ids:
+            scene.callbacks.pop(callback_id, None)
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addNodeAddedCallback(function, nodeType="dependNode", clientData=None):
+        return _add_callback("nodeAdded", nodeType, lambda node, data: function(MObject(node.name), data), clientData)
+
+    @staticmethod
+    def addNodeRemovedCallback(function, nodeType="dependNode", clientData=None):
+        return _add_callback("nodeRemoved", nodeType, lambda node, data: function(MObject(node.name), data), clientData)
+
+    @staticmethod
+    def addConnectionCallback(function, clientData=None):
+        return _add_callback("connection", None, function, clientData)
+
+
+class MNodeMessage(MMessage):
+    @staticmethod
+    def addNameChangedCallback(node, function, clientData=None):
+        """node が kNullObj なら全ノードの名前の変更で呼ばれる"""
+        target = node.node_name
+
+        def on_name_changed(renamed, prev_name, data):
+            if target is None or target in (renamed.name, prev_name):
+                function(MObject(renamed.name), prev_name, data)
+
+        return _add_callback("nameChanged", None, on_name_changed, clientData)
+
+
+class MDagMessage(MMessage):
+    @staticmethod
+    def addParentAddedCallback(function, clientData=None):
+        return _add_callback("parentAdded", None, lambda child, parent, data: function(MDagPath(child.name), MDagPath(parent.name), data), clientData)
+
+    @staticmethod
+    def addParentRemovedCallback(function, clientData=None):
+        return _add_callback("parentRemoved", None, lambda child, parent, data: function(MDagPath(child.name), MDagPath(parent.name), data), clientData)
+
+
+class MSceneMessage(MMessage):
+    kAfterNew = 1
+    kAfterOpen = 5
+
+    @staticmethod
+    def addCallback(message, function, clientData=None):
+        events = {MSceneMessage.kAfterNew: "afterNew", MSceneMessage.kAfterOpen: "afterOpen"}
+        return _add_callback(events.get(message, "scene%d" % message), None, function, clientData)
+
+
+class MFnDependencyNode(object):
+    def __init__(self, obj=None):
+        self.node_name = obj.node_name if obj is not None else None
+
+    def name(self):
+        return self.node_name
+
+
+class MFnDagNode(MFnDependencyNode):
+    def __init__(self, obj=None):
+        self.node_name = obj.node_name if obj is not None else None
+
+    def fullPathName(self):
+        return scene.full_path(self.node_name)
+
+    def partialPathName(self):
+        return self.node_name
+
+    def getPath(self):
+        return MDagPath(self.node_name)
+
+
+class MFnMesh(MFnDagNode):
+    def __init__(self, obj):
+        if isinstance(obj, str):
+            obj = MGlobal.getSelectionListByName(obj).getDagPath(0)
+
+        self.shape = scene.mesh(obj.node_name)
+        self.node_name = self.shape.name
+        self.mesh = self.shape.data
+
+    # トポロジー
+    @property
+    def numVertices(self):
+        return len(self.mesh.points)
+
+    @property
+    def numEdges(self):
+        return len(self.mesh.edges)
+
+    @property
+    def numPolygons(self):
+        return len(self.mesh.faces)
+
+    @property
+    def numFaceVertices(self):
+        return self.mesh.num_face_vertices
+
+    def getPolygonVertices(self, fi):
+        return MIntArray(self.mesh.faces[fi])
+
+    def getVertices(self):
+        counts = MIntArray(len(f) for f in self.mesh.faces)
+        ids = MIntArray(vi for f in self.mesh.faces for vi in f)
+        return counts, ids
+
+    def getEdgeVertices(self, ei):
+        return tuple(self.mesh.edges[ei])
+
+    def isEdgeSmooth(self, ei):
+        return self.mesh.smooths[ei]
+
+    def setEdgeSmoothing(self, ei, smooth=True):
+        self.mesh.smooths[ei] = smooth
+
+    def getFaceVertexIndex(self, fi, local_vi, localVertex=True):
+        if localVertex:
+            return self.mesh.face_offsets[fi] + local_vi
+        return self.mesh.face_vertex_index(fi, local_vi)
+
+    # 頂点座標
+    def _offset(self, space):
+        return scene.world_offset(self.shape.name) if space == MSpace.kWorld else [0.0, 0.0, 0.0]
+
+    def getPoints(self, space=MSpace.kObject):
+        offset = self._offset(space)
+        return MPointArray(MPoint(p[0] + offset[0], p[1] + offset[1], p[2] + offset[2]) for p in self.mesh.points)
+
+    def getPoint(self, vi, space=MSpace.kObject):
+        return self.getPoints(space)[vi]
+
+    def setPoints(self, points, space=MSpace.kObject):
+        offset = self._offset(space)
+        self.mesh.points = [[p[0] - offset[0], p[1] - offset[1], p[2] - offset[2]] for p in points]
+
+    def setPoint(self, vi, point, space=MSpace.kObject):
+        offset = self._offset(space)
+        self.mesh.points[vi] = [point[0] - offset[0], point[1] - offset[1], point[2] - offset[2]]
+
+    # UV
+    def currentUVSetName(self, instance=-1):
+        return self.mesh.current_uv_set
+
+    def getUVSetNames(self):
+        return list(self.mesh.uv_sets)
+
+    def numUVs(self, uvSet=""):
+        return len(self.mesh.uv_set(uvSet or None)["us"])
+
+    def getUVs(self, uvSet=""):
+        data = self.mesh.uv_set(uvSet or None)
+        return MFloatArray(data["us"]), MFloatArray(data["vs"])
+
+    def setUVs(self, us, vs, uvSet=""):
+        data = self.mesh.uv_set(uvSet or None)
+
+        if len(us) != len(vs):
+            raise ValueError("setUVs: array length mismatch")
+
+        data["us"] = [float(u) for u in us]
+        data["vs"] = [float(v) for v in vs]
+
+    def getUV(self, uvi, uvSet=""):
+        data = self.mesh.uv_set(uvSet or None)
+        return data["us"][uvi], data["vs"][uvi]
+
+    def setUV(self, uvi, u, v, uvSet=""):
+        data = self.mesh.uv_set(uvSet or None)
+        data["us"][uvi] = float(u)
+        data["vs"][uvi] = float(v)
+
+    def getPolygonUVid(self, fi, local_vi, uvSet=""):
+        return self.mesh.uv_set(uvSet or None)["face_uvs"][fi][local_vi]
+
+    def getAssignedUVs(self, uvSet=""):
+        face_uvs = self.mesh.uv_set(uvSet or None)["face_uvs"]
+        return MIntArray(len(f) for f in face_uvs), MIntArray(uvi for f in face_uvs for uvi in f)
+
+    def assignUVs(self, uvCounts, uvIds, uvSet=""):
+        data = self.mesh.uv_set(uvSet or None)
+
+        if list(uvCounts) != [len(f) for f in self.mesh.faces]:
+            raise ValueError("assignUVs: uvCounts does not match the face vertex counts")
+
+        face_uvs = []
+        offset = 0
+
+        for count in uvCounts:
+            face_uvs.append([int(x) for x in uvIds[offset:offset + count]])
+            offset += count
+
+        if any(uvi >= len(data["us"]) for f in face_uvs for uvi in f):
+            raise ValueError("assignUVs: uv id out of range")
+
+        data["face_uvs"] = face_uvs
+
+    def getUvShellsIds(self, uvSet=""):
+        num_shells, ids = self.mesh.uv_shells(uvSet or None)
+        return num_shells, MIntArray(ids)
+
+    # 頂点カラー
+    def getColorSetNames(self):
+        return ["colorSet1"] if self.mesh.colors is not None else []
+
+    def getFaceVertexColors(self, colorSet="", defaultUnsetColor=None):
+        return MColorArray(MColor(c) for c in self.mesh.get_colors())
+
+    def setFaceVertexColors(self, colors, faces, vertices, modifier=None, rep=None):
+        stored = self.mesh.get_colors()
+
+        for color, fi, vi in zip(colors, faces, vertices):
+            stored[self.mesh.face_vertex_index(fi, vi)] = [float(x) for x in color]
+
+    def setVertexColors(self, colors, vertices, modifier=None, rep=None):
+        stored = self.mesh.get_colors()
+
+        for color, vi in zip(colors, vertices):
+            for fi in self.mesh.vertex_faces[vi]:
+                stored[self.mesh.face_vertex_index(fi, vi)] = [float(x) for x in color]
+
+    def updateSurface(self):
+        pass
+
+
+def _wrap_methods(cls, prefix):
+    """API の呼び出し回数もテストで見られるように記録する"""
+    for name, function in list(vars(cls).items()):
+        if name.startswith("_") or not callable(function):
+            continue
+
+        setattr(cls, name, _method(prefix + name, function))
+
+
+def _method(name, function):
+    def wrapper(self, *args, **kwargs):
+        return mm.recorder.call(name, function, (self,) + args, kwargs)
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+
+    return wrapper
+
+
+_wrap_methods(MFnMesh, "om.MFnMesh.")
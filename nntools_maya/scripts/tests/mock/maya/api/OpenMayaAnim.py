@@ -0,0 +1,51 @@
+"""maya.api.OpenMayaAnim の代替"""
+import mayamock as mm
+from mayamock import scene
+
+from . import OpenMaya as om
+
+
+class MFnSkinCluster(object):
+    def __init__(self, obj):
+        self.node_name = obj.node_name
+        self.data = scene.get(obj.node_name).data
+
+    def name(self):
+        return self.node_name
+
+    def influenceObjects(self):
+        return [om.MDagPath(x) for x in self.data.influences]
+
+    def numOutputConnections(self):
+        return 1
+
+    def indexForOutputConnection(self, i):
+        return 0
+
+    def getPathAtIndex(self, i):
+        return om.MDagPath(scene.get(self.node_name).data.mesh)
+
+    def getWeights(self, dag, comp, influence=None):
+        vertices = comp.indices if comp is not None and not comp.isNull() else range(len(self.data.weights))
+
+        if influence is not None:
+            return om.MDoubleArray(self.data.weights[vi][influence] for vi in vertices)
+
+        weights = om.MDoubleArray(w for vi in vertices for w in self.data.weights[vi])
+
+        return weights, len(self.data.influences)
+
+    def setWeights(self, dag, comp, influences, weights, normalize=True, returnOldWeights=False):
+        # 実機は頂点コンポーネントが必須
+        if comp is None or comp.isNull():
+            raise RuntimeError("setWeights: a vertex component is required")
+
+        vertices = comp.indices
+        n = len(influences)
+
+        for k, vi in enumerate(vertices):
+            for j, ii in enumerate(influences):
+                self.data.weights[vi][ii] = float(weights[k * n + j])
+
+
+om._wrap_methods(MFnSkinCluster, "oma.MFnSkinCluster.")
@@ -0,0 +1,5 @@
+"""maya.app.general.mayaMixin の代替"""
+
+
+class MayaQWidgetBaseMixin(object):
+    pass
@@ -0,0 +1,722 @@
+"""maya.cmds の代替
+
+mayamock のシーンに対して動作する｡ 全ての呼び出しは mayamock.recorder に記録される｡
+未実装のコマンドは何もせず None を返す｡
+"""
+import fnmatch
+
+import mayamock as mm
+from mayamock import scene
+
+
+def _flag(kwargs, *names, default=None):
+    """長い名前と短い名前のどちらかで指定されたフラグの値を返す"""
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+
+    return default
+
+
+def _as_list(args):
+    """位置引数を文字列のフラットなリストにする"""
+    result = []
+
+    for a in args:
+        if a is None:
+            continue
+
+        if isinstance(a, (list, tuple)):
+            result.extend(_as_list(a))
+        else:
+            result.append(a)
+
+    return result
+
+
+def _expand(names):
+    """コンポーネントを含む文字列リストを 1 要素 1 文字列に展開する"""
+    result = []
+
+    for name in names:
+        shape, kind, indices = mm.parse(name)
+
+        if kind is None:
+            result.append(name)
+        else:
+            result.extend(mm.component_strings(shape, kind, indices, flatten=True))
+
+    return result
+
+
+# 選択
+def ls(*args, **kwargs):
+    flatten = _flag(kwargs, "flatten", "fl", default=False)
+    node_type = _flag(kwargs, "type", "typ")
+    objects_only = _flag(kwargs, "objectsOnly", "o", default=False)
+    long_name = _flag(kwargs, "long", "l", default=False)
+
+    if _flag(kwargs, "selection", "sl", default=False) or _flag(kwargs, "orderedSelection", "os", default=False):
+        names = list(scene.selection)
+    elif args:
+        names = []
+        for pattern in _as_list(args):
+            if "*" in pattern and "[" not in pattern:
+                names.extend(n for n in scene.nodes if fnmatch.fnmatch(n, pattern))
+            elif mm._component_re.match(pattern) or scene.find(pattern):
+                names.append(pattern)
+    else:
+        names = list(scene.nodes)
+
+    if node_type:
+        types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+        names = [n for n in names if mm._component_re.match(n) is None and scene.get(n).type in types]
+
+    if objects_only:
+        objects = []
+        for n in names:
+            shape, kind, _ = mm.parse(n)
+            o = mm.transform_name(shape) if kind else n
+            if o not in objects:
+                objects.append(o)
+        names = objects
+
+    if flatten:
+        names = _expand(names)
+
+    if long_name:
+        names = [scene.full_path(n) if mm._component_re.match(n) is None else n for n in names]
+
+    return names
+
+
+def select(*args, **kwargs):
+    names = _as_list(args)
+
+    if _flag(kwargs, "clear", "cl", default=False):
+        scene.selection = []
+        return
+
+    if _flag(kwargs, "deselect", "d", default=False):
+        removed = set(_expand(names))
+        scene.selection = [x for x in _expand(scene.selection) if x not in removed]
+        return
+
+    if _flag(kwargs, "add", "af", default=False) or _flag(kwargs, "toggle", "tgl", default=False):
+        scene.selection = scene.selection + names
+        return
+
+    for name in names:
+        mm.parse(name)
+
+    scene.selection = names
+
+
+def selectMode(*args, **kwargs):
+    if _flag(kwargs, "query", "q", default=False):
+        if _flag(kwargs, "component", "co", default=False):
+            return scene.select_mode == "component"
+        if _flag(kwargs, "object", "o", default=False):
+            return scene.select_mode == "object"
+        return False
+
+    if _flag(kwargs, "component", "co", default=False):
+        scene.select_mode = "component"
+    elif _flag(kwargs, "object", "o", default=False):
+        scene.select_mode = "object"
+
+
+def selectType(*args, **kwargs):
+    query = _flag(kwargs, "query", "q", default=False)
+    aliases = {"v": "vertex", "pv": "vertex", "e": "edge", "pe": "edge", "fc": "facet", "pf": "facet", "puv": "polymeshUV"}
+
+    for key, value in kwargs.items():
+        if key in ("query", "q", "edit", "e"):
+            continue
+
+        key = aliases.get(key, key)
+
+        if query:
+            return scene.select_type.get(key, False)
+
+        scene.select_type[key] = value
+
+
+def softSelect(*args, **kwargs):
+    return False
+
+
+def filterExpand(*args, **kwargs):
+    mask = _flag(kwargs, "selectionMask", "sm")
+    names = _as_list(args) or list(scene.selection)
+    masks = mask if isinstance(mask, (list, tuple)) else [mask]
+
+    result = []
+    for name in _expand(names):
+        shape, kind, _ = mm.parse(name)
+
+        if kind is None:
+            if 12 in masks and shape.type == "mesh":
+                result.append(mm.transform_name(shape))
+            continue
+
+        if mask is None or mm.selection_mask[kind] in masks:
+            result.append(name)
+
+    return result or None
+
+
+def polyListComponentConversion(*args, **kwargs):
+    names = _as_list(args) or list(scene.selection)
+    targets = [
+        (mm.KIND_VTX, ("toVertex", "tv")),
+        (mm.KIND_EDGE, ("toEdge", "te")),
+        (mm.KIND_FACE, ("toFace", "tf")),
+        (mm.KIND_UV, ("toUV", "tuv")),
+        (mm.KIND_VF, ("toVertexFace", "tvf")),
+    ]
+    to_kind = None
+
+    for kind, flags in targets:
+        if _flag(kwargs, *flags, default=False):
+            to_kind = kind
+
+    border = _flag(kwargs, "border", "bo", default=False)
+    internal = _flag(kwargs, "internal", "in", default=False)
+    uv_shell = _flag(kwargs, "uvShell", "uvs", default=False)
+
+    result = []
+    results_per_shape = dict()
+
+    for (shape_name, kind), indices in mm.group_components(names).items():
+        shape = scene.get(shape_name)
+
+        if to_kind is None:
+            if shape_name not in result:
+                result.append(shape_name)
+            continue
+
+        if shape.type != "mesh":
+            continue
+
+        if kind is None:
+            kind = mm.KIND_FACE
+            indices = shape.data.all_indices(kind)
+
+        converted = shape.data.convert(kind, indices, to_kind, border=border, internal=internal, uv_shell=uv_shell)
+        results_per_shape.setdefault(shape_name, set()).update(converted)
+
+    for shape_name, indices in results_per_shape.items():
+        result.extend(mm.component_strings(scene.get(shape_name), to_kind, indices))
+
+    return result
+
+
+def SelectUVShell(*args, **kwargs):
+    uvs = polyListComponentConversion(scene.selection, toUV=True, uvShell=True)
+    scene.selection = uvs
+
+
+def _select_uv_facing(front):
+    result = []
+
+    for (shape_name, kind), indices in mm.group_components(scene.selection).items():
+        shape = scene.get(shape_name)
+        if shape.type != "mesh":
+            continue
+
+        mesh = shape.data
+        faces = [fi for fi in range(len(mesh.faces)) if (mesh.uv_face_area(fi) >= 0) == front]
+        result.extend(mm.component_strings(shape, mm.KIND_UV, mesh.convert(mm.KIND_FACE, faces, mm.KIND_UV)))
+
+    scene.selection = result
+
+
+def SelectUVBackFacingComponents(*args, **kwargs):
+    _select_uv_facing(front=False)
+
+
+def SelectUVFrontFacingComponents(*args, **kwargs):
+    _select_uv_facing(front=True)
+
+
+# ノード
+def attributeQuery(attr, node=None, **kwargs):
+    if _flag(kwargs, "exists", "ex", default=False):
+        return attr in scene.get(node).attrs
+
+    return None
+
+
+def addAttr(*args, **kwargs):
+    node = scene.get(_as_list(args)[0])
+    node.attrs.setdefault(_flag(kwargs, "longName", "ln"), "" if _flag(kwargs, "dataType", "dt") == "string" else 0.0)
+
+
+def objExists(name):
+    try:
+        mm.parse(name)
+        return True
+
+    except mm.MockMayaError:
+        return False
+
+
+def objectType(name, **kwargs):
+    shape, kind, _ = mm.parse(name)
+    node = shape if kind else scene.get(name)
+    is_type = _flag(kwargs, "isType", "i")
+
+    if is_type:
+        return node.type == is_type
+
+    return node.type
+
+
+def nodeType(name, **kwargs):
+    return objectType(name, **kwargs)
+
+
+def rename(*args, **kwargs):
+    name, new_name = args[-2:] if len(args) >= 2 else (scene.selection[0], args[0])
+    return scene.rename(name, new_name)
+
+
+def parent(*args, **kwargs):
+    names = _as_list(args)
+
+    if _flag(kwargs, "world", "w", default=False):
+        children, new_parent = names or list(scene.selection), None
+    else:
+        children, new_parent = names[:-1], names[-1]
+
+    for name in children:
+        scene.reparent(name, new_parent)
+
+    return children
+
+
+def listRelatives(*args, **kwargs):
+    names = _as_list(args) or [x for x in scene.selection if scene.find(x)]
+    full_path = _flag(kwargs, "fullPath", "f", default=False)
+    node_type = _flag(kwargs, "type", "typ")
+    result = []
+
+    for name in names:
+        node = scene.get(name)
+
+        if _flag(kwargs, "parent", "p", default=False):
+            related = [scene.get(node.parent)] if node.parent else []
+
+        elif _flag(kwargs, "allDescendents", "ad", default=False):
+            related = []
+            queue = scene.children(node.name)
+            while queue:
+                child = queue.pop(0)
+                related.append(child)
+                queue.extend(scene.children(child.name))
+
+        else:
+            related = scene.children(node.name)
+
+            if _flag(kwargs, "shapes", "s", default=False):
+                related = [n for n in related if n.type == "mesh"]
+
+        if node_type:
+            types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+            related = [n for n in related if n.type in types]
+
+        result.extend(scene.full_path(n.name) if full_path else n.name for n in related)
+
+    return result or None
+
+
+def listConnections(*args, **kwargs):
+    names = _as_list(args)
+    node_type = _flag(kwargs, "type", "t")
+    result = []
+
+    for name in names:
+        if "." in name and mm._component_re.match(name) is None:
+            # 入力のアトリビュートはヒストリーのノードだけを扱う
+            node = scene.find(name.split(".")[0])
+
+            if node is not None and name.split(".")[-1] in ("inMesh", "create") and _flag(kwargs, "source", "s", default=True):
+                result.extend(x for x in node.history if x not in result)
+
+            continue
+
+        node = scene.find(name)
+        if node is None:
+            continue
+
+        if node.type == "skinCluster":
+            connected = node.data.influences + [node.data.mesh]
+        elif node.type == "joint":
+            connected = [sc.name for sc in scene.skinclusters() if node.name in sc.data.influences]
+        elif node.type == "mesh":
+            connected = [sc.name for sc in scene.skinclusters() if sc.data.mesh == node.name]
+        else:
+            connected = []
+
+        for c in connected:
+            if node_type is None or scene.get(c).type == node_type:
+                if c not in result:
+                    result.append(c)
+
+    return result or None
+
+
+def listHistory(*args, **kwargs):
+    result = []
+
+    for name in _as_list(args):
+        shape, _, _ = mm.parse(name)
+        result.append(shape.name)
+        result.extend(sc.name for sc in scene.skinclusters() if sc.data.mesh == shape.name)
+
+    return result
+
+
+def getAttr(attr, **kwargs):
+    node_name, attr_name = attr.split(".", 1)
+    node = scene.get(node_name)
+
+    if attr_name in ("translate", "t"):
+        return [tuple(node.translate)]
+
+    if attr_name in ("translateX", "tx", "translateY", "ty", "translateZ", "tz"):
+        return node.translate["xyz".index(attr_name[-1].lower())]
+
+    return node.attrs.get(attr_name, False)
+
+
+def setAttr(attr, *values, **kwargs):
+    node_name, attr_name = attr.split(".", 1)
+    node = scene.get(node_name)
+
+    if attr_name in ("translate", "t"):
+        node.translate = list(map(float, values))
+    else:
+        node.attrs[attr_name] = values[0] if len(values) == 1 else values
+
+
+# 座標
+def xform(*args, **kwargs):
+    names = _as_list(args) or list(scene.selection)
+    world = _flag(kwargs, "worldSpace", "ws", default=False)
+    query = _flag(kwargs, "query", "q", default=False)
+    translation = _flag(kwargs, "translation", "t")
+    relative = _flag(kwargs, "relative", "r", default=False)
+
+    if query:
+        result = []
+
+        for name in _expand(names):
+            shape, kind, indices = mm.parse(name)
+
+            if kind == mm.KIND_VTX:
+                points = scene.world_points(shape) if world else shape.data.points
+                result.extend(points[indices[0]])
+            elif kind is None:
+                result.extend(scene.world_offset(name) if world else scene.get(name).translate)
+
+        return result
+
+    if translation is not None:
+        for name in _expand(names):
+            shape, kind, indices = mm.parse(name)
+
+            if kind == mm.KIND_VTX:
+                offset = scene.world_offset(shape.name) if world else [0.0, 0.0, 0.0]
+                p = shape.data.points[indices[0]]
+                for i in range(3):
+                    p[i] = p[i] + translation[i] if relative else translation[i] - offset[i]
+            elif kind is None:
+                node = scene.get(name)
+                node.translate = [node.translate[i] + translation[i] if relative else float(translation[i]) for i in range(3)]
+
+
+def pointPosition(name, **kwargs):
+    shape, kind, indices = mm.parse(name)
+
+    if kind != mm.KIND_VTX:
+        raise mm.MockMayaError("pointPosition: unsupported component %s" % name)
+
+    if _flag(kwargs, "local", "l", default=False):
+        return list(shape.data.points[indices[0]])
+
+    return scene.world_points(shape)[indices[0]]
+
+
+def polyEvaluate(*args, **kwargs):
+    names = _as_list(args) or list(scene.selection)
+    mesh = scene.mesh(names[0]).data
+
+    if _flag(kwargs, "vertex", "v", default=False):
+        return len(mesh.points)
+    if _flag(kwargs, "edge", "e", default=False):
+        return len(mesh.edges)
+    if _flag(kwargs, "face", "f", default=False):
+        return len(mesh.faces)
+    if _flag(kwargs, "uvcoord", "uv", default=False):
+        return len(mesh.all_indices(mm.KIND_UV))
+
+    return None
+
+
+def polyEditUV(*args, **kwargs):
+    names = _as_list(args) or list(scene.selection)
+    query = _flag(kwargs, "query", "q", default=False)
+    relative = _flag(kwargs, "relative", "r", default=True)
+    u = _flag(kwargs, "uValue", "u")
+    v = _flag(kwargs, "vValue", "v")
+    su = _flag(kwargs, "scaleU", "su")
+    sv = _flag(kwargs, "scaleV", "sv")
+    pu = _flag(kwargs, "pivotU", "pu", default=0.0)
+    pv = _flag(kwargs, "pivotV", "pv", default=0.0)
+
+    # UV 以外のコンポーネントは UV に変換して扱う
+    uv_names = polyListComponentConversion(names, toUV=True)
+    result = []
+
+    for name in _expand(uv_names):
+        shape, _, indices = mm.parse(name)
+        data = shape.data.uv_set()
+        uvi = indices[0]
+
+        if query:
+            result.extend([data["us"][uvi], data["vs"][uvi]])
+            continue
+
+        if su is not None or sv is not None:
+            data["us"][uvi] = pu + (data["us"][uvi] - pu) * (su if su is not None else 1.0)
+            data["vs"][uvi] = pv + (data["vs"][uvi] - pv) * (sv if sv is not None else 1.0)
+        elif relative:
+            data["us"][uvi] += u or 0.0
+            data["vs"][uvi] += v or 0.0
+        else:
+            if u is not None:
+                data["us"][uvi] = float(u)
+            if v is not None:
+                data["vs"][uvi] = float(v)
+
+    return result if query else None
+
+
+def polyExtrudeEdge(*args, **kwargs):
+    """境界エッジの押し出し｡ 押し出し先のエッジを選択する"""
+    names = _as_list(args) or list(scene.selection)
+    new_edges = []
+
+    for (shape_name, kind), indices in mm.group_components(names).items():
+        shape = scene.mesh(shape_name)
+        edge_ids = shape.data.extrude_border_edges(sorted(indices))
+        new_edges.extend(mm.component_strings(shape, kind, edge_ids))
+
+    scene.selection = new_edges
+
+    return ["polyExtrudeEdge1"]
+
+
+def polyMapSew(*args, **kwargs):
+    """エッジの両側のフェースで同じ位置にある UV を一つにまとめる"""
+    for (shape_name, kind), indices in mm.group_components(_as_list(args) or list(scene.selection)).items():
+        mesh = scene.mesh(shape_name).data
+        data = mesh.uv_set()
+
+        for ei in indices:
+            faces = mesh.edge_faces[ei]
+
+            for vi in mesh.edges[ei]:
+                corners = [(fi, mesh.faces[fi].index(vi)) for fi in faces]
+                uvs = [data["face_uvs"][fi][k] for fi, k in corners]
+                keep = min(uvs)
+
+                for (fi, k), uvi in zip(corners, uvs):
+                    if (data["us"][uvi], data["vs"][uvi]) == (data["us"][keep], data["vs"][keep]):
+                        data["face_uvs"][fi][k] = keep
+
+
+def polyPinUV(*args, **kwargs):
+    names = _expand(_as_list(args) or list(scene.selection))
+    return [0.0 for _ in names]
+
+
+# 頂点カラー
+def polyColorSet(*args, **kwargs):
+    if _flag(kwargs, "query", "q", default=False):
+        if _flag(kwargs, "representation", "rep", default=False):
+            return "RGBA"
+        if _flag(kwargs, "currentColorSet", "ccs", default=False):
+            return ["colorSet1"]
+        if _flag(kwargs, "allColorSets", "acs", default=False):
+            return ["colorSet1"]
+
+    return None
+
+
+def polyColorPerVertex(*args, **kwargs):
+    names = _as_list(args) or list(scene.selection)
+    query = _flag(kwargs, "query", "q", default=False)
+    channels = [("r", "red"), ("g", "green"), ("b", "blue"), ("a", "alpha")]
+    rgb = _flag(kwargs, "rgb", "colorRGB")
+
+    result = []
+
+    for name in _expand(names):
+        shape, kind, indices = mm.parse(name)
+        mesh = shape.data
+        colors = mesh.get_colors()
+        corners = mesh.convert(kind, indices, mm.KIND_VF)
+        fvis = [mesh.face_vertex_index(fi, vi) for vi, fi in sorted(corners)]
+
+        if query:
+            for short, long in channels:
+                if _flag(kwargs, short, long, default=False):
+                    result.append(sum(colors[i]["rgba".index(short)] for i in fvis) / len(fvis))
+            continue
+
+        for i in fvis:
+            for ci, (short, long) in enumerate(channels):
+                value = _flag(kwargs, short, long)
+                if value is not None:
+                    colors[i][ci] = float(value)
+
+            if rgb is not None:
+                colors[i][:3] = [float(x) for x in rgb]
+
+    return result if query else None
+
+
+# スキン
+def skinCluster(*args, **kwargs):
+    if _flag(kwargs, "query", "q", default=False):
+        node = scene.get(_as_list(args)[0])
+
+        if _flag(kwargs, "influence", "inf", default=False):
+            return list(node.data.influences)
+
+        if _flag(kwargs, "geometry", "g", default=False):
+            return [node.data.mesh]
+
+    return None
+
+
+def skinPercent(skincluster, *args, **kwargs):
+    sc = scene.get(skincluster).data
+    names = _expand(_as_list(args))
+
+    if _flag(kwargs, "query", "q", default=False):
+        if _flag(kwargs, "value", "v", default=False):
+            shape, _, indices = mm.parse(names[0])
+            return list(sc.weights[indices[0]])
+
+        return None
+
+    transform_value = _flag(kwargs, "transformValue", "tv")
+    normalize = _flag(kwargs, "normalize", "nrm", default=True)
+
+    if transform_value:
+        if isinstance(transform_value[0], str):
+            transform_value = [transform_value]
+
+        for name in names:
+            shape, _, indices = mm.parse(name)
+            weights = sc.weights[indices[0]]
+            specified = dict()
+
+            for influence, weight in transform_value:
+                specified[sc.influences.index(influence)] = float(weight)
+
+            rest = sum(w for i, w in enumerate(weights) if i not in specified)
+            target = 1.0 - sum(specified.values())
+
+            # 指定されなかったインフルエンスで残りを按分する
+            for i in range(len(weights)):
+                if i in specified:
+                    weights[i] = specified[i]
+                elif normalize:
+                    weights[i] = weights[i] / rest * target if rest > 0 else 0.0
+
+
+# システム
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, "openChunk", "ock", default=False):
+        scene.undo_depth += 1
+    elif _flag(kwargs, "closeChunk", "cck", default=False):
+        scene.undo_depth -= 1
+    elif _flag(kwargs, "query", "q", default=False):
+        return True
+
+
+def about(*args, **kwargs):
+    if _flag(kwargs, "version", "v", default=False):
+        return "2024"
+
+    if _flag(kwargs, "apiVersion", "api", default=False):
+        return 20240000
+
+    return ""
+
+
+def scriptEditorInfo(*args, **kwargs):
+    if _flag(kwargs, "query", "q", default=False):
+        return False
+
+
+def repeatLast(*args, **kwargs):
+    pass
+
+
+def loadPlugin(*args, **kwargs):
+    scene.plugins.update(_as_list(args))
+    return _as_list(args)
+
+
+def pluginInfo(*args, **kwargs):
+    return any(p in scene.plugins for p in _as_list(args))
+
+
+def snapshotState(*args, **kwargs):
+    """snapshotStatePlugin の代替｡ Undo は扱わないので何もしない"""
+    pass
+
+
+def attributeEdit(*args, **kwargs):
+    """attributeEditPlugin の代替｡ 変更後の値を設定するだけで Undo は扱わない"""
+    plugs = list(_flag(kwargs, "plug", "p", default=[]))
+    values = list(_flag(kwargs, "after", "a", default=[]))
+
+    for plug, value in zip(plugs, values):
+        node_name, attr = plug.split(".", 1)
+        scene.get(node_name).attrs[attr] = float(value)
+
+
+def evalDeferred(*args, **kwargs):
+    """関数を登録するだけで実行しない｡ mayamock.run_deferred() で実行する"""
+    scene.deferred.extend(a for a in args if callable(a))
+
+
+def warning(*args, **kwargs):
+    scene.warnings.append(" ".join(str(a) for a in args))
+
+
+def refresh(*args, **kwargs):
+    pass
+
+
+mm.recorded("cmds.", globals())
+
+
+def __getattr__(name):
+    """未実装のコマンドは呼び出しだけ記録して None を返す"""
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    def command(*args, **kwargs):
+        return None
+
+    command.__name__ = name
+
+    return mm._wrap("cmds." + name, command)
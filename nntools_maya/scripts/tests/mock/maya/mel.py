@@ -0,0 +1,24 @@
+"""maya.mel の代替
+
+findRelatedSkinCluster のみ mayamock のシーンから結果を返す｡ それ以外は記録だけして何もしない｡
+"""
+import mayamock as mm
+from mayamock import scene
+
+
+def eval(command):
+    tokens = command.strip().rstrip(";").split()
+
+    if tokens and tokens[0] == "findRelatedSkinCluster":
+        shape, _, _ = mm.parse(tokens[1])
+
+        for sc in scene.skinclusters():
+            if sc.data.mesh == shape.name:
+                return sc.name
+
+        return ""
+
+    return None
+
+
+mm.recorded("mel.", globals())
@@ -0,0 +1,798 @@
+"""Maya を使わずにツールを動かすためのインメモリシーンとコマンド呼び出しの記録
+
+tests/mock 以下の maya パッケージ (cmds, mel, api.OpenMaya 等) はこのモジュールのシーンを操作する｡
+メッシュ･トランスフォーム･ジョイント･スキンクラスターのみを扱う最小限のモデルで､
+ツールのテストに必要なコマンドとフラグだけを実装している｡
+"""
+import contextlib
+import re
+import time
+
+
+class CallRecord(object):
+    """コマンド呼び出し一回分の記録
+
+    Args:
+        name (str): コマンド名 ("cmds.ls", "mel.eval" 等)
+        args (tuple): 位置引数
+        kwargs (dict): キーワード引数
+        duration (float): 所要時間 (秒)
+    """
+    def __init__(self, name, args, kwargs, duration):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.duration = duration
+
+    def __repr__(self):
+        return "CallRecord(%s, %r, %r, %.6f)" % (self.name, self.args, self.kwargs, self.duration)
+
+
+class CallRecorder(object):
+    """cmds/mel の呼び出しを記録するクラス
+
+    コマンド内部から別のコマンドを呼んだ場合は外側の呼び出しのみを記録する｡
+    """
+    def __init__(self):
+        self.records = []
+        self._depth = 0
+
+    def clear(self):
+        self.records = []
+
+    def call(self, name, function, args, kwargs):
+        """function を呼び出して記録する"""
+        if self._depth > 0:
+            return function(*args, **kwargs)
+
+        self._depth += 1
+        start = time.perf_counter()
+
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            self._depth -= 1
+            self.records.append(CallRecord(name, args, kwargs, time.perf_counter() - start))
+
+    def count(self, name=None):
+        """記録された呼び出し回数を返す｡ name 指定時はそのコマンドのみ数える"""
+        if name is None:
+            return len(self.records)
+
+        return len([r for r in self.records if r.name == name])
+
+    def summary(self):
+        """コマンド名ごとの (呼び出し回数, 合計時間) の辞書を返す"""
+        result = dict()
+
+        for r in self.records:
+            count, total = result.get(r.name, (0, 0.0))
+            result[r.name] = (count + 1, total + r.duration)
+
+        return result
+
+    @contextlib.contextmanager
+    def measure(self):
+        """with ブロック内の呼び出しだけを集めたリストを返すコンテキストマネージャー"""
+        start = len(self.records)
+        calls = []
+
+        try:
+            yield calls
+
+        finally:
+            calls.extend(self.records[start:])
+
+
+recorder = CallRecorder()
+
+
+def recorded(prefix, namespace):
+    """namespace 内の公開関数を記録付きの関数に置き換える"""
+    for name, function in list(namespace.items()):
+        if name.startswith("_") or not callable(function) or isinstance(function, type):
+            continue
+
+        if getattr(function, "__module__", None) != namespace["__name__"]:
+            continue
+
+        namespace[name] = _wrap(prefix + name, function)
+
+
+def _wrap(name, function):
+    def wrapper(*args, **kwargs):
+        return recorder.call(name, function, args, kwargs)
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+
+    return wrapper
+
+
+class MockMayaError(RuntimeError):
+    """Maya のコマンドエラーに相当する例外"""
+    pass
+
+
+# コンポーネント種別と filterExpand のセレクションマスク
+KIND_VTX = "vtx"
+KIND_EDGE = "e"
+KIND_FACE = "f"
+KIND_UV = "map"
+KIND_VF = "vtxFace"
+
+selection_mask = {KIND_VTX: 31, KIND_EDGE: 32, KIND_FACE: 34, KIND_UV: 35, KIND_VF: 70}
+
+
+class Mesh(object):
+    """ポリゴンメッシュのデータ
+
+    Args:
+        points (list[list[float]]): 頂点座標 (オブジェクト空間)
+        faces (list[list[int]]): フェースを構成する頂点 ID
+        uvs (list[list[float]], optional): UV 座標
+        face_uvs (list[list[int]], optional): フェース頂点毎の UV ID｡ faces と同じ形
+        colors (list[list[float]], optional): フェース頂点毎の RGBA｡ フェース頂点の通し番号順
+    """
+    def __init__(self, points, faces, uvs=None, face_uvs=None, colors=None):
+        self.points = [list(map(float, p)) for p in points]
+        self.faces = [list(f) for f in faces]
+        self.current_uv_set = "map1"
+        self.uv_sets = dict()
+
+        if uvs is not None:
+            self.uv_sets["map1"] = {
+                "us": [float(uv[0]) for uv in uvs],
+                "vs": [float(uv[1]) for uv in uvs],
+                "face_uvs": [list(f) for f in face_uvs],
+            }
+
+        self.colors = [list(c) for c in colors] if colors else None
+
+        self._build_topology()
+        self.smooths = [True] * len(self.edges)
+
+    def _build_topology(self):
+        self.face_offsets = []
+        n = 0
+        for f in self.faces:
+            self.face_offsets.append(n)
+            n += len(f)
+
+        self.num_face_vertices = n
+
+        self.edges = []
+        self.edge_index = dict()
+        self.face_edges = []
+        self.vertex_faces = [[] for _ in self.points]
+        self.vertex_edges = [[] for _ in self.points]
+
+        for fi, f in enumerate(self.faces):
+            fe = []
+
+            for k, vi in enumerate(f):
+                self.vertex_faces[vi].append(fi)
+                a, b = vi, f[(k + 1) % len(f)]
+                key = (min(a, b), max(a, b))
+
+                if key not in self.edge_index:
+                    self.edge_index[key] = len(self.edges)
+                    self.edges.append(key)
+                    self.vertex_edges[a].append(self.edge_index[key])
+                    self.vertex_edges[b].append(self.edge_index[key])
+
+                fe.append(self.edge_index[key])
+
+            self.face_edges.append(fe)
+
+        self.edge_faces = [[] for _ in self.edges]
+        for fi, fe in enumerate(self.face_edges):
+            for ei in fe:
+                self.edge_faces[ei].append(fi)
+
+    # UV
+    def uv_set(self, name=None):
+        return self.uv_sets.get(name or self.current_uv_set)
+
+    def corner_uv(self, fi, vi, uv_set=None):
+        """フェース fi の頂点 vi に割り当てられた UV ID"""
+        data = self.uv_set(uv_set)
+
+        if not data:
+            return -1
+
+        return data["face_uvs"][fi][self.faces[fi].index(vi)]
+
+    def uv_corners(self, uv_set=None):
+        """UV ID から (フェース ID, 頂点 ID) のリストへの対応"""
+        data = self.uv_set(uv_set)
+        corners = [[] for _ in data["us"]]
+
+        for fi, fuv in enumerate(data["face_uvs"]):
+            for k, uvi in enumerate(fuv):
+                corners[uvi].append((fi, self.faces[fi][k]))
+
+        return corners
+
+    def uv_shells(self, uv_set=None):
+        """UV 毎のシェル ID とシェル数"""
+        data = self.uv_set(uv_set)
+        parent = list(range(len(data["us"])))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for fuv in data["face_uvs"]:
+            for uvi in fuv[1:]:
+                ra, rb = find(fuv[0]), find(uvi)
+                if ra != rb:
+                    parent[rb] = ra
+
+        roots = dict()
+        ids = []
+        for i in range(len(parent)):
+            ids.append(roots.setdefault(find(i), len(roots)))
+
+        return len(roots), ids
+
+    def uv_face_area(self, fi, uv_set=None):
+        data = self.uv_set(uv_set)
+        fuv = data["face_uvs"][fi]
+        area = 0.0
+
+        for k in range(len(fuv)):
+            a, b = fuv[k], fuv[(k + 1) % len(fuv)]
+            area += data["us"][a] * data["vs"][b] - data["us"][b] * data["vs"][a]
+
+        return area * 0.5
+
+    # コンポーネント変換
+    def all_indices(self, kind):
+        if kind == KIND_VTX:
+            return list(range(len(self.points)))
+        if kind == KIND_EDGE:
+            return list(range(len(self.edges)))
+        if kind == KIND_FACE:
+            return list(range(len(self.faces)))
+        if kind == KIND_UV:
+            data = self.uv_set()
+            return list(range(len(data["us"]))) if data else []
+        if kind == KIND_VF:
+            return [(vi, fi) for fi, f in enumerate(self.faces) for vi in f]
+
+        return []
+
+    def convert(self, kind, indices, to_kind, border=False, internal=False, uv_shell=False):
+        """コンポーネント ID を別の種類のコンポーネント ID の集合に変換する"""
+        indices = set(indices)
+        result = set()
+
+        if kind == KIND_VTX:
+            vertices = indices
+            faces = {fi for vi in vertices for fi in self.vertex_faces[vi]}
+            corners = {(vi, fi) for vi in vertices for fi in self.vertex_faces[vi]}
+
+            if to_kind == KIND_VTX:
+                result = vertices
+            elif to_kind == KIND_EDGE:
+                if internal:
+                    result = {ei for ei, (a, b) in enumerate(self.edges) if a in vertices and b in vertices}
+                else:
+                    result = {ei for vi in vertices for ei in self.vertex_edges[vi]}
+            elif to_kind == KIND_FACE:
+                if internal:
+                    result = {fi for fi in faces if all(vi in vertices for vi in self.faces[fi])}
+                else:
+                    result = faces
+            elif to_kind == KIND_UV:
+                result = {self.corner_uv(fi, vi) for vi, fi in corners}
+            elif to_kind == KIND_VF:
+                result = corners
+
+        elif kind == KIND_EDGE:
+            edges = indices
+            corners = {(vi, fi) for ei in edges for fi in self.edge_faces[ei] for vi in self.edges[ei]}
+
+            if to_kind == KIND_VTX:
+                result = {vi for ei in edges for vi in self.edges[ei]}
+            elif to_kind == KIND_EDGE:
+                result = edges
+            elif to_kind == KIND_FACE:
+                faces = {fi for ei in edges for fi in self.edge_faces[ei]}
+                if internal:
+                    faces = {fi for fi in faces if all(ei in edges for ei in self.face_edges[fi])}
+                result = faces
+            elif to_kind == KIND_UV:
+                result = {self.corner_uv(fi, vi) for vi, fi in corners}
+            elif to_kind == KIND_VF:
+                result = corners
+
+        elif kind == KIND_FACE:
+            faces = indices
+            region_border_edges = {ei for fi in faces for ei in self.face_edges[fi] if len([x for x in self.edge_faces[ei] if x in faces]) == 1}
+            region_border_vertices = {vi for ei in region_border_edges for vi in self.edges[ei]}
+
+            if to_kind == KIND_VTX:
+                result = region_border_vertices if border else {vi for fi in faces for vi in self.faces[fi]}
+            elif to_kind == KIND_EDGE:
+                result = region_border_edges if border else {ei for fi in faces for ei in self.face_edges[fi]}
+            elif to_kind == KIND_FACE:
+                result = faces
+            elif to_kind == KIND_UV:
+                data = self.uv_set()
+                result = {uvi for fi in faces for uvi in data["face_uvs"][fi]}
+            elif to_kind == KIND_VF:
+                result = {(vi, fi) for fi in faces for vi in self.faces[fi] if not border or vi in region_border_vertices}
+
+        elif kind == KIND_UV:
+            uvs = indices
+            corners = set()
+            for uvi, uv_corners in enumerate(self.uv_corners()):
+                if uvi in uvs:
+                    corners.update((vi, fi) for fi, vi in uv_corners)
+
+            if to_kind == KIND_VTX:
+                result = {vi for vi, _ in corners}
+            elif to_kind == KIND_EDGE:
+                for vi, fi in corners:
+                    f = self.faces[fi]
+                    k = f.index(vi)
+                    for other in (f[k - 1], f[(k + 1) % len(f)]):
+                        ei = self.edge_index[(min(vi, other), max(vi, other))]
+                        if not internal or self.corner_uv(fi, other) in uvs:
+                            result.add(ei)
+            elif to_kind == KIND_FACE:
+                faces = {fi for _, fi in corners}
+                if internal:
+                    faces = {fi for fi in faces if all(uvi in uvs for uvi in self.uv_set()["face_uvs"][fi])}
+                result = faces
+            elif to_kind == KIND_UV:
+                result = uvs
+                if uv_shell:
+                    _, shell_ids = self.uv_shells()
+                    shells = {shell_ids[uvi] for uvi in uvs}
+                    result = {uvi for uvi, si in enumerate(shell_ids) if si in shells}
+            elif to_kind == KIND_VF:
+                result = corners
+
+        elif kind == KIND_VF:
+            corners = indices
+
+            if to_kind == KIND_VTX:
+                result = {vi for vi, _ in corners}
+            elif to_kind == KIND_EDGE:
+                result = {ei for vi, fi in corners for ei in self.face_edges[fi] if vi in self.edges[ei]}
+            elif to_kind == KIND_FACE:
+                result = {fi for _, fi in corners}
+            elif to_kind == KIND_UV:
+                result = {self.corner_uv(fi, vi) for vi, fi in corners}
+            elif to_kind == KIND_VF:
+                result = corners
+
+        return result
+
+    # トポロジー編集
+    def extrude_border_edges(self, edge_ids):
+        """境界エッジを押し出す (polyExtrudeEdge -keepFacesTogether 相当)
+
+        新しい頂点は元の頂点と同じ位置に末尾へ追加し､新しいフェースも末尾に追加する｡
+        新しいフェース頂点にはフェース毎に独立した UV (0, 0) と未設定の頂点カラーを割り当てる｡
+
+        Returns:
+            list[int]: 押し出し先のエッジ ID
+        """
+        new_vertices = dict()
+        new_faces = []
+
+        for ei in edge_ids:
+            fi = self.edge_faces[ei][0]
+            f = self.faces[fi]
+            a, b = self.edges[ei]
+
+            if f[(f.index(a) + 1) % len(f)] != b:
+                a, b = b, a
+
+            for vi in (a, b):
+                if vi not in new_vertices:
+                    new_vertices[vi] = len(self.points)
+                    self.points.append(list(self.points[vi]))
+
+            new_faces.append([b, a, new_vertices[a], new_vertices[b]])
+
+        for data in self.uv_sets.values():
+            for f in new_faces:
+                start = len(data["us"])
+                data["us"].extend([0.0] * len(f))
+                data["vs"].extend([0.0] * len(f))
+                data["face_uvs"].append(list(range(start, start + len(f))))
+
+        if self.colors is not None:
+            self.colors.extend([-1.0, -1.0, -1.0, -1.0] for f in new_faces for _ in f)
+
+        self.faces.extend(new_faces)
+        self._build_topology()
+        self.smooths.extend([True] * (len(self.edges) - len(self.smooths)))
+
+        return [self.edge_index[(min(f[2], f[3]), max(f[2], f[3]))] for f in new_faces]
+
+    # 頂点カラー
+    def face_vertex_index(self, fi, vi):
+        return self.face_offsets[fi] + self.faces[fi].index(vi)
+
+    def get_colors(self):
+        if self.colors is None:
+            self.colors = [[-1.0, -1.0, -1.0, -1.0] for _ in range(self.num_face_vertices)]
+
+        return self.colors
+
+
+class Node(object):
+    """DAG/DG ノード
+
+    Args:
+        name (str): ノード名
+        type (str): ノードタイプ ("transform", "mesh", "joint", "skinCluster")
+        parent (str, optional): 親ノード名
+    """
+    def __init__(self, name, type, parent=None):
+        self.name = name
+        self.type = type
+        self.parent = parent
+        self.translate = [0.0, 0.0, 0.0]
+        self.attrs = dict()
+        self.data = None
+
+        # inMesh などに接続された上流のノード名 (コンストラクションヒストリー)
+        self.history = []
+
+
+class SkinClusterData(object):
+    """スキンクラスターのデータ
+
+    Args:
+        mesh (str): バインドされたメッシュシェイプ名
+        influences (list[str]): インフルエンス名
+        weights (list[list[float]]): 頂点毎のインフルエンス順のウェイト
+    """
+    def __init__(self, mesh, influences, weights):
+        self.mesh = mesh
+        self.influences = list(influences)
+        self.weights = [list(map(float, w)) for w in weights]
+
+
+class Scene(object):
+    """シーン全体の状態"""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = dict()
+        self.selection = []
+        self.select_mode = "object"
+        self.select_type = {"vertex": False, "edge": False, "facet": False, "polymeshUV": False, "msh": False}
+        self.undo_depth = 0
+        self.plugins = set()
+        self.warnings = []
+
+        # MDGMessage 等で登録されたコールバック｡ ID をキーに (イベント名, ノードタイプ, 関数, clientData)
+        self.callbacks = dict()
+
+        # evalDeferred で登録され､アイドル時に実行される関数
+        self.deferred = []
+
+    def fire(self, event, node=None, *args):
+        """event に登録されたコールバックを呼ぶ｡ ノードタイプの指定があるものは一致する場合だけ呼ぶ"""
+        for event_name, node_type, function, client_data in list(self.callbacks.values()):
+            if event_name != event:
+                continue
+
+            if node is not None and node_type not in (None, "dependNode", node.type):
+                continue
+
+            function(*(args + (client_data,)))
+
+    # ノード
+    def add(self, node):
+        if node.name in self.nodes:
+            raise MockMayaError("node already exists: %s" % node.name)
+
+        self.nodes[node.name] = node
+        self.fire("nodeAdded", node, node)
+
+        return node
+
+    def remove(self, name):
+        node = self.get(name)
+        del self.nodes[node.name]
+        self.fire("nodeRemoved", node, node)
+
+    def rename(self, name, new_name):
+        """ノード名を変更する｡ 親子関係とスキンクラスターの参照も付け替える"""
+        node = self.get(name)
+        prev_name = node.name
+
+        if new_name in self.nodes:
+            raise MockMayaError("node already exists: %s" % new_name)
+
+        del self.nodes[prev_name]
+        node.name = new_name
+        self.nodes[new_name] = node
+
+        for other in self.nodes.values():
+            if other.parent == prev_name:
+                other.parent = new_name
+
+            if isinstance(other.data, SkinClusterData):
+                other.data.influences = [new_name if x == prev_name else x for x in other.data.influences]
+
+                if other.data.mesh == prev_name:
+                    other.data.mesh = new_name
+
+        self.fire("nameChanged", None, node, prev_name)
+
+        return new_name
+
+    def reparent(self, name, parent=None):
+        """ノードの親を変更する｡ parent が None ならワールド直下にする"""
+        node = self.get(name)
+
+        if node.parent:
+            self.fire("parentRemoved", None, node, self.get(node.parent))
+
+        node.parent = self.get(parent).name if parent else None
+
+        if node.parent:
+            self.fire("parentAdded", None, node, self.get(node.parent))
+
+    def find(self, name):
+        """名前 (フルパス可) からノードを返す｡ 無ければ None"""
+        if name is None:
+            return None
+
+        name = name.split("|")[-1]
+
+        return self.nodes.get(name)
+
+    def get(self, name):
+        node = self.find(name)
+
+        if node is None:
+            raise MockMayaError("No object matches name: %s" % name)
+
+        return node
+
+    def children(self, name):
+        return [n for n in self.nodes.values() if n.parent == name]
+
+    def shape_of(self, name):
+        """トランスフォームならその下のシェイプを､シェイプならそれ自身を返す"""
+        node = self.get(name)
+
+        if node.type == "transform":
+            shapes = [n for n in self.children(node.name) if n.type == "mesh"]
+            return shapes[0] if shapes else None
+
+        return node
+
+    def mesh(self, name):
+        shape = self.shape_of(name)
+
+        if shape is None or shape.type != "mesh":
+            raise MockMayaError("not a mesh: %s" % name)
+
+        return shape
+
+    def full_path(self, name):
+        node = self.get(name)
+        path = [node.name]
+
+        while node.parent:
+            node = self.get(node.parent)
+            path.insert(0, node.name)
+
+        return "|" + "|".join(path)
+
+    def world_offset(self, name):
+        """ノードのワールド空間での平行移動 (回転･スケールは扱わない)"""
+        offset = [0.0, 0.0, 0.0]
+        node = self.find(name)
+
+        while node is not None:
+            offset = [offset[i] + node.translate[i] for i in range(3)]
+            node = self.find(node.parent)
+
+        return offset
+
+    def world_points(self, shape):
+        offset = self.world_offset(shape.name)
+
+        return [[p[i] + offset[i] for i in range(3)] for p in shape.data.points]
+
+    def skinclusters(self):
+        return [n for n in self.nodes.values() if n.type == "skinCluster"]
+
+
+scene = Scene()
+
+
+# コンポーネント文字列の解析と生成
+_component_re = re.compile(r"^(?P<node>[^.\[\]]+)\.(?P<kind>vtxFace|vtx|e|f|map)(?P<indices>(\[[^\]]*\])+)$")
+
+
+def _parse_range(text, count):
+    if text == "*":
+        return range(count)
+
+    if ":" in text:
+        a, b = text.split(":")
+        return range(int(a), int(b) + 1)
+
+    return [int(text)]
+
+
+def parse(name):
+    """文字列をシェイプノードとコンポーネント種別と ID のリストに分解する
+
+    オブジェクト名の場合は kind, indices が None になる｡
+
+    Returns:
+        tuple[Node, str, list]: (シェイプノード, 種別, ID のリスト)
+    """
+    m = _component_re.match(name)
+
+    if not m:
+        node = scene.get(name)
+        shape = scene.shape_of(name) if node.type == "transform" else node
+        return (shape or node), None, None
+
+    shape = scene.mesh(m.group("node"))
+    kind = m.group("kind")
+    groups = re.findall(r"\[([^\]]*)\]", m.group("indices"))
+    mesh = shape.data
+
+    if kind == KIND_VF:
+        indices = [(vi, fi) for vi in _parse_range(groups[0], len(mesh.points)) for fi in _parse_range(groups[1], len(mesh.faces)) if fi in mesh.vertex_faces[vi]]
+    else:
+        count = len(mesh.all_indices(kind))
+        indices = list(_parse_range(groups[0], count))
+
+    return shape, kind, indices
+
+
+def transform_name(shape):
+    """シェイプの親トランスフォーム名｡ 親がなければシェイプ名"""
+    return shape.parent or shape.name
+
+
+def component_strings(shape, kind, indices, flatten=False):
+    """ID の集合をコンポーネント文字列のリストにする｡ flatten=False なら連番を範囲表記にまとめる"""
+    owner = transform_name(shape)
+
+    if kind == KIND_VF:
+        return ["%s.vtxFace[%d][%d]" % (owner, vi, fi) for vi, fi in sorted(indices)]
+
+    indices = sorted(indices)
+
+    if flatten:
+        return ["%s.%s[%d]" % (owner, kind, i) for i in indices]
+
+    result = []
+    start = None
+    prev = None
+
+    for i in indices + [None]:
+        if start is not None and (i is None or i != prev + 1):
+            if start == prev:
+                result.append("%s.%s[%d]" % (owner, kind, start))
+            else:
+                result.append("%s.%s[%d:%d]" % (owner, kind, start, prev))
+            start = None
+
+        if i is not None and start is None:
+            start = i
+
+        prev = i
+
+    return result
+
+
+def group_components(names):
+    """文字列のリストを (シェイプ, 種別) 毎の ID 集合にまとめる｡ 出現順を保持した dict を返す"""
+    groups = dict()
+
+    for name in names:
+        shape, kind, indices = parse(name)
+        key = (shape.name, kind)
+        groups.setdefault(key, set()).update(indices if indices is not None else [])
+
+    return groups
+
+
+# シーン構築
+def new_scene():
+    """シーンとコマンド呼び出しの記録を初期化する
+
+    Maya の新規シーンと同様に登録済みのコールバックは残し､ afterNew のコールバックを呼ぶ
+    """
+    callbacks = scene.callbacks
+    scene.reset()
+    scene.callbacks = callbacks
+    scene.fire("afterNew")
+    recorder.clear()
+
+
+def run_deferred():
+    """evalDeferred で登録された関数をアイドル時と同様に登録順に実行する"""
+    while scene.deferred:
+        scene.deferred.pop(0)()
+
+
+def create_mesh(name, points, faces, uvs=None, face_uvs=None, colors=None, translate=(0, 0, 0)):
+    """メッシュを作成してトランスフォーム名を返す｡ シェイプ名は name + "Shape" """
+    transform = scene.add(Node(name, "transform"))
+    transform.translate = list(map(float, translate))
+    shape = scene.add(Node(name + "Shape", "mesh", parent=name))
+    shape.data = Mesh(points, faces, uvs=uvs, face_uvs=face_uvs, colors=colors)
+
+    return name
+
+
+def create_plane(name, width=4, height=4, size=1.0, translate=(0, 0, 0), uv_offset=(0.0, 0.0), uv_scale=1.0, colors=False):
+    """XZ 平面上に width x height 分割のグリッドメッシュを作成する
+
+    頂点 ID は行優先 (x 方向が先) で､ UV は頂点と一対一の単一シェル｡
+    colors=True の場合は頂点フェース毎に (r, g, b, a) = (x 比率, z 比率, 0.5, 1.0) を設定する｡
+    """
+    points = []
+    uvs = []
+
+    for j in range(height + 1):
+        for i in range(width + 1):
+            points.append([i * size, 0.0, j * size])
+            uvs.append([uv_offset[0] + uv_scale * i / width, uv_offset[1] + uv_scale * j / height])
+
+    faces = []
+    for j in range(height):
+        for i in range(width):
+            v0 = j * (width + 1) + i
+            faces.append([v0, v0 + 1, v0 + width + 2, v0 + width + 1])
+
+    face_colors = None
+    if colors:
+        face_colors = []
+        for f in faces:
+            for vi in f:
+                face_colors.append([(vi % (width + 1)) / float(width), (vi // (width + 1)) / float(height), 0.5, 1.0])
+
+    return create_mesh(name, points, faces, uvs=uvs, face_uvs=[list(f) for f in faces], colors=face_colors, translate=translate)
+
+
+def create_joint(name, position=(0, 0, 0), parent=None):
+    """ジョイントを作成する｡ position は親からの相対位置"""
+    joint = scene.add(Node(name, "joint", parent=parent))
+    joint.translate = list(map(float, position))
+
+    return name
+
+
+def bind_skin(mesh, influences, weights, name=None):
+    """メッシュにスキンクラスターを作成する
+
+    Args:
+        mesh (str): メッシュのトランスフォームかシェイプ
+        influences (list[str]): インフルエンスのジョイント名
+        weights (list[list[float]]): 頂点毎のウェイト
+
+    Returns:
+        str: スキンクラスター名
+    """
+    shape = scene.mesh(mesh)
+    name = name or "skinCluster%d" % (len(scene.skinclusters()) + 1)
+    node = scene.add(Node(name, "skinCluster"))
+    node.data = SkinClusterData(shape.name, influences, weights)
+
+    return name
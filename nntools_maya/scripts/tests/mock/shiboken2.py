@@ -0,0 +1,5 @@
+"""テスト用の shiboken2 の代替"""
+
+
+def wrapInstance(ptr, base):
+    return None
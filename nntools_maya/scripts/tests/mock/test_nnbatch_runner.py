@@ -0,0 +1,154 @@
+"""nnbatch.runner のテスト
+
+シーンファイルの代わりにテキストファイルを使い､開いたファイルの内容をタスクが参照する｡
+"""
+import json
+import sys
+
+import pytest
+
+import nnbatch.runner as runner
+import nnbatch.tasks as tasks
+
+
+# InProcessBackend で開いたシーンの内容
+current_scene = {"text": ""}
+
+
+def fake_open(path):
+    with open(path, encoding="utf-8") as f:
+        current_scene["text"] = f.read()
+
+
+def fake_save(path, output_dir=None):
+    return "saved:" + path
+
+
+@tasks.register("test_check_words", kind=tasks.KIND_CHECK)
+def check_words(banned="bad"):
+    """禁止語を含む行"""
+    return {"issues": [x for x in current_scene["text"].splitlines() if banned in x]}
+
+
+@tasks.register("test_explode", kind=tasks.KIND_CHECK)
+def explode():
+    """"boom" を含むシーンで例外を投げる"""
+    if "boom" in current_scene["text"]:
+        raise RuntimeError("boom")
+
+    return {"issues": []}
+
+
+@tasks.register("test_fix_words", kind=tasks.KIND_FIX)
+def fix_words():
+    """禁止語の数を修正数として返す"""
+    return {"fixed": current_scene["text"].count("bad")}
+
+
+@pytest.fixture
+def scenes(tmp_path):
+    paths = []
+    for name, text in [("a.ma", "good\n"), ("b.ma", "bad\nboom\n"), ("c.mb", "bad\nbad\n")]:
+        path = tmp_path / "scenes" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+
+    return paths
+
+
+def make_runner(tmp_path, pipeline, processes=2, **kwargs):
+    return runner.BatchRunner(
+        pipeline,
+        results_path=str(tmp_path / "results.jsonl"),
+        backend=runner.InProcessBackend(fake_open, fake_save),
+        processes=processes,
+        modules=[__name__],
+        **kwargs)
+
+
+def test_run_pipeline(tmp_path, scenes):
+    batch = make_runner(tmp_path, ["test_check_words", ("test_explode", None)])
+
+    records = dict((x["scene"], x) for x in batch.run(scenes))
+
+    assert [x["status"] for x in (records[s] for s in scenes)] == [tasks.STATUS_OK, tasks.STATUS_ERROR, tasks.STATUS_FAILED]
+
+    b = records[scenes[1]]
+    assert [t["status"] for t in b["tasks"]] == [tasks.STATUS_FAILED, tasks.STATUS_ERROR]
+    assert b["tasks"][0]["result"]["issues"] == ["bad"]
+    assert "RuntimeError: boom" in b["tasks"][1]["error"]
+    assert all(t["seconds"] >= 0.0 for r in records.values() for t in r["tasks"])
+    assert all(r["seconds"] >= r["open_seconds"] >= 0.0 for r in records.values())
+
+    # 結果ファイルは 1 シーン 1 行の JSON
+    lines = (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(x)["scene"] for x in lines) == sorted(scenes)
+
+    summary = runner.summarize(list(records.values()))
+    assert summary["status"] == {tasks.STATUS_OK: 1, tasks.STATUS_FAILED: 1, tasks.STATUS_ERROR: 1}
+    assert summary["tasks"]["test_explode"]["status"] == {tasks.STATUS_OK: 2, tasks.STATUS_ERROR: 1}
+
+
+def test_resume(tmp_path, scenes):
+    batch = make_runner(tmp_path, ["test_check_words"], processes=1)
+    batch.run(scenes[:1])
+
+    # 書き込み途中で止まった行は無視される
+    with open(batch.results_path, "a", encoding="utf-8") as f:
+        f.write('{"scene": "broken')
+
+    records = batch.run(scenes)
+
+    assert sorted(x["scene"] for x in records) == sorted(scenes[1:])
+    assert batch.run(scenes) == []
+    assert set(runner.load_results(batch.results_path)) == set(scenes)
+
+
+def test_save_modified_scenes(tmp_path, scenes):
+    batch = make_runner(tmp_path, ["test_fix_words"], processes=1, save=True)
+
+    records = dict((x["scene"], x) for x in batch.run(scenes))
+
+    assert records[scenes[0]]["saved"] is None
+    assert records[scenes[2]]["saved"] == "saved:" + scenes[2]
+    assert records[scenes[2]]["tasks"][0]["result"]["fixed"] == 2
+
+
+def test_unknown_task(tmp_path):
+    with pytest.raises(KeyError):
+        make_runner(tmp_path, ["no_such_task"])
+
+
+def test_expand_scenes(tmp_path, scenes):
+    (tmp_path / "scenes" / "notes.txt").write_text("")
+
+    assert runner.expand_scenes([str(tmp_path / "scenes"), scenes[0]]) == scenes
+    assert runner.expand_scenes([str(tmp_path / "scenes" / "*.ma")]) == scenes[:2]
+
+
+def test_mayapy_backend_crash(tmp_path, scenes):
+    # mayapy の代わりに現在の Python で結果を書くか異常終了するワーカーを実行する
+    worker_dir = tmp_path / "worker"
+    worker_dir.mkdir()
+    (worker_dir / "fake_worker.py").write_text(
+        "import json, os, sys\n"
+        "job = json.load(open(sys.argv[1]))\n"
+        "if 'b.ma' in job['scene']:\n"
+        "    sys.stderr.write('fatal error')\n"
+        "    os._exit(3)\n"
+        "json.dump({'scene': job['scene'], 'status': 'ok', 'seconds': 0.0, 'tasks': []}, open(sys.argv[2], 'w'))\n")
+
+    backend = runner.MayapyBackend(sys.executable, worker_module="fake_worker", python_path=[str(worker_dir)])
+    batch = runner.BatchRunner(["test_check_words"], str(tmp_path / "results.jsonl"), backend, processes=2, modules=[__name__])
+
+    records = dict((x["scene"], x) for x in batch.run(scenes))
+
+    assert records[scenes[0]]["status"] == tasks.STATUS_OK
+    assert records[scenes[1]]["status"] == tasks.STATUS_CRASHED
+    assert records[scenes[1]]["returncode"] == 3
+    assert "fatal error" in records[scenes[1]]["error"]
+
+    # crashed のシーンは retry_crashed を指定した場合だけ再実行する
+    assert batch.run(scenes) == []
+    assert [x["scene"] for x in batch.run(scenes, retry_crashed=True)] == [scenes[1]]
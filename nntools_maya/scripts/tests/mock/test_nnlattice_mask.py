@@ -0,0 +1,69 @@
+"""nnlattice.mask のテスト (Maya 非依存)"""
+import itertools
+import random
+import time
+
+import pytest
+
+import nnlattice.mask as lmask
+
+
+def brute_force(mask, radius, element, erode):
+    """構造要素内のポイントを全て調べる参照実装"""
+    div_s, div_t, div_u = mask.divisions
+    selected = set(mask.indices())
+    offsets = [d for d in itertools.product(range(-radius, radius + 1), repeat=3)
+               if element == lmask.ELEMENT_BOX or sum(abs(x) for x in d) <= radius]
+    result = []
+
+    for s, t, u in itertools.product(range(div_s), range(div_t), range(div_u)):
+        neighbors = [(s + ds, t + dt, u + du) for ds, dt, du in offsets]
+
+        if erode:
+            if all(x in selected for x in neighbors):
+                result.append((s, t, u))
+        elif any(x in selected for x in neighbors):
+            result.append((s, t, u))
+
+    return result
+
+
+@pytest.mark.parametrize("element", [lmask.ELEMENT_BOX, lmask.ELEMENT_CROSS])
+@pytest.mark.parametrize("radius", [1, 2])
+def test_morphology_matches_brute_force(element, radius):
+    rng = random.Random(radius)
+    divisions = (5, 6, 4)
+    indices = [x for x in itertools.product(*[range(d) for d in divisions]) if rng.random() < 0.6]
+    mask = lmask.LatticeMask.from_indices(divisions, indices)
+
+    assert mask.dilate(radius, element).indices() == brute_force(mask, radius, element, erode=False)
+    assert mask.erode(radius, element).indices() == brute_force(mask, radius, element, erode=True)
+
+
+def test_surface_and_inner():
+    divisions = (4, 5, 3)
+    surface = lmask.LatticeMask.surface(divisions)
+    inner = lmask.LatticeMask.inner(divisions)
+
+    assert inner.indices() == [(s, t, 1) for s in (1, 2) for t in (1, 2, 3)]
+    assert surface.count() == 4 * 5 * 3 - 6
+    assert (surface | inner).count() == surface.size
+    assert (surface & inner).count() == 0
+
+    # 全選択を縮小すると内側になる
+    full = lmask.LatticeMask.from_indices(divisions, itertools.product(range(4), range(5), range(3)))
+    assert full.erode(1, lmask.ELEMENT_CROSS) == inner
+    assert full - surface == inner
+
+
+def test_grow_large_lattice():
+    divisions = (30, 30, 30)
+    mask = lmask.LatticeMask.from_indices(divisions, [(15, 15, 15), (0, 0, 0), (40, 0, 0)])
+
+    start = time.perf_counter()
+    grown = mask.dilate(2)
+    elapsed = time.perf_counter() - start
+
+    print("\ndilate 30x30x30: %.3f s" % elapsed)
+    assert grown.count() == 5 ** 3 + 3 ** 3
+    assert grown.erode(2).indices() == [(15, 15, 15)]
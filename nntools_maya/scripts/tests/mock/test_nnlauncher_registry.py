@@ -0,0 +1,81 @@
+"""nnlauncher.registry のテスト"""
+import os
+import sys
+
+import pytest
+
+from nnlauncher.registry import ToolRegistry
+
+
+@pytest.fixture
+def package(tmp_path):
+    """base <- util <- tool の依存関係を持つ一時パッケージ"""
+    root = tmp_path / "pkgroot"
+    pkg = root / "lazypkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "base.py").write_text("value = 1\n")
+    (pkg / "util.py").write_text("from . import base\n\n\ndef get():\n    return base.value\n")
+    (pkg / "tool.py").write_text("import lazypkg.util as util\n\n\ndef main():\n    return util.get()\n")
+
+    sys.path.insert(0, str(root))
+
+    yield pkg
+
+    sys.path.remove(str(root))
+    for name in [x for x in sys.modules if x == "lazypkg" or x.startswith("lazypkg.")]:
+        del sys.modules[name]
+
+
+def touch(path, text):
+    """内容を書き換えて更新日時を確実に進める"""
+    mtime = os.path.getmtime(path)
+    path.write_text(text)
+    os.utime(path, (mtime + 10, mtime + 10))
+
+
+def test_launcher_does_not_import_tools():
+    import nnlauncher.core
+
+    assert "nnmirror.core" not in sys.modules
+    assert nnlauncher.core.registry.is_loaded("nnmirror.core") is False
+
+
+def test_load_records_import_cost(package):
+    registry = ToolRegistry(root=str(package.parent))
+
+    assert not registry.is_loaded("lazypkg.tool")
+
+    module = registry.load("lazypkg.tool")
+
+    assert module.main() == 1
+    assert {"lazypkg.tool", "lazypkg.util", "lazypkg.base"} <= set(registry.import_costs)
+
+    tool_cost = registry.import_costs["lazypkg.tool"]
+    assert tool_cost.total >= tool_cost.self_time >= 0.0
+    assert registry.dependencies["lazypkg.tool"] == {"lazypkg.util"}
+    assert "lazypkg.base" in registry.dependencies["lazypkg.util"]
+    assert "lazypkg.tool" in registry.cost_report()
+
+
+def test_reload_only_changed(package):
+    registry = ToolRegistry(root=str(package.parent))
+    module = registry.load("lazypkg.tool")
+
+    assert registry.reload_changed() == []
+
+    touch(package / "base.py", "value = 2\n")
+
+    assert registry.changed_modules() == ["lazypkg.base"]
+    assert registry.reload_changed() == ["lazypkg.base"]
+    assert module.main() == 2
+    assert registry.reload_changed() == []
+
+
+def test_reload_with_dependents_in_topological_order(package):
+    registry = ToolRegistry(root=str(package.parent))
+    registry.load("lazypkg.tool")
+
+    touch(package / "base.py", "value = 3\n")
+
+    assert registry.reload_changed(with_dependents=True) == ["lazypkg.base", "lazypkg.util", "lazypkg.tool"]
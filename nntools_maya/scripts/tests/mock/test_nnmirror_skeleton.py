@@ -0,0 +1,91 @@
+"""nnmirror.skeleton の行列計算のテスト"""
+import random
+
+import pytest
+
+import nnmirror.skeleton as sk
+
+
+def random_matrix(rng):
+    m = sk.rotation_xyz([rng.uniform(-180, 180) for _ in range(3)])
+    m[12:15] = [rng.uniform(-5, 5) for _ in range(3)]
+    return m
+
+
+def determinant(m):
+    return sk.dot(sk.basis(m, 0), sk.cross(sk.basis(m, 1), sk.basis(m, 2)))
+
+
+def test_euler_round_trip():
+    rng = random.Random(0)
+
+    for _ in range(20):
+        angles = [rng.uniform(-179, 179), rng.uniform(-89, 89), rng.uniform(-179, 179)]
+        assert sk.euler_xyz(sk.rotation_xyz(angles)) == pytest.approx(angles)
+
+    # ジンバルロックでも同じ回転になる
+    m = sk.rotation_xyz([30, 90, 0])
+    assert sk.rotation_xyz(sk.euler_xyz(m)) == pytest.approx(m, abs=1e-9)
+
+
+def test_local_transform_restores_world():
+    rng = random.Random(1)
+    parent = random_matrix(rng)
+    world = random_matrix(rng)
+
+    translate, joint_orient = sk.local_transform(world, parent)
+    local = sk.rotation_xyz(joint_orient)
+    local[12:15] = translate
+
+    assert sk.multiply(local, parent) == pytest.approx(world, abs=1e-9)
+    assert sk.multiply(parent, sk.inverse(parent)) == pytest.approx(sk.rotation_xyz([0, 0, 0]), abs=1e-9)
+
+
+def test_mirror_matrix():
+    rng = random.Random(2)
+    m = random_matrix(rng)
+    mirrored = sk.mirror_matrix(m)
+
+    assert sk.position(mirrored) == pytest.approx([-m[12], m[13], m[14]])
+    assert determinant(mirrored) == pytest.approx(1.0)
+    assert sk.mirror_matrix(mirrored) == pytest.approx(m, abs=1e-9)
+
+
+def test_radial_matrix():
+    parent = sk.rotation_xyz([0, 0, 0])
+    joint = sk.rotation_xyz([10, 20, 30])
+    joint[12:15] = [1.0, 0.0, 0.0]
+
+    m = sk.radial_matrix(joint, parent, [1.0, 2.0, 0.0])
+
+    # X 軸は子へ､ Z 軸は親･自身･子の平面の法線
+    assert sk.basis(m, 0) == pytest.approx([0.0, 1.0, 0.0])
+    assert sk.basis(m, 2) == pytest.approx([0.0, 0.0, -1.0])
+    assert determinant(m) == pytest.approx(1.0)
+    assert sk.position(m) == [1.0, 0.0, 0.0]
+
+    # 一直線なら親の Y, Z 軸
+    m = sk.radial_matrix(joint, parent, [3.0, 0.0, 0.0])
+    assert m[0:12] == pytest.approx(parent[0:12])
+
+
+def test_pair_table():
+    table = sk.PairTable("L_", "R_", ["|root|L_arm", "|root|R_arm", "|root|R_leg"])
+
+    assert table.opposite("|root|L_arm") == "|root|R_arm"
+    assert table.opposite("R_arm") == "|root|L_arm"
+    assert table.opposite("|root|R_leg") is None
+    assert table.opposite_name("spine") is None
+
+
+def test_driven_pairs():
+    table = sk.PairTable("L_", "R_", ["|root|L_arm", "|root|R_arm", "|root|L_leg", "|root|R_leg", "|root|spine"])
+
+    # 左右両方が対象なら L_ 側を元に R_ 側だけを変更する
+    pairs, missing = table.driven_pairs(["|root|L_arm", "|root|R_arm", "|root|R_leg", "|root|spine"])
+
+    assert pairs == [("|root|R_arm", "|root|L_arm"), ("|root|R_leg", "|root|L_leg")]
+    assert missing == ["|root|spine"]
+
+    # 片側だけなら選択された側を変更する
+    assert table.driven_pairs(["|root|L_arm"]) == ([("|root|L_arm", "|root|R_arm")], [])
@@ -0,0 +1,135 @@
+"""nnmisc.core のテスト"""
+import pytest
+
+import maya.cmds as cmds
+
+import mayamock as mm
+
+import nnmisc.core as nmc
+import nnutil.uv_quantize as nuq
+
+
+def uvs_of(obj):
+    data = mm.scene.mesh(obj).data.uv_set()
+    return data["us"], data["vs"]
+
+
+@pytest.fixture
+def column(scene):
+    """1x8 のプレーンの左列の UV (V 方向に並び U が半端な位置にある)"""
+    mm.create_plane("plane", 1, 8, uv_offset=(0.1003, 0.0), uv_scale=0.5)
+    return ["plane.map[%d]" % (j * 2) for j in range(9)]
+
+
+def test_snap_to_pixels(column, recorder, call_budget):
+    us_before, vs_before = [list(x) for x in uvs_of("plane")]
+
+    with recorder.measure() as calls:
+        report = nmc.snap_to_pixels(column, texture_resolution=64, snap_pixels=2)
+
+    us, vs = uvs_of("plane")
+    step = 2.0 / 64
+
+    # 範囲の狭い U だけがスナップされ､選択外の UV は動かない
+    for uvi in range(0, 18, 2):
+        assert us[uvi] / step == pytest.approx(round(us[uvi] / step))
+        assert us[uvi] != us_before[uvi]
+    for uvi in range(1, 18, 2):
+        assert us[uvi] == us_before[uvi]
+    assert vs == vs_before
+
+    assert len(report) == 1
+    assert report[0].count == 9
+    assert report[0].max == pytest.approx(max(abs(a - b) * 64 for a, b in zip(us, us_before)))
+    assert sum(report[0].histogram) == 9
+    call_budget("nnmisc.core.snap_to_pixels", calls)
+
+
+def test_snap_to_ordinal_in_block(column):
+    nmc.snap_to_ordinal_in_block(column, texture_resolution=64, block_width=8, ordinal=5)
+
+    us, _ = uvs_of("plane")
+    for uvi in range(0, 18, 2):
+        assert (us[uvi] * 64) % 8 == pytest.approx(5)
+
+
+def test_snap_ordinal_nearest():
+    coords = [1.0 / 64, 7.0 / 64]
+    assert nuq.snap_ordinal(coords, 64, block_width=8, ordinal=5, nearest=True) == pytest.approx([3.0 / 64, 5.0 / 64])
+    assert nuq.snap_ordinal(coords, 64, block_width=8, ordinal=5, nearest=False) == pytest.approx([5.0 / 64, 5.0 / 64])
+
+
+def test_displacement_histogram():
+    assert nuq.displacement_histogram([0.0, 0.3, 0.6, 1.5, 3.0, 10.0]) == [1, 1, 1, 1, 1, 1]
+
+
+@pytest.fixture
+def strip(scene):
+    """2x1 のプレーンの手前の境界エッジ 2 本 (頂点 0-1, 1-2) を選択した状態"""
+    mm.create_plane("strip", 2, 1, colors=True)
+    cmds.select(["strip.e[0]", "strip.e[4]"])
+    return "strip"
+
+
+def test_extrude_edges(strip, recorder, call_budget):
+    mesh = mm.scene.mesh(strip).data
+    assert [mesh.edges[0], mesh.edges[4]] == [(0, 1), (1, 2)]
+    colors_before = [list(c) for c in mesh.colors]
+
+    with recorder.measure() as calls:
+        nmc.extrude_edges(offset=0.0)
+
+    data = mesh.uv_set()
+    assert len(mesh.faces) == 4
+    assert len(mesh.points) == 9
+
+    for fi in (2, 3):
+        for k, vi in enumerate(mesh.faces[fi]):
+            uvi = data["face_uvs"][fi][k]
+            src = vi if vi < 6 else vi - 6
+
+            # 根元は元の UV をそのまま使い､押し出し先は元の UV と同じ位置
+            if vi < 6:
+                assert uvi == src
+            else:
+                assert uvi != src
+                assert (data["us"][uvi], data["vs"][uvi]) == (data["us"][src], data["vs"][src])
+
+            src_face = 0 if fi == 2 else 1
+            assert mesh.colors[mesh.face_vertex_index(fi, vi)] == colors_before[mesh.face_vertex_index(src_face, src)]
+
+    # 中央の側面エッジは両側のフェースで UV を共有する
+    shared = set(data["face_uvs"][2]) & set(data["face_uvs"][3])
+    assert shared == {1, data["face_uvs"][2][mesh.faces[2].index(7)]}
+    assert recorder.count("cmds.polyMapSew") == 0
+    assert recorder.count("om.MFnMesh.assignUVs") == 1
+    call_budget("nnmisc.core.extrude_edges", calls)
+
+
+def test_extrude_edges_with_history(strip, recorder):
+    """ヒストリーのあるメッシュは再評価で消える API ではなくコマンドで UV と頂点カラーを書き込む"""
+    mesh_node = mm.scene.mesh(strip)
+    mesh_node.history = ["polyPlane1"]
+    mesh = mesh_node.data
+    colors_before = [list(c) for c in mesh.colors]
+
+    nmc.extrude_edges(offset=0.0)
+
+    data = mesh.uv_set()
+    assert len(mesh.faces) == 4
+
+    for fi in (2, 3):
+        for k, vi in enumerate(mesh.faces[fi]):
+            uvi = data["face_uvs"][fi][k]
+            src = vi if vi < 6 else vi - 6
+            assert (data["us"][uvi], data["vs"][uvi]) == (data["us"][src], data["vs"][src])
+
+            src_face = 0 if fi == 2 else 1
+            assert mesh.colors[mesh.face_vertex_index(fi, vi)] == colors_before[mesh.face_vertex_index(src_face, src)]
+
+    # 根元は元のフェースと縫い合わされ､中央の側面エッジは両側で UV を共有する
+    assert {1, 2} <= set(data["face_uvs"][2]) | set(data["face_uvs"][3])
+    assert len(set(data["face_uvs"][2]) & set(data["face_uvs"][3])) == 2
+    assert recorder.count("cmds.polyMapSew") == 1
+    assert recorder.count("om.MFnMesh.assignUVs") == 0
+    assert recorder.count("om.MFnMesh.setFaceVertexColors") == 0
@@ -0,0 +1,51 @@
+"""nnskin.core のテスト"""
+import pytest
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnskin.core as nsc
+
+
+@pytest.fixture
+def skinned_plane(scene):
+    """x 方向にウェイトが joint1 から joint2 へ線形に移るプレーン"""
+    mm.create_plane("plane", 4, 1)
+    mm.create_joint("joint1")
+    mm.create_joint("joint2", position=(4, 0, 0), parent="joint1")
+
+    weights = []
+    for vi in range(10):
+        t = (vi % 5) / 4.0
+        weights.append([1.0 - t, t])
+
+    mm.bind_skin("plane", ["joint1", "joint2"], weights)
+
+    return "plane"
+
+
+def test_get_skincluster(skinned_plane):
+    assert nsc.get_skincluster("plane.vtx[0]") == "skinCluster1"
+    assert nsc.get_skincluster("plane") == "skinCluster1"
+
+
+def test_get_vtx_weight(skinned_plane):
+    assert nsc.get_vtx_weight("plane.vtx[1]") == {"joint1": 0.75, "joint2": 0.25}
+
+
+def test_copy_and_paste_weight(skinned_plane, recorder, call_budget):
+    cmds.select(["plane.vtx[0]", "plane.vtx[4]"])
+    nsc.copy_weight()
+
+    assert nsc.weightclipboard == pytest.approx({"joint1": 0.5, "joint2": 0.5})
+
+    targets = ["plane.vtx[%d]" % i for i in range(5, 10)]
+
+    with recorder.measure() as calls:
+        nsc.paste_weight_as_possible(targets)
+
+    for vi in range(5, 10):
+        assert nsc.get_vtx_weight("plane.vtx[%d]" % vi) == pytest.approx({"joint1": 0.5, "joint2": 0.5})
+
+    call_budget("nnskin.core.paste_weight_as_possible", calls)
@@ -0,0 +1,94 @@
+"""nnsweep.rebuild のテスト"""
+import math
+import random
+
+import pytest
+
+import nnsweep.core as nsc
+import nnsweep.rebuild as rb
+
+
+def test_solve_banded():
+    rng = random.Random(0)
+    n = 7
+    degree = 2
+    matrix = [[0.0] * n for _ in range(n)]
+
+    for i in range(n):
+        for j in range(max(0, i - degree), i):
+            matrix[i][j] = matrix[j][i] = rng.random()
+        matrix[i][i] = 5.0 + rng.random()
+
+    band = [[matrix[i][i - k] if i >= k else 0.0 for k in range(degree + 1)] for i in range(n)]
+    rhs = [[rng.random(), rng.random()] for _ in range(n)]
+    x = rb._solve_banded(band, rhs, degree)
+
+    for i in range(n):
+        for c in range(2):
+            assert sum(matrix[i][j] * x[j][c] for j in range(n)) == pytest.approx(rhs[i][c])
+
+
+def test_sample_curve():
+    # 直線は弧長等間隔のサンプルがそのまま等間隔になる
+    cvs = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [3.0, 0.0, 0.0]]
+    samples, length = rb.sample_curve(cvs, rb.uniform_knots(2, 2), 2, 4)
+
+    assert length == pytest.approx(3.0)
+    assert [c for p in samples for c in p] == pytest.approx([0, 0, 0, 1, 0, 0, 2, 0, 0, 3, 0, 0])
+
+    # 円弧に近い CV の弧長は四分円の長さに近い
+    cvs = [[math.cos(a), math.sin(a), 0.0] for a in [i * math.pi / 10 for i in range(6)]]
+    _, length = rb.sample_curve(cvs, rb.uniform_knots(4, 2), 2, 64)
+    assert length == pytest.approx(math.pi / 2, rel=0.02)
+
+
+def test_plan_spans():
+    # 直線は最小スパン数､曲がるほど･長いほどスパン数が増える
+    spans = rb.plan_spans([10.0, 10.0, 100.0], [0.0, math.pi, math.pi], degree=2, tolerance=0.01)
+    assert spans[0] == rb.default_min_spans
+    assert spans[0] < spans[1] < spans[2]
+
+    # 誤差の見積もりが tolerance 以下になる最小のスパン数
+    n = spans[1]
+    assert 10.0 * math.pi / (8.0 * n ** 3) <= 0.01 < 10.0 * math.pi / (8.0 * (n - 1) ** 3)
+
+    # スパン長の制限と上限
+    assert rb.plan_spans([10.0], [0.0], span_length=3.0) == [4]
+    assert rb.plan_spans([1000.0], [10.0], max_spans=8) == [8]
+
+
+def test_fit_curve():
+    cvs = [[math.cos(a), math.sin(a), 0.0] for a in [i * math.pi / 10 for i in range(6)]]
+    samples, _ = rb.sample_curve(cvs, rb.uniform_knots(4, 2), 2, 64)
+
+    fitted, knots = rb.fit_curve(samples, 3, 2)
+
+    # CV 数はスパン数 + 次数､ノットは Maya 形式で両端の多重度が次数
+    assert len(fitted) == 5
+    assert knots == [0.0, 0.0, 1.0, 2.0, 3.0, 3.0]
+
+    # 両端の CV はサンプルの端点に固定される
+    assert fitted[0] == pytest.approx(samples[0])
+    assert fitted[-1] == pytest.approx(samples[-1])
+
+    # 再評価した形状は元の形状に近い
+    resampled, _ = rb.sample_curve(fitted, knots, 2, 64)
+    assert max(math.dist(a, b) for a, b in zip(samples, resampled)) < 0.01
+
+    # 1 スパン 1 次は両端を結ぶ直線
+    line, knots = rb.fit_curve(samples, 1, 1)
+    assert len(line) == 2 and knots == [0.0, 1.0]
+
+
+def test_curve_attr_command():
+    command = rb._curve_attr_command("curveShape1", [[0, 0, 0], [1, 2, 0], [2, 0, 0.5]], [0.0, 0.0, 1.0, 1.0], 2)
+
+    assert command == 'setAttr "curveShape1.cc" -type "nurbsCurve" 2 1 0 no 3 4 0 0 1 1 3 0 0 0 1 2 0 2 0 0.5;'
+
+
+def test_rebuild_curve_fixed_spans_use_rebuild_curve(recorder):
+    nsc.rebuild_curve(["curve1", "curve2"], span=3)
+
+    calls = [r for r in recorder.records if r.name == "cmds.rebuildCurve"]
+    assert [c.args[0] for c in calls] == ["curve1", "curve2"]
+    assert calls[0].kwargs["s"] == 3 and calls[0].kwargs["ch"] == 1
@@ -0,0 +1,110 @@
+"""nntexture.simplify と nntexture.photoshop の JSX 出力のテスト"""
+import io
+import math
+import random
+import re
+
+import pytest
+
+import nntexture.photoshop as ps
+import nntexture.simplify as nsp
+
+
+def circle(n, radius=0.4, center=(0.5, 0.5)):
+    return [(center[0] + radius * math.cos(2 * math.pi * i / n), center[1] + radius * math.sin(2 * math.pi * i / n)) for i in range(n)]
+
+
+def noisy_square(n_per_side, noise, seed=0):
+    """1 辺 n_per_side 点の正方形の境界に noise の揺らぎを加えた閉じた点列"""
+    rng = random.Random(seed)
+    corners = [(0.1, 0.1), (0.9, 0.1), (0.9, 0.9), (0.1, 0.9)]
+    points = []
+
+    for (x0, y0), (x1, y1) in zip(corners, corners[1:] + corners[:1]):
+        for i in range(n_per_side):
+            t = float(i) / n_per_side
+            points.append((x0 + (x1 - x0) * t + rng.uniform(-noise, noise), y0 + (y1 - y0) * t + rng.uniform(-noise, noise)))
+
+    return points
+
+
+def max_error(points, kept, closed):
+    """元の全点から簡略化後の折れ線までの最大距離"""
+    simplified = [points[i] for i in kept]
+    segments = list(zip(simplified, simplified[1:]))
+
+    if closed:
+        segments.append((simplified[-1], simplified[0]))
+
+    return max(min(nsp.segment_distance(p, a, b) for a, b in segments) for p in points)
+
+
+@pytest.mark.parametrize("method", [nsp.METHOD_RDP, nsp.METHOD_VISVALINGAM])
+@pytest.mark.parametrize("closed", [False, True])
+def test_error_bound(method, closed):
+    size = 4096
+    tolerance = 0.5
+    points = nsp.scaled(noisy_square(500, 0.2 / size), (size, size))
+
+    kept = nsp.simplify_path(points, tolerance, method=method, closed=closed)
+
+    # ±0.2px の揺らぎは 0.5px で消えるので角の付近だけが残る
+    assert len(kept) < 40
+    assert max_error(points, kept, closed) <= tolerance + 1e-9
+
+
+@pytest.mark.parametrize("method", [nsp.METHOD_RDP, nsp.METHOD_VISVALINGAM])
+def test_circle_point_count(method):
+    size = 4096
+    points = circle(10000)
+
+    coarse = nsp.simplify_path(points, 2.0, method=method, closed=True, scale=(size, size))
+    fine = nsp.simplify_path(points, 0.1, method=method, closed=True, scale=(size, size))
+
+    # 半径 r の円を誤差 e の折れ線で近似する点数はおよそ pi / sqrt(2e/r)
+    radius = 0.4 * size
+    assert len(coarse) <= 1.5 * math.pi / math.sqrt(2 * 2.0 / radius)
+    assert len(coarse) < len(fine) < len(points)
+    assert max_error(nsp.scaled(points, (size, size)), coarse, True) <= 2.0 + 1e-9
+
+
+def test_zero_tolerance_keeps_all():
+    points = noisy_square(10, 0.01)
+    assert nsp.simplify_path(points, 0.0, closed=True) == list(range(len(points)))
+
+
+def test_merge_collinear():
+    # 正方形の各辺に等間隔の点を並べたもの
+    points = noisy_square(25, 0.0)
+
+    kept = nsp.merge_collinear(points, closed=True)
+
+    assert [points[i] for i in kept] == [(0.1, 0.1), (0.9, 0.1), (0.9, 0.9), (0.1, 0.9)]
+    assert nsp.merge_collinear(points[:30], closed=False) == [0, 25, 29]
+
+
+def test_degenerate():
+    assert nsp.simplify_rdp([(0.5, 0.5)] * 5, 0.1, closed=True) == [0]
+    assert nsp.simplify_rdp([(0, 0), (1, 1)], 0.1) == [0, 1]
+    assert len(nsp.simplify_visvalingam([(0.5, 0.5)] * 5, 0.1, closed=True)) == 3
+
+
+def test_jsx_writer():
+    subpaths = [ps.SubPath([ps.UVCoord(u, v) for u, v in circle(2000)]), ps.SubPath([ps.UVCoord(u, v) for u, v in noisy_square(50, 0.0)])]
+    shapes = [ps.Shape(subpaths), ps.Shape(subpaths[1:])]
+
+    f = io.StringIO()
+    writer = ps.write_jsx(f, shapes, tolerance=0.5, image_size=(4096, 4096), merge_collinear=True)
+    code = f.getvalue()
+
+    # 点毎の PathPointInfo の生成は展開されず addShape のループで行う
+    assert code.count("new PathPointInfo()") == 1
+    assert code.count("addShape([") == 2
+    assert writer.num_input_points == 2000 + 200 + 200
+    assert writer.num_output_points < 300
+
+    values = re.findall(r"-?\d+\.\d+(?:e-?\d+)?", code.split("addShape([", 2)[2])
+    assert len(values) == 2 * 4
+
+    # 簡略化しない場合は全点を出力する
+    assert ps.make_jsx_code(shapes[1:]).count(",") - ps.jsx_header.count(",") == 2 * 200 - 1
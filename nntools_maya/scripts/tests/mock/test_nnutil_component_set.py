@@ -0,0 +1,65 @@
+"""nnutil.component_set と nnutil.core のリスト演算のテスト (Maya 非依存の部分)"""
+import random
+
+import nnutil.component_set as ncs
+import nnutil.core as nu
+
+
+def old_list_diff(l1, l2):
+    return list(filter(lambda x: x not in l2, l1))
+
+
+def old_list_intersection(l1, l2):
+    return list(filter(lambda x: x in l2, l1))
+
+
+def test_list_helpers_keep_order():
+    a = ["p.vtx[3]", "p.vtx[1]", "p.vtx[3]", "p.vtx[2]"]
+    b = ["p.vtx[2]", "p.vtx[9]"]
+
+    assert nu.list_diff(a, b) == old_list_diff(a, b) == ["p.vtx[3]", "p.vtx[1]", "p.vtx[3]"]
+    assert nu.list_intersection(a, b) == ["p.vtx[2]"]
+    assert nu.uniq(a) == ["p.vtx[3]", "p.vtx[1]", "p.vtx[2]"]
+    assert ncs.ordered_union(a, b) == ["p.vtx[3]", "p.vtx[1]", "p.vtx[2]", "p.vtx[9]"]
+
+    # ハッシュ不可能な要素も重複を取り除く
+    assert nu.uniq([[1, 2], [3], [1, 2]]) == [[1, 2], [3]]
+    assert nu.list_diff([[1], [2]], [[2]]) == [[1]]
+    assert nu.uniq([]) == []
+
+
+def test_component_strings():
+    selection = ncs.ComponentSelection.from_strings(["p.vtx[5]", "p.vtx[0:3]", "p.e[2]", "q|r.vtx[1]", "p.vtx[4]"])
+
+    assert selection.to_strings() == ["p.vtx[0:5]", "p.e[2]", "q|r.vtx[1]"]
+    assert len(selection) == 8
+
+    rest = selection - ncs.ComponentSelection.from_strings(["p.vtx[2:3]", "q|r.vtx[1]"])
+    assert rest.to_strings() == ["p.vtx[0:1]", "p.vtx[4:5]", "p.e[2]"]
+    assert rest.to_strings(flatten=True)[:2] == ["p.vtx[0]", "p.vtx[1]"]
+
+    both = selection & ncs.ComponentSelection.from_strings(["p.vtx[3:9]", "p.f[0]"])
+    assert both.to_strings() == ["p.vtx[3:5]"]
+    assert (rest | both).to_strings() == ["p.vtx[0:1]", "p.vtx[3:5]", "p.e[2]"]
+    assert 4 in rest.sets[("p", "vtx")] and 2 not in rest.sets[("p", "vtx")]
+
+
+def test_benchmark_100k():
+    """100k 要素のリストで旧実装と比較する｡ 旧実装は O(n･m) なので引く側を 500 要素にする"""
+    rng = random.Random(0)
+    items = ["mesh.vtx[%d]" % i for i in range(100000)]
+    rng.shuffle(items)
+    small = items[::200]
+    large = items[::2]
+
+    assert nu.list_diff(items, small) == old_list_diff(items, small)
+
+    # 旧実装では現実的に終わらない大きさ同士
+    diff = nu.list_diff(items, large)
+    common = nu.list_intersection(items, large)
+    unique = nu.uniq(items + large)
+    selection = ncs.ComponentSelection.from_strings(items) - ncs.ComponentSelection.from_strings(large)
+
+    assert len(diff) + len(common) == len(items)
+    assert unique == items
+    assert len(selection) == len(diff)
@@ -0,0 +1,77 @@
+"""nnutil.core のテスト"""
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnutil.core as nu
+
+
+def edge_name(obj, a, b):
+    """頂点 a, b を結ぶエッジのコンポーネント文字列"""
+    mesh = mm.scene.mesh(obj).data
+    return "%s.e[%d]" % (obj, mesh.edge_index[(min(a, b), max(a, b))])
+
+
+def test_list_diff_and_intersection():
+    l1 = ["a", "b", "c", "d"]
+    l2 = ["b", "d", "e"]
+
+    assert nu.list_diff(l1, l2) == ["a", "c"]
+    assert nu.list_intersection(l1, l2) == ["b", "d"]
+
+
+def test_to_vtx_and_to_edge(scene):
+    mm.create_plane("plane", 2, 2)
+
+    vertices = nu.to_vtx(["plane.f[0]"])
+    assert sorted(vertices) == ["plane.vtx[0]", "plane.vtx[1]", "plane.vtx[3]", "plane.vtx[4]"]
+
+    edges = nu.to_edge(["plane.vtx[4]"])
+    assert len(edges) == 4
+
+
+def test_to_border_edges(scene):
+    mm.create_plane("plane", 2, 2)
+
+    border = nu.to_border_edges(["plane.f[0]", "plane.f[1]"])
+    assert len(border) == 6
+
+
+def test_get_all_polylines(scene, recorder, call_budget):
+    mm.create_plane("plane", 4, 4)
+
+    # 0 行目の 4 本と 2 行目の 4 本
+    row0 = [edge_name("plane", i, i + 1) for i in range(4)]
+    row2 = [edge_name("plane", 10 + i, 11 + i) for i in range(4)]
+
+    with recorder.measure() as calls:
+        polylines = nu.get_all_polylines(row0 + row2)
+
+    assert sorted(sorted(p) for p in polylines) == sorted([sorted(row0), sorted(row2)])
+    call_budget("nnutil.core.get_all_polylines", calls)
+
+
+def test_sort_edges(scene, recorder, call_budget):
+    mm.create_plane("plane", 4, 4)
+
+    edges = [edge_name("plane", i, i + 1) for i in (2, 0, 3, 1)]
+
+    with recorder.measure() as calls:
+        vertices = nu.sort_edges(edges)
+
+    indices = [nu.get_index(v) for v in vertices]
+    assert indices in ([0, 1, 2, 3, 4], [4, 3, 2, 1, 0])
+    call_budget("nnutil.core.sort_edges", calls)
+
+
+def test_get_set_points_world_space(scene):
+    mm.create_plane("plane", 1, 1, translate=(10, 0, 0))
+
+    points = nu.get_points("plane", space=nu.om.MSpace.kWorld)
+    assert [p.x for p in points] == [10.0, 11.0, 10.0, 11.0]
+
+    moved = [nu.om.MPoint(p.x, p.y + 1.0, p.z) for p in points]
+    nu.set_points("plane", moved, space=nu.om.MSpace.kWorld)
+
+    assert cmds.pointPosition("plane.vtx[1]") == [11.0, 1.0, 0.0]
+    assert cmds.pointPosition("plane.vtx[1]", local=True) == [1.0, 1.0, 0.0]
@@ -0,0 +1,81 @@
+"""nnutil.image のテスト"""
+import random
+import struct
+import zlib
+
+import nnutil.image as nimg
+
+
+def pixels_of(image, color):
+    return {(x, y) for y in range(image.height) for x in range(image.width) if image.get_pixel(x, y) == color}
+
+
+def test_draw_lines():
+    image = nimg.Image(8, 8, 255, 255, 255)
+    nimg.draw_lines(image, [(0, 0, 7, 0), (0, 0, 0, 7), (0, 0, 7, 7), (1, 0, 7, 3)], nimg.black)
+
+    drawn = pixels_of(image, nimg.black)
+    assert {(x, 0) for x in range(8)} <= drawn
+    assert {(0, y) for y in range(8)} <= drawn
+    assert {(i, i) for i in range(8)} <= drawn
+    assert {(1, 0), (3, 1), (5, 2), (7, 3)} <= drawn
+
+    # 画像外にはみ出した線は内側だけ描画される
+    image.fill(nimg.white)
+    nimg.draw_lines(image, [(-5, 2, 20, 2), (3, -4, 3, 30), (-2, -2, 10, 10)], nimg.red)
+    assert len(pixels_of(image, nimg.red)) == 8 + 7 + 6
+
+
+def test_fill_polygons_and_blend():
+    image = nimg.Image(10, 10, 0, 0, 0)
+    nimg.fill_polygons(image, [[(1, 1), (4, 1), (4, 4), (1, 4)], [(6, 6), (9, 6), (6, 9)]], nimg.white)
+
+    assert pixels_of(image, nimg.white) == {(x, y) for x in range(1, 4) for y in range(1, 4)} | {(6, 6), (7, 6), (8, 6), (6, 7), (7, 7), (6, 8)}
+
+    nimg.draw_rect(image, nimg.Point((0, 0)), nimg.Point((9, 9)), (255, 0, 0, 128))
+    assert tuple(image.get_pixel(0, 0)) == (128, 0, 0, 255)
+    assert tuple(image.get_pixel(2, 2)) == (255, 127, 127, 255)
+
+
+def test_save_bmp_and_png(tmp_path):
+    image = nimg.Image(3, 2, 10, 20, 30)
+    image.set_pixel(0, 0, nimg.red)
+    image.set_pixel(2, 1, nimg.blue)
+
+    bmp = (tmp_path / "a.bmp")
+    image.save_bmp(str(bmp))
+    data = bmp.read_bytes()
+    assert data[:2] == b"BM"
+    assert struct.unpack("<ii", data[18:26]) == (3, 2)
+    # 下の行から BGRA
+    assert data[54:58] == bytes((0, 0, 255, 255))
+    assert data[54 + 5 * 4:54 + 6 * 4] == bytes((255, 0, 0, 255))
+
+    png = (tmp_path / "a.png")
+    image.save_png(str(png))
+    data = png.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    length = struct.unpack(">I", data[33:37])[0]
+    raw = zlib.decompress(data[41:41 + length])
+    # 上の行から､各行の先頭はフィルタ種別
+    assert raw[0] == 0
+    assert raw[1 + 8:1 + 12] == bytes((0, 0, 255, 255))
+    assert raw[13 + 1:13 + 5] == bytes((255, 0, 0, 255))
+
+
+def test_benchmark_100k_uv_edges_4k():
+    """4K の画像に 100k 本の UV エッジ (数ピクセルから数十ピクセルの線分) を描画する"""
+    rng = random.Random(0)
+    size = 4096
+    segments = []
+
+    for _ in range(100000):
+        x = rng.random() * size
+        y = rng.random() * size
+        segments.append((x, y, x + rng.uniform(-24, 24), y + rng.uniform(-24, 24)))
+
+    image = nimg.Image(size, size, 255, 255, 255)
+
+    nimg.draw_lines(image, segments, nimg.black)
+
+    assert image.get_pixel(segments[0][0], segments[0][1]) == nimg.black
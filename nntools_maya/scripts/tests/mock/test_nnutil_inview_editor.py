@@ -0,0 +1,64 @@
+"""nnutil.inview_editor のテスト"""
+import pytest
+
+import mayamock as mm
+
+import nnutil.inview_editor as nie
+
+
+@pytest.fixture
+def nodes(scene):
+    names = []
+
+    for i in range(3):
+        node = scene.add(mm.Node("polyEditEdgeFlow%d" % (i + 1), "polyEditEdgeFlow"))
+        node.attrs["adjustEdgeFlow"] = 0.1 * (i + 1)
+        names.append(node.name)
+
+    return names
+
+
+def values(scene, nodes):
+    return [scene.get(x).attrs["adjustEdgeFlow"] for x in nodes]
+
+
+def test_absolute_session(scene, recorder, nodes):
+    session = nie.AttributeEditSession(nodes, "adjustEdgeFlow", refresh_interval=60.0)
+    recorder.clear()
+
+    # 最初の適用は即座に行い､更新間隔内の値は保留する
+    assert session.apply(0.5)
+    assert not session.apply(0.7)
+    assert values(scene, nodes) == pytest.approx([0.5, 0.5, 0.5])
+    assert session.pending_value == 0.7
+
+    # 保留した値はアイドル時に適用する
+    mm.run_deferred()
+    assert values(scene, nodes) == pytest.approx([0.7, 0.7, 0.7])
+    assert session.pending_value is None
+
+    assert not session.apply(0.75)
+    assert recorder.count("cmds.evalDeferred") == 2
+
+    # 確定で最後の値を適用し､ Undo の記録は一回だけ
+    session.commit(0.8)
+    assert values(scene, nodes) == pytest.approx([0.8, 0.8, 0.8])
+    assert recorder.count("cmds.attributeEdit") == 1
+    assert recorder.count("cmds.setAttr") == 0
+
+    record = [r for r in recorder.records if r.name == "cmds.attributeEdit"][0]
+    assert record.kwargs["before"] == pytest.approx([0.1, 0.2, 0.3])
+
+    session.cancel()
+    assert values(scene, nodes) == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_relative_session(scene, nodes):
+    session = nie.AttributeEditSession(nodes, "adjustEdgeFlow", relative=True)
+
+    # 基準値は先頭ノードの値で､ノード毎の差を保つ
+    session.commit(0.3)
+    assert values(scene, nodes) == pytest.approx([0.3, 0.4, 0.5])
+
+    session.commit(0.2)
+    assert values(scene, nodes) == pytest.approx([0.2, 0.3, 0.4])
@@ -0,0 +1,39 @@
+"""nnutil.polyline のテスト"""
+import mayamock as mm
+
+import nnutil.polyline as npl
+
+
+def test_decompose():
+    # 0-1-2-3 の開いた列 (逆順に渡す)､ 4-5-6-4 の閉じた列
+    edge_vertices = [(2, 3), (1, 2), (0, 1), (4, 5), (6, 4), (5, 6)]
+    chains = npl.decompose(edge_vertices)
+
+    assert chains[0] == ([0, 1, 2], [3, 2, 1, 0], False)
+    assert sorted(chains[1][0]) == [3, 4, 5]
+    assert chains[1][1][0] == chains[1][1][-1]
+    assert chains[1][2]
+
+
+def test_decompose_splits_at_intersection():
+    # 頂点 0 に 4 本のエッジが集まる十字は 4 本の列になる
+    edge_vertices = [(0, 1), (1, 2), (0, 3), (0, 4), (4, 5), (0, 6)]
+    chains = npl.decompose(edge_vertices)
+
+    assert [c[0] for c in chains] == [[0, 1], [2], [3, 4], [5]]
+    assert chains[0][1] == [0, 1, 2]
+    assert not any(c[2] for c in chains)
+
+
+def test_cache(scene):
+    mm.create_plane("plane", 2, 2)
+    npl.clear_cache()
+    edges = ["plane.e[0]", "plane.e[1]", "plane.e[4]"]
+
+    polylines = npl.get_polylines(edges)
+    count = npl._cache.build_count
+
+    assert npl.get_polylines(edges) is polylines
+    assert npl._cache.build_count == count
+    assert sorted(p.edges[0] for p in polylines) == sorted(p.edges[0] for p in npl.get_polylines(edges[::-1]))
+    assert npl._cache.build_count == count + 1
@@ -0,0 +1,116 @@
+"""nnutil.profiler のテスト"""
+import json
+import threading
+
+import pytest
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnutil.core as nu
+import nnutil.profiler as prof
+import nnskin.core as nsc
+
+
+@pytest.fixture(autouse=True)
+def profiler():
+    prof.reset()
+
+    yield prof.profiler
+
+    prof.disable()
+    prof.reset()
+
+
+def test_disabled_records_nothing():
+    @nu.timer
+    def f():
+        return 1
+
+    assert f() == 1
+    assert prof.stats() == []
+
+
+def test_nested_scopes_and_stats():
+    @nu.timer
+    def inner():
+        pass
+
+    @nu.timer
+    def outer():
+        for _ in range(3):
+            inner()
+
+    prof.enable()
+    outer()
+    outer()
+    prof.disable()
+
+    rows = {row["name"]: row for row in prof.stats()}
+    inner_name = [name for name in rows if name.endswith("inner")][0]
+    outer_name = [name for name in rows if name.endswith("outer")][0]
+
+    assert rows[inner_name]["count"] == 6
+    assert rows[outer_name]["count"] == 2
+    assert rows[inner_name]["min"] <= rows[inner_name]["mean"] <= rows[inner_name]["max"]
+    assert rows[inner_name]["p95"] <= rows[inner_name]["max"]
+
+    depths = {e.name: e.depth for e in prof.profiler.events}
+    assert depths[outer_name] == 0
+    assert depths[inner_name] == 1
+
+
+def test_scopes_are_per_thread():
+    def work():
+        with prof.scope("worker"):
+            pass
+
+    prof.enable()
+    with prof.scope("main"):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    prof.disable()
+
+    events = {e.name: e for e in prof.profiler.events}
+    assert events["worker"].depth == 0
+    assert events["worker"].thread_id != events["main"].thread_id
+
+
+def test_cmds_counting(scene):
+    mm.create_plane("plane", 4, 1)
+    mm.create_joint("joint1")
+    mm.bind_skin("plane", ["joint1"], [[1.0]] * 10)
+    nsc.weightclipboard = {"joint1": 1.0}
+
+    prof.enable(count_cmds=True)
+    nsc.paste_weight_as_possible(["plane.vtx[0:4]"])
+    prof.disable()
+
+    # 差し替えたプロキシは disable で元に戻る
+    assert nsc.cmds is cmds
+
+    row = [r for r in prof.stats() if r["name"].endswith("paste_weight_as_possible")][0]
+    event = [e for e in prof.profiler.events if e.name == row["name"]][0]
+    assert event.cmds_self["skinPercent"] == 5
+    assert row["cmds"] == sum(event.cmds_self.values())
+
+
+def test_export(tmp_path):
+    prof.enable()
+    with prof.scope("a"):
+        with prof.scope("b"):
+            pass
+    prof.disable()
+
+    path = tmp_path / "trace.json"
+    prof.export_chrome_trace(str(path))
+    trace = json.loads(path.read_text())
+
+    assert sorted(e["name"] for e in trace["traceEvents"]) == ["a", "b"]
+    assert all(e["ph"] == "X" for e in trace["traceEvents"])
+
+    lines = prof.summary().splitlines()
+    assert lines[0].split() == ["name", "count", "total", "min", "mean", "p95", "cmds"]
+    assert len(lines) == 4
@@ -0,0 +1,99 @@
+"""nnutil.skin_index のテスト"""
+import importlib
+
+import pytest
+
+import maya.cmds as cmds
+import mayamock as mm
+
+import nnmisc.core as nmc
+import nnutil.skin_index as nsi
+
+
+@pytest.fixture
+def rig(scene):
+    """root 以下に 3 本のジョイントと､それぞれ別のジョイントにバインドされた 3 枚のプレーン"""
+    mm.create_joint("root")
+    mm.create_joint("spine", position=(0, 1, 0), parent="root")
+    mm.create_joint("arm", position=(1, 0, 0), parent="spine")
+    mm.create_joint("other")
+
+    for name, influences in (("body", ["root", "spine"]), ("hand", ["arm"]), ("prop", ["other"])):
+        mm.create_plane(name, 1, 1)
+        mm.bind_skin(name, influences, [[1.0 / len(influences)] * len(influences)] * 4, name=name + "_skinCluster")
+
+
+def test_queries(rig):
+    index = nsi.get_index()
+
+    assert index.meshes_from_joints(["spine", "arm"]) == ["body", "hand"]
+    assert index.skinclusters_from_joint("other") == ["prop_skinCluster"]
+    assert index.skincluster_of("hand") == "hand_skinCluster"
+    assert index.skincluster_of("handShape") == "hand_skinCluster"
+    assert index.skincluster_of("hand.vtx[2]") == "hand_skinCluster"
+    assert index.skincluster_of("root") == ""
+    assert index.influences("body_skinCluster") == ["root", "spine"]
+    assert index.influence_index("body_skinCluster", "spine") == 1
+    assert index.influence_index("body_skinCluster", "arm") == -1
+
+
+def test_invalidation(rig):
+    index = nsi.get_index()
+    count = index.build_count
+
+    # 問い合わせだけでは再構築しない
+    index.meshes_from_joints(["root"])
+    assert index.build_count == count
+
+    # スキンクラスターの追加で再構築される
+    mm.create_plane("extra", 1, 1)
+    mm.bind_skin("extra", ["arm"], [[1.0]] * 4, name="extra_skinCluster")
+    assert index.meshes_from_joints(["arm"]) == ["hand", "extra"]
+    assert index.build_count == count + 1
+
+    # 新規シーンで空になる
+    mm.new_scene()
+    assert index.meshes_from_joints(["arm"]) == []
+
+
+def test_select_all_skined_meshes_from_root_joint(rig, recorder):
+    with recorder.measure() as calls:
+        meshes = nmc.select_all_skined_meshes_from_root_joint("root")
+
+    assert sorted(meshes) == ["body", "hand"]
+    assert mm.scene.selection == meshes
+    assert not [c for c in calls if c.name in ("cmds.listConnections", "mel.eval")]
+
+
+def test_rename_and_reparent(rig):
+    index = nsi.get_index()
+    count = index.build_count
+
+    # 対応表に無いノードの名前の変更では再構築しない
+    mm.create_joint("unused")
+    cmds.rename("unused", "unused2")
+    assert index.skincluster_of("hand") == "hand_skinCluster"
+    assert index.build_count == count
+
+    cmds.rename("hand", "hand_geo")
+    assert index.skincluster_of("hand_geo") == "hand_skinCluster"
+    assert index.skincluster_of("hand") == ""
+
+    cmds.rename("arm", "arm_jnt")
+    assert index.meshes_from_joints(["arm_jnt"]) == ["hand_geo"]
+
+    count = index.build_count
+    mm.create_joint("group")
+    cmds.parent("hand_geo", "group")
+    index.skincluster_of("hand_geo")
+    assert index.build_count == count + 1
+
+
+def test_reload_removes_callbacks(rig):
+    nsi.get_index()
+    count = len(mm.scene.callbacks)
+
+    importlib.reload(nsi)
+    nsi.get_index()
+
+    assert len(mm.scene.callbacks) == count
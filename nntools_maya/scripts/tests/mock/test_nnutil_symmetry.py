@@ -0,0 +1,118 @@
+"""nnutil.symmetry のテスト"""
+import pytest
+
+import mayamock as mm
+import maya.cmds as cmds
+
+import nnutil.symmetry as nsym
+
+
+def grid(width=4, height=2):
+    """X = 0 で左右対称な XZ 平面のグリッドの頂点座標とフェース"""
+    points = [[i - width / 2.0, 0.0, float(j)] for j in range(height + 1) for i in range(width + 1)]
+    faces = []
+
+    for j in range(height):
+        for i in range(width):
+            v0 = j * (width + 1) + i
+            faces.append([v0, v0 + 1, v0 + width + 2, v0 + width + 1])
+
+    return points, faces
+
+
+def expected_mirror(width=4, height=2):
+    return [j * (width + 1) + (width - i) for j in range(height + 1) for i in range(width + 1)]
+
+
+def test_positional_and_topological_map():
+    points, faces = grid()
+    points[0][0] -= 0.0005  # 許容誤差内のずれ
+
+    assert nsym.positional_map(points, axis=0, tolerance=0.001) == expected_mirror()
+
+    # 大きくずれた頂点は対応が見つからない
+    points[0][0] -= 0.1
+    mirror = nsym.positional_map(points, axis=0, tolerance=0.001)
+    assert mirror[0] == -1 and mirror[4] == -1
+
+    # トポロジーは位置がずれていても対応する
+    seed = nsym.find_center_edge(grid()[0], faces, axis=0)
+    assert seed == (2, 7)
+    assert nsym.topological_map(faces, len(points), seed) == expected_mirror()
+
+    with pytest.raises(ValueError):
+        nsym.topological_map(faces, len(points), (0, 1))
+
+
+def test_influence_map():
+    influences = ["|root|spine", "|root|L_arm", "|root|R_arm", "|root|arm_l", "|root|hand_r"]
+    labels = [(0, 1, ""), (0, 0, ""), (0, 0, ""), (1, 18, "hand"), (2, 18, "hand")]
+
+    assert nsym.influence_map(influences, labels=labels) == [0, 2, 1, 4, 3]
+
+    positions = [[0, 1, 0], [1, 1, 0], [-1, 1, 0], [2, 0, 0], [-2.1, 0, 0]]
+    assert nsym.influence_map(influences, positions=positions, association=nsym.INFLUENCE_CLOSEST) == [0, 2, 1, 4, 3]
+
+
+def test_influence_map_ambiguous_labels():
+    # type が None のラベルと二つのインフルエンスで共有される Arm ラベルは名前で対応させる
+    influences = ["L_hip", "R_hip", "L_arm", "L_forearm", "R_arm", "R_forearm", "L_hand", "R_hand"]
+    labels = [(1, 0, ""), (2, 0, ""), (1, 10, ""), (1, 10, ""), (2, 10, ""), (2, 10, ""), (1, 12, ""), (2, 12, "")]
+
+    assert nsym.influence_map(influences, labels=labels) == [1, 0, 4, 5, 2, 3, 7, 6]
+
+
+
+def test_symmetrize_points_uses_cache(scene):
+    points, faces = grid()
+    points[4][1] = 0.5
+    points[2][0] = 0.0004
+    mm.create_mesh("body", points, faces)
+
+    # 位置では対応しない変形もトポロジーの対応でコピーできる
+    nsym.clear_cache()
+    unmatched = nsym.symmetrize_points("body", axis=0, direction=1, method=nsym.METHOD_TOPOLOGY)
+
+    assert unmatched == []
+    assert cmds.xform("body.vtx[0]", q=True, t=True) == pytest.approx([-2.0, 0.5, 0.0])
+    assert cmds.xform("body.vtx[2]", q=True, t=True) == pytest.approx([0.0, 0.0, 0.0])
+
+    # 書き込んだ結果ではマップを作り直さない
+    nsym.symmetrize_points("body", axis=0, direction=1)
+    count = nsym._cache.build_count
+    assert nsym.snap_center("body", axis=0) == 0
+    nsym.symmetrize_points("body", axis=0, direction=-1)
+    assert nsym._cache.build_count == count
+
+    # 頂点の移動で作り直す
+    cmds.xform("body.vtx[3]", t=(1.0, 1.0, 0.0))
+    nsym.symmetrize_points("body", axis=0, direction=-1)
+    assert nsym._cache.build_count == count + 1
+
+
+def test_mirror_weights_and_colors(scene, recorder, call_budget):
+    points, faces = grid()
+    colors = [[points[vi][0], 0.0, 0.0, 1.0] for f in faces for vi in f]
+    mm.create_mesh("body", points, faces, colors=colors)
+
+    mm.create_joint("root")
+    mm.create_joint("L_arm", position=(1, 0, 0), parent="root")
+    mm.create_joint("R_arm", position=(-1, 0, 0), parent="root")
+    weights = [[0.0, 1.0, 0.0] if p[0] > 0 else [0.5, 0.0, 0.5] for p in points]
+    skincluster = mm.bind_skin("body", ["root", "L_arm", "R_arm"], weights)
+
+    nsym.clear_cache()
+    recorder.clear()
+    assert nsym.mirror_weights("body", axis=0, direction=1) == []
+    call_budget("nnutil.symmetry.mirror_weights", recorder.records)
+
+    result = scene.get(skincluster).data.weights
+    for vi, p in enumerate(points):
+        if p[0] < 0:
+            assert result[vi] == pytest.approx([0.0, 0.0, 1.0])
+        elif p[0] == 0:
+            assert result[vi] == pytest.approx([0.5, 0.25, 0.25])
+
+    nsym.mirror_colors("body", axis=0, direction=1)
+    stored = scene.mesh("body").data.get_colors()
+    assert [c[0] for c in stored] == [abs(points[vi][0]) for f in faces for vi in f]
@@ -0,0 +1,56 @@
+"""nnutil.uv_kernel のテスト"""
+import itertools
+import random
+
+import pytest
+
+import nnutil.uv_kernel as nuvk
+
+
+def brute_force_farthest(points):
+    return max(itertools.combinations(range(len(points)), 2), key=lambda ij: nuvk._distance_sq(points[ij[0]], points[ij[1]]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_farthest_pair(seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(200)]
+
+    i, j = nuvk.farthest_pair(points)
+    a, b = brute_force_farthest(points)
+
+    assert nuvk._distance_sq(points[i], points[j]) == pytest.approx(nuvk._distance_sq(points[a], points[b]))
+
+
+def test_farthest_pair_collinear():
+    points = [(0.0, 0.5), (0.3, 0.5), (1.0, 0.5), (0.6, 0.5)]
+    assert sorted(nuvk.farthest_pair(points)) == [0, 2]
+
+
+def test_project_to_line():
+    points = [(0.0, 0.0), (0.25, 0.1), (0.5, -0.1), (1.0, 0.0)]
+
+    arc = nuvk.project_to_line(points, 0, 3, preserve_arc=True)
+    distance = nuvk.project_to_line(points, 0, 3, preserve_arc=False)
+
+    assert arc[0] == (0.0, 0.0)
+    assert arc[3] == (1.0, 0.0)
+    assert all(v == pytest.approx(0.0) for _, v in arc + distance)
+
+    # 弧長の比率では区間の長さの比が元の折れ線と一致する
+    lengths = [nuvk.math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:])]
+    assert arc[1][0] == pytest.approx(lengths[0] / sum(lengths))
+    assert distance[1][0] == pytest.approx(nuvk.math.hypot(0.25, 0.1))
+    assert nuvk.project_to_line([(0.1, 0.1), (0.1, 0.1)], 0, 1) is None
+
+
+def test_facing_and_mirror():
+    us = [0.0, 1.0, 1.0, 0.0]
+    vs = [0.0, 0.0, 1.0, 1.0]
+    faces = [[0, 1, 2, 3], [0, 3, 2, 1], [0, 0, 1]]
+
+    assert nuvk.classify_facing(us, vs, faces) == [nuvk.FACING_FRONT, nuvk.FACING_BACK, nuvk.FACING_DEGENERATE]
+
+    nuvk.mirror(us, vs, [1, 2], (0.0, 0.0), nuvk.AXIS_U)
+    assert us == [0.0, -1.0, -1.0, 0.0]
+    assert nuvk.backfacing_uv_ids(us, vs, faces[:1]) == {0, 1, 2, 3}
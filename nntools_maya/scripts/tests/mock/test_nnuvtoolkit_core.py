@@ -0,0 +1,78 @@
+"""nnuvtoolkit.core のテスト"""
+import pytest
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnuvtoolkit.core as nuvc
+
+
+def uv_of(obj, uvi):
+    data = mm.scene.mesh(obj).data.uv_set()
+    return data["us"][uvi], data["vs"][uvi]
+
+
+def test_linear_align(scene, recorder, call_budget):
+    mm.create_plane("plane", 4, 1)
+
+    # 下辺の UV を上下にずらしてから整列する
+    cmds.polyEditUV("plane.map[1]", v=0.1)
+    cmds.polyEditUV("plane.map[3]", v=-0.05)
+    cmds.select(["plane.map[0:4]"])
+
+    with recorder.measure() as calls:
+        nuvc.linear_align()
+
+    for uvi in range(5):
+        u, v = uv_of("plane", uvi)
+        assert v == pytest.approx(0.0, abs=1e-9)
+        assert 0.0 <= u <= 1.0
+
+    assert uv_of("plane", 0) == pytest.approx((0.0, 0.0))
+    assert uv_of("plane", 4) == pytest.approx((1.0, 0.0))
+    call_budget("nnuvtoolkit.core.linear_align", calls)
+
+
+def test_symmetry_arrange(scene, recorder, call_budget):
+    # x=+1..+5 と x=-5..-1 に鏡像配置された 2 枚のプレーン
+    mm.create_plane("right", 4, 2, translate=(1, 0, 0), uv_offset=(0.55, 0.1), uv_scale=0.3)
+    mm.create_plane("left", 4, 2, translate=(-5, 0, 0), uv_offset=(0.05, 0.5), uv_scale=0.3)
+
+    cmds.select(["right.map[0]", "left.map[0]"])
+
+    with recorder.measure() as calls:
+        nuvc.symmetry_arrange()
+
+    # left の頂点 (i, j) は right の頂点 (4-i, j) の鏡像で UV も u=0.5 で反転した位置になる
+    for j in range(3):
+        for i in range(5):
+            u_src, v_src = uv_of("right", j * 5 + (4 - i))
+            assert uv_of("left", j * 5 + i) == pytest.approx((1.0 - u_src, v_src))
+
+    call_budget("nnuvtoolkit.core.symmetry_arrange", calls)
+
+
+def test_half_expand_fold(scene, recorder, call_budget):
+    mm.create_plane("plane", 4, 1)
+    us_before = list(mm.scene.mesh("plane").data.uv_set()["us"])
+
+    # 中央の列を軸に右へ畳む
+    cmds.select(["plane.map[2]", "plane.map[7]"])
+
+    with recorder.measure() as calls:
+        nuvc.half_expand_fold(right_down=True)
+
+    data = mm.scene.mesh("plane").data.uv_set()
+    for j in range(2):
+        for i in range(5):
+            assert data["us"][j * 5 + i] == pytest.approx(abs(us_before[j * 5 + i] - 0.5) + 0.5)
+
+    assert recorder.count("cmds.polyEditUV") == 0
+    assert cmds.ls(selection=True) == []
+    call_budget("nnuvtoolkit.core.half_expand_fold", calls)
+
+    # 裏返った側を展開すると元に戻る
+    cmds.select(["plane.map[2]", "plane.map[7]"])
+    nuvc.half_expand_fold(right_down=True)
+    assert mm.scene.mesh("plane").data.uv_set()["us"] == pytest.approx(us_before)
@@ -0,0 +1,89 @@
+"""nnuvtoolkit.rectilinearize のテスト"""
+import pytest
+
+import mayamock as mm
+
+import nnutil.uv as nuv
+import nnuvtoolkit.rectilinearize as rl
+
+
+def uvs_of(obj):
+    data = mm.scene.mesh(obj).data.uv_set()
+    return list(zip(data["us"], data["vs"]))
+
+
+def create_wall(name, width, height, translate=(0, 0, 0)):
+    """XY 平面上のグリッド｡ UV は左右反転して歪ませておく"""
+    points = [[i, j * 0.5, 0.0] for j in range(height + 1) for i in range(width + 1)]
+    uvs = [[0.5 - 0.1 * i + 0.01 * j * j, 0.2 * j] for j in range(height + 1) for i in range(width + 1)]
+    faces = []
+    for j in range(height):
+        for i in range(width):
+            v0 = j * (width + 1) + i
+            faces.append([v0, v0 + 1, v0 + width + 2, v0 + width + 1])
+
+    return mm.create_mesh(name, points, faces, uvs=uvs, face_uvs=[list(f) for f in faces], translate=translate)
+
+
+def corners_of(name, width, height):
+    return ["%s.map[%d]" % (name, x) for x in (0, width, height * (width + 1), height * (width + 1) + width)]
+
+
+def test_mesh_uv_index_border_loop(scene):
+    mm.create_plane("plane", 4, 1)
+    index = rl.group_corners_by_shell(corners_of("plane", 4, 1))[0][0]
+
+    # 4x1 のグリッドは全 UV がボーダーで､フェースの巡回と逆向きに一周する
+    assert index.border_loop(0) == [0, 5, 6, 7, 8, 9, 4, 3, 2, 1]
+    assert rl.arc_length_params(index.points, [0, 1, 2, 4]) == (pytest.approx([0.0, 0.25, 0.5, 1.0]), pytest.approx(4.0))
+
+
+def test_rectilinearize_shells(scene, recorder):
+    create_wall("wall", 4, 1)
+    create_wall("tall", 1, 4, translate=(10, 0, 0))
+    center = [sum(x) / len(x) for x in zip(*uvs_of("wall"))]
+
+    with recorder.measure():
+        rl.main(corners_of("wall", 4, 1) + corners_of("tall", 1, 4), target_texel=100, map_size=100)
+
+    assert recorder.count("cmds.polyEditUV") == 0
+    assert recorder.count("om.MFnMesh.setUVs") == 2
+
+    for name, width, height in [("wall", 4, 1), ("tall", 1, 4)]:
+        uvs = uvs_of(name)
+        index = rl.MeshUVIndex(nuv.MeshUV(name))
+
+        # 3D と同じ大きさの長方形で V がワールド Y 方向になり､全フェースが表
+        us = sorted(set(round(u, 6) for u, _ in uvs))
+        vs = sorted(set(round(v, 6) for _, v in uvs))
+        assert us[-1] - us[0] == pytest.approx(width)
+        assert vs[-1] - vs[0] == pytest.approx(height * 0.5)
+        assert (len(us), len(vs)) == (width + 1, height + 1)
+        assert all(rl.signed_uv_area(index.mesh_uv.us, index.mesh_uv.vs, f[1]) > 0 for f in index.mesh_uv.face_uv_ids())
+
+    assert [sum(x) / len(x) for x in zip(*uvs_of("wall"))] == pytest.approx(center)
+
+
+def test_rectilinearize_needs_four_corners(scene):
+    create_wall("wall", 4, 1)
+    before = uvs_of("wall")
+
+    assert rl.rectilinearize_uvshell(corners_of("wall", 4, 1)[:3]) is None
+    assert rl.rectilinearize_shells(rl.group_corners_by_shell(corners_of("wall", 4, 1) + ["wall.map[2]"])) == []
+    assert uvs_of("wall") == before
+
+
+def test_rectilinearize_unfolds_inner_uvs(scene, recorder):
+    create_wall("wall", 4, 3)
+
+    with recorder.measure():
+        rl.main(corners_of("wall", 4, 3), target_texel=100, map_size=100)
+
+    # 内部 UV も Unfold3D を使わずにグリッド上に並ぶ
+    assert recorder.count("om.MFnMesh.setUVs") == 1
+    uvs = uvs_of("wall")
+    origin = uvs[0]
+    for j in range(4):
+        for i in range(5):
+            u, v = uvs[j * 5 + i]
+            assert (u - origin[0], v - origin[1]) == pytest.approx((i, j * 0.5), abs=1e-8)
@@ -0,0 +1,85 @@
+"""nnuvtoolkit.texel のテスト"""
+import pytest
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnuvtoolkit.core as nuvc
+import nnuvtoolkit.texel as uvtexel
+
+
+def uv_of(obj, uvi):
+    data = mm.scene.mesh(obj).data.uv_set()
+    return data["us"][uvi], data["vs"][uvi]
+
+
+def texels_of(obj, mapsize):
+    pairs = uvtexel.selected_edge_uv_pairs(["%s.map[*]" % obj])[0]
+    return uvtexel.measure(pairs, pairs.mesh_uv.points(), mapsize)["texel"]
+
+
+def test_collect_edge_uv_pairs(scene):
+    mm.create_plane("plane", 4, 1)
+
+    # 4x1 のグリッドのエッジは 13 本で全て UV エッジになる
+    pairs = uvtexel.selected_edge_uv_pairs(["plane.map[*]"])[0]
+    assert len(pairs) == 13
+    assert all(a < b for a, b in zip(pairs.uv_a, pairs.uv_b))
+
+    # UV 選択では選択した UV 同士を結ぶ UV エッジだけを先に選択した UV から集める
+    pairs = uvtexel.selected_edge_uv_pairs(["plane.map[6]", "plane.map[1]", "plane.map[0]"])[0]
+    assert sorted(zip(pairs.uv_a, pairs.uv_b)) == [(1, 0), (6, 1)]
+
+
+def test_set_edge_texel_uv_selection(scene, recorder, call_budget):
+    mm.create_plane("plane", 4, 1)
+    cmds.selectType(puv=True)
+    cmds.select(["plane.map[1]", "plane.map[2]", "plane.map[6]"])
+
+    with recorder.measure() as calls:
+        nuvc.set_edge_texel(target_texel=50, mapsize=100, mode=uvtexel.MODE_U_MIN)
+
+    # 縦方向の UV エッジ 1-6 は U の長さが 0 なので横方向の 1-2 だけが U 方向に 2 倍になる
+    assert uv_of("plane", 1) == pytest.approx((0.25, 0.0))
+    assert uv_of("plane", 2) == pytest.approx((0.75, 0.0))
+    assert uv_of("plane", 6) == pytest.approx((0.25, 1.0))
+
+    assert recorder.count("cmds.polyEditUV") == 0
+    assert recorder.count("om.MFnMesh.setUVs") == 1
+    call_budget("nnuvtoolkit.core.set_edge_texel", calls)
+
+
+def test_set_edge_texel_edge_selection(scene):
+    mm.create_plane("plane", 4, 1)
+    cmds.selectType(pe=True)
+    cmds.select(["plane.e[*]"])
+
+    nuvc.set_edge_texel(target_texel=20, mapsize=100, mode=uvtexel.MODE_V_MIN)
+
+    # 縦エッジが全て V 方向に 0.2 倍になり､横エッジは V の長さが 0 なのでスケールしない
+    for i in range(5):
+        assert uv_of("plane", i) == pytest.approx((i * 0.25, 0.0))
+        assert uv_of("plane", 5 + i) == pytest.approx((i * 0.25, 0.2))
+
+    assert set(round(x, 6) for x in texels_of("plane", 100)) == {25.0, 20.0}
+
+
+def test_texel_statistics(scene):
+    mm.create_plane("plane", 4, 1)
+    mm.create_plane("wide", 2, 1, translate=(0, 0, 5), uv_scale=0.5)
+
+    stats = uvtexel.texel_statistics(100, components=["plane", "wide"], bins=3)
+
+    # 横エッジは 0.25 / 1.0, 縦エッジは 1.0 / 1.0
+    shell = stats["planeShape"][0]
+    assert shell["count"] == 13
+    assert shell["min"] == pytest.approx(25)
+    assert shell["max"] == pytest.approx(100)
+    assert shell["histogram"] == [8, 0, 5]
+    assert shell["bin_edges"] == pytest.approx([25, 50, 75, 100])
+
+    shell = stats["wideShape"][0]
+    assert shell["min"] == pytest.approx(25)
+    assert shell["max"] == pytest.approx(50)
+    assert shell["mean"] == pytest.approx((25 * 4 + 50 * 3) / 7.0)
@@ -0,0 +1,67 @@
+"""nnuvtoolkit.unfold のテスト (Maya 非依存)"""
+import math
+
+import pytest
+
+import nnuvtoolkit.unfold as unfold
+
+
+def grid(width, height, z=lambda x, y: 0.0):
+    """width x height 分割のグリッドの 3D 座標と三角形と境界の ID"""
+    points = [[float(i), float(j), z(i, j)] for j in range(height + 1) for i in range(width + 1)]
+    polygons = []
+    for j in range(height):
+        for i in range(width):
+            v0 = j * (width + 1) + i
+            polygons.append([v0, v0 + 1, v0 + width + 2, v0 + width + 1])
+
+    border = [j * (width + 1) + i for j in range(height + 1) for i in range(width + 1) if i in (0, width) or j in (0, height)]
+
+    return points, unfold.triangulate(polygons), border
+
+
+@pytest.mark.parametrize("mode", [unfold.MODE_HARMONIC, unfold.MODE_CONFORMAL])
+def test_flat_grid_is_reproduced(mode):
+    # 平面のグリッドは境界を正しい位置に固定すれば内部も元の位置になる
+    points, triangles, border = grid(4, 3)
+    fixed = dict((i, (points[i][0] * 0.5 + 0.1, points[i][1] * 0.5 + 0.2)) for i in border)
+
+    uvs = unfold.solve(triangles, points, fixed, mode=mode)
+
+    for (u, v), p in zip(uvs, points):
+        assert (u, v) == pytest.approx((p[0] * 0.5 + 0.1, p[1] * 0.5 + 0.2), abs=1e-8)
+
+
+def test_conformal_with_two_pins():
+    # 等角モードは 2 点の固定だけで平面の相似変換を再現する
+    points, triangles, _ = grid(3, 3)
+    angle = math.radians(30)
+    expected = [(math.cos(angle) * x - math.sin(angle) * y, math.sin(angle) * x + math.cos(angle) * y) for x, y, _ in points]
+
+    uvs = unfold.solve(triangles, points, {0: expected[0], 15: expected[15]}, mode=unfold.MODE_CONFORMAL)
+
+    assert [c for uv in uvs for c in uv] == pytest.approx([c for uv in expected for c in uv], abs=1e-8)
+
+
+def test_harmonic_equals_conformal_with_fixed_border():
+    points, triangles, border = grid(4, 4, z=lambda x, y: 0.3 * math.sin(x) * math.cos(y))
+    fixed = dict((i, (points[i][0] / 4.0, points[i][1] / 4.0)) for i in border)
+
+    harmonic = unfold.solve(triangles, points, fixed, mode=unfold.MODE_HARMONIC)
+    conformal = unfold.solve(triangles, points, fixed, mode=unfold.MODE_CONFORMAL)
+
+    assert [c for uv in harmonic for c in uv] == pytest.approx([c for uv in conformal for c in uv], abs=1e-8)
+
+    # 内部の UV は全て境界の内側で三角形は裏返らない
+    assert all(0.0 < u < 1.0 and 0.0 < v < 1.0 for i, (u, v) in enumerate(harmonic) if i not in fixed)
+    assert all(unfold.signed_area([harmonic[x] for x in t]) > 0 for t in triangles)
+
+
+def test_texel_scale():
+    assert unfold.triangle_area([0, 0, 0], [2, 0, 0], [0, 0, 3]) == pytest.approx(3.0)
+    assert unfold.signed_area([(0, 0), (0, 1), (1, 0)]) == pytest.approx(-0.5)
+
+    # 3D で 4 平方単位を UV で 0.01 にすると 1024px で 51.2 px/単位
+    assert unfold.texel_density(0.01, 4.0, 1024) == pytest.approx(51.2)
+    assert unfold.texel_scale(0.01, 4.0, 102.4, 1024) == pytest.approx(2.0)
+    assert unfold.texel_scale(0.0, 4.0, 10, 1024) == 1.0
@@ -0,0 +1,89 @@
+"""nnuvtoolkit.draw_image.wireframe のテスト"""
+import re
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnutil.image as nimg
+import nnuvtoolkit.draw_image.wireframe as wf
+
+
+def svg_segments(path):
+    with open(path) as f:
+        return [tuple(map(float, m)) for m in re.findall(r"M(\S+) (\S+)L(\S+) (\S+?)(?=M|\")", f.read())]
+
+
+def test_iter_uv_edges_dedup(scene):
+    mm.create_plane("plane", 2, 2)
+
+    edges = list(wf.iter_uv_edges("plane"))
+
+    # 2x2 のグリッドのエッジは 12 本
+    assert len(edges) == 12
+    assert len({(e[0], e[1], e[2], e[3]) for e in edges}) == 12
+
+
+def test_iter_uv_edges_seam(scene):
+    mm.create_plane("plane", 2, 1)
+    data = mm.scene.mesh("plane").data.uv_set()
+
+    # 右のフェースに別の UV を割り当てて中央のエッジを UV 境界にする
+    fuv = data["face_uvs"][1]
+    data["face_uvs"][1] = list(range(len(data["us"]), len(data["us"]) + len(fuv)))
+    data["us"].extend(data["us"][uvi] for uvi in fuv)
+    data["vs"].extend(data["vs"][uvi] for uvi in fuv)
+
+    edges = list(wf.iter_uv_edges("plane"))
+
+    # 境界になった中央のエッジは両側のフェースから出力される
+    assert len(edges) == 8
+    assert len({tuple(sorted([(e[0], e[1]), (e[2], e[3])])) for e in edges}) == 7
+
+
+def test_export_svg_selected_edges(scene, tmp_path, recorder):
+    mm.create_plane("plane", 2, 2)
+    cmds.select(["plane.e[0]", "plane.e[1]"])
+
+    with recorder.measure() as calls:
+        files = wf.export_uv_wireframe(str(tmp_path / "edges.svg"), image_size=100)
+
+    segments = svg_segments(files[1001])
+    assert len(segments) == 2
+    # y は上下反転される
+    assert (0.0, 100.0, 50.0, 100.0) in segments
+    assert not [c for c in calls if c.name == "cmds.polyEditUV"]
+
+
+def test_export_png_udim(scene, tmp_path):
+    mm.create_plane("a", 1, 1)
+    mm.create_plane("b", 1, 1, uv_offset=(1.25, 0.25), uv_scale=0.5)
+
+    files = wf.export_uv_wireframe(str(tmp_path / "uv.<UDIM>.png"), targets=["a", "b"], image_size=16, udim=True, shell_colors=True)
+
+    assert sorted(files) == [1001, 1002]
+    assert files[1002].endswith("uv.1002.png")
+
+    with open(files[1002], "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_svg_writer_integer_mode_flips_before_truncating(tmp_path):
+    writer = wf.SvgWriter(str(tmp_path / "a.svg"), 100, integer_mode=True)
+    writer.add(10.6, 10.3, 20.2, 0.5, (0, 0, 0, 255))
+    writer.close()
+
+    assert svg_segments(writer.filepath) == [(10.0, 89.0, 20.0, 99.0)]
+
+
+def test_raster_writer_batches(tmp_path):
+    writer = wf.RasterWriter(str(tmp_path / "a.bmp"), 8, wf.FORMAT_BMP, batch_size=2)
+
+    for y in range(5):
+        writer.add(0, y, 7, y, (255, 0, 0, 255))
+
+    assert len(writer._batches[(255, 0, 0, 255)]) == 1
+    writer.close()
+
+    assert writer.image.get_pixel(3, 4) == nimg.red
+    assert writer.image.get_pixel(3, 6) == nimg.Pixel(0, 0, 0, 0)
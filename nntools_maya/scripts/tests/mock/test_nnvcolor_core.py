@@ -0,0 +1,78 @@
+"""nnvcolor.core のテスト"""
+import pytest
+
+import mayamock as mm
+
+import maya.cmds as cmds
+
+import nnvcolor.core as nvc
+import nnvcolor.layers as vlayers
+
+
+def colors_of(obj):
+    return mm.scene.mesh(obj).data.get_colors()
+
+
+def test_vfi_string_conversion():
+    assert nvc.str_to_vfi("plane.vtxFace[3][1]") == (1, 3)
+    assert nvc.vfi_to_str("plane", 1, 3) == "plane.vtxFace[3][1]"
+    assert nvc.str_to_vfi("plane.vtx[3]") is None
+
+
+def test_store_and_restore_colors(scene):
+    mm.create_plane("plane", 2, 2, colors=True)
+    original = [list(c) for c in colors_of("plane")]
+
+    stored = nvc.store_colors(["plane"])
+    cmds.polyColorPerVertex("plane.vtx[*]", r=0.0, g=0.0)
+
+    # g 以外を復元
+    nvc.restore_colors(["plane"], stored, r=True, g=False, b=True, a=True)
+
+    for before, after in zip(original, colors_of("plane")):
+        assert after == pytest.approx([before[0], 0.0, before[2], before[3]])
+
+
+@pytest.mark.parametrize("via_api", [True, False])
+def test_set_unified_color(scene, recorder, call_budget, via_api):
+    mm.create_plane("plane", 4, 4, colors=True)
+    original = [list(c) for c in colors_of("plane")]
+    targets = ["plane.vtx[0:4]"]
+
+    with recorder.measure() as calls:
+        nvc.NN_ToolWindow._set_unified_color(None, targets, "b", 0.25, via_api=via_api)
+
+    mesh = mm.scene.mesh("plane").data
+    changed = {mesh.face_vertex_index(fi, vi) for vi in range(5) for fi in mesh.vertex_faces[vi]}
+
+    for i, (before, after) in enumerate(zip(original, colors_of("plane"))):
+        if i in changed:
+            assert after == pytest.approx([before[0], before[1], 0.25, before[3]])
+        else:
+            assert after == pytest.approx(before)
+
+    call_budget("nnvcolor.core.set_unified_color[%s]" % ("api" if via_api else "cmds"), calls)
+
+
+def test_set_unified_color_to_layer(scene, recorder):
+    mm.create_plane("plane", 2, 2, colors=True)
+    original = [list(c) for c in colors_of("plane")]
+    layer = vlayers.LayerTarget("paint")
+
+    nvc.NN_ToolWindow._set_unified_color(None, ["plane.vtx[0]"], "r", 0.0, layer=layer)
+
+    # 編集はレイヤーに書き込まれ､メッシュにはスタックの合成結果が適用される
+    stack = layer.stack("plane")
+    assert [x.name for x in stack.layers] == ["base", "paint"]
+    assert list(stack.layer("base").colors) == pytest.approx([x for c in original for x in c])
+    assert [x for c in colors_of("plane") for x in c] == pytest.approx(list(stack.composite()))
+
+    mesh = mm.scene.mesh("plane").data
+    changed = {mesh.face_vertex_index(fi, 0) for fi in mesh.vertex_faces[0]}
+    assert [colors_of("plane")[i][0] for i in changed] == pytest.approx([0.0] * len(changed))
+    assert recorder.count("cmds.polyColorPerVertex") == 0
+
+    # 保存したスタックを読み直して続けて編集できる
+    layer.save()
+    assert layer.stacks == {}
+    assert [x.name for x in vlayers.load_stack("plane").layers] == ["base", "paint"]
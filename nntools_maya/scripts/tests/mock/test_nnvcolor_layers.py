@@ -0,0 +1,60 @@
+"""nnvcolor.layers のテスト"""
+import pytest
+
+import mayamock as mm
+
+import nnvcolor.layers as vlayers
+
+
+def test_blend_modes():
+    base = [0.5, 0.5, 0.5, 1.0] * 2
+
+    def blended(mode, opacity=1.0, mask=None):
+        layer = vlayers.ColorLayer("layer", [0.25, 1.0, 0.0, 0.5] * 2, mode, opacity, mask)
+        return list(vlayers.blend(base, layer))
+
+    assert blended(vlayers.MODE_COPY, 0.5) == pytest.approx([0.375, 0.75, 0.25, 0.75] * 2)
+    assert blended(vlayers.MODE_MUL) == pytest.approx([0.125, 0.5, 0.0, 0.5] * 2)
+    assert blended(vlayers.MODE_ADD, mask=[1.0, 0.0]) == pytest.approx([0.75, 1.5, 0.5, 1.5] + [0.5, 0.5, 0.5, 1.0])
+    assert blended(vlayers.MODE_DIV, 0.5)[0:2] == pytest.approx([0.5 / 0.625, 0.5])
+
+
+def test_stack_round_trip(tmp_path):
+    stack = vlayers.LayerStack(2)
+    stack.add_layer("base", [0.5, 0.5, 0.5, 1.0] * 2)
+    stack.add_layer("ao", [0.5, 0.5, 0.5, 1.0] * 2, mode=vlayers.MODE_MUL, mask=[1.0, 0.5])
+    stack.add_layer("tint", [1.0, 0.0, 0.0, 1.0] * 2, opacity=0.5, index=1)
+    assert [x.name for x in stack.layers] == ["base", "tint", "ao"]
+
+    stack.layer("tint").visible = False
+    expected = list(stack.composite())
+    assert expected == pytest.approx([0.25, 0.25, 0.25, 1.0, 0.375, 0.375, 0.375, 1.0])
+
+    path = tmp_path / "layers.json"
+    vlayers.export_stack(stack, str(path))
+    loaded = vlayers.import_stack(str(path))
+
+    assert [x.name for x in loaded.layers] == ["base", "tint", "ao"]
+    assert list(loaded.composite()) == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        stack.add_layer("bad", [1.0] * 4)
+
+
+def test_apply_stack(scene, recorder):
+    mm.create_plane("plane", 2, 2, colors=True)
+
+    stack = vlayers.load_stack("plane")
+    assert [x.name for x in stack.layers] == ["base"]
+
+    stack.add_layer("dark", [0.0, 0.0, 0.0, 1.0] * stack.num_face_vertices, mode=vlayers.MODE_MUL, opacity=0.5)
+    vlayers.save_stack("plane", stack)
+
+    recorder.clear()
+    vlayers.apply_stack("plane", vlayers.load_stack("plane"))
+    assert recorder.count("om.MFnMesh.setFaceVertexColors") == 1
+
+    colors = scene.mesh("plane").data.get_colors()
+    base = stack.layer("base").colors
+    assert [c[0] for c in colors] == pytest.approx([base[i * 4] * 0.5 for i in range(len(colors))], abs=1e-6)
+    assert [c[3] for c in colors] == pytest.approx([1.0] * len(colors))
@@ -0,0 +1,59 @@
+"""plug-ins/snapshotStatePlugin.py の Undo/Redo のテスト"""
+import importlib.util
+
+import mayamock as mm
+
+from conftest import scripts_dir
+
+
+def load_plugin():
+    path = scripts_dir.parent / "plug-ins" / "snapshotStatePlugin.py"
+    spec = importlib.util.spec_from_file_location("snapshotStatePlugin", str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def snapshot(plugin, targets, **flags):
+    """snapshotState コマンドの doIt と同じ状態を引数の解析なしで作る"""
+    command = plugin.SnapshotState()
+    command.targets = targets
+
+    for name, value in flags.items():
+        setattr(command, "to_store_" + name, value)
+
+    command.store()
+
+    return command
+
+
+def colors_of(shape):
+    return [list(c) for c in mm.scene.mesh(shape).data.get_colors()]
+
+
+def test_undo_colors_of_two_meshes(scene):
+    plugin = load_plugin()
+    mm.create_plane("a", 2, 2, colors=True)
+    mm.create_plane("b", 3, 1, colors=True, translate=(10, 0, 0))
+    shapes = ["aShape", "bShape"]
+    before = dict((x, colors_of(x)) for x in shapes)
+
+    # 編集前後でスナップショットを取る
+    before_edit = snapshot(plugin, shapes, colors=True, positions=True)
+
+    for shape in shapes:
+        for color in mm.scene.mesh(shape).data.get_colors():
+            color[:] = [1.0, 0.0, 0.0, 1.0]
+
+    after = dict((x, colors_of(x)) for x in shapes)
+    after_edit = snapshot(plugin, shapes, colors=True, positions=True)
+
+    # Undo は後に実行したコマンドから
+    after_edit.undoIt()
+    before_edit.undoIt()
+    assert dict((x, colors_of(x)) for x in shapes) == before
+
+    before_edit.redoIt()
+    after_edit.redoIt()
+    assert dict((x, colors_of(x)) for x in shapes) == after
@@ -15,8 +15,9 @@ class TestNNTools(unittest.TestCase):
         # 環境パス追加
         sys.path.append(str(test_path))
 
-        # 全pyファイル
-        python_files = [x for x in test_path.rglob('*.py') if "__init__.py" not in x.name]
+        # 全pyファイル (モック Maya はツールのモジュールではないので除外)
+        mock_path = test_path / "tests" / "mock"
+        python_files = [x for x in test_path.rglob('*.py') if "__init__.py" not in x.name and mock_path not in x.parents]
 
         # インポートの成功失敗の統計
         for file_path in python_files: